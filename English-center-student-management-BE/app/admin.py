@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from app.apps.users.models import User
 from app.apps.hocviens.models import HocVien
+from app.apps.hocviens.search import search_hocvien
 from app.apps.khoahocs.models import KhoaHoc
 from app.apps.dangky.models import DangKyKhoaHoc
 from app.apps.thanhtoans.models import ThanhToan
@@ -31,6 +32,9 @@ class HocVienAdmin(admin.ModelAdmin):
     search_fields = ['ten', 'email', 'sdt']
     ordering = ['-created_at']
     readonly_fields = ['created_at', 'updated_at']
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_hocvien(queryset, search_term), False
     
     fieldsets = (
         ('Thông tin cơ bản', {
@@ -56,6 +60,21 @@ class KhoaHocAdmin(admin.ModelAdmin):
     search_fields = ['ten', 'giang_vien']
     ordering = ['-created_at']
     readonly_fields = ['created_at', 'updated_at', 'so_hoc_vien_dang_ky', 'so_hoc_vien_hoan_thanh', 'ty_le_hoan_thanh']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stats()
+
+    @admin.display(description='Số học viên', ordering='so_dang_ky')
+    def so_hoc_vien_dang_ky(self, obj):
+        return obj.so_hoc_vien
+
+    @admin.display(description='Hoàn thành', ordering='so_hoan_thanh')
+    def so_hoc_vien_hoan_thanh(self, obj):
+        return obj.so_hoc_vien_hoan_thanh
+
+    @admin.display(description='Tỷ lệ hoàn thành (%)', ordering='phan_tram_tb')
+    def ty_le_hoan_thanh(self, obj):
+        return round(obj.ty_le_hoan_thanh, 2)
     
     fieldsets = (
         ('Thông tin khóa học', {
@@ -5,3 +5,7 @@ class ChamsocConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.apps.chamsoc'
     verbose_name = 'Chăm sóc học viên'
+
+    def ready(self):
+        from app.core.cache import invalidate_on_change
+        invalidate_on_change(self.get_model('ChamSocHocVien'), 'care')
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:31
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction, nhưng không khóa ghi bảng
+    atomic = False
+
+    dependencies = [
+        ('chamsoc', '0001_initial'),
+        ('hocviens', '0008_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='chamsochocvien',
+            index=models.Index(fields=['hocvien', '-ngay'], name='erp_care_hocvien_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='chamsochocvien',
+            index=models.Index(fields=['trang_thai', '-ngay'], name='erp_care_trang_thai_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='chamsochocvien',
+            index=models.Index(fields=['loai_cham_soc', '-ngay'], name='erp_care_loai_idx'),
+        ),
+    ]
@@ -59,6 +59,11 @@ class ChamSocHocVien(BaseModel):
         verbose_name_plural = 'Chăm sóc học viên'
         ordering = ['-ngay']
         db_table = 'erp_care_logs'
+        indexes = [
+            models.Index(fields=['hocvien', '-ngay'], name='erp_care_hocvien_idx'),
+            models.Index(fields=['trang_thai', '-ngay'], name='erp_care_trang_thai_idx'),
+            models.Index(fields=['loai_cham_soc', '-ngay'], name='erp_care_loai_idx'),
+        ]
 
     def __str__(self):
         return f"{self.hocvien.ten} - {self.get_loai_cham_soc_display()} - {self.ngay.strftime('%d/%m/%Y')}"
@@ -1,11 +1,16 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 from app.core.permissions import IsStaffUser, IsOwnerOrStaff
+from app.core.capabilities import HasCapability, own_queryset
+from app.core.cache import cached_view
+from app.core.export import ExportMixin
+from app.core.stats import abreakdown_stats
+from app.core.async_views import async_api_view
 from .models import ChamSocHocVien
 from .serializers import (
     ChamSocHocVienSerializer, ChamSocHocVienCreateSerializer,
@@ -13,17 +18,23 @@ from .serializers import (
 )
 
 
-class ChamSocHocVienListView(generics.ListCreateAPIView):
+class ChamSocHocVienListView(ExportMixin, generics.ListCreateAPIView):
     """
-    Danh sách và tạo chăm sóc học viên (Nhân viên/Admin)
+    Danh sách và tạo chăm sóc học viên (Nhân viên/Admin). GET chamsoc/export/ xuất CSV/XLSX
     """
-    queryset = ChamSocHocVien.objects.all()
+    # serializer lồng học viên (kèm khóa học quan tâm, tài khoản) và nhân viên
+    queryset = ChamSocHocVien.objects.select_related('hocvien__khoa_hoc_quan_tam', 'hocvien__user', 'nhanvien')
     serializer_class = ChamSocHocVienSerializer
     permission_classes = [IsStaffUser]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['trang_thai', 'loai_cham_soc', 'hocvien', 'nhanvien']
     search_fields = ['hocvien__ten', 'noi_dung']
     ordering_fields = ['ngay', 'trang_thai', 'created_at']
+    export_filename = 'chamsoc'
+    export_fields = [
+        ('Học viên', 'hocvien__ten'), ('Nhân viên', 'nhanvien__username'), ('Loại', 'loai_cham_soc'),
+        ('Trạng thái', 'trang_thai'), ('Nội dung', 'noi_dung'), ('Ngày', 'ngay'), ('Ghi chú', 'ghi_chu'),
+    ]
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -53,45 +64,26 @@ class ChamSocHocVienMyListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        if self.request.user.role == 'hocvien':
-            try:
-                from app.apps.hocviens.models import HocVien
-                hocvien = HocVien.objects.get(user=self.request.user)
-                return ChamSocHocVien.objects.filter(hocvien=hocvien)
-            except HocVien.DoesNotExist:
-                return ChamSocHocVien.objects.none()
-        return ChamSocHocVien.objects.none()
+        return own_queryset(ChamSocHocVien.objects.all(), self.request.user).select_related(
+            'hocvien__khoa_hoc_quan_tam', 'hocvien__user', 'nhanvien'
+        )
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def chamsoc_stats(request):
+@async_api_view(['GET'])
+@permission_classes([HasCapability('care.read')])
+@cached_view('care')
+async def chamsoc_stats(request):
     """
     Thống kê chăm sóc học viên (Nhân viên/Admin)
     """
-    if request.user.role not in ['admin', 'nhanvien']:
-        return Response({'error': 'Không có quyền truy cập'}, status=status.HTTP_403_FORBIDDEN)
-
-    total_chamsoc = ChamSocHocVien.objects.count()
-    moi = ChamSocHocVien.objects.filter(trang_thai='moi').count()
-    dang_xu_ly = ChamSocHocVien.objects.filter(trang_thai='dang_xu_ly').count()
-    hoan_thanh = ChamSocHocVien.objects.filter(trang_thai='hoan_thanh').count()
-    dong = ChamSocHocVien.objects.filter(trang_thai='dong').count()
-
-    # Thống kê theo loại chăm sóc
-    tuvan = ChamSocHocVien.objects.filter(loai_cham_soc='tuvan').count()
-    theodoi = ChamSocHocVien.objects.filter(loai_cham_soc='theodoi').count()
-    hoidap = ChamSocHocVien.objects.filter(loai_cham_soc='hoidap').count()
-    khac = ChamSocHocVien.objects.filter(loai_cham_soc='khac').count()
+    # Theo trạng thái và loại chăm sóc: một truy vấn duy nhất
+    stats = await abreakdown_stats(
+        ChamSocHocVien,
+        [
+            ('trang_thai', ['moi', 'dang_xu_ly', 'hoan_thanh', 'dong']),
+            ('loai_cham_soc', ['tuvan', 'theodoi', 'hoidap', 'khac']),
+        ],
+        total='total_chamsoc',
+    )
 
-    return Response({
-        'total_chamsoc': total_chamsoc,
-        'moi': moi,
-        'dang_xu_ly': dang_xu_ly,
-        'hoan_thanh': hoan_thanh,
-        'dong': dong,
-        'tuvan': tuvan,
-        'theodoi': theodoi,
-        'hoidap': hoidap,
-        'khac': khac
-    })
+    return Response(stats)
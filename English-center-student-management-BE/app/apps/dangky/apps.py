@@ -5,3 +5,7 @@ class DangkyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.apps.dangky'
     verbose_name = 'Quản lý đăng ký khóa học'
+
+    def ready(self):
+        from app.core.cache import invalidate_on_change
+        invalidate_on_change(self.get_model('DangKyKhoaHoc'), 'courses', 'enrollments')
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:31
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction, nhưng không khóa ghi bảng
+    atomic = False
+
+    dependencies = [
+        ('dangky', '0001_initial'),
+        ('hocviens', '0008_indexes'),
+        ('khoahocs', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='dangkykhoahoc',
+            index=models.Index(fields=['trang_thai', '-ngay_dang_ky'], name='erp_enroll_trang_thai_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='dangkykhoahoc',
+            index=models.Index(fields=['khoahoc', 'trang_thai'], name='erp_enroll_khoahoc_idx'),
+        ),
+    ]
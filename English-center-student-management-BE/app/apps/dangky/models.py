@@ -44,6 +44,11 @@ class DangKyKhoaHoc(BaseModel):
         unique_together = ['hocvien', 'khoahoc']
         ordering = ['-ngay_dang_ky']
         db_table = 'erp_enrollment'
+        indexes = [
+            models.Index(fields=['trang_thai', '-ngay_dang_ky'], name='erp_enroll_trang_thai_idx'),
+            # Thống kê theo khóa học (KhoaHocQuerySet.with_stats)
+            models.Index(fields=['khoahoc', 'trang_thai'], name='erp_enroll_khoahoc_idx'),
+        ]
 
     def __str__(self):
         return f"{self.hocvien.ten} - {self.khoahoc.ten}"
@@ -1,5 +1,5 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
@@ -7,6 +7,11 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from django.db import models
 
 from app.core.permissions import IsStaffUser, IsOwnerOrStaff
+from app.core.capabilities import HasCapability, own_queryset
+from app.core.cache import cached_view
+from app.core.stats import abreakdown_stats
+from app.core.async_views import async_api_view
+from app.apps.khoahocs.models import KhoaHoc
 from .models import DangKyKhoaHoc
 from .serializers import (
     DangKyKhoaHocSerializer, DangKyKhoaHocCreateSerializer,
@@ -18,7 +23,10 @@ class DangKyKhoaHocListView(generics.ListCreateAPIView):
     """
     Danh sách và tạo đăng ký khóa học (Nhân viên/Admin)
     """
-    queryset = DangKyKhoaHoc.objects.all()
+    # khoahoc_info lồng KhoaHocSerializer: nạp khóa học kèm thống kê một lần cho cả trang
+    queryset = DangKyKhoaHoc.objects.select_related('hocvien__khoa_hoc_quan_tam', 'hocvien__user').prefetch_related(
+        models.Prefetch('khoahoc', queryset=KhoaHoc.objects.with_stats())
+    )
     serializer_class = DangKyKhoaHocSerializer
     permission_classes = [IsStaffUser]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -36,7 +44,9 @@ class DangKyKhoaHocDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Chi tiết, cập nhật và xóa đăng ký khóa học (Nhân viên/Admin)
     """
-    queryset = DangKyKhoaHoc.objects.all()
+    queryset = DangKyKhoaHoc.objects.select_related('hocvien__khoa_hoc_quan_tam', 'hocvien__user').prefetch_related(
+        models.Prefetch('khoahoc', queryset=KhoaHoc.objects.with_stats())
+    )
     serializer_class = DangKyKhoaHocDetailSerializer
     permission_classes = [IsOwnerOrStaff]
 
@@ -54,41 +64,25 @@ class DangKyKhoaHocMyListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        if self.request.user.role == 'hocvien':
-            try:
-                from app.apps.hocviens.models import HocVien
-                hocvien = HocVien.objects.get(user=self.request.user)
-                return DangKyKhoaHoc.objects.filter(hocvien=hocvien)
-            except HocVien.DoesNotExist:
-                return DangKyKhoaHoc.objects.none()
-        return DangKyKhoaHoc.objects.none()
+        return own_queryset(DangKyKhoaHoc.objects.all(), self.request.user).select_related('hocvien__khoa_hoc_quan_tam', 'hocvien__user').prefetch_related(
+            models.Prefetch('khoahoc', queryset=KhoaHoc.objects.with_stats())
+        )
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def dangky_stats(request):
+@async_api_view(['GET'])
+@permission_classes([HasCapability('enrollments.read')])
+@cached_view('enrollments')
+async def dangky_stats(request):
     """
     Thống kê đăng ký khóa học (Nhân viên/Admin)
     """
-    if request.user.role not in ['admin', 'nhanvien']:
-        return Response({'error': 'Không có quyền truy cập'}, status=status.HTTP_403_FORBIDDEN)
+    # Số đăng ký theo trạng thái và tỷ lệ hoàn thành trung bình: một truy vấn duy nhất
+    stats = await abreakdown_stats(
+        DangKyKhoaHoc,
+        [('trang_thai', ['dang_hoc', 'hoan_thanh', 'tam_ngung', 'huy_bo'])],
+        total='total_dangky',
+        ty_le_hoan_thanh_tb=models.Avg('phan_tram_hoan_thanh'),
+    )
+    stats['ty_le_hoan_thanh_tb'] = round(stats['ty_le_hoan_thanh_tb'], 2)
 
-    total_dangky = DangKyKhoaHoc.objects.count()
-    dang_hoc = DangKyKhoaHoc.objects.filter(trang_thai='dang_hoc').count()
-    hoan_thanh = DangKyKhoaHoc.objects.filter(trang_thai='hoan_thanh').count()
-    tam_ngung = DangKyKhoaHoc.objects.filter(trang_thai='tam_ngung').count()
-    huy_bo = DangKyKhoaHoc.objects.filter(trang_thai='huy_bo').count()
-
-    # Tỷ lệ hoàn thành trung bình
-    ty_le_hoan_thanh_tb = DangKyKhoaHoc.objects.aggregate(
-        avg=models.Avg('phan_tram_hoan_thanh')
-    )['avg'] or 0
-
-    return Response({
-        'total_dangky': total_dangky,
-        'dang_hoc': dang_hoc,
-        'hoan_thanh': hoan_thanh,
-        'tam_ngung': tam_ngung,
-        'huy_bo': huy_bo,
-        'ty_le_hoan_thanh_tb': round(ty_le_hoan_thanh_tb, 2)
-    })
+    return Response(stats)
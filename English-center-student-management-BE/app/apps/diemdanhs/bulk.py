@@ -0,0 +1,142 @@
+"""
+Ghi nhận một bảng điểm danh (nhiều học viên) bằng số truy vấn cố định:
+một truy vấn IN kiểm tra học viên, một truy vấn IN kiểm tra lịch học,
+một truy vấn lấy các dòng (lich_hoc, hoc_vien) đã có và một câu
+INSERT ... ON CONFLICT DO UPDATE trong transaction.
+"""
+import uuid
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from app.apps.hocviens.models import HocVien
+from app.apps.lichhocs.models import LichHoc
+from .models import DiemDanh
+
+# map common incoming status strings to canonical DB values
+STATUS_MAP = {
+    'co_mat': 'co_mat',
+    'có mặt': 'co_mat',
+    'vang_co_phep': 'vang_co_phep',
+    'vắng có phép': 'vang_co_phep',
+    'vang_khong_phep': 'vang_khong_phep',
+    'vắng không phép': 'vang_khong_phep',
+    'present': 'co_mat',
+    'absent_excused': 'vang_co_phep',
+    'absent_unexcused': 'vang_khong_phep',
+}
+
+UPDATE_FIELDS = ['trang_thai', 'thoi_gian', 'ghi_chu', 'updated_at']
+
+
+def normalize_status(value):
+    if value is None:
+        return None
+    return STATUS_MAP.get(str(value).strip().lower(), value)
+
+
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _parse_checkin(value):
+    if not value:
+        return None
+    try:
+        return parse_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def upsert_diem_danh(items, default_lich_hoc=None):
+    """
+    Upsert danh sách điểm danh.
+
+    `items`: list các dict {'index', 'student', 'item'} với `item` dạng
+      { "status": "...", "checkInTime": "...", "notes": "...", "lich_hoc": "<id>" }
+    Trả về (created, updated, errors) giống báo cáo từng dòng trước đây.
+    Một học viên xuất hiện nhiều lần trong cùng lịch học: dòng sau ghi đè dòng trước.
+    """
+    errors = []
+    rows = []
+
+    def error(entry, message, **extra):
+        errors.append({"index": entry.get('index'), "student": entry.get('student'), **extra, "error": message})
+
+    for entry in items:
+        item = entry.get('item')
+        if not isinstance(item, dict):
+            error(entry, "Invalid item format, expected object")
+            continue
+
+        hocvien_id = entry.get('student')
+        lich_hoc_id = item.get('lich_hoc') or default_lich_hoc
+        status_val = normalize_status(item.get('status'))
+        if not (hocvien_id and lich_hoc_id and status_val):
+            error(entry, "Missing required fields (hocvien id, lich_hoc, status)", item=item)
+            continue
+        if status_val not in STATUS_MAP.values():
+            error(entry, f"Invalid status '{item.get('status')}'")
+            continue
+
+        hocvien_uuid, lich_hoc_uuid = _parse_uuid(hocvien_id), _parse_uuid(lich_hoc_id)
+        if hocvien_uuid is None:
+            error(entry, "HocVien not found")
+            continue
+        if lich_hoc_uuid is None:
+            error(entry, "LichHoc not found")
+            continue
+
+        rows.append((entry, {
+            'hoc_vien_id': hocvien_uuid,
+            'lich_hoc_id': lich_hoc_uuid,
+            'trang_thai': status_val,
+            'thoi_gian': _parse_checkin(item.get('checkInTime') or item.get('checkinTime') or item.get('thoi_gian')),
+            'ghi_chu': item.get('notes') or item.get('note') or item.get('ghi_chu') or '',
+        }))
+
+    if not rows:
+        return [], [], errors
+
+    hocvien_ids = {values['hoc_vien_id'] for _, values in rows}
+    lich_hoc_ids = {values['lich_hoc_id'] for _, values in rows}
+    known_hocviens = set(HocVien.objects.filter(id__in=hocvien_ids).order_by().values_list('id', flat=True))
+    known_lich_hocs = set(LichHoc.objects.filter(id__in=lich_hoc_ids).order_by().values_list('id', flat=True))
+    existing = {
+        (lich_hoc_id, hoc_vien_id): pk
+        for pk, lich_hoc_id, hoc_vien_id in DiemDanh.objects.filter(
+            lich_hoc_id__in=lich_hoc_ids, hoc_vien_id__in=hocvien_ids
+        ).order_by().values_list('id', 'lich_hoc_id', 'hoc_vien_id')
+    }
+
+    created, updated = [], []
+    records = {}
+    for entry, values in rows:
+        if values['hoc_vien_id'] not in known_hocviens:
+            error(entry, "HocVien not found")
+            continue
+        if values['lich_hoc_id'] not in known_lich_hocs:
+            error(entry, "LichHoc not found")
+            continue
+
+        key = (values['lich_hoc_id'], values['hoc_vien_id'])
+        if key in existing:
+            updated.append(str(existing[key]))
+        else:
+            record = DiemDanh(**values)
+            existing[key] = record.id
+            created.append(str(record.id))
+        records[key] = DiemDanh(id=existing[key], **values)
+
+    if records:
+        with transaction.atomic():
+            DiemDanh.objects.bulk_create(
+                records.values(),
+                update_conflicts=True,
+                unique_fields=['lich_hoc', 'hoc_vien'],
+                update_fields=UPDATE_FIELDS,
+            )
+    return created, updated, errors
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:31
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction, nhưng không khóa ghi bảng
+    atomic = False
+
+    dependencies = [
+        ('diemdanhs', '0003_diemdanh_thoi_gian'),
+        ('hocviens', '0008_indexes'),
+        ('lichhocs', '0006_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='diemdanh',
+            index=models.Index(fields=['-created_at'], name='erp_attend_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='diemdanh',
+            index=models.Index(fields=['hoc_vien', '-created_at'], name='erp_attend_hocvien_idx'),
+        ),
+    ]
@@ -37,6 +37,11 @@ class DiemDanh(BaseModel):
         ordering = ['-created_at']
         db_table = 'erp_attendances'
         unique_together = ['lich_hoc', 'hoc_vien']
+        # Lọc theo lich_hoc đã dùng được unique index ở trên
+        indexes = [
+            models.Index(fields=['-created_at'], name='erp_attend_created_idx'),
+            models.Index(fields=['hoc_vien', '-created_at'], name='erp_attend_hocvien_idx'),
+        ]
 
     def __str__(self):
         return f"{self.hoc_vien.ten} - {self.lich_hoc} - {self.trang_thai}"
\ No newline at end of file
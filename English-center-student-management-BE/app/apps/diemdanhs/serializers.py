@@ -3,6 +3,7 @@ from rest_framework import serializers
 from .models import DiemDanh
 from app.apps.lichhocs.models import LichHoc
 from app.apps.hocviens.models import HocVien
+from app.core.capabilities import has_capability, linked_hocvien_id
 
 
 class DiemDanhSerializer(serializers.ModelSerializer):
@@ -25,7 +26,7 @@ class DiemDanhSerializer(serializers.ModelSerializer):
         Ensure hoc_vien can only mark their own attendance if not staff.
         """
         request = self.context['request']
-        if not (request.user.is_admin or request.user.is_nhanvien or request.user.is_giangvien):
-            if data['hoc_vien'].user != request.user:
+        if not has_capability(request.user, 'attendance.write'):
+            if data['hoc_vien'].pk != linked_hocvien_id(request.user):
                 raise serializers.ValidationError("Học viên chỉ có thể điểm danh cho chính mình.")
         return data
\ No newline at end of file
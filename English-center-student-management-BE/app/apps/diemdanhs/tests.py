@@ -0,0 +1,83 @@
+from datetime import date, time
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from app.core.pagination import DefaultPagination
+from app.apps.diemdanhs.bulk import upsert_diem_danh
+from app.apps.diemdanhs.models import DiemDanh
+from app.apps.hocviens.models import HocVien
+from app.apps.khoahocs.models import KhoaHoc
+from app.apps.lichhocs.models import LichHoc
+from app.apps.lophocs.models import LopHoc
+
+
+class UpsertDiemDanhTest(TestCase):
+    def setUp(self):
+        khoahoc = KhoaHoc.objects.create(ten='IELTS', lich_hoc='T2', giang_vien='Cô Hằng', so_buoi=10, hoc_phi=1000)
+        lop = LopHoc.objects.create(ten='IELTS-01', khoa_hoc=khoahoc, ngay_bat_dau=date(2025, 1, 6))
+        self.lich_hoc = LichHoc.objects.create(lop_hoc=lop, ngay_hoc='monday', gio_bat_dau=time(18), gio_ket_thuc=time(20))
+        self.hocviens = [
+            HocVien.objects.create(ten=f'HV {i}', email=f'hv{i}@example.com', sdt=f'09000000{i:02d}')
+            for i in range(30)
+        ]
+
+    def sheet(self, status):
+        return [
+            {"index": idx, "student": str(hv.id), "item": {"status": status, "notes": f"#{idx}"}}
+            for idx, hv in enumerate(self.hocviens)
+        ]
+
+    def test_constant_queries_and_upsert(self):
+        # 3 SELECT + 1 INSERT ... ON CONFLICT (+ SAVEPOINT/RELEASE của transaction.atomic)
+        with self.assertNumQueries(6):
+            created, updated, errors = upsert_diem_danh(self.sheet('present'), default_lich_hoc=str(self.lich_hoc.id))
+        self.assertEqual((len(created), len(updated), errors), (30, 0, []))
+
+        created_again, updated, errors = upsert_diem_danh(self.sheet('vắng có phép'), default_lich_hoc=str(self.lich_hoc.id))
+        self.assertEqual((created_again, sorted(updated), errors), ([], sorted(created), []))
+        self.assertEqual(DiemDanh.objects.filter(trang_thai='vang_co_phep').count(), 30)
+
+    def test_errors_are_reported_per_row(self):
+        items = [
+            {"index": 0, "student": str(self.hocviens[0].id), "item": {"status": "co_mat"}},
+            {"index": 1, "student": "00000000-0000-0000-0000-000000000000", "item": {"status": "co_mat"}},
+            {"index": 2, "student": str(self.hocviens[1].id), "item": {"status": "ngu_gat"}},
+            {"index": 3, "student": str(self.hocviens[2].id), "item": "co_mat"},
+        ]
+        created, updated, errors = upsert_diem_danh(items, default_lich_hoc=str(self.lich_hoc.id))
+        self.assertEqual(len(created), 1)
+        self.assertEqual([e['index'] for e in errors], [2, 3, 1])
+
+
+class KeysetPaginationTest(TestCase):
+    setUp = UpsertDiemDanhTest.setUp
+    sheet = UpsertDiemDanhTest.sheet
+
+    class View:
+        pagination_mode = 'cursor'
+
+    def page(self, url):
+        paginator = DefaultPagination()
+        with self.assertNumQueries(1):
+            rows = paginator.paginate_queryset(DiemDanh.objects.all(), Request(APIRequestFactory().get(url)), self.View())
+        response = paginator.get_paginated_response([row.id for row in rows])
+        return response.data
+
+    def test_walks_all_rows_forward_and_back(self):
+        upsert_diem_danh(self.sheet('co_mat'), default_lich_hoc=str(self.lich_hoc.id))
+        expected = list(DiemDanh.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        seen, pages, url = [], [], '/api/diemdanhs/?page_size=7'
+        while url:
+            data = self.page(url)
+            self.assertNotIn('count', data)
+            seen += data['results']
+            pages.append(data)
+            url = data['next']
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 5)
+
+        # quay lại trang trước từ trang cuối
+        self.assertEqual(self.page(pages[-1]['previous'])['results'], pages[-2]['results'])
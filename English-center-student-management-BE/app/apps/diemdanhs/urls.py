@@ -11,6 +11,7 @@ router.register(r'diemdanhs', DiemDanhViewSet, basename='diemdanh')
 
 urlpatterns = [
     path('diemdanhs/', views.DiemDanhListView.as_view(), name='diemdanh-list'),
+    path('diemdanhs/export/', views.DiemDanhListView.as_view(export=True), name='diemdanh-export'),
     path('diemdanhs/<uuid:pk>/', views.DiemDanhDetailView.as_view(), name='diemdanh-detail'),
     path('diemdanhs/me/', views.DiemDanhMeListView.as_view(), name='diemdanh-me'),
     path('diemdanhs/bulk/', views.DiemDanhBulkCreateView.as_view(), name='diemdanh-bulk-create'),
@@ -6,8 +6,10 @@ from rest_framework import status
 from .models import DiemDanh
 from .serializers import DiemDanhSerializer
 from app.core.permissions import IsOwnerOrStaff, CanManageCourses
+from app.core.capabilities import scope_queryset
+from app.core.export import ExportMixin
 from app.apps.hocviens.models import HocVien
-from django.utils.dateparse import parse_datetime
+from .bulk import upsert_diem_danh
 
 
 class DiemDanhViewSet(viewsets.ModelViewSet):
@@ -18,6 +20,8 @@ class DiemDanhViewSet(viewsets.ModelViewSet):
     queryset = DiemDanh.objects.all()
     serializer_class = DiemDanhSerializer
     permission_classes = [IsOwnerOrStaff | CanManageCourses]
+    # bảng lớn dần theo thời gian: mặc định phân trang keyset (?page= vẫn dùng được)
+    pagination_mode = 'cursor'
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['ghi_chu']
     ordering_fields = ['lich_hoc', 'hoc_vien']
@@ -26,12 +30,10 @@ class DiemDanhViewSet(viewsets.ModelViewSet):
         """
         Filter queryset based on query params and user role.
         """
-        queryset = super().get_queryset()
+        # Non-staff (e.g., hocvien) only see their own attendance
+        queryset = scope_queryset(super().get_queryset(), self.request.user, 'attendance', owner='hoc_vien')
         hoc_vien = self.request.query_params.get('hoc_vien')
         lich_hoc = self.request.query_params.get('lich_hoc')
-        if not (self.request.user.is_admin or self.request.user.is_nhanvien or self.request.user.is_giangvien):
-            # Non-staff (e.g., hocvien) only see their own attendance
-            queryset = queryset.filter(hoc_vien__user=self.request.user)
         if hoc_vien:
             queryset = queryset.filter(hoc_vien_id=hoc_vien)
         if lich_hoc:
@@ -39,14 +41,21 @@ class DiemDanhViewSet(viewsets.ModelViewSet):
         return queryset.order_by('-created_at')
 
 
-class DiemDanhListView(generics.ListCreateAPIView):
-    """List and create DiemDanh"""
+class DiemDanhListView(ExportMixin, generics.ListCreateAPIView):
+    """List and create DiemDanh (diemdanhs/export/ streams the filtered list as CSV/XLSX)"""
     queryset = DiemDanh.objects.all()
     serializer_class = DiemDanhSerializer
     permission_classes = [CanManageCourses]
+    pagination_mode = 'cursor'
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['ghi_chu']
     ordering_fields = ['lich_hoc', 'hoc_vien']
+    export_filename = 'diemdanh'
+    export_fields = [
+        ('Học viên', 'hoc_vien__ten'), ('Lớp', 'lich_hoc__lop_hoc__ten'), ('Ngày học', 'lich_hoc__ngay_hoc'),
+        ('Giờ bắt đầu', 'lich_hoc__gio_bat_dau'), ('Trạng thái', 'trang_thai'),
+        ('Thời gian điểm danh', 'thoi_gian'), ('Ghi chú', 'ghi_chu'),
+    ]
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -66,83 +75,13 @@ class DiemDanhListView(generics.ListCreateAPIView):
         """
         payload = request.data
 
-        # helper: map common incoming status strings to canonical DB values
-        status_map = {
-            'co_mat': 'co_mat',
-            'có mặt': 'co_mat',
-            'có mặt'.lower(): 'co_mat',
-            'có mặt'.upper(): 'co_mat',
-            'vang_co_phep': 'vang_co_phep',
-            'vắng có phép': 'vang_co_phep',
-            'vang_khong_phep': 'vang_khong_phep',
-            'vắng không phép': 'vang_khong_phep',
-            'present': 'co_mat',
-            'absent_excused': 'vang_co_phep',
-            'absent_unexcused': 'vang_khong_phep',
-        }
-
-        def normalize_status(s):
-            if s is None:
-                return None
-            key = str(s).strip().lower()
-            return status_map.get(key, s)
-
         # If payload contains mapping under 'hoc_vien' -> handle bulk creation here
         if isinstance(payload, dict) and 'hoc_vien' in payload and isinstance(payload.get('hoc_vien'), dict):
-            mapping = payload.get('hoc_vien')
-            top_level_lich = payload.get('lich_hoc')
-            created = []
-            updated = []
-            errors = []
-
-            for idx, (hocvien_id, item) in enumerate(mapping.items()):
-                if not isinstance(item, dict):
-                    errors.append({"index": idx, "student": hocvien_id, "error": "Invalid item format, expected object"})
-                    continue
-
-                # normalize fields
-                lich_hoc_id = item.get('lich_hoc') or top_level_lich
-                checkin_raw = item.get('checkInTime') or item.get('checkinTime') or item.get('thoi_gian')
-                note = item.get('notes') or item.get('note') or item.get('ghi_chu') or ''
-                status_val = normalize_status(item.get('status'))
-
-                if not (hocvien_id and lich_hoc_id and status_val):
-                    errors.append({"index": idx, "student": hocvien_id, "item": item, "error": "Missing required fields (hocvien id, lich_hoc, status)"})
-                    continue
-
-                try:
-                    hocvien = HocVien.objects.get(id=hocvien_id)
-                except HocVien.DoesNotExist:
-                    errors.append({"index": idx, "student": hocvien_id, "error": "HocVien not found"})
-                    continue
-
-                thoi_gian = None
-                if checkin_raw:
-                    try:
-                        thoi_gian = parse_datetime(checkin_raw)
-                    except Exception:
-                        thoi_gian = None
-
-                try:
-                    # upsert: if attendance exists for (lich_hoc, hoc_vien) update it, else create
-                    existing = DiemDanh.objects.filter(lich_hoc_id=lich_hoc_id, hoc_vien_id=hocvien_id).first()
-                    if existing:
-                        existing.trang_thai = status_val
-                        existing.thoi_gian = thoi_gian
-                        existing.ghi_chu = note
-                        existing.save()
-                        updated.append(str(existing.id))
-                    else:
-                        dd = DiemDanh.objects.create(
-                            hoc_vien=hocvien,
-                            lich_hoc_id=lich_hoc_id,
-                            trang_thai=status_val,
-                            thoi_gian=thoi_gian,
-                            ghi_chu=note
-                        )
-                        created.append(str(dd.id))
-                except Exception as e:
-                    errors.append({"index": idx, "student": hocvien_id, "error": str(e)})
+            items = [
+                {"index": idx, "student": hocvien_id, "item": item}
+                for idx, (hocvien_id, item) in enumerate(payload.get('hoc_vien').items())
+            ]
+            created, updated, errors = upsert_diem_danh(items, default_lich_hoc=payload.get('lich_hoc'))
 
             status_code = status.HTTP_201_CREATED if (created or updated) else status.HTTP_400_BAD_REQUEST
             return Response({
@@ -198,96 +137,50 @@ class DiemDanhBulkCreateView(APIView):
 
     def post(self, request):
         payload = request.data
-        created = []
-        errors = []
-
-        # Helper to create one record from normalized item dict
-        def create_record(hocvien_id, item_dict, idx=None):
-            lich_hoc_id = item_dict.get('lich_hoc') or payload.get('lich_hoc')
-            checkin_raw = item_dict.get('checkInTime') or item_dict.get('checkinTime') or item_dict.get('thoi_gian')
-            note = item_dict.get('notes') or item_dict.get('note') or item_dict.get('ghi_chu') or ''
-            status_val = normalize_status(item_dict.get('status'))
-            if not (hocvien_id and lich_hoc_id and status_val):
-                errors.append({"index": idx, "student": hocvien_id, "item": item_dict, "error": "Missing required fields (hocvien id, lich_hoc, status)"})
-                return
-            try:
-                hocvien = HocVien.objects.get(id=hocvien_id)
-            except HocVien.DoesNotExist:
-                errors.append({"index": idx, "student": hocvien_id, "error": "HocVien not found"})
-                return
-
-            # parse datetime if provided
-            thoi_gian = None
-            if checkin_raw:
-                try:
-                    thoi_gian = parse_datetime(checkin_raw)
-                except Exception:
-                    thoi_gian = None
-
-            try:
-                # upsert to avoid unique constraint violation
-                existing = DiemDanh.objects.filter(lich_hoc_id=lich_hoc_id, hoc_vien_id=hocvien_id).first()
-                if existing:
-                    existing.trang_thai = status_val
-                    existing.thoi_gian = thoi_gian
-                    existing.ghi_chu = note
-                    existing.save()
-                    created.append(str(existing.id))  # report id in created for backward compat
-                else:
-                    dd = DiemDanh.objects.create(
-                        hoc_vien=hocvien,
-                        lich_hoc_id=lich_hoc_id,
-                        trang_thai=status_val,
-                        thoi_gian=thoi_gian,
-                        ghi_chu=note
-                    )
-                    created.append(str(dd.id))
-            except Exception as e:
-                errors.append({"index": idx, "student": hocvien_id, "error": str(e)})
+        top_level_lich = payload.get('lich_hoc') if isinstance(payload, dict) else None
 
         # New: support payload shaped as { "hoc_vien": { "<id>": {...}, ... }, "lich_hoc": "<id>" }
         if isinstance(payload, dict) and 'hoc_vien' in payload and isinstance(payload.get('hoc_vien'), dict):
-            top_level_lich = payload.get('lich_hoc')
-            for idx, (hocvien_id, info) in enumerate(payload.get('hoc_vien').items()):
-                if not isinstance(info, dict):
-                    errors.append({"index": idx, "student": hocvien_id, "error": "Invalid item format, expected object"})
-                    continue
-                # ensure lich_hoc present in item or fallback to top-level
-                if 'lich_hoc' not in info and top_level_lich:
-                    info['lich_hoc'] = top_level_lich
-                create_record(hocvien_id, info, idx=idx)
+            items = [
+                {"index": idx, "student": hocvien_id, "item": info}
+                for idx, (hocvien_id, info) in enumerate(payload.get('hoc_vien').items())
+            ]
 
         # If payload is a list -> existing behavior (list of item objects)
         elif isinstance(payload, list):
+            items = []
             for idx, item in enumerate(payload):
-                student_id = item.get("studentId") or item.get("hoc_vien") or item.get("hocvien")
-                create_record(student_id, {
-                    'lich_hoc': item.get('lich_hoc'),
-                    'checkInTime': item.get('checkinTime') or item.get('checkInTime'),
-                    'notes': item.get('note') or item.get('notes'),
-                    'status': item.get('status')
-                }, idx=idx)
+                if not isinstance(item, dict):
+                    items.append({"index": idx, "student": None, "item": item})
+                    continue
+                items.append({
+                    "index": idx,
+                    "student": item.get("studentId") or item.get("hoc_vien") or item.get("hocvien"),
+                    "item": {
+                        'lich_hoc': item.get('lich_hoc'),
+                        'checkInTime': item.get('checkinTime') or item.get('checkInTime'),
+                        'notes': item.get('note') or item.get('notes'),
+                        'status': item.get('status')
+                    },
+                })
 
         # Backward-compatible: top-level mapping where keys are hocvien ids
         elif isinstance(payload, dict):
-            top_level_lich = payload.get('lich_hoc')
-            for key, value in payload.items():
-                if key == 'lich_hoc':
-                    continue
-                if not isinstance(value, dict):
-                    errors.append({"student": key, "error": "Invalid item format, expected object"})
-                    continue
-                item_dict = value.copy()
-                if 'lich_hoc' not in item_dict and top_level_lich:
-                    item_dict['lich_hoc'] = top_level_lich
-                create_record(key, item_dict)
+            items = [
+                {"index": None, "student": key, "item": value}
+                for key, value in payload.items() if key != 'lich_hoc'
+            ]
 
         else:
             return Response({"error": "Invalid payload format"}, status=status.HTTP_400_BAD_REQUEST)
 
+        created, updated, errors = upsert_diem_danh(items, default_lich_hoc=top_level_lich)
+        # report updated ids in created for backward compat
+        created = created + updated
+
         status_code = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
         return Response({
             "created": created,
             "errors": errors,
             "message": f"{len(created)} diem_danh created, {len(errors)} errors."
-        }, status=status_code)
\ No newline at end of file
+        }, status=status_code)
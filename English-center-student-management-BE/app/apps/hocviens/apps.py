@@ -5,3 +5,10 @@ class HocviensConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.apps.hocviens'
     verbose_name = 'Quản lý học viên'
+
+    def ready(self):
+        from app.core.authentication import refresh_principal_on_change
+        from app.core.cache import invalidate_on_change
+        invalidate_on_change(self.get_model('HocVien'), 'students')
+        # request.user.hocvien_id (claim/principal) theo liên kết HocVien.user
+        refresh_principal_on_change(self.get_model('HocVien'), 'user_id')
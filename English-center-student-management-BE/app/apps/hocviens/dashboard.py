@@ -0,0 +1,112 @@
+"""
+Tổng hợp dữ liệu của học viên đang đăng nhập cho GET /api/me/dashboard/ (thay cho các lần gọi riêng
+hocviens/me, dangky/me, thanhtoans/me, diemdanhs/me, thongbaos/me khi mở app).
+
+Học viên được xác định một lần (linked_hocvien_id); mỗi phần là một số truy vấn cố định đọc `.values()`
+theo hocvien_id, không dựng model và không truy vấn theo từng dòng:
+
+- profile: 1 truy vấn
+- enrollments: 1 truy vấn (số buổi có mặt theo khóa là subquery)
+- balance: 2 truy vấn (sổ công nợ, thanh toán gần đây)
+- attendance: 1 truy vấn (đếm theo trạng thái trong ATTENDANCE_DAYS ngày gần nhất)
+- notifications: 2 truy vấn (số chưa đọc, hộp thư gần đây)
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.db.models import Count, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from app.apps.thongbaos import inbox
+from .models import HocVien
+
+SECTIONS = ('profile', 'enrollments', 'balance', 'attendance', 'notifications')
+ATTENDANCE_DAYS = 30
+RECENT_LIMIT = 5
+
+
+def profile(hocvien_id):
+    return HocVien.objects.filter(pk=hocvien_id).values(
+        'id', 'ten', 'email', 'sdt', 'ngay_sinh', 'address', 'trang_thai_hoc_phi',
+        'khoa_hoc_quan_tam_id', 'khoa_hoc_quan_tam__ten', 'created_at',
+    ).first()
+
+
+def enrollments(hocvien_id):
+    DangKyKhoaHoc = apps.get_model('dangky', 'DangKyKhoaHoc')
+    DiemDanh = apps.get_model('diemdanhs', 'DiemDanh')
+    attended = (
+        DiemDanh.objects.filter(
+            hoc_vien_id=hocvien_id, trang_thai='co_mat', lich_hoc__lop_hoc__khoa_hoc_id=OuterRef('khoahoc_id'),
+        )
+        .order_by().values('hoc_vien_id').annotate(n=Count('id')).values('n')
+    )
+    return list(
+        DangKyKhoaHoc.objects.filter(hocvien_id=hocvien_id)
+        .annotate(so_buoi_co_mat=Coalesce(Subquery(attended, output_field=IntegerField()), Value(0)))
+        .order_by('-ngay_dang_ky')
+        .values(
+            'id', 'khoahoc_id', 'khoahoc__ten', 'khoahoc__so_buoi', 'khoahoc__hoc_phi', 'trang_thai',
+            'ngay_dang_ky', 'phan_tram_hoan_thanh', 'so_buoi_co_mat',
+        )
+    )
+
+
+def balance(hocvien_id):
+    CongNoHocVien = apps.get_model('thanhtoans', 'CongNoHocVien')
+    ThanhToan = apps.get_model('thanhtoans', 'ThanhToan')
+    ledger = CongNoHocVien.objects.filter(hocvien_id=hocvien_id).values('total_fee', 'total_paid').first()
+    total_fee = ledger['total_fee'] if ledger else 0
+    total_paid = ledger['total_paid'] if ledger else 0
+    return {
+        'tong_hoc_phi': total_fee,
+        'da_dong': total_paid,
+        'con_no': max(total_fee - total_paid, 0),
+        'thanh_toan_gan_day': list(
+            ThanhToan.objects.filter(hocvien_id=hocvien_id).order_by('-created_at').values(
+                'id', 'so_tien', 'trang_thai', 'hinh_thuc', 'ngay_dong', 'created_at',
+            )[:RECENT_LIMIT]
+        ),
+    }
+
+
+def attendance(hocvien_id):
+    DiemDanh = apps.get_model('diemdanhs', 'DiemDanh')
+    since = timezone.now() - timedelta(days=ATTENDANCE_DAYS)
+    summary = DiemDanh.objects.filter(hoc_vien_id=hocvien_id, created_at__gte=since).aggregate(
+        tong=Count('id'),
+        co_mat=Count('id', filter=Q(trang_thai='co_mat')),
+        vang_co_phep=Count('id', filter=Q(trang_thai='vang_co_phep')),
+        vang_khong_phep=Count('id', filter=Q(trang_thai='vang_khong_phep')),
+        gan_nhat=Max('created_at'),
+    )
+    summary['so_ngay'] = ATTENDANCE_DAYS
+    summary['ty_le_co_mat'] = round(summary['co_mat'] * 100 / summary['tong'], 2) if summary['tong'] else None
+    return summary
+
+
+def notifications(user):
+    ThongBaoNguoiNhan = apps.get_model('thongbaos', 'ThongBaoNguoiNhan')
+    return {
+        'chua_doc': inbox.unread_count(user),
+        'gan_day': list(
+            ThongBaoNguoiNhan.objects.filter(user=user).order_by('-ngay_nhan').values(
+                'thongbao_id', 'thongbao__tieu_de', 'thongbao__loai_thong_bao', 'ngay_nhan', 'da_doc',
+            )[:RECENT_LIMIT]
+        ),
+    }
+
+
+def build(hocvien_id, user, sections=SECTIONS):
+    """
+    Các phần `sections` của dashboard học viên `hocvien_id` (tài khoản `user`)
+    """
+    builders = {
+        'profile': lambda: profile(hocvien_id),
+        'enrollments': lambda: enrollments(hocvien_id),
+        'balance': lambda: balance(hocvien_id),
+        'attendance': lambda: attendance(hocvien_id),
+        'notifications': lambda: notifications(user),
+    }
+    return {section: builders[section]() for section in SECTIONS if section in sections}
@@ -0,0 +1,251 @@
+"""
+Nhập lead hàng loạt từ CSV / JSON lines.
+
+Dữ liệu được xử lý theo lô CHUNK_SIZE dòng, mỗi lô tốn số truy vấn cố định:
+một truy vấn IN kiểm tra email / SĐT đã có trong DB và một lệnh COPY (app/core/bulk.py).
+Trùng lặp ngay trong file cũng bị loại (dòng xuất hiện sau báo lỗi).
+Mỗi dòng lỗi được trả về kèm số dòng trong file để người nhập sửa lại.
+Nếu request khác tạo cùng email trong lúc nhập, lô được kiểm tra lại và ghi lại tối đa
+INSERT_ATTEMPTS lần; quá số lần đó các dòng còn lại được báo lỗi.
+"""
+import csv
+import io
+import json
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from rest_framework import serializers
+
+from app.core.bulk import copy_insert
+from app.core.cache import invalidate
+from app.core.tracking import apply_delta
+from app.apps.reports import facts
+from .models import HocVien
+from .serializers import LeadImportRowSerializer
+
+CHUNK_SIZE = 1000
+INSERT_ATTEMPTS = 3
+
+# Tiêu đề cột quen thuộc (file xuất từ hocviens/export/, file của bên marketing) -> field
+HEADER_ALIASES = {
+    'họ tên': 'ten',
+    'họ và tên': 'ten',
+    'name': 'ten',
+    'sđt': 'sdt',
+    'số điện thoại': 'sdt',
+    'phone': 'sdt',
+    'ngày sinh': 'ngay_sinh',
+    'địa chỉ': 'address',
+    'nguồn': 'sourced',
+    'source': 'sourced',
+    'ghi chú': 'ghi_chu',
+}
+
+
+def _clean_row(row):
+    """
+    Chuẩn hóa tên cột và bỏ ô rỗng (ô trống trong CSV coi như không nhập)
+    """
+    cleaned = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip().lower()
+        key = HEADER_ALIASES.get(key, key)
+        if isinstance(value, str):
+            value = value.strip()
+        if value not in ('', None):
+            cleaned[key] = value
+    return cleaned
+
+
+def read_csv(stream):
+    """
+    (số dòng, dict) cho mỗi dòng dữ liệu; dòng 1 là tiêu đề
+    """
+    for line, row in enumerate(csv.DictReader(stream), start=2):
+        yield line, _clean_row(row)
+
+
+def read_jsonl(stream):
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, _clean_row(row) if isinstance(row, dict) else None
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+def detect_format(filename, default='csv'):
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def open_text(binary):
+    """
+    Bọc file nhị phân (upload, file trên đĩa) thành luồng văn bản UTF-8, bỏ BOM nếu có
+    """
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _Report:
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.errors = []
+        self.seen_emails = set()
+        self.seen_phones = set()
+
+    def error(self, line, errors):
+        self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'total': self.total, 'created': self.created, 'failed': len(self.errors), 'errors': self.errors}
+
+
+def _validate_chunk(chunk, report, validator, defaults):
+    """
+    Kiểm tra từng dòng (không truy vấn DB) và loại trùng trong file. Trả về [(line, data)]
+    """
+    valid = []
+    for line, row in chunk:
+        report.total += 1
+        if row is None:
+            report.error(line, {'non_field_errors': ['Dòng không phải JSON object hợp lệ']})
+            continue
+        try:
+            data = validator.run_validation({**defaults, **row})
+        except serializers.ValidationError as exc:
+            report.error(line, {field: [str(message) for message in messages] for field, messages in exc.detail.items()})
+            continue
+
+        duplicated = {}
+        if data['email'] in report.seen_emails:
+            duplicated['email'] = ['Email bị trùng với một dòng trước trong file']
+        if data['sdt'] in report.seen_phones:
+            duplicated['sdt'] = ['Số điện thoại bị trùng với một dòng trước trong file']
+        if duplicated:
+            report.error(line, duplicated)
+            continue
+        report.seen_emails.add(data['email'])
+        report.seen_phones.add(data['sdt'])
+        valid.append((line, data))
+    return valid
+
+
+def _drop_existing(valid, report):
+    """
+    Loại các dòng có email / SĐT đã tồn tại (một truy vấn IN cho cả lô)
+    """
+    if not valid:
+        return valid
+    emails = [data['email'] for _, data in valid]
+    phones = [data['sdt'] for _, data in valid]
+    existing_emails, existing_phones = set(), set()
+    # UNION ALL thay vì OR: mỗi nhánh dùng được index riêng (hoặc so khớp IN bằng hash),
+    # còn `email IN (...) OR sdt_chuan IN (...)` buộc so từng dòng với cả hai danh sách
+    # email trong file đã được chuyển chữ thường; email trong DB có thể còn chữ hoa
+    base = HocVien.objects.order_by().annotate(email_lower=Lower('email')).values_list('email', 'sdt_chuan')
+    by_email = base.filter(email_lower__in=emails)
+    for email, sdt_chuan in by_email.union(base.filter(sdt_chuan__in=phones), all=True):
+        existing_emails.add(email.lower())
+        existing_phones.add(sdt_chuan)
+
+    remaining = []
+    for line, data in valid:
+        duplicated = {}
+        if data['email'] in existing_emails:
+            duplicated['email'] = ['Email đã tồn tại']
+        if data['sdt'] in existing_phones:
+            duplicated['sdt'] = ['Số điện thoại đã tồn tại']
+        if duplicated:
+            report.error(line, duplicated)
+        else:
+            remaining.append((line, data))
+    return remaining
+
+
+def _build(data):
+    hocvien = HocVien(**data, created_as_lead=True, is_converted=False)
+    # COPY không gọi save(): tự tính search_text / sdt_chuan
+    hocvien.refresh_search_fields()
+    return hocvien
+
+
+def _insert(valid, report):
+    for _ in range(INSERT_ATTEMPTS):
+        objs = [_build(data) for _, data in valid]
+        try:
+            with transaction.atomic():
+                copy_insert(HocVien, objs)
+        except IntegrityError:
+            # Một request khác vừa tạo cùng email: kiểm tra lại lô rồi thử lại
+            valid = _drop_existing(valid, report)
+            continue
+        report.created += len(objs)
+        return objs
+
+    for line, _ in valid:
+        report.error(line, {'non_field_errors': ['Không ghi được dòng này do xung đột với dữ liệu vừa được tạo, '
+                                                 'vui lòng nhập lại']})
+    return []
+
+
+def _record_facts(objs):
+    """
+    COPY không bắn post_save: cộng số học viên mới vào bảng fact báo cáo theo ngày
+    """
+    per_key = Counter()
+    for obj in objs:
+        model, key, _ = facts.hocvien_contribution(
+            {field: getattr(obj, field) for field in facts.HOCVIEN_FIELDS}
+        )
+        per_key[tuple(sorted(key.items()))] += 1
+    for key, count in per_key.items():
+        apply_delta(model, dict(key), {'so_luong': count})
+
+
+def import_leads(rows, chunk_size=CHUNK_SIZE, dry_run=False, defaults=None):
+    """
+    Nhập các dòng `rows` = iterable (số dòng, dict | None) thành lead (created_as_lead=True).
+    `defaults`: giá trị mặc định cho mọi dòng, ví dụ {'sourced': 'facebook'}.
+    dry_run=True chỉ kiểm tra, không ghi DB.
+    Trả về {'total', 'created', 'failed', 'errors': [{'line', 'errors'}]}.
+    """
+    report = _Report()
+    validator = LeadImportRowSerializer()
+    defaults = defaults or {}
+    for chunk in _chunks(rows, chunk_size):
+        valid = _drop_existing(_validate_chunk(chunk, report, validator, defaults), report)
+        if not valid:
+            continue
+        if dry_run:
+            report.created += len(valid)
+            continue
+        objs = _insert(valid, report)
+        _record_facts(objs)
+
+    if report.created and not dry_run:
+        invalidate('students')
+    return report.as_dict()
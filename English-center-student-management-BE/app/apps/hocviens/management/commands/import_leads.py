@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.apps.hocviens.importer import CHUNK_SIZE, READERS, detect_format, import_leads, open_text
+
+
+class Command(BaseCommand):
+    help = 'Nhập lead hàng loạt từ file CSV (có dòng tiêu đề) hoặc JSON lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Đường dẫn file cần nhập')
+        parser.add_argument(
+            '--file-format',
+            choices=sorted(READERS),
+            help='Định dạng file (mặc định đoán theo đuôi file, không rõ thì là csv)'
+        )
+        parser.add_argument('--sourced', help='Nguồn mặc định cho các dòng không có cột nguồn')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Số dòng mỗi lô')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Chỉ kiểm tra dữ liệu, không ghi vào DB'
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['file_format'] or detect_format(options['path'])
+        try:
+            binary = open(options['path'], 'rb')
+        except OSError as exc:
+            raise CommandError(f'Không mở được file: {exc}')
+
+        with binary:
+            report = import_leads(
+                READERS[file_format](open_text(binary)),
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run'],
+                defaults={'sourced': options['sourced']} if options['sourced'] else None,
+            )
+
+        for error in report['errors'][:50]:
+            self.stdout.write(f"  dòng {error['line']}: {error['errors']}")
+        if report['failed'] > 50:
+            self.stdout.write(f"  ... và {report['failed'] - 50} dòng lỗi khác")
+
+        summary = f"{report['created']}/{report['total']} dòng hợp lệ, {report['failed']} dòng lỗi"
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{summary} (dry-run, chưa ghi DB).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Đã nhập: {summary}.'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:31
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction, nhưng không khóa ghi bảng
+    atomic = False
+
+    dependencies = [
+        ('hocviens', '0007_leadcontactnote'),
+        ('khoahocs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='hocvien',
+            index=models.Index(fields=['-created_at'], name='erp_students_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='hocvien',
+            index=models.Index(fields=['trang_thai_hoc_phi', '-created_at'], name='erp_students_hocphi_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='hocvien',
+            index=models.Index(condition=models.Q(('created_as_lead', True), ('is_converted', False)), fields=['-created_at'], name='erp_students_open_lead_idx'),
+        ),
+    ]
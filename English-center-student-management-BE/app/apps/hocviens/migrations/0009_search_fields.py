@@ -0,0 +1,42 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hocviens', '0008_indexes'),
+        ('khoahocs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hocvien',
+            name='sdt_chuan',
+            field=models.CharField(blank=True, default='', editable=False, max_length=15, verbose_name='SĐT chuẩn hóa'),
+        ),
+        migrations.AddField(
+            model_name='hocvien',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Chuỗi tìm kiếm'),
+        ),
+        migrations.AddField(
+            model_name='hocvien',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('search_text', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector(models.Func(django.db.models.functions.text.Lower('email'), models.Value('[^a-z0-9]+'), models.Value(' '), models.Value('g'), function='regexp_replace'), config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='hocvien',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='erp_students_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hocvien',
+            index=models.Index(fields=['sdt_chuan'], name='erp_students_sdt_chuan_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
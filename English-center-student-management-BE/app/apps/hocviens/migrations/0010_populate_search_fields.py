@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def populate_search_fields(apps, schema_editor):
+    from app.apps.hocviens.models import build_search_text
+    from app.core.text import normalize_phone
+
+    HocVien = apps.get_model('hocviens', 'HocVien')
+    batch = []
+    for hocvien in HocVien.objects.only('id', 'ten', 'sdt').order_by().iterator(chunk_size=2000):
+        hocvien.search_text = build_search_text(hocvien.ten)
+        hocvien.sdt_chuan = normalize_phone(hocvien.sdt)
+        batch.append(hocvien)
+        if len(batch) >= 2000:
+            HocVien.objects.bulk_update(batch, ['search_text', 'sdt_chuan'])
+            batch = []
+    if batch:
+        HocVien.objects.bulk_update(batch, ['search_text', 'sdt_chuan'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hocviens', '0009_search_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_search_fields, migrations.RunPython.noop),
+    ]
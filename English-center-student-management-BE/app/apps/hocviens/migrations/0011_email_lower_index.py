@@ -0,0 +1,24 @@
+# Generated by Django 5.0.2 on 2026-10-18 22:10
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction, nhưng không khóa ghi bảng
+    atomic = False
+
+    dependencies = [
+        ('hocviens', '0010_populate_search_fields'),
+        ('khoahocs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='hocvien',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='erp_students_email_lower_idx'),
+        ),
+    ]
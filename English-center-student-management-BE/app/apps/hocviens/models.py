@@ -1,10 +1,28 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.core.validators import RegexValidator
 from app.core.models import BaseModel
+from app.core.text import normalize_phone, search_tokens
 from app.apps.users.models import User
 from app.apps.khoahocs.models import KhoaHoc  # add import
 
 
+def build_search_text(*values):
+    """
+    'Nguyễn Văn A' -> 'nguyen van a'
+    """
+    return ' '.join(token for value in values for token in search_tokens(value))
+
+
+def _email_tokens(field):
+    # 'An.Nguyen@gmail.com' -> 'an nguyen gmail com' (immutable, dùng được trong cột sinh)
+    return models.Func(
+        models.functions.Lower(field), models.Value('[^a-z0-9]+'), models.Value(' '), models.Value('g'),
+        function='regexp_replace',
+    )
+
+
 class HocVien(BaseModel):
     """
     Model quản lý thông tin học viên
@@ -73,15 +91,61 @@ class HocVien(BaseModel):
         verbose_name='Tài khoản'
     )
 
+    # Trường phục vụ tìm kiếm (app/apps/hocviens/search.py), tự cập nhật trong save()
+    search_text = models.TextField(blank=True, default='', editable=False, verbose_name='Chuỗi tìm kiếm')
+    sdt_chuan = models.CharField(max_length=15, blank=True, default='', editable=False, verbose_name='SĐT chuẩn hóa')
+    # họ tên (trọng số A) xếp trước email (trọng số B) khi cùng khớp
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('search_text', config='simple', weight='A')
+            + SearchVector(_email_tokens('email'), config='simple', weight='B')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    SEARCH_SOURCE_FIELDS = {'ten', 'sdt'}
+
     class Meta:
         verbose_name = 'Học viên'
         verbose_name_plural = 'Học viên'
         ordering = ['-created_at']
         db_table = 'erp_students'
+        indexes = [
+            models.Index(fields=['-created_at'], name='erp_students_created_idx'),
+            models.Index(fields=['trang_thai_hoc_phi', '-created_at'], name='erp_students_hocphi_idx'),
+            # Danh sách lead đang mở (LeadListView): chỉ index phần nhỏ của bảng
+            models.Index(
+                fields=['-created_at'], name='erp_students_open_lead_idx',
+                condition=models.Q(created_as_lead=True, is_converted=False),
+            ),
+            GinIndex(fields=['search_vector'], name='erp_students_search_idx'),
+            models.Index(
+                fields=['sdt_chuan'], name='erp_students_sdt_chuan_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+            # kiểm tra email đã có khi nhập lead (không phân biệt hoa thường)
+            models.Index(models.functions.Lower('email'), name='erp_students_email_lower_idx'),
+        ]
         
     def __str__(self):
         return self.ten
 
+    def refresh_search_fields(self):
+        """
+        Tính lại chuỗi tìm kiếm (bỏ dấu) và số điện thoại chuẩn hóa.
+        Gọi thủ công trước bulk_create()/update() vì các thao tác đó không qua save().
+        """
+        self.search_text = build_search_text(self.ten)
+        self.sdt_chuan = normalize_phone(self.sdt)
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.SEARCH_SOURCE_FIELDS & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_text', 'sdt_chuan'}
+        super().save(*args, **kwargs)
+
     @property
     def tuoi(self):
         from datetime import date
@@ -0,0 +1,60 @@
+"""
+Tìm kiếm học viên / lead.
+
+- Họ tên được bỏ dấu, tách từ và lưu vào `search_text` khi save(); cột sinh `search_vector`
+  (to_tsvector 'simple') ghép `search_text` (trọng số A) với các từ của email (trọng số B, tách
+  trong DB) và có GIN index; từ cuối được tra theo tiền tố ('nguyen van th' -> nguyen & van & th:*),
+  "nguyen" khớp "Nguyễn".
+- Chuỗi giống số điện thoại được chuẩn hóa về 0xxxxxxxxx (chấp nhận +84 / 84 / 0) và tra
+  theo tiền tố trên `sdt_chuan` (B-tree varchar_pattern_ops).
+- Kết quả tìm theo tên gồm MỌI dòng khớp (count / phân trang / export đúng), xếp theo ts_rank
+  (khớp họ tên trước khớp email), sau đó đến created_at.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Q
+from rest_framework.filters import SearchFilter
+
+from app.core.text import phone_query_prefixes, search_tokens
+
+
+def build_tsquery(term):
+    """
+    'Nguyễn Văn Th' -> 'nguyen & van & th:*' (chỉ gồm [a-z0-9] nên ghép raw an toàn).
+    Các từ đã gõ xong tra chính xác, chỉ từ cuối (đang gõ) tra theo tiền tố: tra tiền tố
+    trên GIN tốn hơn nhiều so với tra đúng một từ.
+    """
+    tokens = search_tokens(term)
+    if not tokens:
+        return ''
+    return ' & '.join(tokens[:-1] + [f'{tokens[-1]}:*'])
+
+
+def search_hocvien(queryset, term):
+    term = (term or '').strip()
+    if not term:
+        return queryset
+
+    prefixes = phone_query_prefixes(term)
+    if prefixes:
+        condition = Q()
+        for prefix in prefixes:
+            condition |= Q(sdt_chuan__startswith=prefix)
+        return queryset.filter(condition).order_by('sdt_chuan', '-created_at')
+
+    tsquery = build_tsquery(term)
+    if not tsquery:
+        return queryset.none()
+    query = SearchQuery(tsquery, search_type='raw', config='simple')
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F('search_vector'), query))
+        .order_by('-search_rank', '-created_at', '-id')
+    )
+
+
+class HocVienSearchFilter(SearchFilter):
+    """
+    Thay SearchFilter mặc định (ILIKE '%q%' trên nhiều cột) bằng `search_hocvien`; vẫn dùng ?search=
+    """
+    def filter_queryset(self, request, queryset, view):
+        return search_hocvien(queryset, request.query_params.get(self.search_param, ''))
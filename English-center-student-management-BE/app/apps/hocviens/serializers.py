@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from app.core.text import normalize_phone
 from .models import HocVien, LeadContactNote
 from app.apps.users.serializers import UserSerializer
 from app.apps.khoahocs.models import KhoaHoc
@@ -60,6 +62,31 @@ class HocVienCreateSerializer(serializers.ModelSerializer):
         extra_kwargs = {'is_converted': {'required': False}, 'created_as_lead': {'required': False}}
 
 
+class LeadImportRowSerializer(serializers.Serializer):
+    """
+    Kiểm tra một dòng lead khi nhập hàng loạt (app/apps/hocviens/importer.py).
+    Không phải ModelSerializer: kiểm tra trùng email/SĐT được làm theo lô, không truy vấn từng dòng.
+    """
+    ten = serializers.CharField(max_length=100)
+    email = serializers.EmailField(max_length=254)
+    sdt = serializers.CharField(max_length=20)
+    ngay_sinh = serializers.DateField(required=False, allow_null=True)
+    address = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+    nhu_cau_hoc = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    ghi_chu = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    sourced = serializers.CharField(max_length=64, required=False, allow_blank=True, allow_null=True)
+    concern_level = serializers.ChoiceField(choices=HocVien.CONCERN_LEVEL_CHOICES, required=False, allow_null=True)
+
+    def validate_email(self, value):
+        return value.strip().lower()
+
+    def validate_sdt(self, value):
+        sdt = normalize_phone(value)
+        if len(sdt) != 10 or sdt[1] == '0':
+            raise serializers.ValidationError('Số điện thoại không hợp lệ')
+        return sdt
+
+
 class HocVienUpdateSerializer(serializers.ModelSerializer):
     """
     Serializer để cập nhật HocVien
@@ -0,0 +1,170 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.core.text import fold_diacritics, normalize_phone, phone_query_prefixes
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.diemdanhs.models import DiemDanh
+from app.apps.hocviens.models import HocVien
+from app.apps.khoahocs.models import KhoaHoc
+from app.apps.lichhocs.models import LichHoc
+from app.apps.lophocs.models import LopHoc
+from app.apps.thanhtoans.models import ThanhToan
+from app.apps.thongbaos.models import ThongBao
+from app.apps.hocviens import importer
+from app.apps.hocviens.search import search_hocvien
+from app.apps.reports.models import HocVienNgay
+from app.apps.users.models import User
+from app.core import jobs
+
+
+class TextNormalizeTest(TestCase):
+    def test_fold_diacritics(self):
+        self.assertEqual(fold_diacritics('Nguyễn Đức Thắng'), 'nguyen duc thang')
+
+    def test_normalize_phone(self):
+        for value in ['0912345678', '+84912345678', '84912345678', '912345678', '0912 345 678']:
+            self.assertEqual(normalize_phone(value), '0912345678')
+        self.assertEqual(phone_query_prefixes('+84912'), ['0912'])
+        self.assertEqual(phone_query_prefixes('84912'), ['084912', '0912'])
+        self.assertEqual(phone_query_prefixes('nguyen'), [])
+
+
+class HocVienSearchTest(TestCase):
+    def setUp(self):
+        self.thang = HocVien.objects.create(ten='Nguyễn Đức Thắng', email='thang@example.com', sdt='+84912345678')
+        self.an = HocVien.objects.create(ten='Trần Thị An', email='an.nguyen@example.com', sdt='0987654321')
+        HocVien.objects.create(ten='Lê Văn Bình', email='binh@example.com', sdt='0901111222')
+
+    def search(self, term):
+        return list(search_hocvien(HocVien.objects.all(), term))
+
+    def test_folds_diacritics_and_prefixes(self):
+        self.assertEqual(self.search('nguyen duc'), [self.thang])
+        self.assertEqual(self.search('Thắ'), [self.thang])
+        # khớp họ tên xếp trước khớp email
+        self.assertEqual(self.search('nguyen'), [self.thang, self.an])
+
+    def test_phone_prefixes(self):
+        self.assertEqual(self.search('0912 345'), [self.thang])
+        self.assertEqual(self.search('+8498765'), [self.an])
+        self.assertEqual(self.search('84912345678'), [self.thang])
+
+    def test_leads_search_is_not_capped_and_keeps_filters(self):
+        HocVien.objects.bulk_create([
+            HocVien(ten=f'Nguyễn {index}', search_text=f'nguyen {index}', email=f'lead{index}@example.com',
+                    sdt=f'09{index:08d}', created_as_lead=True, concern_level='nong' if index % 2 else 'moi')
+            for index in range(600)
+        ])
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='admin', password='x', role='admin'))
+        url = reverse('hocviens:hocvien-leads')
+        self.assertEqual(client.get(url, {'search': 'nguyen', 'page': 1}).data['count'], 600)
+        response = client.get(url, {'search': 'nguyen', 'concern_level': 'nong', 'ordering': 'ten', 'page': 1})
+        self.assertEqual(response.data['count'], 300)
+        self.assertEqual(response.data['results'][0]['ten'], 'Nguyễn 1')
+
+    def test_update_fields_refreshes_search_text(self):
+        self.thang.ten = 'Phạm Minh'
+        self.thang.save(update_fields=['ten'])
+        self.assertEqual(self.search('pham'), [self.thang])
+
+
+class LeadImportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='x', role='admin'))
+        HocVien.objects.create(ten='Đã có', email='old@example.com', sdt='0901111222')
+
+    def upload(self, name, content, query=''):
+        return self.client.post(
+            f'/api/hocviens/leads/import/{query}',
+            {'file': SimpleUploadedFile(name, content.encode('utf-8'))}, format='multipart',
+        )
+
+    def test_csv_import_reports_errors_per_line(self):
+        response = self.upload('leads.csv', (
+            'Họ tên,Email,SĐT,ngay_sinh\n'
+            'Nguyễn Văn Mới,Moi@Example.com,+84 912 345 678,2001-02-03\n'
+            'Trùng email,OLD@example.com,0933333333,\n'
+            'Trùng SĐT,khac@example.com,84901111222,\n'
+            'Trùng trong file,moi@example.com,0944444444,\n'
+            'Sai,khong-phai-email,123,\n'
+        ), query='?sourced=facebook')
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['total'], report['created'], report['failed']), (5, 1, 4))
+        self.assertEqual([error['line'] for error in report['errors']], [5, 6, 3, 4])
+        self.assertEqual(set(report['errors'][3]['errors']), {'sdt'})
+
+        lead = HocVien.objects.get(email='moi@example.com')
+        self.assertEqual((lead.sdt, lead.sourced, lead.created_as_lead, lead.is_converted),
+                         ('0912345678', 'facebook', True, False))
+        self.assertEqual(search_hocvien(HocVien.objects.all(), 'nguyen van moi').get(), lead)
+        self.assertEqual(HocVienNgay.objects.get(created_as_lead=True).so_luong, 1)
+
+    def test_existing_email_matched_case_insensitively_and_retry_is_capped(self):
+        HocVien.objects.create(ten='Chữ hoa', email='Hoa@Example.com', sdt='0902222333')
+        rows = [(2, {'ten': 'A', 'email': 'hoa@example.com', 'sdt': '0912000111'}),
+                (3, {'ten': 'B', 'email': 'b@example.com', 'sdt': '0912000222'})]
+        report = importer.import_leads(rows, dry_run=True)
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(report['errors'], [{'line': 2, 'errors': {'email': ['Email đã tồn tại']}}])
+
+        # COPY luôn lỗi ràng buộc: chỉ thử lại INSERT_ATTEMPTS lần rồi báo lỗi các dòng còn lại
+        with mock.patch.object(importer, 'copy_insert', side_effect=IntegrityError) as copy_insert:
+            report = importer.import_leads(rows)
+        self.assertEqual(copy_insert.call_count, importer.INSERT_ATTEMPTS)
+        self.assertEqual((report['total'], report['created'], report['failed']), (2, 0, 2))
+        self.assertEqual([error['line'] for error in report['errors']], [2, 3])
+
+    def test_jsonl_dry_run(self):
+        response = self.upload('leads.jsonl', (
+            '{"ten": "A", "email": "a@example.com", "sdt": "0912000111"}\n'
+            'not json\n'
+        ), query='?dry_run=1')
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(response.json()['errors'][0]['line'], 2)
+        self.assertFalse(HocVien.objects.filter(email='a@example.com').exists())
+
+
+class MeDashboardTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hv1', password='x', role='giangvien')
+        self.hocvien = HocVien.objects.create(ten='A', email='a@example.com', sdt='0912345678', user=self.user)
+        khoahoc = KhoaHoc.objects.create(ten='IELTS', lich_hoc='T2-T4', giang_vien='A', so_buoi=10, hoc_phi=1000)
+        DangKyKhoaHoc.objects.create(hocvien=self.hocvien, khoahoc=khoahoc, trang_thai='dang_hoc')
+        ThanhToan.objects.create(hocvien=self.hocvien, so_tien=400, trang_thai='partial')
+        lop = LopHoc.objects.create(ten='IELTS-1', khoa_hoc=khoahoc, ngay_bat_dau='2024-01-01')
+        for ngay_hoc, trang_thai in [('monday', 'co_mat'), ('wednesday', 'co_mat'), ('friday', 'vang_co_phep')]:
+            lich = LichHoc.objects.create(lop_hoc=lop, ngay_hoc=ngay_hoc, gio_bat_dau='18:00', gio_ket_thuc='19:30')
+            DiemDanh.objects.create(lich_hoc=lich, hoc_vien=self.hocvien, trang_thai=trang_thai)
+        ThongBao.objects.create(tieu_de='Nghỉ lễ', noi_dung='...', nguoi_nhan='hocvien', trang_thai='da_gui')
+        jobs.run_pending()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_all_sections(self):
+        # 1 truy vấn tìm học viên + số truy vấn cố định của từng phần
+        with self.assertNumQueries(8):
+            data = self.client.get(reverse('hocviens:me-dashboard')).data
+        self.assertEqual(data['profile']['id'], self.hocvien.pk)
+        self.assertEqual(data['enrollments'][0]['so_buoi_co_mat'], 2)
+        self.assertEqual(data['balance']['con_no'], 600)
+        self.assertEqual(len(data['balance']['thanh_toan_gan_day']), 1)
+        self.assertEqual((data['attendance']['tong'], data['attendance']['ty_le_co_mat']), (3, 66.67))
+        self.assertEqual(data['notifications']['chua_doc'], 1)
+        self.assertEqual(data['notifications']['gan_day'][0]['thongbao__tieu_de'], 'Nghỉ lễ')
+
+    def test_selected_sections(self):
+        with self.assertNumQueries(4):
+            data = self.client.get(reverse('hocviens:me-dashboard'), {'include': 'profile,notifications'}).data
+        self.assertEqual(set(data), {'profile', 'notifications'})
+
+        staff = User.objects.create_user(username='sales1', password='x', role='sales_staff')
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.client.get(reverse('hocviens:me-dashboard')).status_code, 404)
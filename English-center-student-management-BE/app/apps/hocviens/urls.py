@@ -6,9 +6,12 @@ app_name = 'hocviens'
 
 urlpatterns = [
     path('hocviens/', views.HocVienListView.as_view(), name='hocvien-list'),
+    path('hocviens/export/', views.HocVienListView.as_view(export=True), name='hocvien-export'),
     path('hocviens/<uuid:pk>/', views.HocVienDetailView.as_view(), name='hocvien-detail'),
     path('hocviens/me/', views.HocVienMyProfileView.as_view(), name='hocvien-me'),
+    path('me/dashboard/', views.me_dashboard, name='me-dashboard'),
     path('hocviens/leads/', views.LeadsListCreateView.as_view(), name='hocvien-leads'),
+    path('hocviens/leads/import/', views.LeadImportView.as_view(), name='hocvien-lead-import'),
     path('hocviens/leads/<uuid:pk>/convert/', views.LeadConvertView.as_view(), name='hocvien-lead-convert'),
     path('hocviens/<uuid:lead_id>/contact-note/', views.LeadContactNoteView.as_view(), name='hocvien-contact-note'),
     path('hocviens/stats/', HocVienStatsView.as_view(), name='hocvien-stats'),
@@ -3,34 +3,48 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.views import APIView
-from django.db.models import Count
-from django.db.models.functions import TruncDate
+from django.db.models import Count, Sum
 from django.db.models import Q
-from django.utils.timezone import now
+from django.utils.timezone import localtime, now
 from django.apps import apps
 
 from app.core.permissions import CanManageStudents, IsOwnerOrStaff, CanManageCourses, CanManageStudentsOrFinanceRead
+from app.core.capabilities import HasCapability, linked_hocvien_id, own_queryset
+from app.core.cache import cached_view
+from app.core.export import ExportMixin
+from app.core.stats import abreakdown_stats, breakdown_stats
+from app.core.async_views import AsyncAPIView, async_api_view, gather_queries
+from app.apps.reports.models import HocVienNgay
+from . import dashboard
 from .models import HocVien, LeadContactNote, KhoaHoc
+from .importer import READERS, detect_format, import_leads, open_text
+from .search import HocVienSearchFilter
 from .serializers import (
     HocVienSerializer, HocVienCreateSerializer,
     HocVienUpdateSerializer, HocVienDetailSerializer, LeadContactNoteSerializer
 )
 
 
-class HocVienListView(generics.ListCreateAPIView):
+class HocVienListView(ExportMixin, generics.ListCreateAPIView):
     """
-    Danh sách và tạo học viên (Nhân viên/Admin)
+    Danh sách và tạo học viên (Nhân viên/Admin). GET hocviens/export/ xuất CSV/XLSX theo cùng bộ lọc
     """
-    queryset = HocVien.objects.all()
+    # HocVienSerializer lồng khóa học quan tâm và tài khoản
+    queryset = HocVien.objects.select_related('khoa_hoc_quan_tam', 'user')
     serializer_class = HocVienSerializer
     # allow finance staff to GET the list (read-only), other methods require CanManageStudents
     permission_classes = [CanManageStudentsOrFinanceRead]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, HocVienSearchFilter, OrderingFilter]
     filterset_fields = ['trang_thai_hoc_phi']
-    search_fields = ['ten', 'email', 'sdt']
     ordering_fields = ['ten', 'ngay_sinh', 'created_at', 'trang_thai_hoc_phi']
+    export_filename = 'hocvien'
+    export_fields = [
+        ('Họ tên', 'ten'), ('Email', 'email'), ('SĐT', 'sdt'), ('Ngày sinh', 'ngay_sinh'),
+        ('Trạng thái học phí', 'trang_thai_hoc_phi'), ('Lead', 'created_as_lead'),
+        ('Đã chuyển đổi', 'is_converted'), ('Nguồn', 'sourced'), ('Ngày tạo', 'created_at'),
+    ]
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -61,40 +75,43 @@ class HocVienMyProfileView(generics.RetrieveAPIView):
 
     def get_object(self):
         # Học viên chỉ có thể xem thông tin của mình
-        if self.request.user.role == 'hocvien':
-            try:
-                return HocVien.objects.get(user=self.request.user)
-            except HocVien.DoesNotExist:
-                return None
-        return None
+        return own_queryset(HocVien.objects.all(), self.request.user, owner='pk').first()
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def hocvien_stats(request):
+def me_dashboard(request):
+    """
+    Dashboard của học viên đang đăng nhập trong một request: hồ sơ, đăng ký và tiến độ, công nợ học phí,
+    điểm danh gần đây, thông báo chưa đọc. Chọn phần cần lấy bằng ?include=profile,balance (mặc định tất cả).
+    """
+    hocvien_id = linked_hocvien_id(request.user)
+    if hocvien_id is None:
+        return Response({'detail': 'Tài khoản chưa liên kết với học viên.'}, status=status.HTTP_404_NOT_FOUND)
+    raw = request.query_params.get('include')
+    sections = dashboard.SECTIONS if raw is None else {part.strip() for part in raw.split(',')}
+    return Response(dashboard.build(hocvien_id, request.user, sections))
+
+
+@async_api_view(['GET'])
+@permission_classes([HasCapability('students.read')])
+@cached_view('students', 'finance', 'courses', 'enrollments')
+async def hocvien_stats(request):
     """
     Thống kê học viên (Nhân viên/Admin)
     """
-    if request.user.role not in ['admin', 'nhanvien']:
-        return Response({'error': 'Không có quyền truy cập'}, status=status.HTTP_403_FORBIDDEN)
-
-    total_hocvien = HocVien.objects.count()
-    dadong_hocphi = HocVien.objects.filter(trang_thai_hoc_phi='dadong').count()
-    conno_hocphi = HocVien.objects.filter(trang_thai_hoc_phi='conno').count()
-    chuadong_hocphi = HocVien.objects.filter(trang_thai_hoc_phi='chuadong').count()
-    co_taikhoan = HocVien.objects.filter(user__isnull=False).count()
-
-    return Response({
-        'total_hocvien': total_hocvien,
-        'dadong_hocphi': dadong_hocphi,
-        'conno_hocphi': conno_hocphi,
-        'chuadong_hocphi': chuadong_hocphi,
-        'co_taikhoan': co_taikhoan,
-        'khong_co_taikhoan': total_hocvien - co_taikhoan
-    })
-
-
-class HocVienStatsView(APIView):
+    stats = await abreakdown_stats(
+        HocVien,
+        [('trang_thai_hoc_phi', {'dadong_hocphi': 'dadong', 'conno_hocphi': 'conno', 'chuadong_hocphi': 'chuadong'})],
+        total='total_hocvien',
+        co_taikhoan=Q(user__isnull=False),
+    )
+    stats['khong_co_taikhoan'] = stats['total_hocvien'] - stats['co_taikhoan']
+
+    return Response(stats)
+
+
+class HocVienStatsView(AsyncAPIView):
     """
     GET /api/hocviens/stats/
     Returns:
@@ -109,33 +126,26 @@ class HocVienStatsView(APIView):
     """
     permission_classes = [CanManageCourses]
 
-    def get(self, request):
+    @cached_view('students', 'courses', 'enrollments')
+    async def get(self, request):
         try:
-            # total students
-            total_students = HocVien.objects.count()
-
-            # students created this month (use created_at from BaseModel)
-            now_ts = now()
-            first_of_month = now_ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            students_this_month = HocVien.objects.filter(created_at__gte=first_of_month).count()
-
-            # --- CHANGED: compute student_count per KhoaHoc from enrollments (dangkykhoahoc) ---
-            # Use apps.get_model to load the enrollment model (avoid hardcoding class name)
-            DangKy = apps.get_model('dangky', 'dangkykhoahoc')
-            # aggregate unique students per khoahoc
-            enroll_counts = DangKy.objects.values('khoahoc').annotate(student_count=Count('hocvien', distinct=True))
-            enroll_map = {str(item['khoahoc']): item['student_count'] for item in enroll_counts}
-
-            # build courses list using enroll_map (falls back to 0)
-            courses_qs = KhoaHoc.objects.all().values('id', 'ten')
-            courses = []
-            for c in courses_qs:
-                cid = str(c['id'])
-                courses.append({
-                    'id': c['id'],
-                    'ten': c['ten'],
-                    'student_count': enroll_map.get(cid, 0)
-                })
+            first_of_month = localtime(now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            # both queries are independent: run them concurrently
+            counts, courses = await gather_queries(
+                # total students + students created this month (use created_at from BaseModel): one query
+                lambda: breakdown_stats(
+                    HocVien,
+                    total='total_students',
+                    students_this_month=Q(created_at__gte=first_of_month),
+                ),
+                # unique students per KhoaHoc from enrollments (dangkykhoahoc)
+                lambda: list(
+                    KhoaHoc.objects.annotate(student_count=Count('dangkykhoahoc__hocvien', distinct=True))
+                    .values('id', 'ten', 'student_count')
+                ),
+            )
+            total_students = counts['total_students']
+            students_this_month = counts['students_this_month']
 
             return Response({
                 "total_students": total_students,
@@ -166,6 +176,35 @@ class LeadCreateView(APIView):
         return Response(out.data, status=status.HTTP_201_CREATED)
 
 
+class LeadImportView(APIView):
+    """
+    POST /api/hocviens/leads/import/  (multipart, field `file`: CSV có dòng tiêu đề hoặc JSON lines)
+    Nhập hàng loạt lead, kiểm tra và loại trùng theo lô (xem importer.py).
+    Query: ?file_format=csv|jsonl (mặc định theo đuôi file), ?dry_run=1 chỉ kiểm tra, ?sourced=<nguồn mặc định>
+    Trả về số dòng đã tạo và danh sách lỗi theo từng dòng.
+    """
+    permission_classes = [CanManageStudents]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"file": ["Cần tải lên file CSV hoặc JSON lines."]}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.query_params.get('file_format') or detect_format(upload.name)
+        if file_format not in READERS:
+            return Response(
+                {"file_format": [f"Chỉ hỗ trợ: {', '.join(READERS)}"]}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sourced = request.query_params.get('sourced')
+        report = import_leads(
+            READERS[file_format](open_text(upload)),
+            dry_run=request.query_params.get('dry_run') in ('1', 'true'),
+            defaults={'sourced': sourced} if sourced else None,
+        )
+        status_code = status.HTTP_201_CREATED if report['created'] and not report['failed'] else status.HTTP_200_OK
+        return Response(report, status=status_code)
+
+
 class LeadConvertView(APIView):
     """
     POST /api/hocviens/leads/<pk>/convert/
@@ -196,7 +235,11 @@ class LeadsListCreateView(generics.ListCreateAPIView):
     POST /api/hocviens/leads/  -> create a new lead (public allowed)
     """
     # only leads created as leads and not yet converted to student
-    queryset = HocVien.objects.filter(created_as_lead=True, is_converted=False)
+    queryset = HocVien.objects.filter(created_as_lead=True, is_converted=False).select_related('khoa_hoc_quan_tam', 'user')
+    filter_backends = [DjangoFilterBackend, HocVienSearchFilter, OrderingFilter]
+    filterset_fields = ['trang_thai_hoc_phi', 'concern_level', 'sourced']
+    ordering_fields = ['ten', 'ngay_sinh', 'created_at', 'concern_level']
+
     # return full serializer for listing
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -262,19 +305,20 @@ class StudentRegistrationTrendView(APIView):
 
     def get(self, request):
         try:
-            qs = HocVien.objects.filter(
+            # đọc từ bảng fact học viên mới theo ngày
+            qs = HocVienNgay.objects.filter(
                 Q(created_as_lead=False) | Q(created_as_lead=True, is_converted=True)
             )
             # optional date range
             from_date = request.query_params.get('from')
             to_date = request.query_params.get('to')
             if from_date:
-                qs = qs.filter(created_at__date__gte=from_date)
+                qs = qs.filter(ngay__gte=from_date)
             if to_date:
-                qs = qs.filter(created_at__date__lte=to_date)
+                qs = qs.filter(ngay__lte=to_date)
 
-            daily = qs.annotate(day=TruncDate('created_at')).values('day').annotate(count=Count('id')).order_by('day')
-            result = [{'date': d['day'].strftime('%Y-%m-%d'), 'count': d['count']} for d in daily]
+            daily = qs.values('ngay').annotate(count=Sum('so_luong')).filter(count__gt=0).order_by('ngay')
+            result = [{'date': d['ngay'].strftime('%Y-%m-%d'), 'count': d['count']} for d in daily]
             return Response(result, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -5,3 +5,7 @@ class KhoahocsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.apps.khoahocs'
     verbose_name = 'Quản lý khóa học'
+
+    def ready(self):
+        from app.core.cache import invalidate_on_change
+        invalidate_on_change(self.get_model('KhoaHoc'), 'courses')
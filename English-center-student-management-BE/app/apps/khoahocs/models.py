@@ -3,6 +3,21 @@ from django.core.validators import MinValueValidator
 from app.core.models import BaseModel
 
 
+class KhoaHocQuerySet(models.QuerySet):
+    def with_stats(self):
+        """
+        Gắn thống kê đăng ký tính bằng SQL (một JOIN + GROUP BY) thay vì truy vấn riêng cho từng khóa học:
+          so_dang_ky     - số đăng ký
+          so_hoan_thanh  - số đăng ký hoàn thành 100%
+          phan_tram_tb   - phần trăm hoàn thành trung bình
+        """
+        return self.annotate(
+            so_dang_ky=models.Count('dangkykhoahoc'),
+            so_hoan_thanh=models.Count('dangkykhoahoc', filter=models.Q(dangkykhoahoc__phan_tram_hoan_thanh__gte=100)),
+            phan_tram_tb=models.Avg('dangkykhoahoc__phan_tram_hoan_thanh', default=0),
+        )
+
+
 class KhoaHoc(BaseModel):
     """
     Model quản lý khóa học
@@ -32,6 +47,8 @@ class KhoaHoc(BaseModel):
         verbose_name='Trạng thái'
     )
 
+    objects = KhoaHocQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Khóa học'
         verbose_name_plural = 'Khóa học'
@@ -43,13 +60,23 @@ class KhoaHoc(BaseModel):
 
     @property
     def so_hoc_vien(self):
-        """Số học viên đăng ký"""
+        """Số học viên đăng ký (dùng annotation của with_stats() nếu có)"""
+        if 'so_dang_ky' in self.__dict__:
+            return self.so_dang_ky
         return self.dangkykhoahoc_set.count()
 
+    @property
+    def so_hoc_vien_hoan_thanh(self):
+        """Số học viên hoàn thành 100% (dùng annotation của with_stats() nếu có)"""
+        if 'so_hoan_thanh' in self.__dict__:
+            return self.so_hoan_thanh
+        return self.dangkykhoahoc_set.filter(phan_tram_hoan_thanh__gte=100).count()
+
     @property
     def ty_le_hoan_thanh(self):
-        """Tỷ lệ hoàn thành trung bình"""
-        dang_ky = self.dangkykhoahoc_set.all()
-        if not dang_ky:
-            return 0
-        return sum(dk.phan_tram_hoan_thanh for dk in dang_ky) / len(dang_ky)
+        """Tỷ lệ hoàn thành trung bình (dùng annotation của with_stats() nếu có)"""
+        if 'phan_tram_tb' in self.__dict__:
+            return self.phan_tram_tb
+        return self.dangkykhoahoc_set.aggregate(
+            tb=models.Avg('phan_tram_hoan_thanh', default=0)
+        )['tb']
@@ -0,0 +1,63 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.hocviens.models import HocVien
+from app.apps.khoahocs.models import KhoaHoc
+from app.apps.users.models import User
+
+# (trang_thai, phan_tram_hoan_thanh) của các đăng ký mỗi khóa học
+ENROLLMENTS = [('dang_hoc', 40), ('hoan_thanh', 100), ('huy', 0), ('dang_ky', 100), ('dang_hoc', 75)]
+
+
+class KhoaHocStatsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='x', role='admin'))
+        self.students = 0
+
+    def create_course(self, enrollments=ENROLLMENTS):
+        khoahoc = KhoaHoc.objects.create(ten='IELTS', lich_hoc='T2', giang_vien='A', so_buoi=10, hoc_phi=1000)
+        for trang_thai, phan_tram in enrollments:
+            self.students += 1
+            hocvien = HocVien.objects.create(
+                ten=f'HV {self.students}', email=f'hv{self.students}@example.com', sdt=f'09{self.students:08d}',
+            )
+            DangKyKhoaHoc.objects.create(
+                hocvien=hocvien, khoahoc=khoahoc, trang_thai=trang_thai, phan_tram_hoan_thanh=phan_tram,
+            )
+        return khoahoc
+
+    def stats(self, khoahoc):
+        return khoahoc.so_hoc_vien, khoahoc.so_hoc_vien_hoan_thanh, khoahoc.ty_le_hoan_thanh
+
+    def test_annotations_match_fallback(self):
+        mixed, partial, empty = self.create_course(), self.create_course(ENROLLMENTS[:1]), self.create_course([])
+
+        annotated = {khoahoc.pk: self.stats(khoahoc) for khoahoc in KhoaHoc.objects.with_stats()}
+        # không có annotation: mỗi thuộc tính tự truy vấn
+        for khoahoc in (mixed, partial, empty):
+            fresh = KhoaHoc.objects.get(pk=khoahoc.pk)
+            self.assertNotIn('so_dang_ky', fresh.__dict__)
+            self.assertEqual(annotated[khoahoc.pk], self.stats(fresh))
+        # đăng ký hủy vẫn được tính như trước khi có annotation
+        self.assertEqual(annotated[mixed.pk], (5, 2, 63.0))
+        self.assertEqual(annotated[partial.pk], (1, 0, 40.0))
+        self.assertEqual(annotated[empty.pk], (0, 0, 0))
+
+    def test_list_query_count_is_constant(self):
+        self.create_course()
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/khoahocs/', {'page': 1})
+        self.assertEqual([(row['so_hoc_vien'], row['ty_le_hoan_thanh']) for row in response.data['results']],
+                         [(5, 63.0)])
+
+        for _ in range(4):
+            self.create_course(ENROLLMENTS[:2])
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/khoahocs/', {'page': 1})
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(
+            sorted((row['so_hoc_vien'], row['ty_le_hoan_thanh']) for row in response.data['results']),
+            [(2, 70.0)] * 4 + [(5, 63.0)],
+        )
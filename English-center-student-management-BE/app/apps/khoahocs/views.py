@@ -1,12 +1,15 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db import models
 
 from app.core.permissions import CanManageCourses, CanManageCoursesOrFinanceRead
+from app.core.capabilities import HasCapability
+from app.core.cache import cached_view
+from app.core.stats import breakdown_stats
+from app.core.async_views import async_api_view, gather_queries
 from .models import KhoaHoc
 from .serializers import (
     KhoaHocSerializer, KhoaHocCreateSerializer,
@@ -18,7 +21,8 @@ class KhoaHocListView(generics.ListCreateAPIView):
     """
     Danh sách và tạo khóa học (Nhân viên/Admin)
     """
-    queryset = KhoaHoc.objects.all()
+    # GROUP BY của with_stats() bỏ qua Meta.ordering: cần order_by rõ ràng để phân trang ổn định
+    queryset = KhoaHoc.objects.with_stats().order_by('-created_at')
     serializer_class = KhoaHocSerializer
     # allow finance staff to GET the list (read-only), other methods require CanManageCourses
     permission_classes = [CanManageCoursesOrFinanceRead]
@@ -37,7 +41,7 @@ class KhoaHocDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Chi tiết, cập nhật và xóa khóa học (Nhân viên/Admin)
     """
-    queryset = KhoaHoc.objects.all()
+    queryset = KhoaHoc.objects.with_stats()
     serializer_class = KhoaHocDetailSerializer
     permission_classes = [CanManageCourses]
 
@@ -51,7 +55,7 @@ class KhoaHocPublicListView(generics.ListAPIView):
     """
     Danh sách khóa học công khai (cho học viên xem)
     """
-    queryset = KhoaHoc.objects.filter(trang_thai='mo')
+    queryset = KhoaHoc.objects.filter(trang_thai='mo').with_stats().order_by('-created_at')
     serializer_class = KhoaHocSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -60,38 +64,29 @@ class KhoaHocPublicListView(generics.ListAPIView):
     ordering_fields = ['ten', 'hoc_phi', 'so_buoi']
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def khoahoc_stats(request):
+@async_api_view(['GET'])
+@permission_classes([HasCapability('courses.read')])
+@cached_view('courses', 'enrollments')
+async def khoahoc_stats(request):
     """
     Thống kê khóa học (Nhân viên/Admin)
     """
-    if request.user.role not in ['admin', 'nhanvien']:
-        return Response({'error': 'Không có quyền truy cập'}, status=status.HTTP_403_FORBIDDEN)
-
-    total_khoahoc = KhoaHoc.objects.count()
-    mo = KhoaHoc.objects.filter(trang_thai='mo').count()
-    dong = KhoaHoc.objects.filter(trang_thai='dong').count()
-    hoan_thanh = KhoaHoc.objects.filter(trang_thai='hoan_thanh').count()
-
-    # Top khóa học có nhiều học viên nhất
-    top_khoahoc = KhoaHoc.objects.annotate(
-        so_hv=models.Count('dangkykhoahoc')
-    ).order_by('-so_hv')[:5]
+    # Số khóa học theo trạng thái và top khóa học có nhiều học viên nhất: hai truy vấn chạy đồng thời
+    counts, top_khoahoc = await gather_queries(
+        lambda: breakdown_stats(KhoaHoc, [('trang_thai', ['mo', 'dong', 'hoan_thanh'])], total='total_khoahoc'),
+        lambda: list(KhoaHoc.objects.with_stats().order_by('-so_dang_ky')[:5]),
+    )
 
     top_khoahoc_data = []
     for kh in top_khoahoc:
         top_khoahoc_data.append({
             'id': kh.id,
             'ten': kh.ten,
-            'so_hoc_vien': kh.so_hv,
+            'so_hoc_vien': kh.so_hoc_vien,
             'ty_le_hoan_thanh': kh.ty_le_hoan_thanh
         })
 
     return Response({
-        'total_khoahoc': total_khoahoc,
-        'mo': mo,
-        'dong': dong,
-        'hoan_thanh': hoan_thanh,
+        **counts,
         'top_khoahoc': top_khoahoc_data
     })
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:31
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction, nhưng không khóa ghi bảng
+    atomic = False
+
+    dependencies = [
+        ('lichhocs', '0005_lichhoc_note'),
+        ('lophocs', '0003_rename_giang_vien_id_lophoc_giang_vien_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='lichhoc',
+            index=models.Index(fields=['ngay_hoc', 'gio_bat_dau'], name='erp_schedules_ngay_hoc_idx'),
+        ),
+    ]
@@ -26,6 +26,10 @@ class LichHoc(BaseModel):
         ordering = ['ngay_hoc', 'gio_bat_dau']
         db_table = 'erp_schedules'
         unique_together = ['lop_hoc', 'ngay_hoc', 'gio_bat_dau']
+        # Lọc theo lop_hoc (+ ngay_hoc) đã dùng được unique index ở trên
+        indexes = [
+            models.Index(fields=['ngay_hoc', 'gio_bat_dau'], name='erp_schedules_ngay_hoc_idx'),
+        ]
 
     def __str__(self):
         return f"{self.lop_hoc.ten} - {self.ngay_hoc} ({self.gio_bat_dau} - {self.gio_ket_thuc})"
\ No newline at end of file
@@ -0,0 +1,61 @@
+from datetime import time
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.hocviens.models import HocVien
+from app.apps.khoahocs.models import KhoaHoc
+from app.apps.lichhocs.models import LichHoc
+from app.apps.lophocs.models import LopHoc
+from app.apps.users.models import User
+
+
+class LopHocListTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='x', role='admin'))
+        self.ielts = KhoaHoc.objects.create(ten='IELTS', lich_hoc='T2', giang_vien='A', so_buoi=10, hoc_phi=1000)
+        self.toeic = KhoaHoc.objects.create(ten='TOEIC', lich_hoc='T3', giang_vien='B', so_buoi=10, hoc_phi=1000)
+        for index, khoahoc in enumerate([self.ielts, self.ielts, self.ielts, self.toeic]):
+            hocvien = HocVien.objects.create(
+                ten=f'HV {index}', email=f'hv{index}@example.com', sdt=f'09000000{index:02d}',
+            )
+            DangKyKhoaHoc.objects.create(hocvien=hocvien, khoahoc=khoahoc)
+        self.lops = [
+            LopHoc.objects.create(ten=f'Lớp {index}', khoa_hoc=self.ielts if index % 2 else self.toeic,
+                                  ngay_bat_dau='2024-01-01')
+            for index in range(5)
+        ]
+        LichHoc.objects.create(lop_hoc=self.lops[1], ngay_hoc='monday', gio_bat_dau=time(18), gio_ket_thuc=time(20))
+        self.url = reverse('lophocs:lophoc-list')
+
+    def test_current_students_and_includes(self):
+        results = self.client.get(self.url, {'khoa_hoc': self.ielts.pk}).data['results']
+        self.assertEqual({item['currentStudents'] for item in results}, {3})
+        self.assertFalse({'students', 'schedule'} & set(results[0]))
+
+        results = self.client.get(self.url, {'include': 'students,schedule'}).data['results']
+        by_id = {item['id']: item for item in results}
+        for lop in self.lops:
+            item = by_id[lop.pk]
+            expected = DangKyKhoaHoc.objects.filter(khoahoc=lop.khoa_hoc)
+            self.assertEqual(item['currentStudents'], expected.count())
+            self.assertEqual({student['id'] for student in item['students']},
+                             set(expected.values_list('hocvien_id', flat=True)))
+        self.assertEqual(by_id[self.lops[1].pk]['schedule'], [{'day': 'monday', 'time': '18:00:00-20:00:00'}])
+        self.assertEqual(by_id[self.lops[0].pk]['schedule'], [])
+
+        results = self.client.get(self.url, {'include': 'schedule'}).data['results']
+        self.assertNotIn('students', results[0])
+
+    def test_cursor_pages_return_each_class_once(self):
+        seen = []
+        response = self.client.get(self.url, {'page_size': 2})
+        while True:
+            seen += [item['id'] for item in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, [lop.pk for lop in sorted(self.lops, key=lambda lop: lop.created_at, reverse=True)])
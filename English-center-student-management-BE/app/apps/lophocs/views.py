@@ -2,13 +2,14 @@
 from django.apps import apps
 from rest_framework import viewsets, generics, filters
 from rest_framework.response import Response
+from django.db.models import Count
 from .models import LopHoc
 from .serializers import LopHocSerializer
+from app.core.pagination import StandardCursorPagination
 from app.core.permissions import CanManageCourses
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from app.apps.users.models import User
 
 
 class LopHocViewSet(viewsets.ModelViewSet):
@@ -41,23 +42,30 @@ class LopHocListView(generics.ListCreateAPIView):
     """
     List and create LopHoc
     Endpoint: /api/lophoc/  (singular)
+    GET: cursor pagination (?cursor=&page_size=), opt-in expansion ?include=students,schedule
     """
     queryset = LopHoc.objects.all()
     serializer_class = LopHocSerializer
     permission_classes = [CanManageCourses]
+    pagination_class = StandardCursorPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['ten', 'giang_vien', 'phong_hoc']
+    search_fields = ['ten', 'giang_vien__first_name', 'giang_vien__last_name', 'giang_vien__username', 'phong_hoc']
     ordering_fields = ['ten', 'ngay_bat_dau', 'ngay_ket_thuc']
 
+    # columns read for the list DTOs (no model instances are built)
+    list_fields = [
+        'id', 'ten', 'khoa_hoc_id', 'khoa_hoc__ten', 'phong_hoc', 'ngay_bat_dau', 'ngay_ket_thuc',
+        'so_hoc_vien_toi_da', 'trang_thai', 'mo_ta', 'created_at', 'updated_at',
+        'giang_vien_id', 'giang_vien__first_name', 'giang_vien__last_name',
+        'giang_vien__email', 'giang_vien__username',
+    ]
+    include_options = {'students', 'schedule'}
+
     def get_queryset(self):
         """
         Filter queryset based on query params (e.g., khoa_hoc, trang_thai).
         """
         qs = super().get_queryset()
-        
-        # Use select_related to load related course and teacher in one query
-        qs = qs.select_related('khoa_hoc', 'giang_vien')
-        
         khoa_hoc = self.request.query_params.get('khoa_hoc')
         trang_thai = self.request.query_params.get('trang_thai')
         if khoa_hoc:
@@ -66,118 +74,89 @@ class LopHocListView(generics.ListCreateAPIView):
             qs = qs.filter(trang_thai=trang_thai)
         return qs.order_by('-created_at')
 
+    def get_includes(self):
+        raw = self.request.query_params.get('include', '')
+        return {part.strip() for part in raw.split(',')} & self.include_options
+
     def list(self, request, *args, **kwargs):
         """
-        List LopHoc and attach schedule built from related LichHoc records.
+        List LopHoc as lean DTOs built from .values() rows.
+        currentStudents comes from one grouped count; schedule / students are only loaded when requested.
         """
-        queryset = self.filter_queryset(self.get_queryset())
-
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.list_fields)
         page = self.paginate_queryset(queryset)
-        lops = list(page) if page is not None else list(queryset)
+        rows = list(page) if page is not None else list(queryset)
+        includes = self.get_includes()
 
-        # collect lop ids
-        lop_ids = [getattr(l, 'id') for l in lops]
-        schedule_map = {}
+        lop_ids = [r['id'] for r in rows]
+        course_ids = {r['khoa_hoc_id'] for r in rows if r['khoa_hoc_id']}
 
-        # load LichHoc model dynamically
-        try:
+        # enrollment count per course: one GROUP BY query
+        DangKy = apps.get_model('dangky', 'dangkykhoahoc')
+        student_counts = dict(
+            DangKy.objects.filter(khoahoc_id__in=course_ids)
+            .values('khoahoc_id').annotate(n=Count('id')).order_by()
+            .values_list('khoahoc_id', 'n')
+        ) if course_ids else {}
+
+        schedule_map = {}
+        if 'schedule' in includes and lop_ids:
             LichHoc = apps.get_model('lichhocs', 'LichHoc')
-            lich_qs = LichHoc.objects.filter(lop_hoc_id__in=lop_ids).values('lop_hoc_id', 'ngay_hoc', 'gio_bat_dau', 'gio_ket_thuc')
-            for r in lich_qs:
-                lid = str(r.get('lop_hoc_id'))
-                day = r.get('ngay_hoc')
-                start = r.get('gio_bat_dau') or ''
-                end = r.get('gio_ket_thuc') or ''
-                time = f"{start}-{end}" if start and end else start
-                schedule_map.setdefault(lid, []).append({"day": day, "time": time})
-        except Exception:
-            schedule_map = {}
+            lich_qs = LichHoc.objects.filter(lop_hoc_id__in=lop_ids).values_list(
+                'lop_hoc_id', 'ngay_hoc', 'gio_bat_dau', 'gio_ket_thuc'
+            )
+            for lop_id, day, start, end in lich_qs:
+                time = f"{start}-{end}" if start and end else (start or '')
+                schedule_map.setdefault(lop_id, []).append({"day": day, "time": time})
 
-        # load enrollments
-        enroll_students_map = {}
-        try:
-            DangKy = apps.get_model('dangky', 'dangkykhoahoc')
-            course_ids = []
-            for l in lops:
-                cid = getattr(l, 'khoa_hoc_id', None)
-                if not cid:
-                    kh = getattr(l, 'khoa_hoc', None)
-                    cid = getattr(kh, 'id', None) if kh else None
-                if cid:
-                    course_ids.append(cid)
-            if course_ids:
-                dk_qs = DangKy.objects.filter(khoahoc_id__in=course_ids).select_related('hocvien')
-                for dk in dk_qs:
-                    cid = getattr(dk, 'khoahoc_id', None) or (getattr(dk, 'khoahoc', None) and getattr(getattr(dk, 'khoahoc', None), 'id', None))
-                    if not cid:
-                        continue
-                    hv = getattr(dk, 'hocvien', None)
-                    if hv:
-                        student_obj = {
-                            "id": getattr(hv, 'id', None),
-                            "ten": getattr(hv, 'ten', None) or getattr(hv, 'name', None),
-                            "email": getattr(hv, 'email', None)
-                        }
-                    else:
-                        student_obj = None
-                    enroll_students_map.setdefault(str(cid), []).append(student_obj)
-        except Exception:
-            enroll_students_map = {}
+        students_map = {}
+        if 'students' in includes and course_ids:
+            dk_qs = DangKy.objects.filter(khoahoc_id__in=course_ids).values_list(
+                'khoahoc_id', 'hocvien_id', 'hocvien__ten', 'hocvien__email'
+            )
+            for course_id, hocvien_id, ten, email in dk_qs:
+                students_map.setdefault(course_id, []).append({"id": hocvien_id, "ten": ten, "email": email})
 
         # build DTOs
         items = []
-        for lop in lops:
-            lid = str(getattr(lop, 'id'))
-            linked_course_id = getattr(lop, 'khoa_hoc_id', None)
-            if not linked_course_id:
-                kh = getattr(lop, 'khoa_hoc', None)
-                linked_course_id = getattr(kh, 'id', None) if kh else None
-            linked_course_key = str(linked_course_id) if linked_course_id else None
-
-            students = enroll_students_map.get(linked_course_key, [])
-            current_students_count = len(students) if isinstance(students, list) else 0
-
-            # Get teacher info
+        for r in rows:
             teacher_obj = None
-            teacher = getattr(lop, 'giang_vien', None)
-            if teacher and isinstance(teacher, User):
+            if r['giang_vien_id']:
                 teacher_obj = {
-                    "id": str(teacher.id),
-                    "name": f"{teacher.first_name} {teacher.last_name}".strip() or teacher.username,
-                    "email": teacher.email,
-                    "username": teacher.username,
+                    "id": str(r['giang_vien_id']),
+                    "name": f"{r['giang_vien__first_name']} {r['giang_vien__last_name']}".strip()
+                    or r['giang_vien__username'],
+                    "email": r['giang_vien__email'],
+                    "username": r['giang_vien__username'],
                 }
 
-            # Get course name from relationship
-            course_name = None
-            course = getattr(lop, 'khoa_hoc', None)
-            if course:
-                course_name = getattr(course, 'ten', None)
-
             dto = {
-                "id": getattr(lop, 'id'),
-                "ten": getattr(lop, 'ten', None),
-                "khoa_hoc": linked_course_id,
-                "courseName": course_name,  # Add course name
+                "id": r['id'],
+                "ten": r['ten'],
+                "khoa_hoc": r['khoa_hoc_id'],
+                "courseName": r['khoa_hoc__ten'],
                 "giang_vien": teacher_obj,
-                "phong_hoc": getattr(lop, 'phong_hoc', None),
-                "ngay_bat_dau": getattr(lop, 'ngay_bat_dau', None),
-                "ngay_ket_thuc": getattr(lop, 'ngay_ket_thuc', None),
-                "so_hoc_vien_toi_da": getattr(lop, 'so_hoc_vien_toi_da', 20),
-                "trang_thai": getattr(lop, 'trang_thai', None),
-                "mo_ta": getattr(lop, 'mo_ta', None),
-                "created_at": getattr(lop, 'created_at', None),
-                "updated_at": getattr(lop, 'updated_at', None),
-                "schedule": schedule_map.get(lid, []),
-                "students": students,
-                "currentStudents": current_students_count,
+                "phong_hoc": r['phong_hoc'],
+                "ngay_bat_dau": r['ngay_bat_dau'],
+                "ngay_ket_thuc": r['ngay_ket_thuc'],
+                "so_hoc_vien_toi_da": r['so_hoc_vien_toi_da'],
+                "trang_thai": r['trang_thai'],
+                "mo_ta": r['mo_ta'],
+                "created_at": r['created_at'],
+                "updated_at": r['updated_at'],
+                "currentStudents": student_counts.get(r['khoa_hoc_id'], 0),
             }
+            if 'schedule' in includes:
+                dto["schedule"] = schedule_map.get(r['id'], [])
+            if 'students' in includes:
+                dto["students"] = students_map.get(r['khoa_hoc_id'], [])
             items.append(dto)
 
         if page is not None:
             return self.get_paginated_response(items)
 
         return Response({"results": items})
+
     def create(self, request, *args, **kwargs):
         """
         Create LopHoc and optionally create related LichHoc records from 'schedule' array.
@@ -5,3 +5,6 @@ class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.apps.reports'
     verbose_name = 'Báo cáo thống kê'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,116 @@
+"""
+Cập nhật các bảng fact của báo cáo.
+
+Mỗi bản ghi nguồn (ThanhToan, DangKyKhoaHoc, HocVien) đóng góp vào đúng một dòng fact.
+Khi bản ghi thay đổi, đóng góp cũ bị trừ và đóng góp mới được cộng bằng F() nên
+chi phí cập nhật là hằng số, không phụ thuộc lượng dữ liệu lịch sử.
+QuerySet.update()/bulk_create() không bắn signal; dùng `rebuild_all()` để đồng bộ lại.
+"""
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DangKyNgay, DoanhThuNgay, HocVienNgay
+
+THANHTOAN_FIELDS = ['ngay_dong', 'hinh_thuc', 'trang_thai', 'so_tien']
+DANGKY_FIELDS = ['ngay_dang_ky', 'khoahoc_id', 'trang_thai', 'phan_tram_hoan_thanh']
+HOCVIEN_FIELDS = ['created_at', 'created_as_lead', 'is_converted']
+
+
+def _local_date(value):
+    if value is None:
+        return None
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def thanhtoan_contribution(values):
+    key = {
+        'ngay': _local_date(values['ngay_dong']),
+        'hinh_thuc': values['hinh_thuc'] or '',
+        'trang_thai': values['trang_thai'],
+    }
+    return DoanhThuNgay, key, {'so_tien': values['so_tien'] or 0, 'so_luong': 1}
+
+
+def dangky_contribution(values):
+    key = {
+        'ngay': _local_date(values['ngay_dang_ky']),
+        'khoahoc_id': values['khoahoc_id'],
+        'trang_thai': values['trang_thai'],
+    }
+    phan_tram = values['phan_tram_hoan_thanh'] or 0
+    return DangKyNgay, key, {
+        'so_luong': 1,
+        'so_hoan_thanh': 1 if phan_tram >= 100 else 0,
+        'tong_phan_tram': phan_tram,
+    }
+
+
+def hocvien_contribution(values):
+    key = {
+        'ngay': _local_date(values['created_at']),
+        'created_as_lead': values['created_as_lead'],
+        'is_converted': values['is_converted'],
+    }
+    return HocVienNgay, key, {'so_luong': 1}
+
+
+def rebuild_all(apps=None):
+    """
+    Dựng lại toàn bộ bảng fact từ dữ liệu gốc (mỗi bảng một truy vấn GROUP BY).
+    `apps` cho phép migration truyền registry model lịch sử.
+    """
+    if apps is None:
+        from django.apps import apps
+    ThanhToan = apps.get_model('thanhtoans', 'ThanhToan')
+    DangKyKhoaHoc = apps.get_model('dangky', 'DangKyKhoaHoc')
+    HocVien = apps.get_model('hocviens', 'HocVien')
+    DoanhThuNgay = apps.get_model('reports', 'DoanhThuNgay')
+    DangKyNgay = apps.get_model('reports', 'DangKyNgay')
+    HocVienNgay = apps.get_model('reports', 'HocVienNgay')
+
+    with transaction.atomic():
+        DoanhThuNgay.objects.all().delete()
+        DangKyNgay.objects.all().delete()
+        HocVienNgay.objects.all().delete()
+
+        revenue = (
+            ThanhToan.objects.annotate(ngay=TruncDate('ngay_dong'))
+            .values('ngay', 'hinh_thuc', 'trang_thai')
+            .annotate(tong=Sum('so_tien'), dem=Count('id'))
+            .order_by()
+        )
+        DoanhThuNgay.objects.bulk_create([
+            DoanhThuNgay(ngay=r['ngay'], hinh_thuc=r['hinh_thuc'] or '', trang_thai=r['trang_thai'],
+                         so_tien=r['tong'] or 0, so_luong=r['dem'])
+            for r in revenue
+        ], batch_size=1000)
+
+        enrollments = (
+            DangKyKhoaHoc.objects.annotate(ngay=TruncDate('ngay_dang_ky'))
+            .values('ngay', 'khoahoc_id', 'trang_thai')
+            .annotate(
+                dem=Count('id'),
+                hoan_thanh=Count('id', filter=Q(phan_tram_hoan_thanh__gte=100)),
+                tong=Sum('phan_tram_hoan_thanh'),
+            )
+            .order_by()
+        )
+        DangKyNgay.objects.bulk_create([
+            DangKyNgay(ngay=r['ngay'], khoahoc_id=r['khoahoc_id'], trang_thai=r['trang_thai'],
+                       so_luong=r['dem'], so_hoan_thanh=r['hoan_thanh'], tong_phan_tram=r['tong'] or 0)
+            for r in enrollments
+        ], batch_size=1000)
+
+        students = (
+            HocVien.objects.annotate(ngay=TruncDate('created_at'))
+            .values('ngay', 'created_as_lead', 'is_converted')
+            .annotate(dem=Count('id'))
+            .order_by()
+        )
+        HocVienNgay.objects.bulk_create([
+            HocVienNgay(ngay=r['ngay'], created_as_lead=r['created_as_lead'],
+                        is_converted=r['is_converted'], so_luong=r['dem'])
+            for r in students
+        ], batch_size=1000)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from app.apps.reports import facts
+from app.apps.reports.models import DangKyNgay, DoanhThuNgay, HocVienNgay
+
+
+class Command(BaseCommand):
+    help = 'Dựng lại toàn bộ bảng fact báo cáo (doanh thu, đăng ký, học viên mới) từ dữ liệu gốc'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Đang dựng lại bảng fact báo cáo...')
+        facts.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Hoàn tất: {DoanhThuNgay.objects.count()} dòng doanh thu, '
+            f'{DangKyNgay.objects.count()} dòng đăng ký, '
+            f'{HocVienNgay.objects.count()} dòng học viên mới.'
+        ))
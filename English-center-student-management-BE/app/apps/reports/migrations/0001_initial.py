@@ -0,0 +1,76 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('khoahocs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoanhThuNgay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ngay', models.DateField(blank=True, null=True, verbose_name='Ngày đóng')),
+                ('hinh_thuc', models.CharField(blank=True, default='', max_length=20, verbose_name='Hình thức thanh toán')),
+                ('trang_thai', models.CharField(max_length=16, verbose_name='Trạng thái thanh toán')),
+                ('so_tien', models.DecimalField(decimal_places=0, default=0, max_digits=16, verbose_name='Tổng tiền (VNĐ)')),
+                ('so_luong', models.IntegerField(default=0, verbose_name='Số thanh toán')),
+            ],
+            options={
+                'verbose_name': 'Doanh thu theo ngày',
+                'verbose_name_plural': 'Doanh thu theo ngày',
+                'db_table': 'erp_fact_revenue_daily',
+            },
+        ),
+        migrations.CreateModel(
+            name='HocVienNgay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ngay', models.DateField(verbose_name='Ngày tạo')),
+                ('created_as_lead', models.BooleanField(default=False, verbose_name='Tạo như lead')),
+                ('is_converted', models.BooleanField(default=False, verbose_name='Đã chuyển đổi từ lead')),
+                ('so_luong', models.IntegerField(default=0, verbose_name='Số học viên')),
+            ],
+            options={
+                'verbose_name': 'Học viên mới theo ngày',
+                'verbose_name_plural': 'Học viên mới theo ngày',
+                'db_table': 'erp_fact_students_daily',
+            },
+        ),
+        migrations.CreateModel(
+            name='DangKyNgay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ngay', models.DateField(verbose_name='Ngày đăng ký')),
+                ('trang_thai', models.CharField(max_length=20, verbose_name='Trạng thái')),
+                ('so_luong', models.IntegerField(default=0, verbose_name='Số đăng ký')),
+                ('so_hoan_thanh', models.IntegerField(default=0, verbose_name='Số đăng ký hoàn thành 100%')),
+                ('tong_phan_tram', models.BigIntegerField(default=0, verbose_name='Tổng phần trăm hoàn thành')),
+                ('khoahoc', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='khoahocs.khoahoc', verbose_name='Khóa học')),
+            ],
+            options={
+                'verbose_name': 'Đăng ký theo ngày',
+                'verbose_name_plural': 'Đăng ký theo ngày',
+                'db_table': 'erp_fact_enrollment_daily',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='doanhthungay',
+            constraint=models.UniqueConstraint(fields=('ngay', 'hinh_thuc', 'trang_thai'), name='uniq_fact_revenue_daily', nulls_distinct=False),
+        ),
+        migrations.AddConstraint(
+            model_name='hocvienngay',
+            constraint=models.UniqueConstraint(fields=('ngay', 'created_as_lead', 'is_converted'), name='uniq_fact_students_daily'),
+        ),
+        migrations.AddConstraint(
+            model_name='dangkyngay',
+            constraint=models.UniqueConstraint(fields=('ngay', 'khoahoc', 'trang_thai'), name='uniq_fact_enrollment_daily'),
+        ),
+    ]
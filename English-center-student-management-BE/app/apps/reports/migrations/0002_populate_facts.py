@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def populate_facts(apps, schema_editor):
+    from app.apps.reports.facts import rebuild_all
+    rebuild_all(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        ('thanhtoans', '0002_thanhtoan_trang_thai_alter_thanhtoan_hinh_thuc_and_more'),
+        ('dangky', '0001_initial'),
+        ('hocviens', '0007_leadcontactnote'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_facts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+from django.db import models
+from app.apps.khoahocs.models import KhoaHoc
+
+
+class DoanhThuNgay(models.Model):
+    """
+    Bảng fact doanh thu theo ngày × hình thức × trạng thái thanh toán.
+    ThanhToan không gắn với khóa học nên doanh thu không tách theo khóa học.
+    Dòng có ngay = NULL gom các hóa đơn chưa có ngày đóng.
+    """
+    ngay = models.DateField(null=True, blank=True, verbose_name='Ngày đóng')
+    hinh_thuc = models.CharField(max_length=20, blank=True, default='', verbose_name='Hình thức thanh toán')
+    trang_thai = models.CharField(max_length=16, verbose_name='Trạng thái thanh toán')
+    so_tien = models.DecimalField(max_digits=16, decimal_places=0, default=0, verbose_name='Tổng tiền (VNĐ)')
+    so_luong = models.IntegerField(default=0, verbose_name='Số thanh toán')
+
+    class Meta:
+        verbose_name = 'Doanh thu theo ngày'
+        verbose_name_plural = 'Doanh thu theo ngày'
+        db_table = 'erp_fact_revenue_daily'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ngay', 'hinh_thuc', 'trang_thai'],
+                name='uniq_fact_revenue_daily',
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.ngay} - {self.hinh_thuc or '-'} - {self.trang_thai}: {self.so_tien:,} VNĐ"
+
+
+class DangKyNgay(models.Model):
+    """
+    Bảng fact đăng ký khóa học theo ngày × khóa học × trạng thái.
+    khoahoc không dùng ràng buộc FK để việc xóa khóa học không kéo theo xóa dòng fact
+    trước khi signal của DangKyKhoaHoc kịp trừ số liệu.
+    """
+    ngay = models.DateField(verbose_name='Ngày đăng ký')
+    khoahoc = models.ForeignKey(
+        KhoaHoc,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        verbose_name='Khóa học'
+    )
+    trang_thai = models.CharField(max_length=20, verbose_name='Trạng thái')
+    so_luong = models.IntegerField(default=0, verbose_name='Số đăng ký')
+    so_hoan_thanh = models.IntegerField(default=0, verbose_name='Số đăng ký hoàn thành 100%')
+    tong_phan_tram = models.BigIntegerField(default=0, verbose_name='Tổng phần trăm hoàn thành')
+
+    class Meta:
+        verbose_name = 'Đăng ký theo ngày'
+        verbose_name_plural = 'Đăng ký theo ngày'
+        db_table = 'erp_fact_enrollment_daily'
+        constraints = [
+            models.UniqueConstraint(fields=['ngay', 'khoahoc', 'trang_thai'], name='uniq_fact_enrollment_daily'),
+        ]
+
+    def __str__(self):
+        return f"{self.ngay} - {self.khoahoc_id} - {self.trang_thai}: {self.so_luong}"
+
+
+class HocVienNgay(models.Model):
+    """
+    Bảng fact học viên/lead mới theo ngày tạo
+    """
+    ngay = models.DateField(verbose_name='Ngày tạo')
+    created_as_lead = models.BooleanField(default=False, verbose_name='Tạo như lead')
+    is_converted = models.BooleanField(default=False, verbose_name='Đã chuyển đổi từ lead')
+    so_luong = models.IntegerField(default=0, verbose_name='Số học viên')
+
+    class Meta:
+        verbose_name = 'Học viên mới theo ngày'
+        verbose_name_plural = 'Học viên mới theo ngày'
+        db_table = 'erp_fact_students_daily'
+        constraints = [
+            models.UniqueConstraint(fields=['ngay', 'created_as_lead', 'is_converted'], name='uniq_fact_students_daily'),
+        ]
+
+    def __str__(self):
+        return f"{self.ngay}: {self.so_luong}"
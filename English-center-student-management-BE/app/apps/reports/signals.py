@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.core.tracking import apply_change, previous_values, track_changes
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.hocviens.models import HocVien
+from app.apps.thanhtoans.models import ThanhToan
+from . import facts
+
+SOURCES = {
+    ThanhToan: (facts.thanhtoan_contribution, facts.THANHTOAN_FIELDS),
+    DangKyKhoaHoc: (facts.dangky_contribution, facts.DANGKY_FIELDS),
+    HocVien: (facts.hocvien_contribution, facts.HOCVIEN_FIELDS),
+}
+
+for _model, (_contribution, _fields) in SOURCES.items():
+    track_changes(_model, _fields)
+
+
+def _current_values(instance, fields):
+    return {field: getattr(instance, field) for field in fields}
+
+
+@receiver(post_save, sender=ThanhToan, dispatch_uid='reports_facts_thanhtoan_save')
+@receiver(post_save, sender=DangKyKhoaHoc, dispatch_uid='reports_facts_dangky_save')
+@receiver(post_save, sender=HocVien, dispatch_uid='reports_facts_hocvien_save')
+def update_facts_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    contribution, fields = SOURCES[sender]
+    old_values = None if created else previous_values(instance)
+    apply_change(contribution, old_values, _current_values(instance, fields))
+
+
+@receiver(post_delete, sender=ThanhToan, dispatch_uid='reports_facts_thanhtoan_delete')
+@receiver(post_delete, sender=DangKyKhoaHoc, dispatch_uid='reports_facts_dangky_delete')
+@receiver(post_delete, sender=HocVien, dispatch_uid='reports_facts_hocvien_delete')
+def update_facts_on_delete(sender, instance, **kwargs):
+    contribution, fields = SOURCES[sender]
+    apply_change(contribution, _current_values(instance, fields), None)
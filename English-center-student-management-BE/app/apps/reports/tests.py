@@ -0,0 +1,168 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import uuid
+from unittest import mock
+
+from django.db import connection, models, transaction
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from app.core.async_views import gather_queries
+from app.core.stats import breakdown_stats
+from app.core.timeseries import month_range, month_window, monthly_buckets
+from app.apps.chamsoc.models import ChamSocHocVien
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.diemdanhs.models import DiemDanh
+from app.apps.hocviens.models import HocVien
+from app.apps.khoahocs.models import KhoaHoc
+from app.apps.lichhocs.models import LichHoc
+from app.apps.thanhtoans.models import ThanhToan
+from app.apps.thongbaos.models import ThongBao
+from app.apps.reports import facts
+from app.apps.reports.models import DangKyNgay, DoanhThuNgay, HocVienNgay
+
+
+class MonthRangeTest(TestCase):
+    def test_month_range_crosses_year(self):
+        self.assertEqual(
+            month_range(date(2024, 11, 15), date(2025, 2, 3)),
+            [date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1)]
+        )
+
+    def test_month_window_default(self):
+        start, end = month_window(to_date=date(2025, 3, 31), default_months=6)
+        self.assertEqual(start, date(2024, 10, 1))
+        self.assertEqual(end, date(2025, 3, 1))
+
+
+class MonthlyBucketsTest(TestCase):
+    def setUp(self):
+        hv = HocVien.objects.create(ten='Nguyễn Văn A', email='a@example.com', sdt='0912345678')
+        tz = timezone.get_current_timezone()
+        for day, amount in [(datetime(2025, 1, 10), 100), (datetime(2025, 1, 31, 23, 30), 50),
+                            (datetime(2025, 3, 1, 0, 15), 70)]:
+            ThanhToan.objects.create(
+                hocvien=hv, so_tien=Decimal(amount), trang_thai='pending',
+                ngay_dong=timezone.make_aware(day, tz)
+            )
+
+    def test_single_query_and_zero_fill(self):
+        with self.assertNumQueries(1):
+            rows = monthly_buckets(
+                ThanhToan.objects.all(), 'ngay_dong', date(2024, 12, 1), date(2025, 3, 1),
+                doanh_thu=models.Sum('so_tien'), so_luong=models.Count('id')
+            )
+        self.assertEqual([r['thang'] for r in rows],
+                         [date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)])
+        self.assertEqual([r['doanh_thu'] for r in rows], [0, 150, 0, 70])
+        self.assertEqual([r['so_luong'] for r in rows], [0, 2, 0, 1])
+
+
+class FactTablesTest(TestCase):
+    def snapshot(self):
+        return (
+            sorted((r.ngay, r.hinh_thuc, r.trang_thai, r.so_tien, r.so_luong)
+                   for r in DoanhThuNgay.objects.exclude(so_luong=0)),
+            sorted((r.ngay, r.khoahoc_id, r.trang_thai, r.so_luong, r.so_hoan_thanh, r.tong_phan_tram)
+                   for r in DangKyNgay.objects.exclude(so_luong=0)),
+            sorted((r.ngay, r.created_as_lead, r.is_converted, r.so_luong)
+                   for r in HocVienNgay.objects.exclude(so_luong=0)),
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        kh = KhoaHoc.objects.create(ten='IELTS', lich_hoc='T2', giang_vien='Cô Hằng', so_buoi=10, hoc_phi=1000)
+        hv = HocVien.objects.create(ten='A', email='a@example.com', sdt='0912345678',
+                                    created_as_lead=True, is_converted=False)
+        lead = HocVien.objects.create(ten='B', email='b@example.com', sdt='0912345679')
+        dk = DangKyKhoaHoc.objects.create(hocvien=hv, khoahoc=kh)
+        tt = ThanhToan.objects.create(hocvien=hv, so_tien=500, hinh_thuc='tienmat', trang_thai='pending')
+
+        hv.is_converted = True
+        hv.save()
+        dk.trang_thai = 'hoan_thanh'
+        dk.phan_tram_hoan_thanh = 100
+        dk.save()
+        tt.trang_thai = 'paid'
+        tt.so_tien = 700
+        tt.save()
+        ThanhToan.objects.create(hocvien=lead, so_tien=300, hinh_thuc='the', trang_thai='paid')
+        lead.delete()
+
+        incremental = self.snapshot()
+        facts.rebuild_all()
+        self.assertEqual(incremental, self.snapshot())
+        self.assertEqual(DoanhThuNgay.objects.aggregate(t=models.Sum('so_tien'))['t'], 700)
+
+
+class BreakdownStatsTest(TestCase):
+    def test_single_aggregate(self):
+        kh = KhoaHoc.objects.create(ten='TOEIC', lich_hoc='T3', giang_vien='Thầy Nam', so_buoi=10, hoc_phi=1000)
+        for i, trang_thai in enumerate(['dang_hoc', 'dang_hoc', 'hoan_thanh']):
+            hv = HocVien.objects.create(ten=f'HV {i}', email=f'hv{i}@example.com', sdt=f'091234567{i}')
+            DangKyKhoaHoc.objects.create(hocvien=hv, khoahoc=kh, trang_thai=trang_thai)
+
+        with self.assertNumQueries(1):
+            stats = breakdown_stats(
+                DangKyNgay, [('trang_thai', ['dang_hoc', 'hoan_thanh', 'huy_bo'])], measure='so_luong',
+                so_hoan_thanh=models.Sum('so_hoan_thanh')
+            )
+        self.assertEqual(stats, {'total': 3, 'dang_hoc': 2, 'hoan_thanh': 1, 'huy_bo': 0, 'so_hoan_thanh': 0})
+        with self.assertRaises(ValueError):
+            breakdown_stats(DangKyNgay, [('trang_thai', ['total'])])
+
+
+class GatherQueriesTest(TransactionTestCase):
+    def test_concurrent_queries_keep_order(self):
+        KhoaHoc.objects.create(ten='IELTS', lich_hoc='T2', giang_vien='Cô Lan', so_buoi=10, hoc_phi=1000)
+        HocVien.objects.create(ten='HV', email='hv@example.com', sdt='0912345678')
+        connection.close()
+        pooled = {'CONN_MAX_AGE': 0, 'OPTIONS': {**connection.settings_dict['OPTIONS'], 'pool': {'min_size': 1}}}
+        # ngoài giao dịch, có pool: mỗi hàm chạy ở thread / kết nối riêng nhưng kết quả giữ đúng thứ tự
+        with mock.patch.dict(connection.settings_dict, pooled):
+            try:
+                results = async_to_sync(gather_queries)(
+                    KhoaHoc.objects.count,
+                    lambda: list(HocVien.objects.values_list('email', flat=True)),
+                    lambda: breakdown_stats(KhoaHoc, [('giang_vien', {'co_lan': 'Cô Lan'})]),
+                )
+                pool_stats = connection.pool.get_stats()
+            finally:
+                connection.close()
+                connection.close_pool()
+        self.assertEqual(results, [1, ['hv@example.com'], {'total': 1, 'co_lan': 1}])
+        self.assertGreaterEqual(pool_stats['requests_num'], 3)
+
+
+class QueryPlanTest(TestCase):
+    """
+    Các truy vấn danh sách chính phải dùng được index tương ứng.
+    Dữ liệu test quá ít nên tắt seq scan để planner cho biết index có áp dụng được hay không.
+    """
+    def assertUsesIndex(self, queryset, index_name):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        self.assertIn(index_name, plan, f'{queryset.query}\n{plan}')
+
+    def test_list_queries_use_indexes(self):
+        some_id = uuid.uuid4()
+        cases = [
+            (HocVien.objects.all(), 'erp_students_created_idx'),
+            (HocVien.objects.filter(trang_thai_hoc_phi='conno'), 'erp_students_hocphi_idx'),
+            (HocVien.objects.filter(created_as_lead=True, is_converted=False), 'erp_students_open_lead_idx'),
+            (ThanhToan.objects.filter(hocvien_id=some_id), 'erp_payments_hocvien_idx'),
+            (ThanhToan.objects.filter(hinh_thuc='tienmat'), 'erp_payments_hinh_thuc_idx'),
+            (ThongBao.objects.filter(trang_thai='moi'), 'erp_notif_trang_thai_idx'),
+            (ThongBao.objects.filter(trang_thai='da_gui', nguoi_nhan__in=['tatca', 'hocvien']), 'erp_notif_trang_thai_idx'),
+            (ThongBao.objects.filter(nguoi_nhan='hocvien'), 'erp_notif_nguoi_nhan_idx'),
+            (ChamSocHocVien.objects.filter(loai_cham_soc='tuvan'), 'erp_care_loai_idx'),
+            (DangKyKhoaHoc.objects.filter(trang_thai='dang_hoc'), 'erp_enroll_trang_thai_idx'),
+            (LichHoc.objects.order_by('ngay_hoc', 'gio_bat_dau'), 'erp_schedules_ngay_hoc_idx'),
+            (DiemDanh.objects.filter(hoc_vien_id=some_id).order_by('-created_at'), 'erp_attend_hocvien_idx'),
+        ]
+        for queryset, index_name in cases:
+            with self.subTest(index=index_name):
+                self.assertUsesIndex(queryset[:20], index_name)
@@ -1,76 +1,98 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import models
-from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from app.core.permissions import IsAdminUser
+from app.core.timeseries import month_window, monthly_buckets
+from app.core.cache import cached_view
+from app.core.stats import breakdown_stats
+from app.core.async_views import async_api_view, gather_queries
 from app.apps.hocviens.models import HocVien
 from app.apps.khoahocs.models import KhoaHoc
-from app.apps.dangky.models import DangKyKhoaHoc
-from app.apps.thanhtoans.models import ThanhToan
 from app.apps.chamsoc.models import ChamSocHocVien
 from app.apps.thongbaos.models import ThongBao
+from .models import DangKyNgay, DoanhThuNgay, HocVienNgay
 
 
-@api_view(['GET'])
+def _parse_date(value):
+    """
+    Chuyển chuỗi YYYY-MM-DD thành date, trả về None nếu không hợp lệ
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _date_q(from_date, to_date, field='ngay'):
+    """
+    Điều kiện lọc bảng fact theo khoảng ngày [from_date, to_date] (dùng trong filter của aggregate)
+    """
+    condition = models.Q()
+    if from_date:
+        condition &= models.Q(**{f'{field}__gte': from_date})
+    if to_date:
+        condition &= models.Q(**{f'{field}__lte': to_date})
+    return condition
+
+
+@async_api_view(['GET'])
 @permission_classes([IsAdminUser])
-def overview_report(request):
+@cached_view('students', 'finance', 'courses', 'enrollments')
+async def overview_report(request):
     """
     Báo cáo tổng quan (Admin only)
     """
     # Lấy tham số từ query string
-    from_date = request.GET.get('from')
-    to_date = request.GET.get('to')
-    
-    # Xử lý ngày tháng
-    if from_date:
-        try:
-            from_date = datetime.strptime(from_date, '%Y-%m-%d').date()
-        except ValueError:
-            from_date = None
-    
-    if to_date:
-        try:
-            to_date = datetime.strptime(to_date, '%Y-%m-%d').date()
-        except ValueError:
-            to_date = None
-    
-    # Tổng học viên mới
-    hocvien_query = HocVien.objects.all()
-    if from_date:
-        hocvien_query = hocvien_query.filter(created_at__date__gte=from_date)
-    if to_date:
-        hocvien_query = hocvien_query.filter(created_at__date__lte=to_date)
-    
-    total_hocvien_moi = hocvien_query.count()
-    
-    # Doanh thu
-    thanhtoan_query = ThanhToan.objects.all()
-    if from_date:
-        thanhtoan_query = thanhtoan_query.filter(ngay_dong__date__gte=from_date)
-    if to_date:
-        thanhtoan_query = thanhtoan_query.filter(ngay_dong__date__lte=to_date)
+    from_date = _parse_date(request.GET.get('from'))
+    to_date = _parse_date(request.GET.get('to'))
     
-    doanh_thu = thanhtoan_query.aggregate(total=models.Sum('so_tien'))['total'] or 0
-    
-    # Tỷ lệ hoàn thành khóa học
-    total_dangky = DangKyKhoaHoc.objects.count()
-    hoan_thanh = DangKyKhoaHoc.objects.filter(phan_tram_hoan_thanh=100).count()
+    month_start, month_end = month_window(from_date, to_date, default_months=6)
+
+    # Các truy vấn độc lập với nhau: chạy đồng thời, thời gian chờ bằng truy vấn chậm nhất
+    (
+        hocvien_tong, doanh_thu, dangky_tong, danh_sach_no, top_khoahoc, total_khoahoc,
+        hocvien_thang, doanhthu_thang,
+    ) = await gather_queries(
+        # Tổng học viên và học viên mới (đọc từ bảng fact theo ngày, một truy vấn)
+        lambda: breakdown_stats(
+            HocVienNgay, total='total_hocvien', measure='so_luong',
+            total_hocvien_moi=_date_q(from_date, to_date)
+        ),
+        # Doanh thu
+        lambda: breakdown_stats(
+            DoanhThuNgay, total=None, measure='so_tien', doanh_thu=_date_q(from_date, to_date)
+        )['doanh_thu'],
+        # Tỷ lệ hoàn thành khóa học
+        lambda: breakdown_stats(DangKyNgay, measure='so_luong', hoan_thanh=models.Sum('so_hoan_thanh')),
+        # Danh sách nợ học phí (10 học viên đầu tiên)
+        lambda: list(HocVien.objects.filter(trang_thai_hoc_phi__in=['conno', 'chuadong']).values(
+            'id', 'ten', 'email', 'sdt', 'trang_thai_hoc_phi'
+        )[:10]),
+        # Top khóa học
+        lambda: list(KhoaHoc.objects.with_stats().order_by('-so_dang_ky')[:5]),
+        KhoaHoc.objects.count,
+        # Thống kê theo tháng (mặc định 6 tháng gần nhất, hoặc theo khoảng from/to)
+        # Mỗi model chỉ tốn 1 truy vấn GROUP BY, không phụ thuộc số tháng hiển thị
+        lambda: monthly_buckets(
+            HocVienNgay.objects.all(), 'ngay', month_start, month_end,
+            hoc_vien_moi=models.Sum('so_luong')
+        ),
+        lambda: monthly_buckets(
+            DoanhThuNgay.objects.all(), 'ngay', month_start, month_end,
+            doanh_thu=models.Sum('so_tien')
+        ),
+    )
+
+    total_dangky = dangky_tong['total']
+    hoan_thanh = dangky_tong['hoan_thanh']
     ty_le_hoan_thanh = round((hoan_thanh / total_dangky * 100) if total_dangky > 0 else 0, 2)
-    
-    # Danh sách nợ học phí
-    danh_sach_no = HocVien.objects.filter(trang_thai_hoc_phi__in=['conno', 'chuadong']).values(
-        'id', 'ten', 'email', 'sdt', 'trang_thai_hoc_phi'
-    )[:10]  # Lấy 10 học viên đầu tiên
-    
-    # Top khóa học
-    top_khoahoc = KhoaHoc.objects.annotate(
-        so_hoc_vien=models.Count('dangkykhoahoc')
-    ).order_by('-so_hoc_vien')[:5]
-    
+
     top_khoahoc_data = []
     for kh in top_khoahoc:
         top_khoahoc_data.append({
@@ -80,40 +102,26 @@ def overview_report(request):
             'ty_le_hoan_thanh': kh.ty_le_hoan_thanh,
             'hoc_phi': kh.hoc_phi
         })
-    
-    # Thống kê theo tháng (6 tháng gần nhất)
-    thang_stats = []
-    for i in range(6):
-        date = timezone.now() - timedelta(days=30*i)
-        month_start = date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_hocvien = HocVien.objects.filter(
-            created_at__date__gte=month_start,
-            created_at__date__lte=month_end
-        ).count()
-        
-        month_doanhthu = ThanhToan.objects.filter(
-            ngay_dong__date__gte=month_start,
-            ngay_dong__date__lte=month_end
-        ).aggregate(total=models.Sum('so_tien'))['total'] or 0
-        
-        thang_stats.append({
-            'thang': month_start.strftime('%m/%Y'),
-            'hoc_vien_moi': month_hocvien,
-            'doanh_thu': month_doanhthu
-        })
+
+    thang_stats = [
+        {
+            'thang': hv['thang'].strftime('%m/%Y'),
+            'hoc_vien_moi': hv['hoc_vien_moi'],
+            'doanh_thu': dt['doanh_thu']
+        }
+        for hv, dt in reversed(list(zip(hocvien_thang, doanhthu_thang)))
+    ]
     
     return Response({
         'tong_quan': {
-            'total_hocvien_moi': total_hocvien_moi,
+            'total_hocvien_moi': hocvien_tong['total_hocvien_moi'],
             'doanh_thu': doanh_thu,
             'ty_le_hoan_thanh': ty_le_hoan_thanh,
-            'total_hocvien': HocVien.objects.count(),
-            'total_khoahoc': KhoaHoc.objects.count(),
+            'total_hocvien': hocvien_tong['total_hocvien'],
+            'total_khoahoc': total_khoahoc,
             'total_dangky': total_dangky
         },
-        'danh_sach_no_hoc_phi': list(danh_sach_no),
+        'danh_sach_no_hoc_phi': danh_sach_no,
         'top_khoahoc': top_khoahoc_data,
         'thang_stats': thang_stats,
         'filters': {
@@ -123,83 +131,85 @@ def overview_report(request):
     })
 
 
-@api_view(['GET'])
+@async_api_view(['GET'])
 @permission_classes([IsAdminUser])
-def financial_report(request):
+@cached_view('finance')
+async def financial_report(request):
     """
     Báo cáo tài chính (Admin only)
     """
-    # Thống kê thanh toán theo hình thức
-    thanh_toan_stats = ThanhToan.objects.aggregate(
-        total=models.Sum('so_tien'),
-        tien_mat=models.Sum('so_tien', filter=models.Q(hinh_thuc='tienmat')),
-        chuyen_khoan=models.Sum('so_tien', filter=models.Q(hinh_thuc='chuyenkhoan')),
-        the=models.Sum('so_tien', filter=models.Q(hinh_thuc='the'))
+    month_start, month_end = month_window(
+        _parse_date(request.GET.get('from')),
+        _parse_date(request.GET.get('to')),
+        default_months=12
     )
-    
-    # Thống kê theo tháng (12 tháng gần nhất)
-    monthly_stats = []
-    for i in range(12):
-        date = timezone.now() - timedelta(days=30*i)
-        month_start = date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_stats = ThanhToan.objects.filter(
-            ngay_dong__date__gte=month_start,
-            ngay_dong__date__lte=month_end
-        ).aggregate(
-            total=models.Sum('so_tien'),
-            count=models.Count('id')
-        )
-        
-        monthly_stats.append({
-            'thang': month_start.strftime('%m/%Y'),
-            'doanh_thu': month_stats['total'] or 0,
-            'so_luong': month_stats['count'] or 0
-        })
+    thanh_toan_stats, thang_rows = await gather_queries(
+        # Thống kê thanh toán theo hình thức
+        lambda: breakdown_stats(
+            DoanhThuNgay,
+            [('hinh_thuc', {'tien_mat': 'tienmat', 'chuyen_khoan': 'chuyenkhoan', 'the': 'the'})],
+            measure='so_tien'
+        ),
+        # Thống kê theo tháng (mặc định 12 tháng gần nhất, hoặc theo khoảng from/to)
+        lambda: monthly_buckets(
+            DoanhThuNgay.objects.all(), 'ngay', month_start, month_end,
+            doanh_thu=models.Sum('so_tien'),
+            so_luong=models.Sum('so_luong')
+        ),
+    )
+    monthly_stats = [
+        {
+            'thang': row['thang'].strftime('%m/%Y'),
+            'doanh_thu': row['doanh_thu'],
+            'so_luong': row['so_luong']
+        }
+        for row in reversed(thang_rows)
+    ]
     
     return Response({
-        'thanh_toan_stats': {
-            'total': thanh_toan_stats['total'] or 0,
-            'tien_mat': thanh_toan_stats['tien_mat'] or 0,
-            'chuyen_khoan': thanh_toan_stats['chuyen_khoan'] or 0,
-            'the': thanh_toan_stats['the'] or 0
-        },
+        'thanh_toan_stats': thanh_toan_stats,
         'monthly_stats': monthly_stats
     })
 
 
-@api_view(['GET'])
+@async_api_view(['GET'])
 @permission_classes([IsAdminUser])
-def academic_report(request):
+@cached_view('courses', 'enrollments')
+async def academic_report(request):
     """
     Báo cáo học tập (Admin only)
     """
-    # Thống kê khóa học
-    khoahoc_stats = KhoaHoc.objects.aggregate(
-        total=models.Count('id'),
-        dang_mo=models.Count('id', filter=models.Q(trang_thai='dang_mo')),
-        da_dong=models.Count('id', filter=models.Q(trang_thai='da_dong')),
-        sap_mo=models.Count('id', filter=models.Q(trang_thai='sap_mo'))
+    khoahoc_stats, dangky_stats, hocvien_rows, giangvien_rows = await gather_queries(
+        # Thống kê khóa học
+        lambda: breakdown_stats(KhoaHoc, [('trang_thai', ['dang_mo', 'da_dong', 'sap_mo'])]),
+        # Thống kê đăng ký (đọc từ bảng fact)
+        lambda: breakdown_stats(
+            DangKyNgay, [('trang_thai', ['dang_hoc', 'hoan_thanh', 'tam_ngung', 'huy_bo'])], measure='so_luong'
+        ),
+        # Top giảng viên: số khóa học từ bảng khóa học, số học viên từ bảng fact đăng ký
+        lambda: list(DangKyNgay.objects.values('khoahoc__giang_vien').annotate(
+            so_hocvien=models.Sum('so_luong')
+        ).order_by()),
+        lambda: list(KhoaHoc.objects.values('giang_vien').annotate(
+            so_khoahoc=models.Count('id')
+        ).order_by()),
     )
-    
-    # Thống kê đăng ký
-    dangky_stats = DangKyKhoaHoc.objects.aggregate(
-        total=models.Count('id'),
-        dang_hoc=models.Count('id', filter=models.Q(trang_thai='dang_hoc')),
-        hoan_thanh=models.Count('id', filter=models.Q(trang_thai='hoan_thanh')),
-        tam_ngung=models.Count('id', filter=models.Q(trang_thai='tam_ngung')),
-        huy_bo=models.Count('id', filter=models.Q(trang_thai='huy_bo'))
-    )
-    
-    # Top giảng viên
-    top_giangvien = KhoaHoc.objects.values('giang_vien').annotate(
-        so_khoahoc=models.Count('id'),
-        so_hocvien=models.Count('dangkykhoahoc')
-    ).order_by('-so_hocvien')[:5]
+    so_hocvien_map = {row['khoahoc__giang_vien']: row['so_hocvien'] or 0 for row in hocvien_rows}
+    top_giangvien = sorted(
+        (
+            {
+                'giang_vien': row['giang_vien'],
+                'so_khoahoc': row['so_khoahoc'],
+                'so_hocvien': so_hocvien_map.get(row['giang_vien'], 0)
+            }
+            for row in giangvien_rows
+        ),
+        key=lambda row: row['so_hocvien'],
+        reverse=True
+    )[:5]
     
     return Response({
         'khoahoc_stats': khoahoc_stats,
         'dangky_stats': dangky_stats,
-        'top_giangvien': list(top_giangvien)
+        'top_giangvien': top_giangvien
     })
@@ -0,0 +1,128 @@
+"""
+Sổ công nợ học phí (CongNoHocVien).
+
+Mỗi thanh toán partial/paid đóng góp so_tien vào total_paid, mỗi đăng ký dang_hoc/hoan_thanh
+đóng góp học phí khóa học vào total_fee của học viên. Thay đổi được cộng/trừ bằng F() rồi
+trang_thai_hoc_phi được suy ra từ sổ bằng một câu UPDATE, không quét lại lịch sử thanh toán.
+Dữ liệu ghi qua QuerySet.update()/bulk_create() không bắn signal; `reconcile()` sửa lệch.
+"""
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+PAID_STATUSES = ('partial', 'paid')
+BILLABLE_STATUSES = ('dang_hoc', 'hoan_thanh')
+
+THANHTOAN_FIELDS = ['hocvien_id', 'trang_thai', 'so_tien']
+DANGKY_FIELDS = ['hocvien_id', 'trang_thai', 'khoahoc__hoc_phi']
+
+
+def _ledger_model(apps=None):
+    if apps is None:
+        from django.apps import apps
+    return apps.get_model('thanhtoans', 'CongNoHocVien')
+
+
+def thanhtoan_contribution(values):
+    so_tien = (values['so_tien'] or 0) if values['trang_thai'] in PAID_STATUSES else 0
+    return _ledger_model(), {'hocvien_id': values['hocvien_id']}, {'total_paid': so_tien}
+
+
+def dangky_contribution(values):
+    hoc_phi = (values['khoahoc__hoc_phi'] or 0) if values['trang_thai'] in BILLABLE_STATUSES else 0
+    return _ledger_model(), {'hocvien_id': values['hocvien_id']}, {'total_fee': hoc_phi}
+
+
+def trang_thai_expression():
+    """
+    Biểu thức SQL suy ra trang_thai_hoc_phi từ total_fee / total_paid của sổ công nợ
+    """
+    return Case(
+        When(total_fee__gt=0, total_paid__gte=F('total_fee'), then=Value('dadong')),
+        When(total_paid__gt=0, then=Value('conno')),
+        default=Value('chuadong'),
+    )
+
+
+def sync_trang_thai(hocvien_ids=None, apps=None):
+    """
+    Ghi trang_thai_hoc_phi suy ra từ sổ công nợ cho các học viên (None = tất cả) bằng MỘT câu UPDATE.
+    Trả về số học viên được cập nhật.
+    """
+    if apps is None:
+        from django.apps import apps
+    HocVien = apps.get_model('hocviens', 'HocVien')
+    CongNoHocVien = _ledger_model(apps)
+
+    expected = Coalesce(
+        Subquery(
+            CongNoHocVien.objects.filter(hocvien=OuterRef('pk'))
+            .annotate(trang_thai=trang_thai_expression()).values('trang_thai')[:1]
+        ),
+        Value('chuadong'),
+    )
+    students = HocVien.objects.all()
+    if hocvien_ids is not None:
+        students = students.filter(pk__in=hocvien_ids)
+    return (
+        students.annotate(expected=expected)
+        .exclude(trang_thai_hoc_phi=F('expected'))
+        .update(trang_thai_hoc_phi=expected)
+    )
+
+
+def reconcile(hocvien_ids=None, dry_run=False, apps=None):
+    """
+    Tính lại sổ công nợ từ dữ liệu gốc (mỗi loại một truy vấn GROUP BY), sửa các dòng bị lệch
+    rồi đồng bộ trang_thai_hoc_phi. Trả về danh sách (hocvien_id, sổ cũ, sổ đúng) bị lệch.
+    """
+    if apps is None:
+        from django.apps import apps
+    HocVien = apps.get_model('hocviens', 'HocVien')
+    ThanhToan = apps.get_model('thanhtoans', 'ThanhToan')
+    DangKyKhoaHoc = apps.get_model('dangky', 'DangKyKhoaHoc')
+    CongNoHocVien = _ledger_model(apps)
+
+    money = DecimalField(max_digits=14, decimal_places=2)
+    paid = (
+        ThanhToan.objects.filter(hocvien=OuterRef('pk'), trang_thai__in=PAID_STATUSES)
+        .order_by().values('hocvien').annotate(tong=Sum('so_tien')).values('tong')
+    )
+    fee = (
+        DangKyKhoaHoc.objects.filter(hocvien=OuterRef('pk'), trang_thai__in=BILLABLE_STATUSES)
+        .order_by().values('hocvien').annotate(tong=Sum('khoahoc__hoc_phi')).values('tong')
+    )
+    students = HocVien.objects.all()
+    ledgers = CongNoHocVien.objects.all()
+    if hocvien_ids is not None:
+        students = students.filter(pk__in=hocvien_ids)
+        ledgers = ledgers.filter(hocvien_id__in=hocvien_ids)
+
+    expected = students.annotate(
+        fee=Coalesce(Subquery(fee, output_field=money), Value(0), output_field=money),
+        paid=Coalesce(Subquery(paid, output_field=money), Value(0), output_field=money),
+    ).values_list('pk', 'fee', 'paid')
+    current = {pk: (f, p) for pk, f, p in ledgers.values_list('hocvien_id', 'total_fee', 'total_paid')}
+
+    drift = [
+        (pk, current.get(pk), (f, p))
+        for pk, f, p in expected.iterator(chunk_size=2000)
+        if current.get(pk) != (f, p)
+    ]
+    if dry_run:
+        return drift
+
+    now = timezone.now()
+    with transaction.atomic():
+        CongNoHocVien.objects.bulk_create(
+            [CongNoHocVien(hocvien_id=pk, total_fee=f, total_paid=p, last_recomputed_at=now)
+             for pk, _, (f, p) in drift],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['hocvien'],
+            update_fields=['total_fee', 'total_paid', 'last_recomputed_at'],
+        )
+        ledgers.update(last_recomputed_at=now)
+        sync_trang_thai(hocvien_ids, apps=apps)
+    return drift
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from app.apps.thanhtoans import ledger
+
+
+class Command(BaseCommand):
+    help = 'Đối soát sổ công nợ học phí với dữ liệu thanh toán/đăng ký gốc và sửa các dòng bị lệch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Chỉ liệt kê học viên bị lệch, không ghi thay đổi'
+        )
+
+    def handle(self, *args, **options):
+        drift = ledger.reconcile(dry_run=options['dry_run'])
+        for hocvien_id, current, expected in drift[:50]:
+            self.stdout.write(f'  {hocvien_id}: {current} -> {expected}')
+        if len(drift) > 50:
+            self.stdout.write(f'  ... và {len(drift) - 50} học viên khác')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} học viên có sổ công nợ bị lệch (dry-run).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Đã đối soát, sửa {len(drift)} học viên bị lệch.'))
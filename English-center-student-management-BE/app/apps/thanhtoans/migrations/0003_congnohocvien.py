@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hocviens', '0007_leadcontactnote'),
+        ('thanhtoans', '0002_thanhtoan_trang_thai_alter_thanhtoan_hinh_thuc_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CongNoHocVien',
+            fields=[
+                ('hocvien', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cong_no', serialize=False, to='hocviens.hocvien', verbose_name='Học viên')),
+                ('total_fee', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Tổng học phí (VNĐ)')),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Đã đóng (VNĐ)')),
+                ('last_recomputed_at', models.DateTimeField(blank=True, null=True, verbose_name='Lần đối soát gần nhất')),
+            ],
+            options={
+                'verbose_name': 'Công nợ học viên',
+                'verbose_name_plural': 'Công nợ học viên',
+                'db_table': 'erp_student_fee_ledger',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def populate_ledger(apps, schema_editor):
+    from app.apps.thanhtoans.ledger import reconcile
+    reconcile(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thanhtoans', '0003_congnohocvien'),
+        ('dangky', '0001_initial'),
+        ('khoahocs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_ledger, migrations.RunPython.noop),
+    ]
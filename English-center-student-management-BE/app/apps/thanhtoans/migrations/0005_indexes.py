@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:31
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction, nhưng không khóa ghi bảng
+    atomic = False
+
+    dependencies = [
+        ('hocviens', '0008_indexes'),
+        ('thanhtoans', '0004_populate_congnohocvien'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='thanhtoan',
+            index=models.Index(fields=['-ngay_dong'], name='erp_payments_ngay_dong_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='thanhtoan',
+            index=models.Index(fields=['hocvien', '-ngay_dong'], name='erp_payments_hocvien_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='thanhtoan',
+            index=models.Index(fields=['hinh_thuc', '-ngay_dong'], name='erp_payments_hinh_thuc_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='thanhtoan',
+            index=models.Index(fields=['trang_thai', '-ngay_dong'], name='erp_payments_trang_thai_idx'),
+        ),
+    ]
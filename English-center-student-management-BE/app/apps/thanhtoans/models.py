@@ -63,6 +63,12 @@ class ThanhToan(BaseModel):
         verbose_name_plural = 'Thanh toán'
         ordering = ['-ngay_dong']
         db_table = 'erp_payments'
+        indexes = [
+            models.Index(fields=['-ngay_dong'], name='erp_payments_ngay_dong_idx'),
+            models.Index(fields=['hocvien', '-ngay_dong'], name='erp_payments_hocvien_idx'),
+            models.Index(fields=['hinh_thuc', '-ngay_dong'], name='erp_payments_hinh_thuc_idx'),
+            models.Index(fields=['trang_thai', '-ngay_dong'], name='erp_payments_trang_thai_idx'),
+        ]
         
     def __str__(self):
         status_display = dict(self.TRANG_THAI_CHOICES).get(self.trang_thai, '')
@@ -74,34 +80,37 @@ class ThanhToan(BaseModel):
         if self.trang_thai == 'paid' and not self.ngay_dong:
             self.ngay_dong = timezone.now()
 
+        # Sổ công nợ và trạng thái học phí của học viên được cập nhật qua signal (xem ledger.py)
         super().save(*args, **kwargs)
-        # Only update HocVien payment status when a payment is recorded as paid or partial
-        if self.trang_thai in ('paid', 'partial'):
-            self._update_hocvien_status()
 
-    def _update_hocvien_status(self):
-        """
-        Cập nhật trạng thái học phí của học viên
-        """
-        # Tính tổng tiền đã đóng (chỉ tính các thanh toán có trạng_thai != pending)
-        total_paid = ThanhToan.objects.filter(hocvien=self.hocvien, trang_thai__in=['partial', 'paid']).aggregate(
-            total=models.Sum('so_tien')
-        )['total'] or 0
 
-        # Lấy tổng học phí từ các khóa học đã đăng ký
-        from app.apps.dangky.models import DangKyKhoaHoc
-        total_fee = DangKyKhoaHoc.objects.filter(
-            hocvien=self.hocvien,
-            trang_thai__in=['dang_hoc', 'hoan_thanh']
-        ).aggregate(
-            total=models.Sum('khoahoc__hoc_phi')
-        )['total'] or 0
+class CongNoHocVien(models.Model):
+    """
+    Sổ công nợ học phí của từng học viên.
+    total_fee / total_paid được cộng dồn bằng F() mỗi khi thanh toán hoặc đăng ký thay đổi,
+    trang_thai_hoc_phi của học viên được suy ra từ đây (xem ledger.py).
+    """
+    hocvien = models.OneToOneField(
+        HocVien,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='cong_no',
+        verbose_name='Học viên'
+    )
+    # Tổng học phí các khóa đang học / đã hoàn thành
+    total_fee = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Tổng học phí (VNĐ)')
+    # Tổng các thanh toán partial / paid
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Đã đóng (VNĐ)')
+    last_recomputed_at = models.DateTimeField(null=True, blank=True, verbose_name='Lần đối soát gần nhất')
+
+    class Meta:
+        verbose_name = 'Công nợ học viên'
+        verbose_name_plural = 'Công nợ học viên'
+        db_table = 'erp_student_fee_ledger'
 
-        if total_fee and total_paid >= total_fee:
-            self.hocvien.trang_thai_hoc_phi = 'dadong'
-        elif total_paid > 0:
-            self.hocvien.trang_thai_hoc_phi = 'conno'
-        else:
-            self.hocvien.trang_thai_hoc_phi = 'chuadong'
+    def __str__(self):
+        return f"{self.hocvien_id}: {self.total_paid:,}/{self.total_fee:,} VNĐ"
 
-        self.hocvien.save()
+    @property
+    def con_no(self):
+        return max(self.total_fee - self.total_paid, 0)
@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.core.tracking import apply_change, apply_delta, previous_values, track_changes
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.khoahocs.models import KhoaHoc
+from .models import ThanhToan
+from . import ledger, tasks
+
+SOURCES = {
+    ThanhToan: (ledger.thanhtoan_contribution, ledger.THANHTOAN_FIELDS),
+    DangKyKhoaHoc: (ledger.dangky_contribution, ledger.DANGKY_FIELDS),
+}
+
+for _model, (_contribution, _fields) in SOURCES.items():
+    track_changes(_model, _fields)
+track_changes(KhoaHoc, ['hoc_phi'])
+
+
+def _current_values(instance):
+    values = {'hocvien_id': instance.hocvien_id, 'trang_thai': instance.trang_thai}
+    if isinstance(instance, ThanhToan):
+        values['so_tien'] = instance.so_tien
+    else:
+        values['khoahoc__hoc_phi'] = instance.khoahoc.hoc_phi
+    return values
+
+
+@receiver(post_save, sender=ThanhToan, dispatch_uid='thanhtoans_ledger_thanhtoan_save')
+@receiver(post_save, sender=DangKyKhoaHoc, dispatch_uid='thanhtoans_ledger_dangky_save')
+def update_ledger_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    contribution, _ = SOURCES[sender]
+    old_values = None if created else previous_values(instance)
+    apply_change(contribution, old_values, _current_values(instance))
+
+    hocvien_ids = {instance.hocvien_id}
+    if old_values:
+        hocvien_ids.add(old_values['hocvien_id'])
+    ledger.sync_trang_thai(hocvien_ids)
+
+
+@receiver(post_delete, sender=ThanhToan, dispatch_uid='thanhtoans_ledger_thanhtoan_delete')
+@receiver(post_delete, sender=DangKyKhoaHoc, dispatch_uid='thanhtoans_ledger_dangky_delete')
+def update_ledger_on_delete(sender, instance, **kwargs):
+    contribution, _ = SOURCES[sender]
+    # Không tạo lại dòng sổ: khi xóa học viên, sổ có thể đã bị xóa cascade trước
+    apply_delta(*contribution(_current_values(instance)), sign=-1, create_missing=False)
+    ledger.sync_trang_thai([instance.hocvien_id])
+
+
+@receiver(post_save, sender=KhoaHoc, dispatch_uid='thanhtoans_ledger_khoahoc_save')
+def update_ledger_on_hoc_phi_change(sender, instance, created, raw=False, **kwargs):
+    """
+    Đổi học phí khóa học ảnh hưởng total_fee của mọi học viên đang học khóa đó: đối soát lại nhóm này
+    ở worker (job tasks.reconcile_khoahoc), không chạy trong request
+    """
+    old_values = None if created or raw else previous_values(instance)
+    if not old_values or old_values['hoc_phi'] == instance.hoc_phi:
+        return
+    tasks.reconcile_khoahoc.enqueue(khoahoc_id=instance.pk)
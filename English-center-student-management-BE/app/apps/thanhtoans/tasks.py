@@ -0,0 +1,17 @@
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.core.jobs import task
+from . import ledger
+
+
+@task
+def reconcile_khoahoc(khoahoc_id):
+    """
+    Đối soát sổ công nợ của các học viên đang học / đã học xong khóa học (sau khi đổi học phí)
+    """
+    hocvien_ids = list(
+        DangKyKhoaHoc.objects.filter(khoahoc_id=khoahoc_id, trang_thai__in=ledger.BILLABLE_STATUSES)
+        .values_list('hocvien_id', flat=True)
+    )
+    if not hocvien_ids:
+        return {'lech': 0}
+    return {'lech': len(ledger.reconcile(hocvien_ids))}
@@ -0,0 +1,135 @@
+import gzip
+import io
+import zipfile
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.hocviens.models import HocVien
+from app.apps.khoahocs.models import KhoaHoc
+from app.core import cache as stats_cache
+from app.core import jobs
+from app.apps.thanhtoans import ledger
+from app.apps.thanhtoans.models import CongNoHocVien, ThanhToan
+from app.apps.users.models import User
+
+
+class CongNoHocVienTest(TestCase):
+    def setUp(self):
+        self.khoahoc = KhoaHoc.objects.create(ten='TOEIC', lich_hoc='T3', giang_vien='Thầy Nam', so_buoi=10, hoc_phi=1000)
+        self.hocvien = HocVien.objects.create(ten='A', email='a@example.com', sdt='0912345678')
+
+    def status(self):
+        self.hocvien.refresh_from_db()
+        return self.hocvien.trang_thai_hoc_phi
+
+    def test_status_follows_ledger(self):
+        dk = DangKyKhoaHoc.objects.create(hocvien=self.hocvien, khoahoc=self.khoahoc, trang_thai='dang_hoc')
+        tt = ThanhToan.objects.create(hocvien=self.hocvien, so_tien=400, trang_thai='partial')
+        self.assertEqual(self.status(), 'conno')
+
+        tt.so_tien = 1000
+        tt.trang_thai = 'paid'
+        tt.save()
+        self.assertEqual(self.status(), 'dadong')
+
+        self.khoahoc.hoc_phi = 1500
+        self.khoahoc.save()
+        # đối soát theo khóa học chạy ở worker
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(self.status(), 'conno')
+
+        dk.trang_thai = 'huy'
+        dk.save()
+        tt.delete()
+        self.assertEqual(self.status(), 'chuadong')
+
+        cong_no = CongNoHocVien.objects.get(hocvien=self.hocvien)
+        self.assertEqual((cong_no.total_fee, cong_no.total_paid), (Decimal(0), Decimal(0)))
+        self.assertEqual(ledger.reconcile(dry_run=True), [])
+
+    def test_reconcile_fixes_drift(self):
+        ThanhToan.objects.create(hocvien=self.hocvien, so_tien=300, trang_thai='paid')
+        CongNoHocVien.objects.filter(hocvien=self.hocvien).update(total_paid=0)
+
+        drift = ledger.reconcile()
+        self.assertEqual(len(drift), 1)
+        self.assertEqual(CongNoHocVien.objects.get(hocvien=self.hocvien).total_paid, 300)
+        self.assertEqual(self.status(), 'conno')
+
+
+class ThanhToanStatsCacheTest(TestCase):
+    def setUp(self):
+        stats_cache.get_cache().clear()
+        stats_cache.reset_counters()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='x', role='admin'))
+        self.hocvien = HocVien.objects.create(ten='A', email='a@example.com', sdt='0912345678')
+
+    def test_hit_then_invalidated_by_payment(self):
+        first = self.client.get('/api/thanhtoans/stats/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/thanhtoans/stats/')
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first.json(), second.json())
+
+        ThanhToan.objects.create(hocvien=self.hocvien, so_tien=500, trang_thai='paid')
+        third = self.client.get('/api/thanhtoans/stats/')
+        self.assertEqual(third['X-Cache'], 'MISS')
+        self.assertEqual(third.json()['total_tien'], 500)
+        self.assertEqual(self.client.get('/api/thanhtoans/stats/?x=1')['X-Cache'], 'MISS')
+        self.assertEqual(
+            stats_cache.cache_counters()['app.apps.thanhtoans.views.thanhtoan_stats'],
+            {'hits': 1, 'misses': 3}
+        )
+
+
+class ThanhToanExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='x', role='admin'))
+        an = HocVien.objects.create(ten='Trần Thị An', email='an@example.com', sdt='0912345678')
+        binh = HocVien.objects.create(ten='Lê Văn Bình', email='binh@example.com', sdt='0987654321')
+        ThanhToan.objects.create(hocvien=an, so_tien=500, trang_thai='paid', hinh_thuc='tienmat', so_bien_lai='BL1')
+        ThanhToan.objects.create(hocvien=binh, so_tien=300, trang_thai='pending')
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_csv_uses_filters_and_labels(self):
+        response = self.client.get('/api/thanhtoans/export/?trang_thai=paid')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('thanhtoan-', response['Content-Disposition'])
+        lines = self.content(response).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('Học viên,Email,Số tiền'))
+        self.assertIn('Trần Thị An', lines[1])
+        self.assertIn('Đã thanh toán', lines[1])
+
+    def test_xlsx_and_gzip(self):
+        response = self.client.get('/api/thanhtoans/export/?file_format=xlsx&gzip=1', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        archive = zipfile.ZipFile(io.BytesIO(gzip.decompress(self.content(response))))
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('Lê Văn Bình', sheet)
+
+    def test_formula_cells_are_escaped(self):
+        ThanhToan.objects.filter(trang_thai='paid').update(
+            ghi_chu='=HYPERLINK("http://x","y")', so_bien_lai='@SUM(1)'
+        )
+        csv_text = self.content(self.client.get('/api/thanhtoans/export/?trang_thai=paid')).decode('utf-8-sig')
+        self.assertIn("'@SUM(1)", csv_text)
+        self.assertIn('"\'=HYPERLINK(""http://x"",""y"")"', csv_text)
+
+        response = self.client.get('/api/thanhtoans/export/?file_format=xlsx&trang_thai=paid')
+        sheet = zipfile.ZipFile(io.BytesIO(self.content(response))).read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn("'=HYPERLINK", sheet)
+        # cột số không bị thêm dấu '
+        self.assertIn('<c><v>500', sheet)
+
+    def test_rejects_post_and_unknown_format(self):
+        self.assertEqual(self.client.post('/api/thanhtoans/export/', {}).status_code, 405)
+        self.assertEqual(self.client.get('/api/thanhtoans/export/?file_format=pdf').status_code, 400)
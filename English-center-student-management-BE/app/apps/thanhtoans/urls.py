@@ -5,6 +5,7 @@ app_name = 'thanhtoans'
 
 urlpatterns = [
     path('thanhtoans/', views.ThanhToanListCreateView.as_view(), name='thanhtoan-list'),
+    path('thanhtoans/export/', views.ThanhToanListCreateView.as_view(export=True), name='thanhtoan-export'),
     path('thanhtoans/<uuid:pk>/', views.ThanhToanDetailView.as_view(), name='thanhtoan-detail'),
     path('thanhtoans/me/', views.ThanhToanMyListView.as_view(), name='thanhtoan-me'),
     path('thanhtoans/stats/', views.thanhtoan_stats, name='thanhtoan-stats'),
@@ -1,15 +1,22 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.db import models
+from django.utils import timezone
 
 from app.core.permissions import (
     IsStaffUser, IsOwnerOrStaff, 
     FinancePermission, CanViewFinance, CanManageFinance
 )
+from app.core.capabilities import own_queryset
+from app.core.cache import cached_view
+from app.core.export import ExportMixin
+from app.core.stats import abreakdown_stats
+from app.core.async_views import async_api_view
+from app.apps.reports.models import DoanhThuNgay
 from .models import ThanhToan
 from .serializers import (
     ThanhToanSerializer, ThanhToanCreateSerializer,
@@ -27,6 +34,7 @@ class ThanhToanListView(generics.ListCreateAPIView):
     queryset = ThanhToan.objects.all()
     serializer_class = ThanhToanSerializer
     permission_classes = [FinancePermission]
+    pagination_mode = 'cursor'
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['hinh_thuc', 'hocvien', 'ngay_dong']
     search_fields = ['hocvien__ten', 'so_bien_lai']
@@ -53,24 +61,6 @@ class ThanhToanDetailView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.method in ['PUT', 'PATCH']:
             return ThanhToanUpdateSerializer
         return ThanhToanDetailSerializer
-    
-    def update(self, request, *args, **kwargs):
-        # Chỉ Admin và Finance Staff mới được cập nhật
-        if request.user.role not in ['admin', 'finance_staff']:
-            return Response(
-                {'error': 'Bạn không có quyền cập nhật thanh toán'}, 
-                status=status.HTTP_403_FORBIDDEN
-            )
-        return super().update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        # Chỉ Admin và Finance Staff mới được xóa
-        if request.user.role not in ['admin', 'finance_staff']:
-            return Response(
-                {'error': 'Bạn không có quyền xóa thanh toán'}, 
-                status=status.HTTP_403_FORBIDDEN
-            )
-        return super().destroy(request, *args, **kwargs)
 
 
 class ThanhToanMyListView(generics.ListAPIView):
@@ -81,45 +71,34 @@ class ThanhToanMyListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        if self.request.user.role == 'hocvien':
-            try:
-                from app.apps.hocviens.models import HocVien
-                hocvien = HocVien.objects.get(user=self.request.user)
-                return ThanhToan.objects.filter(hocvien=hocvien)
-            except HocVien.DoesNotExist:
-                return ThanhToan.objects.none()
-        return ThanhToan.objects.none()
+        return own_queryset(ThanhToan.objects.all(), self.request.user)
 
 
-@api_view(['GET'])
+@async_api_view(['GET'])
 @permission_classes([CanViewFinance])
-def thanhtoan_stats(request):
+@cached_view('finance')
+async def thanhtoan_stats(request):
     """
     Thống kê thanh toán - Có phân quyền theo role
     - Admin, Finance Staff, Academic Staff, Sales Staff: Được xem thống kê
     """
 
-    total_thanhtoan = ThanhToan.objects.count()
-    total_tien = ThanhToan.objects.aggregate(total=models.Sum('so_tien'))['total'] or 0
-
-    # Thống kê theo hình thức thanh toán
-    tien_mat = ThanhToan.objects.filter(hinh_thuc='tienmat').aggregate(
-        total=models.Sum('so_tien')
-    )['total'] or 0
-    chuyen_khoan = ThanhToan.objects.filter(hinh_thuc='chuyenkhoan').aggregate(
-        total=models.Sum('so_tien')
-    )['total'] or 0
-    the = ThanhToan.objects.filter(hinh_thuc='the').aggregate(
-        total=models.Sum('so_tien')
-    )['total'] or 0
-
-    # Thống kê theo tháng
-    from datetime import datetime, timedelta
-    now = datetime.now()
-    thang_nay = ThanhToan.objects.filter(
-        ngay_dong__year=now.year,
-        ngay_dong__month=now.month
-    ).aggregate(total=models.Sum('so_tien'))['total'] or 0
+    # Đọc từ bảng fact doanh thu theo ngày thay vì quét toàn bộ erp_payments
+    today = timezone.localdate()
+    stats = await abreakdown_stats(
+        DoanhThuNgay,
+        [('hinh_thuc', {'tien_mat': 'tienmat', 'chuyen_khoan': 'chuyenkhoan', 'the': 'the'})],
+        total='total_tien',
+        measure='so_tien',
+        total_thanhtoan=models.Sum('so_luong'),
+        thang_nay=models.Q(ngay__year=today.year, ngay__month=today.month),
+    )
+    total_thanhtoan = stats['total_thanhtoan']
+    total_tien = stats['total_tien']
+    tien_mat = stats['tien_mat']
+    chuyen_khoan = stats['chuyen_khoan']
+    the = stats['the']
+    thang_nay = stats['thang_nay']
 
     return Response({
         'total_thanhtoan': total_thanhtoan,
@@ -131,15 +110,27 @@ def thanhtoan_stats(request):
     })
 
 
-class ThanhToanListCreateView(generics.ListCreateAPIView):
+class ThanhToanListCreateView(ExportMixin, generics.ListCreateAPIView):
     """
     GET /thanhtoans/  -> list payments (finance staff/admin)
     POST /thanhtoans/ -> create a payment. If hinh_thuc + so_bien_lai provided and trang_thai not provided,
                          serializer will mark trang_thai='paid' so model.save() sets ngay_dong and updates HocVien.
+    GET /thanhtoans/export/ -> CSV/XLSX of the same (filtered) list, streamed
     """
     queryset = ThanhToan.objects.all().order_by('-created_at')
     serializer_class = ThanhToanSerializer
     permission_classes = [CanManageFinance]
+    # bảng lớn dần theo thời gian: mặc định phân trang keyset (?page= vẫn dùng được)
+    pagination_mode = 'cursor'
+    filterset_fields = ['hinh_thuc', 'trang_thai', 'hocvien', 'ngay_dong']
+    search_fields = ['hocvien__ten', 'so_bien_lai']
+    ordering_fields = ['ngay_dong', 'so_tien', 'created_at']
+    export_filename = 'thanhtoan'
+    export_fields = [
+        ('Học viên', 'hocvien__ten'), ('Email', 'hocvien__email'), ('Số tiền', 'so_tien'),
+        ('Hình thức', 'hinh_thuc'), ('Trạng thái', 'trang_thai'), ('Số biên lai', 'so_bien_lai'),
+        ('Ngày đóng', 'ngay_dong'), ('Ghi chú', 'ghi_chu'), ('Ngày tạo', 'created_at'),
+    ]
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
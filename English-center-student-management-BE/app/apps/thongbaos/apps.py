@@ -5,3 +5,8 @@ class ThongbaosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.apps.thongbaos'
     verbose_name = 'Quản lý thông báo'
+
+    def ready(self):
+        from app.core.cache import invalidate_on_change
+        from . import signals  # noqa: F401
+        invalidate_on_change(self.get_model('ThongBao'), 'notifications')
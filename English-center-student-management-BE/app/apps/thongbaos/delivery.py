@@ -0,0 +1,254 @@
+"""
+Gửi email / SMS ra ngoài cho học viên / lead qua hàng đợi TinNhanGuiDi (bảng erp_notification_outbox).
+
+1. Xếp hàng: `queue_thongbao()` (thông báo đã gửi) hoặc `queue_debt_reminders()` (học viên còn nợ học
+   phí) render sẵn từng tin và ghi theo lô bằng bulk_create; cùng một đợt (`dot`) chạy lại không tạo tin
+   trùng cho cùng địa chỉ.
+2. Gửi: `send_batch()` lấy một lô tin đến hạn bằng SELECT ... FOR UPDATE SKIP LOCKED và gửi qua MỘT
+   kết nối (SMTP của EMAIL_BACKEND hoặc gateway của SMS_BACKEND, xem app/core/sms.py), giới hạn tốc độ
+   OUTBOUND_EMAIL_RATE / OUTBOUND_SMS_RATE tin mỗi giây. Tin lỗi được gửi lại sau jobs.backoff(),
+   quá OUTBOUND_MAX_ATTEMPTS lần thì chuyển 'loi'; trạng thái được ghi cho từng tin.
+
+Job `tasks.send_outbox` chạy `send_batch()` ở worker và tự xếp lần chạy tiếp cho tới khi hết tin.
+Tin có thể bị gửi lại nếu worker chết giữa lô (gửi ít nhất một lần).
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.db.models import F, Min
+from django.template import Context, Engine
+from django.utils import timezone
+
+from app.apps.hocviens.models import HocVien
+from app.core import jobs, sms
+from .models import PhanKhuc, TinNhanGuiDi
+
+PENDING = ('cho_gui', 'dang_gui')
+DEBT_STATUSES = ('conno', 'chuadong')
+SMS_MAX_LENGTH = 480  # 3 tin ghép tiếng Việt có dấu (UCS-2)
+QUEUE_CHUNK_SIZE = 2000
+
+THONG_BAO_TEMPLATES = {
+    'email': (
+        '{{ tieu_de }}',
+        '{{ ten }} thân mến,\n\n{{ noi_dung }}\n\nTrung tâm Anh ngữ',
+    ),
+    'sms': ('', '{{ tieu_de }}: {{ noi_dung }}'),
+}
+NHAC_NO_TEMPLATES = {
+    'email': (
+        'Nhắc đóng học phí',
+        '{{ ten }} thân mến,\n\n'
+        'Trung tâm xin nhắc bạn còn {{ con_no }} VNĐ học phí chưa đóng '
+        '(đã đóng {{ da_dong }} / {{ tong_hoc_phi }} VNĐ).\n'
+        'Nếu đã đóng, vui lòng bỏ qua email này.\n\nTrung tâm Anh ngữ',
+    ),
+    'sms': ('', 'Trung tâm Anh ngữ: {{ ten }} còn {{ con_no }} VNĐ học phí chưa đóng. Vui lòng bỏ qua nếu đã đóng.'),
+}
+
+_engine = Engine(autoescape=False)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _vnd(value):
+    return f'{value or 0:,.0f}'.replace(',', '.')
+
+
+def contacts(thongbao):
+    """
+    Học viên / lead nhận bản gửi ra ngoài của thông báo (nhóm 'nhanvien' chỉ nhận trong app)
+    """
+    students = HocVien.objects.order_by()
+    if thongbao.nguoi_nhan == 'phan_khuc':
+        phan_khuc = PhanKhuc.objects.filter(pk=thongbao.phan_khuc_id).first()
+        return phan_khuc.hocvien_queryset() if phan_khuc else students.none()
+    if thongbao.nguoi_nhan == 'user':
+        return students.filter(user_id=thongbao.user_id)
+    if thongbao.nguoi_nhan in ('tatca', 'hocvien'):
+        return students.exclude(created_as_lead=True, is_converted=False)
+    return students.none()
+
+
+def debtors():
+    """
+    Học viên còn nợ học phí theo sổ công nợ
+    """
+    return HocVien.objects.filter(
+        trang_thai_hoc_phi__in=DEBT_STATUSES, cong_no__total_fee__gt=F('cong_no__total_paid'),
+    ).order_by()
+
+
+def _queue(rows, kenh_list, templates, loai, dot, thongbao_id=None):
+    """
+    Render và ghi tin cho mỗi dòng học viên (dict) trên mỗi kênh. Trả về số tin mới theo kênh.
+    """
+    compiled = {
+        kenh: tuple(_engine.from_string(template) for template in templates[kenh]) for kenh in kenh_list
+    }
+    before = {kenh: TinNhanGuiDi.objects.filter(dot=dot, kenh=kenh).count() for kenh in kenh_list}
+    batch = []
+    for row in rows:
+        context = Context(row, autoescape=False)
+        for kenh in kenh_list:
+            dia_chi = (row['email'] if kenh == 'email' else row['sdt']) or ''
+            if not dia_chi.strip():
+                continue
+            subject, body = compiled[kenh]
+            noi_dung = body.render(context).strip()
+            if kenh == 'sms':
+                noi_dung = noi_dung[:SMS_MAX_LENGTH]
+            batch.append(TinNhanGuiDi(
+                kenh=kenh, loai=loai, dot=dot, thongbao_id=thongbao_id, hocvien_id=row['id'],
+                dia_chi=dia_chi.strip(), tieu_de=subject.render(context).strip()[:200], noi_dung=noi_dung,
+            ))
+        if len(batch) >= QUEUE_CHUNK_SIZE:
+            TinNhanGuiDi.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    TinNhanGuiDi.objects.bulk_create(batch, ignore_conflicts=True)
+    return {kenh: TinNhanGuiDi.objects.filter(dot=dot, kenh=kenh).count() - before[kenh] for kenh in kenh_list}
+
+
+def queue_thongbao(thongbao, kenh_list):
+    """
+    Xếp hàng bản email / SMS của thông báo cho các học viên nhận. Trả về số tin mới theo kênh.
+    """
+    rows = contacts(thongbao).values('id', 'ten', 'email', 'sdt').iterator(chunk_size=QUEUE_CHUNK_SIZE)
+    extra = {'tieu_de': thongbao.tieu_de, 'noi_dung': thongbao.noi_dung}
+    return _queue(
+        ({**row, **extra} for row in rows), kenh_list, THONG_BAO_TEMPLATES, 'thong_bao',
+        f'thongbao:{thongbao.pk}', thongbao_id=thongbao.pk,
+    )
+
+
+def queue_debt_reminders(kenh_list, ngay=None):
+    """
+    Xếp hàng tin nhắc học phí cho mọi học viên còn nợ (mỗi ngày một đợt). Trả về số tin mới theo kênh.
+    """
+    ngay = ngay or timezone.localdate()
+    rows = debtors().values(
+        'id', 'ten', 'email', 'sdt', total_fee=F('cong_no__total_fee'), total_paid=F('cong_no__total_paid'),
+    ).iterator(chunk_size=QUEUE_CHUNK_SIZE)
+    contexts = (
+        {**row, 'tong_hoc_phi': _vnd(row['total_fee']), 'da_dong': _vnd(row['total_paid']),
+         'con_no': _vnd(row['total_fee'] - row['total_paid'])}
+        for row in rows
+    )
+    return _queue(contexts, kenh_list, NHAC_NO_TEMPLATES, 'nhac_no', f'nhac_no:{ngay.isoformat()}')
+
+
+class Throttle:
+    """
+    Giới hạn `rate` lần mỗi giây (0 = không giới hạn)
+    """
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(self.next_at, now) + self.interval
+
+
+def _connection(kenh):
+    if kenh == 'email':
+        return mail.get_connection()
+    return sms.get_connection()
+
+
+def _message(tin):
+    if tin.kenh == 'email':
+        return mail.EmailMessage(tin.tieu_de, tin.noi_dung, settings.DEFAULT_FROM_EMAIL, [tin.dia_chi])
+    return sms.SMSMessage(tin.dia_chi, tin.noi_dung)
+
+
+def claim(kenh, limit):
+    """
+    Lấy tối đa `limit` tin đến hạn của kênh, đánh dấu 'dang_gui' và giữ tin tới hết OUTBOUND_LEASE giây
+    (quá hạn mà chưa ghi kết quả thì tin được lấy lại). Tin đang bị worker khác khóa được bỏ qua.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=_setting('OUTBOUND_LEASE', 600))
+    with transaction.atomic():
+        ids = list(
+            TinNhanGuiDi.objects.select_for_update(skip_locked=True)
+            .filter(kenh=kenh, trang_thai__in=PENDING, gui_luc__lte=now)
+            .order_by('gui_luc')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        TinNhanGuiDi.objects.filter(id__in=ids).update(
+            trang_thai='dang_gui', gui_luc=lease, so_lan_gui=F('so_lan_gui') + 1, updated_at=now,
+        )
+        return list(TinNhanGuiDi.objects.filter(id__in=ids).order_by('created_at'))
+
+
+def send_batch(kenh, limit=None):
+    """
+    Gửi một lô tin đến hạn của kênh qua một kết nối. Trả về số tin đã gửi / sẽ gửi lại / lỗi hẳn.
+    """
+    result = {'da_gui': 0, 'gui_lai': 0, 'loi': 0}
+    claimed = claim(kenh, limit or _setting('OUTBOUND_BATCH_SIZE', 200))
+    if not claimed:
+        return result
+
+    rate = _setting('OUTBOUND_EMAIL_RATE' if kenh == 'email' else 'OUTBOUND_SMS_RATE', 0)
+    throttle = Throttle(rate)
+    sent, failed = [], []
+    connection = _connection(kenh)
+    try:
+        for tin in claimed:
+            throttle.wait()
+            try:
+                connection.open()
+                if not connection.send_messages([_message(tin)]):
+                    raise RuntimeError('Backend không nhận tin')
+            except Exception as exc:
+                failed.append((tin, f'{type(exc).__name__}: {exc}'))
+                # kết nối có thể đã hỏng: tin sau mở kết nối mới
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            else:
+                sent.append(tin.pk)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    now = timezone.now()
+    max_attempts = _setting('OUTBOUND_MAX_ATTEMPTS', 5)
+    # chỉ ghi tin vẫn do lô này giữ (chưa hết hạn giữ và bị lấy lại)
+    held = TinNhanGuiDi.objects.filter(trang_thai='dang_gui', gui_luc=claimed[0].gui_luc)
+    with transaction.atomic():
+        result['da_gui'] = held.filter(pk__in=sent).update(
+            trang_thai='da_gui', da_gui_luc=now, loi='', updated_at=now,
+        )
+        for tin, error in failed:
+            if tin.so_lan_gui < max_attempts:
+                changes = {'trang_thai': 'cho_gui', 'gui_luc': now + timedelta(seconds=jobs.backoff(tin.so_lan_gui))}
+                key = 'gui_lai'
+            else:
+                changes = {'trang_thai': 'loi'}
+                key = 'loi'
+            result[key] += held.filter(pk=tin.pk).update(loi=error, updated_at=now, **changes)
+    return result
+
+
+def next_due(kenh):
+    """
+    Thời điểm sớm nhất còn tin cần gửi của kênh (None = hết tin)
+    """
+    return TinNhanGuiDi.objects.filter(kenh=kenh, trang_thai__in=PENDING).aggregate(at=Min('gui_luc'))['at']
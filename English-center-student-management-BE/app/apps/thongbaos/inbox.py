@@ -0,0 +1,247 @@
+"""
+Hộp thư thông báo theo người nhận (ThongBaoNguoiNhan) và số chưa đọc (SoThongBaoChuaDoc).
+
+Khi thông báo chuyển sang 'da_gui', `fan_out()` ghi một dòng hộp thư cho mỗi người nhận bằng MỘT câu
+INSERT ... SELECT trên danh sách người dùng thuộc nhóm nhận (không lặp người dùng trong Python), và
+cùng câu đó cộng số chưa đọc của từng người. Thông báo rời 'da_gui' hoặc bị xóa thì `withdraw()` rút
+khỏi hộp thư và trừ lại số chưa đọc. Đọc số chưa đọc chỉ là đọc một dòng theo khóa chính.
+
+Lưu thông báo chỉ đưa job `tasks.sync_inbox` vào hàng đợi (app/core/jobs.py): fan-out tới hàng chục
+nghìn người nhận chạy ở worker, không nằm trong request. Riêng xóa thông báo thì rút ngay (signal).
+
+Nhóm nhận 'phan_khuc' (PhanKhuc) được biên dịch thành subquery trong cùng câu INSERT ... SELECT.
+Admin nhận mọi thông báo đã gửi, khớp với danh sách công khai (ThongBaoPublicListView) nơi admin xem tất cả.
+Người nhận được chốt lúc gửi: tài khoản tạo sau đó (hoặc học viên vào phân khúc sau đó) không nhận
+thông báo cũ vào hộp thư.
+Dữ liệu ghi không qua signal (QuerySet.update(), COPY...) được đồng bộ lại bằng `rebuild()`.
+"""
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from app.apps.users.models import User
+from app.core.capabilities import linked_hocvien_id
+from .models import PhanKhuc, SoThongBaoChuaDoc, ThongBao, ThongBaoNguoiNhan
+
+SENT = 'da_gui'
+ADMIN_ROLE = 'admin'
+
+# Nhóm người nhận (ThongBao.nguoi_nhan) mà mỗi role được xem
+PUBLIC_AUDIENCES = {
+    'academic_staff': ['tatca', 'nhanvien'],
+    'sales_staff': ['tatca', 'nhanvien'],
+    'finance_staff': ['tatca', 'nhanvien'],
+    'hocvien': ['tatca', 'hocvien'],
+}
+
+FIELDS = ['trang_thai', 'nguoi_nhan', 'user_id', 'phan_khuc_id']
+
+
+def audiences(user):
+    """
+    Các nhóm nhận (ThongBao.nguoi_nhan) mà `user` thuộc về, cùng quy tắc với `recipients()`;
+    None = mọi nhóm (admin)
+    """
+    if user.role == ADMIN_ROLE:
+        return None
+    groups = list(PUBLIC_AUDIENCES.get(user.role, ['tatca']))
+    # tài khoản liên kết với hồ sơ học viên nhận thông báo 'hocvien' dù role là gì
+    if 'hocvien' not in groups and linked_hocvien_id(user) is not None:
+        groups.append('hocvien')
+    return groups
+
+
+def recipients(nguoi_nhan, user_id=None, phan_khuc_id=None):
+    """
+    Người dùng (đang hoạt động) nhận thông báo gửi tới nhóm `nguoi_nhan`; admin thuộc mọi nhóm nhận.
+    Quy tắc theo chiều ngược lại (nhóm của một người dùng) là `audiences()`.
+    """
+    users = User.objects.filter(is_active=True).order_by()
+    admins = Q(role=ADMIN_ROLE)
+    if nguoi_nhan == 'user':
+        return users.filter(Q(pk=user_id) | admins)
+    if nguoi_nhan == 'phan_khuc':
+        phan_khuc = PhanKhuc.objects.filter(pk=phan_khuc_id).first() if phan_khuc_id else None
+        # phân khúc đã bị xóa: chỉ còn admin
+        return (phan_khuc.user_queryset() | users.filter(admins)) if phan_khuc else users.filter(admins)
+    if nguoi_nhan == 'tatca':
+        return users
+    roles = [role for role, audiences in PUBLIC_AUDIENCES.items() if nguoi_nhan in audiences]
+    condition = Q(role__in=roles) | admins
+    if nguoi_nhan == 'hocvien':
+        # tài khoản liên kết với hồ sơ học viên
+        condition |= Q(hocvien__isnull=False)
+    return users.filter(condition)
+
+
+def recipients_of(thongbao):
+    return recipients(thongbao.nguoi_nhan, thongbao.user_id, thongbao.phan_khuc_id)
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _ids_sql(users):
+    """
+    SQL (kèm tham số) chọn cột id của queryset người dùng, để nhúng làm subquery
+    """
+    try:
+        return users.values('id').query.sql_with_params()
+    except EmptyResultSet:
+        return 'SELECT NULL::uuid AS id WHERE false', ()
+
+
+def _fan_out_sql(select_sql):
+    """
+    INSERT hộp thư từ `select_sql` (thongbao_id, user_id, ngay_nhan) và cộng số chưa đọc các dòng mới
+    """
+    return f"""
+        WITH moi AS (
+            INSERT INTO {_table(ThongBaoNguoiNhan)} (thongbao_id, user_id, ngay_nhan, da_doc)
+            SELECT nguon.thongbao_id, nguon.user_id, nguon.ngay_nhan, false FROM ({select_sql}) nguon
+            ON CONFLICT (user_id, thongbao_id) DO NOTHING
+            RETURNING user_id
+        )
+        INSERT INTO {_table(SoThongBaoChuaDoc)} AS dem (user_id, chua_doc)
+        SELECT user_id, COUNT(*) FROM moi GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET chua_doc = dem.chua_doc + EXCLUDED.chua_doc
+    """
+
+
+def fan_out(thongbao):
+    """
+    Đưa thông báo đã gửi vào hộp thư của mọi người nhận. Trả về số người nhận mới.
+    """
+    users_sql, users_params = _ids_sql(recipients_of(thongbao))
+    select_sql = f'SELECT %s::uuid AS thongbao_id, u.id AS user_id, %s::timestamptz AS ngay_nhan FROM ({users_sql}) u'
+    with connection.cursor() as cursor:
+        cursor.execute(_fan_out_sql(select_sql), [thongbao.pk, timezone.now(), *users_params])
+        return cursor.rowcount
+
+
+def withdraw(thongbao_id, keep=None):
+    """
+    Rút thông báo khỏi hộp thư của mọi người nhận (trừ người dùng thuộc queryset `keep`), trừ số chưa
+    đọc. Trả về số dòng hộp thư bị xóa.
+    """
+    keep_sql, keep_params = '', []
+    if keep is not None:
+        users_sql, keep_params = _ids_sql(keep)
+        keep_sql = f'AND user_id NOT IN ({users_sql})'
+    sql = f"""
+        WITH bo AS (
+            DELETE FROM {_table(ThongBaoNguoiNhan)} WHERE thongbao_id = %s {keep_sql} RETURNING user_id, da_doc
+        ), giam AS (
+            UPDATE {_table(SoThongBaoChuaDoc)} dem SET chua_doc = GREATEST(dem.chua_doc - chua.so, 0)
+            FROM (SELECT user_id, COUNT(*) AS so FROM bo WHERE NOT da_doc GROUP BY user_id) chua
+            WHERE dem.user_id = chua.user_id
+        )
+        SELECT COUNT(*) FROM bo
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [thongbao_id, *keep_params])
+        return cursor.fetchone()[0]
+
+
+def needs_sync(old_values, new_values):
+    """
+    Lần lưu thông báo có làm thay đổi hộp thư không: `old_values` là FIELDS trước khi lưu (None = vừa tạo)
+    """
+    if old_values is None:
+        return new_values['trang_thai'] == SENT
+    return SENT in (old_values['trang_thai'], new_values['trang_thai']) and old_values != new_values
+
+
+def sync(thongbao_id):
+    """
+    Đưa hộp thư về đúng trạng thái hiện tại của thông báo: đã gửi thì thêm người nhận còn thiếu và rút
+    khỏi người không còn thuộc nhóm nhận (giữ trạng thái đã đọc của những người còn lại), chưa gửi /
+    hủy thì rút khỏi mọi hộp thư. Chạy lại nhiều lần vẫn cho cùng kết quả.
+    """
+    with transaction.atomic():
+        # khóa thông báo: hai lần đồng bộ cùng một thông báo chạy lần lượt
+        thongbao = ThongBao.objects.select_for_update().filter(pk=thongbao_id).first()
+        if thongbao is None or thongbao.trang_thai != SENT:
+            return {'them': 0, 'rut': withdraw(thongbao_id)}
+        removed = withdraw(thongbao_id, keep=recipients_of(thongbao))
+        return {'them': fan_out(thongbao), 'rut': removed}
+
+
+def unread_count(user):
+    return (
+        SoThongBaoChuaDoc.objects.filter(user=user).values_list('chua_doc', flat=True).first() or 0
+    )
+
+
+def mark_read(user, thongbao_ids=None):
+    """
+    Đánh dấu đã đọc các thông báo `thongbao_ids` (None = tất cả) trong hộp thư của `user`.
+    Trả về (số thông báo vừa được đánh dấu, số chưa đọc còn lại).
+    """
+    rows = ThongBaoNguoiNhan.objects.filter(user=user, da_doc=False)
+    if thongbao_ids is not None:
+        rows = rows.filter(thongbao_id__in=thongbao_ids)
+    with transaction.atomic():
+        # UPDATE khóa từng dòng: hai request đánh dấu cùng lúc không trừ số chưa đọc hai lần
+        updated = rows.update(da_doc=True, doc_luc=timezone.now())
+        if updated:
+            SoThongBaoChuaDoc.objects.filter(user=user).update(chua_doc=Greatest(F('chua_doc') - updated, 0))
+    return updated, unread_count(user)
+
+
+def rebuild():
+    """
+    Đồng bộ lại hộp thư với các thông báo hiện có (thông báo đã gửi được đưa vào hộp thư, thông báo
+    không còn 'da_gui' bị rút ra) rồi tính lại số chưa đọc từ hộp thư. Trả về số dòng hộp thư.
+    """
+    inbox, counters, notifications = _table(ThongBaoNguoiNhan), _table(SoThongBaoChuaDoc), _table(ThongBao)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {inbox} hop USING {notifications} tb '
+            f'WHERE hop.thongbao_id = tb.id AND tb.trang_thai <> %s',
+            [SENT],
+        )
+        # mỗi nhóm nhận (và mỗi phân khúc đang được dùng) một câu INSERT ... SELECT
+        groups = [(nguoi_nhan, None) for nguoi_nhan in ('tatca', 'hocvien', 'nhanvien')] + [
+            ('phan_khuc', phan_khuc_id) for phan_khuc_id in
+            ThongBao.objects.filter(trang_thai=SENT, nguoi_nhan='phan_khuc', phan_khuc__isnull=False)
+            .order_by().values_list('phan_khuc_id', flat=True).distinct()
+        ]
+        for nguoi_nhan, phan_khuc_id in groups:
+            users_sql, users_params = _ids_sql(recipients(nguoi_nhan, phan_khuc_id=phan_khuc_id))
+            select_sql = (
+                f'SELECT tb.id AS thongbao_id, u.id AS user_id, tb.ngay_gui AS ngay_nhan '
+                f'FROM {notifications} tb CROSS JOIN ({users_sql}) u '
+                f'WHERE tb.trang_thai = %s AND tb.nguoi_nhan = %s'
+            )
+            params = [*users_params, SENT, nguoi_nhan]
+            if phan_khuc_id:
+                select_sql += ' AND tb.phan_khuc_id = %s'
+                params.append(phan_khuc_id)
+            cursor.execute(_fan_out_sql(select_sql), params)
+        cursor.execute(_fan_out_sql(
+            f'SELECT tb.id AS thongbao_id, tb.user_id, tb.ngay_gui AS ngay_nhan FROM {notifications} tb '
+            f'WHERE tb.trang_thai = %s AND tb.nguoi_nhan = %s AND tb.user_id IS NOT NULL'
+        ), [SENT, 'user'])
+        # admin nhận cả thông báo cá nhân và thông báo của phân khúc đã bị xóa
+        admins_sql, admins_params = _ids_sql(User.objects.filter(is_active=True, role=ADMIN_ROLE).order_by())
+        cursor.execute(_fan_out_sql(
+            f'SELECT tb.id AS thongbao_id, u.id AS user_id, tb.ngay_gui AS ngay_nhan '
+            f'FROM {notifications} tb CROSS JOIN ({admins_sql}) u '
+            f'WHERE tb.trang_thai = %s AND tb.nguoi_nhan IN (%s, %s)'
+        ), [*admins_params, SENT, 'user', 'phan_khuc'])
+
+        # số chưa đọc tính lại từ đầu (ghi đè phần vừa cộng ở trên)
+        cursor.execute(f"""
+            INSERT INTO {counters} AS dem (user_id, chua_doc)
+            SELECT user_id, COUNT(*) FILTER (WHERE NOT da_doc) FROM {inbox} GROUP BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET chua_doc = EXCLUDED.chua_doc
+        """)
+        cursor.execute(f"""
+            UPDATE {counters} dem SET chua_doc = 0
+            WHERE dem.chua_doc <> 0 AND NOT EXISTS (SELECT 1 FROM {inbox} hop WHERE hop.user_id = dem.user_id)
+        """)
+    return ThongBaoNguoiNhan.objects.count()
@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.apps.thongbaos import delivery, tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Xếp hàng email / SMS nhắc học phí cho học viên còn nợ (trang_thai_hoc_phi conno / chuadong) và '
+        'giao cho worker gửi. Chạy hằng đêm bằng cron; chạy lại trong cùng ngày không gửi trùng.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kenh', nargs='+', choices=['email', 'sms'], default=['email'],
+                            help='Kênh gửi (mặc định email)')
+        parser.add_argument('--ngay', type=date.fromisoformat,
+                            help='Ngày của đợt nhắc (YYYY-MM-DD, mặc định hôm nay)')
+        parser.add_argument('--inline', action='store_true',
+                            help='Gửi luôn trong tiến trình này thay vì giao cho worker')
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        queued = delivery.queue_debt_reminders(options['kenh'], options['ngay'])
+        for kenh, count in queued.items():
+            self.stdout.write(f'  {kenh:<6}{count:>8} tin mới')
+
+        if not options['inline']:
+            for kenh in queued:
+                tasks.dispatch_outbox(kenh)
+            self.stdout.write(self.style.SUCCESS('Đã xếp hàng, worker (run_worker) sẽ gửi.'))
+            return
+
+        totals = {'da_gui': 0, 'gui_lai': 0, 'loi': 0}
+        for kenh in queued:
+            while True:
+                result = delivery.send_batch(kenh)
+                for key, value in result.items():
+                    totals[key] += value
+                if not any(result.values()):
+                    break
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã gửi {totals['da_gui']} tin trong {elapsed:.1f}s "
+            f"({totals['gui_lai']} tin chờ gửi lại, {totals['loi']} tin lỗi)."
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:31
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction, nhưng không khóa ghi bảng
+    atomic = False
+
+    dependencies = [
+        ('thongbaos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='thongbao',
+            index=models.Index(fields=['trang_thai', '-ngay_gui'], name='erp_notif_trang_thai_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='thongbao',
+            index=models.Index(fields=['loai_thong_bao', '-ngay_gui'], name='erp_notif_loai_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='thongbao',
+            index=models.Index(fields=['nguoi_nhan', '-ngay_gui'], name='erp_notif_nguoi_nhan_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.2 on 2026-10-18 21:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thongbaos', '0002_indexes'),
+        ('users', '0004_user_is_staff'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SoThongBaoChuaDoc',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='so_thong_bao_chua_doc', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Người dùng')),
+                ('chua_doc', models.PositiveIntegerField(default=0, verbose_name='Chưa đọc')),
+            ],
+            options={
+                'verbose_name': 'Số thông báo chưa đọc',
+                'verbose_name_plural': 'Số thông báo chưa đọc',
+                'db_table': 'erp_notification_unread',
+            },
+        ),
+        migrations.CreateModel(
+            name='ThongBaoNguoiNhan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ngay_nhan', models.DateTimeField(verbose_name='Ngày nhận')),
+                ('da_doc', models.BooleanField(default=False, verbose_name='Đã đọc')),
+                ('doc_luc', models.DateTimeField(blank=True, null=True, verbose_name='Đọc lúc')),
+                ('thongbao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nguoi_nhan_list', to='thongbaos.thongbao', verbose_name='Thông báo')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hop_thu', to=settings.AUTH_USER_MODEL, verbose_name='Người nhận')),
+            ],
+            options={
+                'verbose_name': 'Hộp thư thông báo',
+                'verbose_name_plural': 'Hộp thư thông báo',
+                'db_table': 'erp_notification_inbox',
+                'ordering': ['-ngay_nhan'],
+                'indexes': [models.Index(fields=['user', '-ngay_nhan'], name='erp_inbox_user_ngay_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='thongbaonguoinhan',
+            constraint=models.UniqueConstraint(fields=('user', 'thongbao'), name='erp_inbox_user_thongbao_uniq'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.2 on 2026-10-18 21:43
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('khoahocs', '0001_initial'),
+        ('lophocs', '0003_rename_giang_vien_id_lophoc_giang_vien_and_more'),
+        ('thongbaos', '0003_inbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='thongbao',
+            name='nguoi_nhan',
+            field=models.CharField(choices=[('tatca', 'Tất cả'), ('hocvien', 'Học viên'), ('nhanvien', 'Nhân viên'), ('user', 'Người dùng cụ thể'), ('phan_khuc', 'Phân khúc học viên')], default='tatca', max_length=20, verbose_name='Người nhận'),
+        ),
+        migrations.CreateModel(
+            name='PhanKhuc',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ten', models.CharField(max_length=200, verbose_name='Tên phân khúc')),
+                ('mo_ta', models.TextField(blank=True, default='', verbose_name='Mô tả')),
+                ('doi_tuong', models.CharField(choices=[('hocvien', 'Học viên'), ('lead', 'Lead'), ('tatca', 'Học viên và lead')], default='hocvien', max_length=20, verbose_name='Đối tượng')),
+                ('trang_thai_hoc_phi', models.CharField(blank=True, choices=[('dadong', 'Đã đóng'), ('conno', 'Còn nợ'), ('chuadong', 'Chưa đóng')], default='', max_length=20, verbose_name='Trạng thái học phí')),
+                ('concern_level', models.CharField(blank=True, choices=[('moi', 'Mới'), ('quan_tam', 'Quan Tâm'), ('nong', 'Nóng'), ('mat', 'Mất')], default='', max_length=16, verbose_name='Mức độ quan tâm')),
+                ('sourced', models.CharField(blank=True, default='', max_length=64, verbose_name='Nguồn')),
+                ('khoa_hoc', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='khoahocs.khoahoc', verbose_name='Đăng ký khóa học')),
+                ('lop_hoc', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='lophocs.lophoc', verbose_name='Học viên lớp')),
+            ],
+            options={
+                'verbose_name': 'Phân khúc nhận thông báo',
+                'verbose_name_plural': 'Phân khúc nhận thông báo',
+                'db_table': 'erp_notification_segments',
+                'ordering': ['ten'],
+            },
+        ),
+        migrations.AddField(
+            model_name='thongbao',
+            name='phan_khuc',
+            field=models.ForeignKey(blank=True, help_text='Chỉ cần thiết khi chọn "Phân khúc học viên"', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='thong_bao', to='thongbaos.phankhuc', verbose_name='Phân khúc'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.2 on 2026-10-18 21:51
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hocviens', '0010_populate_search_fields'),
+        ('thongbaos', '0004_segments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TinNhanGuiDi',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kenh', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS')], max_length=10, verbose_name='Kênh')),
+                ('loai', models.CharField(choices=[('thong_bao', 'Thông báo'), ('nhac_no', 'Nhắc học phí')], max_length=20, verbose_name='Loại tin')),
+                ('dot', models.CharField(max_length=100, verbose_name='Đợt gửi')),
+                ('dia_chi', models.CharField(max_length=254, verbose_name='Email / số điện thoại')),
+                ('tieu_de', models.CharField(blank=True, default='', max_length=200, verbose_name='Tiêu đề')),
+                ('noi_dung', models.TextField(verbose_name='Nội dung')),
+                ('trang_thai', models.CharField(choices=[('cho_gui', 'Chờ gửi'), ('dang_gui', 'Đang gửi'), ('da_gui', 'Đã gửi'), ('loi', 'Lỗi')], default='cho_gui', max_length=20, verbose_name='Trạng thái')),
+                ('gui_luc', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Gửi từ lúc')),
+                ('so_lan_gui', models.PositiveSmallIntegerField(default=0, verbose_name='Số lần gửi')),
+                ('da_gui_luc', models.DateTimeField(blank=True, null=True, verbose_name='Đã gửi lúc')),
+                ('loi', models.TextField(blank=True, default='', verbose_name='Lỗi gần nhất')),
+                ('hocvien', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hocviens.hocvien', verbose_name='Học viên')),
+                ('thongbao', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tin_nhan_gui_di', to='thongbaos.thongbao', verbose_name='Thông báo')),
+            ],
+            options={
+                'verbose_name': 'Tin gửi ra ngoài',
+                'verbose_name_plural': 'Tin gửi ra ngoài',
+                'db_table': 'erp_notification_outbox',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('trang_thai__in', ['cho_gui', 'dang_gui'])), fields=['kenh', 'gui_luc'], name='erp_outbox_pending_idx'), models.Index(fields=['thongbao', 'trang_thai'], name='erp_outbox_thongbao_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tinnhanguidi',
+            constraint=models.UniqueConstraint(fields=('dot', 'kenh', 'dia_chi'), name='erp_outbox_dot_dia_chi_uniq'),
+        ),
+    ]
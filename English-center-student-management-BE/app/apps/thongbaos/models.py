@@ -1,8 +1,111 @@
 from django.db import models
+from django.db.models import Count, Q
+from django.utils import timezone
 from app.core.models import BaseModel
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.hocviens.models import HocVien
+from app.apps.khoahocs.models import KhoaHoc
+from app.apps.lophocs.models import LopHoc
 from app.apps.users.models import User
 
 
+class PhanKhuc(BaseModel):
+    """
+    Phân khúc học viên / lead để gửi thông báo. Các điều kiện được để trống thì bỏ qua, các điều kiện
+    có giá trị kết hợp bằng AND và được biên dịch thành MỘT queryset (hocvien_queryset), dùng thẳng
+    làm subquery khi đưa thông báo vào hộp thư (inbox.py).
+    """
+    DOI_TUONG_CHOICES = [
+        ('hocvien', 'Học viên'),
+        ('lead', 'Lead'),
+        ('tatca', 'Học viên và lead'),
+    ]
+    # đăng ký còn hiệu lực khi lọc theo khóa học / lớp học
+    DANG_KY_STATUSES = ('dang_ky', 'dang_hoc', 'hoan_thanh')
+
+    ten = models.CharField(max_length=200, verbose_name='Tên phân khúc')
+    mo_ta = models.TextField(blank=True, default='', verbose_name='Mô tả')
+    doi_tuong = models.CharField(
+        max_length=20, choices=DOI_TUONG_CHOICES, default='hocvien', verbose_name='Đối tượng'
+    )
+    khoa_hoc = models.ForeignKey(
+        KhoaHoc,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Đăng ký khóa học'
+    )
+    # học viên của lớp = học viên đăng ký khóa học của lớp (như danh sách học viên ở lophocs)
+    lop_hoc = models.ForeignKey(
+        LopHoc,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Học viên lớp'
+    )
+    trang_thai_hoc_phi = models.CharField(
+        max_length=20, choices=HocVien.TRANG_THAI_HOC_PHI_CHOICES, blank=True, default='',
+        verbose_name='Trạng thái học phí'
+    )
+    concern_level = models.CharField(
+        max_length=16, choices=HocVien.CONCERN_LEVEL_CHOICES, blank=True, default='',
+        verbose_name='Mức độ quan tâm'
+    )
+    sourced = models.CharField(max_length=64, blank=True, default='', verbose_name='Nguồn')
+
+    class Meta:
+        verbose_name = 'Phân khúc nhận thông báo'
+        verbose_name_plural = 'Phân khúc nhận thông báo'
+        ordering = ['ten']
+        db_table = 'erp_notification_segments'
+
+    def __str__(self):
+        return self.ten
+
+    def hocvien_queryset(self):
+        """
+        Học viên / lead thuộc phân khúc (chưa thực thi: dùng làm subquery hoặc COUNT)
+        """
+        is_lead = Q(created_as_lead=True, is_converted=False)
+        queryset = HocVien.objects.order_by()
+        if self.doi_tuong == 'lead':
+            queryset = queryset.filter(is_lead)
+        elif self.doi_tuong == 'hocvien':
+            queryset = queryset.exclude(is_lead)
+
+        enrolled = DangKyKhoaHoc.objects.filter(trang_thai__in=self.DANG_KY_STATUSES)
+        if self.khoa_hoc_id:
+            queryset = queryset.filter(pk__in=enrolled.filter(khoahoc_id=self.khoa_hoc_id).values('hocvien_id'))
+        if self.lop_hoc_id:
+            lop = LopHoc.objects.filter(pk=self.lop_hoc_id).values('khoa_hoc_id')
+            queryset = queryset.filter(pk__in=enrolled.filter(khoahoc_id__in=lop).values('hocvien_id'))
+        for field in ('trang_thai_hoc_phi', 'concern_level', 'sourced'):
+            value = getattr(self, field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset
+
+    def user_queryset(self):
+        """
+        Tài khoản (đang hoạt động) liên kết với học viên / lead thuộc phân khúc
+        """
+        return User.objects.filter(is_active=True, hocvien__in=self.hocvien_queryset()).order_by()
+
+    def audience(self):
+        """
+        Quy mô phân khúc bằng MỘT truy vấn COUNT: tổng số, số có tài khoản (nhận trong app),
+        số có email / số điện thoại
+        """
+        return self.hocvien_queryset().aggregate(
+            tong=Count('pk'),
+            co_tai_khoan=Count('pk', filter=Q(user__is_active=True)),
+            co_email=Count('pk', filter=~Q(email='')),
+            co_sdt=Count('pk', filter=~Q(sdt='')),
+        )
+
+
 class ThongBao(BaseModel):
     """
     Model quản lý thông báo
@@ -12,6 +115,7 @@ class ThongBao(BaseModel):
         ('hocvien', 'Học viên'),
         ('nhanvien', 'Nhân viên'),
         ('user', 'Người dùng cụ thể'),
+        ('phan_khuc', 'Phân khúc học viên'),
     ]
 
     tieu_de = models.CharField(max_length=200, verbose_name='Tiêu đề')
@@ -31,6 +135,15 @@ class ThongBao(BaseModel):
         verbose_name='Người dùng cụ thể',
         help_text='Chỉ cần thiết khi chọn "Người dùng cụ thể"'
     )
+    phan_khuc = models.ForeignKey(
+        PhanKhuc,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='thong_bao',
+        verbose_name='Phân khúc',
+        help_text='Chỉ cần thiết khi chọn "Phân khúc học viên"'
+    )
     trang_thai = models.CharField(
         max_length=20,
         choices=[
@@ -59,6 +172,11 @@ class ThongBao(BaseModel):
         verbose_name_plural = 'Thông báo'
         ordering = ['-ngay_gui']
         db_table = 'erp_notifications'
+        indexes = [
+            models.Index(fields=['trang_thai', '-ngay_gui'], name='erp_notif_trang_thai_idx'),
+            models.Index(fields=['loai_thong_bao', '-ngay_gui'], name='erp_notif_loai_idx'),
+            models.Index(fields=['nguoi_nhan', '-ngay_gui'], name='erp_notif_nguoi_nhan_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tieu_de} - {self.ngay_gui.strftime('%d/%m/%Y %H:%M')}"
@@ -66,8 +184,141 @@ class ThongBao(BaseModel):
     def get_nguoi_nhan_display_name(self):
         if self.nguoi_nhan == 'user' and self.user:
             return f"Người dùng: {self.user.get_full_name()}"
+        if self.nguoi_nhan == 'phan_khuc' and self.phan_khuc:
+            return f"Phân khúc: {self.phan_khuc.ten}"
         return self.get_nguoi_nhan_display()
 
     @property
     def is_public(self):
         return self.nguoi_nhan in ['tatca', 'hocvien', 'nhanvien']
+
+
+class ThongBaoNguoiNhan(models.Model):
+    """
+    Hộp thư: một dòng cho mỗi người nhận của thông báo đã gửi (xem inbox.py), mang trạng thái đã đọc.
+    """
+    thongbao = models.ForeignKey(
+        ThongBao,
+        on_delete=models.CASCADE,
+        related_name='nguoi_nhan_list',
+        verbose_name='Thông báo'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='hop_thu',
+        verbose_name='Người nhận'
+    )
+    ngay_nhan = models.DateTimeField(verbose_name='Ngày nhận')
+    da_doc = models.BooleanField(default=False, verbose_name='Đã đọc')
+    doc_luc = models.DateTimeField(null=True, blank=True, verbose_name='Đọc lúc')
+
+    class Meta:
+        verbose_name = 'Hộp thư thông báo'
+        verbose_name_plural = 'Hộp thư thông báo'
+        ordering = ['-ngay_nhan']
+        db_table = 'erp_notification_inbox'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'thongbao'], name='erp_inbox_user_thongbao_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-ngay_nhan'], name='erp_inbox_user_ngay_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.thongbao_id}"
+
+
+class SoThongBaoChuaDoc(models.Model):
+    """
+    Số thông báo chưa đọc của từng người dùng, cộng/trừ cùng lúc với hộp thư (inbox.py):
+    đọc số chưa đọc chỉ là đọc một dòng theo khóa chính.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='so_thong_bao_chua_doc',
+        verbose_name='Người dùng'
+    )
+    chua_doc = models.PositiveIntegerField(default=0, verbose_name='Chưa đọc')
+
+    class Meta:
+        verbose_name = 'Số thông báo chưa đọc'
+        verbose_name_plural = 'Số thông báo chưa đọc'
+        db_table = 'erp_notification_unread'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.chua_doc}"
+
+
+class TinNhanGuiDi(BaseModel):
+    """
+    Hàng đợi email / SMS gửi ra ngoài (xem delivery.py): mỗi dòng là một tin đã render sẵn cho một
+    địa chỉ, mang trạng thái gửi của riêng nó. `dot` là khóa của đợt gửi (thông báo, ngày nhắc nợ):
+    cùng đợt không xếp hàng trùng một địa chỉ hai lần.
+    """
+    KENH_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    ]
+    LOAI_CHOICES = [
+        ('thong_bao', 'Thông báo'),
+        ('nhac_no', 'Nhắc học phí'),
+    ]
+    TRANG_THAI_CHOICES = [
+        ('cho_gui', 'Chờ gửi'),
+        ('dang_gui', 'Đang gửi'),
+        ('da_gui', 'Đã gửi'),
+        ('loi', 'Lỗi'),
+    ]
+
+    kenh = models.CharField(max_length=10, choices=KENH_CHOICES, verbose_name='Kênh')
+    loai = models.CharField(max_length=20, choices=LOAI_CHOICES, verbose_name='Loại tin')
+    dot = models.CharField(max_length=100, verbose_name='Đợt gửi')
+    thongbao = models.ForeignKey(
+        ThongBao,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tin_nhan_gui_di',
+        verbose_name='Thông báo'
+    )
+    hocvien = models.ForeignKey(
+        HocVien,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Học viên'
+    )
+    dia_chi = models.CharField(max_length=254, verbose_name='Email / số điện thoại')
+    tieu_de = models.CharField(max_length=200, blank=True, default='', verbose_name='Tiêu đề')
+    noi_dung = models.TextField(verbose_name='Nội dung')
+    trang_thai = models.CharField(
+        max_length=20, choices=TRANG_THAI_CHOICES, default='cho_gui', verbose_name='Trạng thái'
+    )
+    # 'cho_gui': gửi từ lúc này (thử lại sau lỗi); 'dang_gui': hết hạn giữ tin của worker đang gửi
+    gui_luc = models.DateTimeField(default=timezone.now, verbose_name='Gửi từ lúc')
+    so_lan_gui = models.PositiveSmallIntegerField(default=0, verbose_name='Số lần gửi')
+    da_gui_luc = models.DateTimeField(null=True, blank=True, verbose_name='Đã gửi lúc')
+    loi = models.TextField(blank=True, default='', verbose_name='Lỗi gần nhất')
+
+    class Meta:
+        verbose_name = 'Tin gửi ra ngoài'
+        verbose_name_plural = 'Tin gửi ra ngoài'
+        ordering = ['-created_at']
+        db_table = 'erp_notification_outbox'
+        constraints = [
+            models.UniqueConstraint(fields=['dot', 'kenh', 'dia_chi'], name='erp_outbox_dot_dia_chi_uniq'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['kenh', 'gui_luc'], name='erp_outbox_pending_idx',
+                condition=Q(trang_thai__in=['cho_gui', 'dang_gui']),
+            ),
+            models.Index(fields=['thongbao', 'trang_thai'], name='erp_outbox_thongbao_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kenh} {self.dia_chi}: {self.get_trang_thai_display()}"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ThongBao
+from .models import PhanKhuc, ThongBao, ThongBaoNguoiNhan, TinNhanGuiDi
 from app.apps.users.serializers import UserSerializer
 
 
@@ -15,31 +15,49 @@ class ThongBaoSerializer(serializers.ModelSerializer):
         model = ThongBao
         fields = [
             'id', 'tieu_de', 'noi_dung', 'ngay_gui', 'nguoi_nhan',
-            'user', 'trang_thai', 'loai_thong_bao', 'user_info',
+            'user', 'phan_khuc', 'trang_thai', 'loai_thong_bao', 'user_info',
             'nguoi_nhan_display', 'is_public', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'ngay_gui', 'created_at', 'updated_at']
 
 
+def validate_nguoi_nhan(attrs, instance=None):
+    """
+    `user` chỉ dùng với nguoi_nhan='user', `phan_khuc` chỉ dùng với nguoi_nhan='phan_khuc'
+    (khi cập nhật một phần thì lấy giá trị còn thiếu từ instance)
+    """
+    def value(name, default=None):
+        return attrs[name] if name in attrs else getattr(instance, name, default)
+
+    nguoi_nhan = value('nguoi_nhan', 'tatca')
+    user = value('user')
+    phan_khuc = value('phan_khuc')
+
+    if nguoi_nhan == 'user' and not user:
+        raise serializers.ValidationError("Phải chọn người dùng cụ thể khi gửi cho người dùng cụ thể.")
+
+    if nguoi_nhan != 'user' and user:
+        raise serializers.ValidationError("Không cần chọn người dùng cụ thể khi gửi cho nhóm người dùng.")
+
+    if nguoi_nhan == 'phan_khuc' and not phan_khuc:
+        raise serializers.ValidationError("Phải chọn phân khúc khi gửi cho phân khúc học viên.")
+
+    if nguoi_nhan != 'phan_khuc' and phan_khuc:
+        raise serializers.ValidationError("Chỉ chọn phân khúc khi gửi cho phân khúc học viên.")
+
+    return attrs
+
+
 class ThongBaoCreateSerializer(serializers.ModelSerializer):
     """
     Serializer để tạo ThongBao mới
     """
     class Meta:
         model = ThongBao
-        fields = ['tieu_de', 'noi_dung', 'nguoi_nhan', 'user', 'loai_thong_bao']
+        fields = ['tieu_de', 'noi_dung', 'nguoi_nhan', 'user', 'phan_khuc', 'loai_thong_bao']
 
     def validate(self, attrs):
-        nguoi_nhan = attrs.get('nguoi_nhan')
-        user = attrs.get('user')
-        
-        if nguoi_nhan == 'user' and not user:
-            raise serializers.ValidationError("Phải chọn người dùng cụ thể khi gửi cho người dùng cụ thể.")
-        
-        if nguoi_nhan != 'user' and user:
-            raise serializers.ValidationError("Không cần chọn người dùng cụ thể khi gửi cho nhóm người dùng.")
-        
-        return attrs
+        return validate_nguoi_nhan(attrs)
 
 
 class ThongBaoUpdateSerializer(serializers.ModelSerializer):
@@ -48,7 +66,10 @@ class ThongBaoUpdateSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = ThongBao
-        fields = ['tieu_de', 'noi_dung', 'nguoi_nhan', 'user', 'trang_thai', 'loai_thong_bao']
+        fields = ['tieu_de', 'noi_dung', 'nguoi_nhan', 'user', 'phan_khuc', 'trang_thai', 'loai_thong_bao']
+
+    def validate(self, attrs):
+        return validate_nguoi_nhan(attrs, self.instance)
 
 
 class ThongBaoDetailSerializer(serializers.ModelSerializer):
@@ -63,7 +84,81 @@ class ThongBaoDetailSerializer(serializers.ModelSerializer):
         model = ThongBao
         fields = [
             'id', 'tieu_de', 'noi_dung', 'ngay_gui', 'nguoi_nhan',
-            'user', 'trang_thai', 'loai_thong_bao', 'user_info',
+            'user', 'phan_khuc', 'trang_thai', 'loai_thong_bao', 'user_info',
             'nguoi_nhan_display', 'is_public', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'ngay_gui', 'created_at', 'updated_at']
+
+
+class ThongBaoHopThuSerializer(serializers.ModelSerializer):
+    """
+    Một thông báo trong hộp thư của người dùng, kèm trạng thái đã đọc
+    """
+    thongbao_id = serializers.UUIDField(read_only=True)
+    tieu_de = serializers.CharField(source='thongbao.tieu_de', read_only=True)
+    noi_dung = serializers.CharField(source='thongbao.noi_dung', read_only=True)
+    loai_thong_bao = serializers.CharField(source='thongbao.loai_thong_bao', read_only=True)
+    nguoi_nhan = serializers.CharField(source='thongbao.nguoi_nhan', read_only=True)
+
+    class Meta:
+        model = ThongBaoNguoiNhan
+        fields = [
+            'thongbao_id', 'tieu_de', 'noi_dung', 'loai_thong_bao', 'nguoi_nhan',
+            'ngay_nhan', 'da_doc', 'doc_luc'
+        ]
+
+
+class DanhDauDaDocSerializer(serializers.Serializer):
+    """
+    Đánh dấu đã đọc: danh sách `ids` (id thông báo) hoặc `all=true` cho toàn bộ hộp thư
+    """
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, max_length=1000)
+    all = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        if not attrs['all'] and not attrs.get('ids'):
+            raise serializers.ValidationError("Phải truyền danh sách ids hoặc all=true.")
+        return attrs
+
+
+class PhanKhucSerializer(serializers.ModelSerializer):
+    """
+    Phân khúc nhận thông báo; điều kiện để trống thì bỏ qua
+    """
+    doi_tuong_display = serializers.CharField(source='get_doi_tuong_display', read_only=True)
+
+    class Meta:
+        model = PhanKhuc
+        fields = [
+            'id', 'ten', 'mo_ta', 'doi_tuong', 'doi_tuong_display', 'khoa_hoc', 'lop_hoc',
+            'trang_thai_hoc_phi', 'concern_level', 'sourced', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class GuiRaNgoaiSerializer(serializers.Serializer):
+    """
+    Gửi bản email / SMS của thông báo tới học viên nhận
+    """
+    kenh = serializers.MultipleChoiceField(choices=TinNhanGuiDi.KENH_CHOICES, default=['email'])
+
+    def validate_kenh(self, value):
+        if not value:
+            raise serializers.ValidationError("Phải chọn ít nhất một kênh gửi.")
+        return sorted(value)
+
+
+class TinNhanGuiDiSerializer(serializers.ModelSerializer):
+    """
+    Tin email / SMS trong hàng đợi gửi ra ngoài, kèm trạng thái gửi
+    """
+    trang_thai_display = serializers.CharField(source='get_trang_thai_display', read_only=True)
+
+    class Meta:
+        model = TinNhanGuiDi
+        fields = [
+            'id', 'kenh', 'loai', 'dot', 'thongbao', 'hocvien', 'dia_chi', 'tieu_de', 'noi_dung',
+            'trang_thai', 'trang_thai_display', 'so_lan_gui', 'gui_luc', 'da_gui_luc', 'loi',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
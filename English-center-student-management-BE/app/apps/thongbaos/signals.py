@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from app.core.tracking import previous_values, track_changes
+from .models import ThongBao
+from . import inbox, tasks
+
+track_changes(ThongBao, inbox.FIELDS)
+
+
+@receiver(post_save, sender=ThongBao, dispatch_uid='thongbaos_inbox_save')
+def update_inbox_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_values = None if created else previous_values(instance)
+    new_values = {field: getattr(instance, field) for field in inbox.FIELDS}
+    if inbox.needs_sync(old_values, new_values):
+        tasks.sync_inbox.enqueue(thongbao_id=instance.pk)
+
+
+@receiver(pre_delete, sender=ThongBao, dispatch_uid='thongbaos_inbox_delete')
+def update_inbox_on_delete(sender, instance, **kwargs):
+    # trước khi hộp thư bị xóa cascade: trừ số chưa đọc của người nhận
+    inbox.withdraw(instance.pk)
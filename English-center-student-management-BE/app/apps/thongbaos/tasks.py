@@ -0,0 +1,46 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from app.core.jobs import task
+from app.core.models import Job
+from . import delivery, inbox
+
+
+@task
+def sync_inbox(thongbao_id):
+    """
+    Đồng bộ hộp thư người nhận với thông báo (xem inbox.sync)
+    """
+    return inbox.sync(thongbao_id)
+
+
+@task
+def send_outbox(kenh):
+    """
+    Gửi một lô email / SMS đang chờ (xem delivery.send_batch) rồi hẹn lần chạy tiếp nếu còn tin
+    """
+    result = delivery.send_batch(kenh)
+    due = delivery.next_due(kenh)
+    if due is not None:
+        dispatch_outbox(kenh, run_at=due)
+    return result
+
+
+def dispatch_outbox(kenh, run_at=None):
+    """
+    Đảm bảo có một job send_outbox đang chờ cho kênh `kenh` (chạy từ `run_at`). Mỗi kênh chỉ giữ một
+    job chờ: tốc độ gửi OUTBOUND_*_RATE áp dụng cho cả kênh, không nhân lên theo số worker.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        # khóa theo kênh tới hết giao dịch: hai tiến trình gọi cùng lúc không cùng thấy "chưa có job"
+        # rồi cùng tạo job mới
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'{send_outbox.task_name}:{kenh}'])
+        waiting = (
+            Job.objects.filter(task=send_outbox.task_name, kwargs__kenh=kenh, status='queued')
+            .order_by('run_at').first()
+        )
+        if waiting is None:
+            return send_outbox.enqueue(kenh=kenh, run_at=run_at)
+        if run_at is None or run_at < waiting.run_at:
+            Job.objects.filter(pk=waiting.pk, status='queued').update(run_at=run_at or timezone.now())
+        return waiting
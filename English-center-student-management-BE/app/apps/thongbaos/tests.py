@@ -0,0 +1,314 @@
+import threading
+
+from django.conf import settings
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.test import APIClient
+
+from app.apps.dangky.models import DangKyKhoaHoc
+from app.apps.hocviens.models import HocVien
+from app.apps.khoahocs.models import KhoaHoc
+from app.apps.lophocs.models import LopHoc
+from app.apps.thongbaos import inbox, tasks
+from app.apps.thongbaos.models import PhanKhuc, SoThongBaoChuaDoc, ThongBao, ThongBaoNguoiNhan, TinNhanGuiDi
+from app.apps.users.models import User
+from app.core import jobs, sms
+from app.core.models import Job
+
+
+class HopThuThongBaoTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='x', role='admin')
+        self.sales = User.objects.create_user(username='sales1', password='x', role='sales_staff')
+        self.finance = User.objects.create_user(username='finance1', password='x', role='finance_staff')
+        self.student = User.objects.create_user(username='hv1', password='x', role='giangvien')
+        HocVien.objects.create(ten='A', email='a@example.com', sdt='0912345678', user=self.student)
+        self.client = APIClient()
+
+    def unread(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get(reverse('thongbaos:thongbao-unread-count')).data['chua_doc']
+
+    def send(self, nguoi_nhan='nhanvien', **kwargs):
+        thongbao = ThongBao.objects.create(tieu_de='Nghỉ lễ', noi_dung='...', nguoi_nhan=nguoi_nhan, **kwargs)
+        thongbao.trang_thai = 'da_gui'
+        thongbao.save()
+        jobs.run_pending()
+        return thongbao
+
+    def test_fan_out_when_sent(self):
+        draft = ThongBao.objects.create(tieu_de='Nháp', noi_dung='...', nguoi_nhan='tatca')
+        self.assertEqual(jobs.run_pending(), 0)
+        self.assertFalse(ThongBaoNguoiNhan.objects.filter(thongbao=draft).exists())
+
+        self.send('nhanvien')
+        self.send('hocvien')
+        self.assertEqual(self.unread(self.sales), 1)
+        self.assertEqual(self.unread(self.student), 1)
+        # admin nhận mọi thông báo (như danh sách công khai)
+        self.assertEqual(self.unread(self.admin), 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.unread(self.finance), 1)
+
+    def test_public_list_matches_inbox(self):
+        self.send('nhanvien')
+        self.send('hocvien')
+        # tài khoản liên kết học viên (role giảng viên) thấy đúng thông báo đã vào hộp thư của mình
+        for user in (self.student, self.sales, self.admin):
+            self.client.force_authenticate(user)
+            listed = self.client.get(reverse('thongbaos:thongbao-public'), {'page': 1}).data
+            self.assertEqual(listed['count'], self.unread(user), user.username)
+        self.assertEqual(self.unread(self.student), 1)
+
+    def test_mark_read(self):
+        first, second = self.send(), self.send()
+        self.client.force_authenticate(self.sales)
+        response = self.client.post(reverse('thongbaos:thongbao-mark-read'), {'ids': [first.id]}, format='json')
+        self.assertEqual(response.data, {'da_danh_dau': 1, 'chua_doc': 1})
+        # đánh dấu lại không trừ số chưa đọc lần nữa
+        response = self.client.post(reverse('thongbaos:thongbao-mark-read'), {'ids': [first.id]}, format='json')
+        self.assertEqual(response.data, {'da_danh_dau': 0, 'chua_doc': 1})
+
+        unread = self.client.get(reverse('thongbaos:thongbao-inbox'), {'da_doc': 'false'}).data
+        self.assertEqual([item['thongbao_id'] for item in unread['results']], [str(second.id)])
+
+        response = self.client.post(reverse('thongbaos:thongbao-mark-read'), {'all': True}, format='json')
+        self.assertEqual(response.data, {'da_danh_dau': 1, 'chua_doc': 0})
+        self.assertEqual(self.unread(self.finance), 2)
+
+    def test_withdraw_and_retarget(self):
+        thongbao = self.send('nhanvien')
+        self.client.force_authenticate(self.finance)
+        self.client.post(reverse('thongbaos:thongbao-mark-read'), {'all': True}, format='json')
+
+        # mở rộng nhóm nhận: người đã đọc giữ trạng thái đã đọc
+        thongbao.nguoi_nhan = 'tatca'
+        thongbao.save()
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual([self.unread(user) for user in (self.finance, self.sales, self.admin)], [0, 1, 1])
+
+        thongbao.nguoi_nhan = 'user'
+        thongbao.user = self.student
+        thongbao.save()
+        jobs.run_pending()
+        self.assertEqual([self.unread(user) for user in (self.sales, self.admin, self.student)], [0, 1, 1])
+        self.assertEqual(ThongBaoNguoiNhan.objects.count(), 2)
+
+        thongbao.trang_thai = 'huy_bo'
+        thongbao.save()
+        jobs.run_pending()
+        self.assertEqual(self.unread(self.student), 0)
+
+        deleted = self.send('tatca')
+        deleted.delete()
+        self.assertEqual(self.unread(self.admin), 0)
+        self.assertFalse(ThongBaoNguoiNhan.objects.exists())
+
+    def test_rebuild(self):
+        self.send('tatca')
+        ThongBao.objects.create(tieu_de='Không qua signal', noi_dung='...', nguoi_nhan='nhanvien')
+        ThongBao.objects.filter(nguoi_nhan='nhanvien').update(trang_thai='da_gui')
+        SoThongBaoChuaDoc.objects.filter(user=self.admin).update(chua_doc=7)
+
+        self.assertEqual(inbox.rebuild(), 4 + 3)
+        self.assertEqual(self.unread(self.admin), 2)
+        self.assertEqual(self.unread(self.sales), 2)
+
+
+class PhanKhucTest(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username='sales1', password='x', role='sales_staff')
+        self.ielts = KhoaHoc.objects.create(ten='IELTS', lich_hoc='T2-T4', giang_vien='A', so_buoi=10, hoc_phi=1000)
+        toeic = KhoaHoc.objects.create(ten='TOEIC', lich_hoc='T3-T5', giang_vien='B', so_buoi=10, hoc_phi=1000)
+        self.lop = LopHoc.objects.create(ten='IELTS-1', khoa_hoc=self.ielts, ngay_bat_dau='2024-01-01')
+
+        self.users = {}
+        for index, (khoahoc, hoc_phi, trang_thai) in enumerate([
+            (self.ielts, 'conno', 'dang_hoc'),
+            (self.ielts, 'dadong', 'dang_hoc'),
+            (self.ielts, 'conno', 'huy'),
+            (toeic, 'conno', 'dang_hoc'),
+        ]):
+            user = User.objects.create_user(username=f'hv{index}', password='x', role='giangvien')
+            hocvien = HocVien.objects.create(
+                ten=f'HV {index}', email=f'hv{index}@example.com', sdt=f'091234567{index}', user=user,
+            )
+            DangKyKhoaHoc.objects.create(hocvien=hocvien, khoahoc=khoahoc, trang_thai=trang_thai)
+            # trạng thái học phí bình thường do sổ công nợ suy ra: gán thẳng cho dữ liệu kiểm thử
+            HocVien.objects.filter(pk=hocvien.pk).update(trang_thai_hoc_phi=hoc_phi)
+            self.users[index] = user
+        lead = HocVien.objects.create(ten='Lead', email='lead@example.com', sdt='0987654321', created_as_lead=True,
+                                      sourced='facebook')
+        HocVien.objects.filter(pk=lead.pk).update(trang_thai_hoc_phi='conno')
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_audience(self):
+        no_hoc_phi = PhanKhuc.objects.create(ten='Nợ học phí IELTS', khoa_hoc=self.ielts, trang_thai_hoc_phi='conno')
+        with self.assertNumQueries(1):
+            self.assertEqual(no_hoc_phi.audience(), {'tong': 1, 'co_tai_khoan': 1, 'co_email': 1, 'co_sdt': 1})
+
+        response = self.client.get(reverse('thongbaos:phankhuc-audience', args=[no_hoc_phi.pk]))
+        self.assertEqual(response.data['tong'], 1)
+
+        # xem trước định nghĩa chưa lưu
+        preview = reverse('thongbaos:phankhuc-preview')
+        response = self.client.post(preview, {'lop_hoc': str(self.lop.pk)}, format='json')
+        self.assertEqual(response.data['tong'], 2)
+        response = self.client.post(preview, {'doi_tuong': 'lead', 'sourced': 'facebook'}, format='json')
+        self.assertEqual(response.data, {'tong': 1, 'co_tai_khoan': 0, 'co_email': 1, 'co_sdt': 1})
+        response = self.client.post(preview, {'doi_tuong': 'tatca', 'trang_thai_hoc_phi': 'conno'}, format='json')
+        self.assertEqual(response.data['tong'], 4)
+
+    def test_send_to_segment(self):
+        response = self.client.post(reverse('thongbaos:phankhuc-list'), {
+            'ten': 'Nợ học phí', 'trang_thai_hoc_phi': 'conno',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        phan_khuc = PhanKhuc.objects.get(pk=response.data['id'])
+
+        response = self.client.post(reverse('thongbaos:thongbao-list'), {
+            'tieu_de': 'Nhắc học phí', 'noi_dung': '...', 'nguoi_nhan': 'phan_khuc',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        admin = User.objects.create_user(username='admin1', password='x', role='admin')
+        thongbao = ThongBao.objects.create(tieu_de='Nhắc học phí', noi_dung='...', nguoi_nhan='phan_khuc',
+                                           phan_khuc=phan_khuc, trang_thai='da_gui')
+        jobs.run_pending()
+        self.assertEqual(
+            set(ThongBaoNguoiNhan.objects.filter(thongbao=thongbao).values_list('user_id', flat=True)),
+            {self.users[0].pk, self.users[2].pk, self.users[3].pk, admin.pk},
+        )
+
+        # thu hẹp phân khúc rồi gửi lại: chỉ còn học viên IELTS
+        phan_khuc.khoa_hoc = self.ielts
+        phan_khuc.save()
+        self.assertEqual(inbox.sync(thongbao.pk), {'them': 0, 'rut': 2})
+        self.assertEqual(inbox.unread_count(self.users[0]), 1)
+        self.assertEqual(inbox.unread_count(self.users[3]), 0)
+
+
+class CountingEmailBackend(EmailBackend):
+    """
+    locmem đếm số kết nối được mở; địa chỉ bắt đầu bằng 'loi' luôn gửi lỗi
+    """
+    connections = 0
+
+    def open(self):
+        if getattr(self, 'connected', False):
+            return False
+        self.connected = True
+        CountingEmailBackend.connections += 1
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def send_messages(self, messages):
+        if any(address.startswith('loi') for message in messages for address in message.to):
+            raise ConnectionResetError('SMTP đóng kết nối')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='app.apps.thongbaos.tests.CountingEmailBackend', SMS_BACKEND='app.core.sms.LocMemBackend',
+    OUTBOUND_EMAIL_RATE=0, OUTBOUND_SMS_RATE=0, OUTBOUND_MAX_ATTEMPTS=2,
+)
+class GuiRaNgoaiTest(TestCase):
+    def setUp(self):
+        import_string(settings.EMAIL_BACKEND).connections = 0
+        sms.outbox.clear()
+        self.staff = User.objects.create_user(username='sales1', password='x', role='sales_staff')
+        khoahoc = KhoaHoc.objects.create(ten='IELTS', lich_hoc='T2-T4', giang_vien='A', so_buoi=10, hoc_phi=1500000)
+        for index, email in enumerate(['a@example.com', 'b@example.com', 'loi@example.com']):
+            hocvien = HocVien.objects.create(ten=f'HV {index}', email=email, sdt=f'091234567{index}')
+            DangKyKhoaHoc.objects.create(hocvien=hocvien, khoahoc=khoahoc, trang_thai='dang_hoc')
+        # chưa đăng ký khóa nào: 'chuadong' nhưng không nợ
+        HocVien.objects.create(ten='Mới', email='moi@example.com', sdt='0987654321')
+
+    def test_debt_reminders(self):
+        call_command('send_debt_reminders', '--kenh', 'email', 'sms', '--inline', '--ngay=2026-10-18', stdout=None)
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['a@example.com', 'b@example.com'])
+        self.assertIn('1.500.000 VNĐ', mail.outbox[0].body)
+        self.assertEqual(len(sms.outbox), 3)
+        # cả lô dùng một kết nối, chỉ mở lại sau lần gửi lỗi (nếu tin lỗi không phải tin cuối)
+        self.assertIn(import_string(settings.EMAIL_BACKEND).connections, (1, 2))
+
+        failed = TinNhanGuiDi.objects.get(dia_chi='loi@example.com')
+        self.assertEqual((failed.trang_thai, failed.so_lan_gui), ('cho_gui', 1))
+        self.assertIn('ConnectionResetError', failed.loi)
+
+        # chạy lại cùng ngày không xếp hàng trùng
+        call_command('send_debt_reminders', '--kenh', 'email', 'sms', '--ngay=2026-10-18', stdout=None)
+        self.assertEqual(TinNhanGuiDi.objects.count(), 6)
+
+    def test_send_thongbao(self):
+        thongbao = ThongBao.objects.create(tieu_de='Nghỉ lễ', noi_dung='Nghỉ ngày 2/9', nguoi_nhan='hocvien')
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        url = reverse('thongbaos:thongbao-outbound', args=[thongbao.pk])
+        self.assertEqual(client.post(url, {'kenh': ['email']}, format='json').status_code, 400)
+
+        ThongBao.objects.filter(pk=thongbao.pk).update(trang_thai='da_gui')
+        response = client.post(url, {'kenh': ['email']}, format='json')
+        self.assertEqual(response.data, {'da_xep_hang': {'email': 4}})
+        client.post(url, {'kenh': ['email']}, format='json')
+        self.assertEqual(Job.objects.filter(status='queued').count(), 1)
+
+        jobs.run_pending()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].subject, 'Nghỉ lễ')
+
+        # tin lỗi được hẹn gửi lại; hết lượt thì chuyển 'loi'
+        retry = TinNhanGuiDi.objects.get(trang_thai='cho_gui')
+        self.assertEqual(Job.objects.get(status='queued').run_at, retry.gui_luc)
+        TinNhanGuiDi.objects.filter(pk=retry.pk).update(gui_luc=thongbao.ngay_gui)
+        Job.objects.filter(status='queued').update(run_at=thongbao.ngay_gui)
+        jobs.run_pending()
+        response = client.get(reverse('thongbaos:outbox-list'), {'trang_thai': 'loi'})
+        self.assertEqual([item['dia_chi'] for item in response.data['results']], ['loi@example.com'])
+        self.assertFalse(Job.objects.filter(status='queued').exists())
+
+
+class DispatchOutboxTest(TransactionTestCase):
+    def test_concurrent_dispatch_keeps_one_job(self):
+        dispatched, release = threading.Event(), threading.Event()
+
+        def first():
+            try:
+                # giữ giao dịch mở sau khi tạo job: job chưa commit nên tiến trình khác chưa thấy
+                with transaction.atomic():
+                    tasks.dispatch_outbox('email')
+                    dispatched.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        def second():
+            try:
+                tasks.dispatch_outbox('email')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        threads[0].start()
+        self.assertTrue(dispatched.wait(5))
+        threads[1].start()
+        # lần gọi thứ hai phải chờ khóa của kênh thay vì tạo job thứ hai
+        threads[1].join(0.3)
+        self.assertTrue(threads[1].is_alive())
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(Job.objects.filter(task=tasks.send_outbox.task_name, status='queued').count(), 1)
+        tasks.dispatch_outbox('sms')
+        self.assertEqual(Job.objects.filter(status='queued').count(), 2)
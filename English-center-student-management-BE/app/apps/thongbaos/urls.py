@@ -6,7 +6,16 @@ app_name = 'thongbaos'
 urlpatterns = [
     path('thongbaos/', views.ThongBaoListView.as_view(), name='thongbao-list'),
     path('thongbaos/<uuid:pk>/', views.ThongBaoDetailView.as_view(), name='thongbao-detail'),
+    path('thongbaos/<uuid:pk>/outbound/', views.thongbao_gui_ra_ngoai, name='thongbao-outbound'),
+    path('thongbaos/outbox/', views.TinNhanGuiDiListView.as_view(), name='outbox-list'),
     path('thongbaos/public/', views.ThongBaoPublicListView.as_view(), name='thongbao-public'),
     path('thongbaos/me/', views.ThongBaoMyListView.as_view(), name='thongbao-me'),
+    path('thongbaos/inbox/', views.ThongBaoHopThuView.as_view(), name='thongbao-inbox'),
+    path('thongbaos/inbox/unread-count/', views.thongbao_chua_doc, name='thongbao-unread-count'),
+    path('thongbaos/inbox/mark-read/', views.thongbao_danh_dau_da_doc, name='thongbao-mark-read'),
+    path('thongbaos/segments/', views.PhanKhucListView.as_view(), name='phankhuc-list'),
+    path('thongbaos/segments/preview/', views.phan_khuc_preview, name='phankhuc-preview'),
+    path('thongbaos/segments/<uuid:pk>/', views.PhanKhucDetailView.as_view(), name='phankhuc-detail'),
+    path('thongbaos/segments/<uuid:pk>/audience/', views.phan_khuc_audience, name='phankhuc-audience'),
     path('thongbaos/stats/', views.thongbao_stats, name='thongbao-stats'),
 ]
@@ -6,18 +6,25 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 from app.core.permissions import IsStaffUser
-from .models import ThongBao
+from app.core.capabilities import HasCapability
+from app.core.cache import cached_view
+from app.core.stats import abreakdown_stats
+from app.core.async_views import async_api_view
+from .models import PhanKhuc, ThongBao, ThongBaoNguoiNhan, TinNhanGuiDi
 from .serializers import (
     ThongBaoSerializer, ThongBaoCreateSerializer,
-    ThongBaoUpdateSerializer, ThongBaoDetailSerializer
+    ThongBaoUpdateSerializer, ThongBaoDetailSerializer,
+    ThongBaoHopThuSerializer, DanhDauDaDocSerializer, PhanKhucSerializer,
+    GuiRaNgoaiSerializer, TinNhanGuiDiSerializer
 )
+from . import delivery, inbox, tasks
 
 
 class ThongBaoListView(generics.ListCreateAPIView):
     """
     Danh sách và tạo thông báo (Admin/Nhân viên)
     """
-    queryset = ThongBao.objects.all()
+    queryset = ThongBao.objects.select_related('user')
     serializer_class = ThongBaoSerializer
     permission_classes = [IsStaffUser]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -57,26 +64,12 @@ class ThongBaoPublicListView(generics.ListAPIView):
     ordering_fields = ['ngay_gui']
 
     def get_queryset(self):
-        user = self.request.user
-        
-        # Lọc thông báo theo quyền truy cập
-        if user.role == 'admin':
-            # Admin xem tất cả
-            return ThongBao.objects.filter(trang_thai='da_gui')
-        elif user.role == 'nhanvien':
-            # Nhân viên xem thông báo cho nhân viên và tất cả
-            return ThongBao.objects.filter(
-                trang_thai='da_gui',
-                nguoi_nhan__in=['tatca', 'nhanvien']
-            )
-        elif user.role == 'hocvien':
-            # Học viên xem thông báo cho học viên và tất cả
-            return ThongBao.objects.filter(
-                trang_thai='da_gui',
-                nguoi_nhan__in=['tatca', 'hocvien']
-            )
-        
-        return ThongBao.objects.none()
+        queryset = ThongBao.objects.filter(trang_thai='da_gui').select_related('user')
+        # cùng quy tắc nhóm nhận với hộp thư: admin xem tất cả, người khác xem nhóm của mình và 'tatca'
+        groups = inbox.audiences(self.request.user)
+        if groups is None:
+            return queryset
+        return queryset.filter(nguoi_nhan__in=groups)
 
 
 class ThongBaoMyListView(generics.ListAPIView):
@@ -95,45 +88,128 @@ class ThongBaoMyListView(generics.ListAPIView):
         )
 
 
+class ThongBaoHopThuView(generics.ListAPIView):
+    """
+    Hộp thư thông báo của user đang đăng nhập (lọc ?da_doc=false để lấy thông báo chưa đọc)
+    """
+    serializer_class = ThongBaoHopThuSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['da_doc']
+
+    def get_queryset(self):
+        return ThongBaoNguoiNhan.objects.filter(user=self.request.user).select_related('thongbao')
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def thongbao_stats(request):
+def thongbao_chua_doc(request):
+    """
+    Số thông báo chưa đọc của user đang đăng nhập (đọc một dòng đếm, dùng cho polling)
+    """
+    return Response({'chua_doc': inbox.unread_count(request.user)})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def thongbao_danh_dau_da_doc(request):
+    """
+    Đánh dấu đã đọc nhiều thông báo trong hộp thư: {"ids": [...]} hoặc {"all": true}
+    """
+    serializer = DanhDauDaDocSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = None if serializer.validated_data['all'] else serializer.validated_data['ids']
+    updated, chua_doc = inbox.mark_read(request.user, ids)
+    return Response({'da_danh_dau': updated, 'chua_doc': chua_doc})
+
+
+@api_view(['POST'])
+@permission_classes([IsStaffUser])
+def thongbao_gui_ra_ngoai(request, pk):
+    """
+    Xếp hàng bản email / SMS của thông báo đã gửi cho học viên nhận: {"kenh": ["email", "sms"]}.
+    Gửi lại cùng thông báo không gửi trùng cho địa chỉ đã có trong hàng đợi.
+    """
+    thongbao = generics.get_object_or_404(ThongBao, pk=pk)
+    if thongbao.trang_thai != inbox.SENT:
+        return Response({'detail': 'Chỉ gửi ra ngoài thông báo đã gửi.'}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = GuiRaNgoaiSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    queued = delivery.queue_thongbao(thongbao, serializer.validated_data['kenh'])
+    for kenh in queued:
+        tasks.dispatch_outbox(kenh)
+    return Response({'da_xep_hang': queued}, status=status.HTTP_202_ACCEPTED)
+
+
+class TinNhanGuiDiListView(generics.ListAPIView):
+    """
+    Hàng đợi email / SMS gửi ra ngoài và trạng thái từng tin (Admin/Nhân viên)
+    """
+    queryset = TinNhanGuiDi.objects.all()
+    serializer_class = TinNhanGuiDiSerializer
+    permission_classes = [IsStaffUser]
+    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filterset_fields = ['kenh', 'loai', 'trang_thai', 'thongbao', 'hocvien', 'dot']
+    search_fields = ['dia_chi']
+
+
+class PhanKhucListView(generics.ListCreateAPIView):
+    """
+    Danh sách và tạo phân khúc nhận thông báo (Admin/Nhân viên)
+    """
+    queryset = PhanKhuc.objects.all()
+    serializer_class = PhanKhucSerializer
+    permission_classes = [IsStaffUser]
+    filter_backends = [SearchFilter]
+    search_fields = ['ten']
+
+
+class PhanKhucDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    Chi tiết, cập nhật và xóa phân khúc (Admin/Nhân viên)
+    """
+    queryset = PhanKhuc.objects.all()
+    serializer_class = PhanKhucSerializer
+    permission_classes = [IsStaffUser]
+
+
+@api_view(['GET'])
+@permission_classes([IsStaffUser])
+def phan_khuc_audience(request, pk):
+    """
+    Quy mô của phân khúc đã lưu (một truy vấn COUNT), xem trước khi gửi
+    """
+    phan_khuc = generics.get_object_or_404(PhanKhuc, pk=pk)
+    return Response(phan_khuc.audience())
+
+
+@api_view(['POST'])
+@permission_classes([IsStaffUser])
+def phan_khuc_preview(request):
+    """
+    Quy mô của một định nghĩa phân khúc chưa lưu (body như khi tạo phân khúc, không cần `ten`)
+    """
+    serializer = PhanKhucSerializer(data=request.data, partial=True)
+    serializer.is_valid(raise_exception=True)
+    return Response(PhanKhuc(**serializer.validated_data).audience())
+
+
+@async_api_view(['GET'])
+@permission_classes([HasCapability('notifications.read')])
+@cached_view('notifications')
+async def thongbao_stats(request):
     """
     Thống kê thông báo (Admin/Nhân viên)
     """
-    if request.user.role not in ['admin', 'nhanvien']:
-        return Response({'error': 'Không có quyền truy cập'}, status=status.HTTP_403_FORBIDDEN)
-
-    total_thongbao = ThongBao.objects.count()
-    moi = ThongBao.objects.filter(trang_thai='moi').count()
-    dang_gui = ThongBao.objects.filter(trang_thai='dang_gui').count()
-    da_gui = ThongBao.objects.filter(trang_thai='da_gui').count()
-    huy_bo = ThongBao.objects.filter(trang_thai='huy_bo').count()
-
-    # Thống kê theo loại thông báo
-    thong_bao = ThongBao.objects.filter(loai_thong_bao='thong_bao').count()
-    canh_bao = ThongBao.objects.filter(loai_thong_bao='canh_bao').count()
-    thong_tin = ThongBao.objects.filter(loai_thong_bao='thong_tin').count()
-    khac = ThongBao.objects.filter(loai_thong_bao='khac').count()
-
-    # Thống kê theo người nhận
-    tatca = ThongBao.objects.filter(nguoi_nhan='tatca').count()
-    hocvien = ThongBao.objects.filter(nguoi_nhan='hocvien').count()
-    nhanvien = ThongBao.objects.filter(nguoi_nhan='nhanvien').count()
-    user = ThongBao.objects.filter(nguoi_nhan='user').count()
-
-    return Response({
-        'total_thongbao': total_thongbao,
-        'moi': moi,
-        'dang_gui': dang_gui,
-        'da_gui': da_gui,
-        'huy_bo': huy_bo,
-        'thong_bao': thong_bao,
-        'canh_bao': canh_bao,
-        'thong_tin': thong_tin,
-        'khac': khac,
-        'tatca': tatca,
-        'hocvien': hocvien,
-        'nhanvien': nhanvien,
-        'user': user
-    })
+    # Theo trạng thái, loại thông báo và người nhận: một truy vấn duy nhất
+    stats = await abreakdown_stats(
+        ThongBao,
+        [
+            ('trang_thai', ['moi', 'dang_gui', 'da_gui', 'huy_bo']),
+            ('loai_thong_bao', ['thong_bao', 'canh_bao', 'thong_tin', 'khac']),
+            ('nguoi_nhan', ['tatca', 'hocvien', 'nhanvien', 'user', 'phan_khuc']),
+        ],
+        total='total_thongbao',
+    )
+
+    return Response(stats)
@@ -5,3 +5,8 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.apps.users'
     verbose_name = 'Quản lý người dùng'
+
+    def ready(self):
+        from app.core.authentication import refresh_principal_on_change
+        # role / is_active mới có hiệu lực ngay với request dùng CachedPrincipalJWTAuthentication
+        refresh_principal_on_change(self.get_model('User'))
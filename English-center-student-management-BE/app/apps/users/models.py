@@ -89,19 +89,20 @@ class User(AbstractUser):
             return 'nhanvien'
         return None
 
+    @staticmethod
+    def staff_flags_for_role(role):
+        """(is_staff, is_superuser) tương ứng với role"""
+        if role == 'admin':
+            return True, True
+        if role in ['academic_staff']:
+            return True, False
+        return False, False
+
     def save(self, *args, **kwargs):
         """Override save để tự động set is_staff và is_superuser dựa trên role"""
         # Tự động set is_staff và is_superuser dựa trên role
-        if self.role == 'admin':
-            self.is_staff = True
-            self.is_superuser = True
-        elif self.role in ['academic_staff']:
-            self.is_staff = True
-            self.is_superuser = False
-        else:
-            self.is_staff = False
-            self.is_superuser = False
-        
+        self.is_staff, self.is_superuser = self.staff_flags_for_role(self.role)
+
         super().save(*args, **kwargs)
 
     # Override is_superuser logic nếu cần
@@ -100,3 +100,126 @@ class UserAPITest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['username'], 'student')
+
+
+class CachedPrincipalAuthTest(APITestCase):
+    def setUp(self):
+        from app.core.authentication import clear_local_principals, get_cache
+        get_cache().clear()
+        clear_local_principals()
+        self.user = User.objects.create_user(
+            username='ketoan', email='ketoan@example.com', password='ketoan123', role='finance_staff'
+        )
+        response = self.client.post(reverse('users:login'), {'email': 'ketoan@example.com', 'password': 'ketoan123'})
+        self.tokens = response.data['tokens']
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+
+    def test_identity_without_queries(self):
+        from app.core.authentication import CachedPrincipalJWTAuthentication, clear_local_principals, get_cache
+        from rest_framework.test import APIRequestFactory
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        with self.assertNumQueries(0):
+            user, _ = CachedPrincipalJWTAuthentication().authenticate(request)
+            self.assertEqual((user.pk, user.role, user.is_finance_staff), (self.user.pk, 'finance_staff', True))
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, 'ketoan@example.com')  # field deferred, đọc khi cần
+
+        # cache trống: đọc DB một lần rồi ghi lại cache
+        get_cache().clear()
+        clear_local_principals()
+        with self.assertNumQueries(1):
+            CachedPrincipalJWTAuthentication().authenticate(request)
+        clear_local_principals()
+        with self.assertNumQueries(0):
+            CachedPrincipalJWTAuthentication().authenticate(request)
+
+    def test_deactivation_after_cache_loss(self):
+        from app.core.authentication import clear_local_principals, get_cache
+        # update() không phát signal: chỉ DB biết tài khoản đã bị khóa, token vẫn còn hạn
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        get_cache().clear()
+        clear_local_principals()
+        response = self.client.get('/api/thanhtoans/stats/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change_and_deactivation_apply_immediately(self):
+        url = '/api/thanhtoans/stats/'
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.user.role = 'giangvien'
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        refresh = self.client.post(reverse('users:token_refresh'), {'refresh': self.tokens['refresh']})
+        self.assertEqual(refresh.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_uses_current_role(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        self.user.role = 'admin'
+        self.user.save()
+        response = self.client.post(reverse('users:token_refresh'), {'refresh': self.tokens['refresh']})
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'admin')
+
+
+class CapabilityMatrixTest(APITestCase):
+    def _request(self, role, method='get'):
+        from rest_framework.test import APIRequestFactory
+        request = getattr(APIRequestFactory(), method)('/')
+        request.user = User(username=role, role=role)
+        return request
+
+    def test_permission_by_method(self):
+        from app.core.capabilities import HasCapability
+        permission = HasCapability('finance')()
+        allowed = {
+            role: [m for m in ('get', 'post', 'delete') if permission.has_permission(self._request(role, m), None)]
+            for role in ('admin', 'finance_staff', 'academic_staff', 'sales_staff', 'giangvien', 'hocvien')
+        }
+        self.assertEqual(allowed, {
+            'admin': ['get', 'post', 'delete'],
+            'finance_staff': ['get', 'post', 'delete'],
+            'academic_staff': ['get', 'post'],
+            'sales_staff': ['get'],
+            'giangvien': [],
+            'hocvien': [],
+        })
+        self.assertIs(HasCapability('finance'), type(permission))
+        with self.assertRaises(ValueError):
+            HasCapability('finance.delete')
+
+    def test_stats_for_staff_roles(self):
+        # trước đây các view thống kê so với role 'nhanvien' không tồn tại nên chỉ admin xem được
+        staff = User.objects.create_user(username='hocvu', password='x', role='academic_staff')
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.client.get('/api/chamsoc/stats/').status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(User.objects.create_user(username='gv', password='x', role='giangvien'))
+        self.assertEqual(self.client.get('/api/chamsoc/stats/').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_course_management_list_read_only_for_finance(self):
+        url = '/api/khoahocs/'
+        allowed = {}
+        for role in ('academic_staff', 'finance_staff', 'sales_staff', 'hocvien'):
+            self.client.force_authenticate(User.objects.create_user(username=role, password='x', role=role))
+            allowed[role] = [
+                self.client.get(url).status_code,
+                self.client.post(url, {}, format='json').status_code,
+            ]
+        self.assertEqual(allowed, {
+            'academic_staff': [status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST],
+            'finance_staff': [status.HTTP_200_OK, status.HTTP_403_FORBIDDEN],
+            'sales_staff': [status.HTTP_403_FORBIDDEN, status.HTTP_403_FORBIDDEN],
+            'hocvien': [status.HTTP_403_FORBIDDEN, status.HTTP_403_FORBIDDEN],
+        })
+
+    def test_scope_own_rows(self):
+        from app.apps.hocviens.models import HocVien
+        from app.apps.thanhtoans.models import ThanhToan
+        from app.core.capabilities import scope_queryset
+        user = User.objects.create_user(username='hv', password='x', role='hocvien')
+        hocvien = HocVien.objects.create(ten='Học viên', email='hv@example.com', sdt='0901234567', user=user)
+        self.assertEqual(str(scope_queryset(ThanhToan.objects.all(), user, 'finance').query),
+                         str(ThanhToan.objects.filter(hocvien=hocvien.pk).query))
+        self.assertFalse(scope_queryset(ThanhToan.objects.all(), User(role='giangvien'), 'finance').exists())
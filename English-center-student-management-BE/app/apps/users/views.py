@@ -2,11 +2,11 @@ from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.forms import PasswordChangeForm
 
+from app.core.authentication import PrincipalRefreshToken
 from app.core.permissions import IsAdminUser, IsOwnerOrStaff
 from .models import User
 from .serializers import (
@@ -29,7 +29,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         
         # Tạo JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = PrincipalRefreshToken.for_user(user)
         
         return Response({
             'message': 'Đăng ký thành công!',
@@ -54,7 +54,7 @@ class LoginView(TokenObtainPairView):
         user = serializer.validated_data['user']
         
         # Tạo JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = PrincipalRefreshToken.for_user(user)
         
         return Response({
             'message': 'Đăng nhập thành công!',
@@ -77,7 +77,7 @@ class LogoutView(generics.GenericAPIView):
         if not refresh_token:
             return Response({'error': 'Refresh token không được cung cấp'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            token = RefreshToken(refresh_token)
+            token = PrincipalRefreshToken(refresh_token)
             token.blacklist()
             return Response({'message': 'Đăng xuất thành công!'}, status=status.HTTP_200_OK)
         except Exception:
@@ -0,0 +1,17 @@
+"""
+ASGI config for app project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Chạy bằng gunicorn với worker uvicorn (docker/entrypoint.sh, APP_SERVER=asgi).
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings.dev')
+
+application = get_asgi_application()
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'app.core'
+    label = 'core'
+    verbose_name = 'Hệ thống'
+
+    def ready(self):
+        from app.core import metrics
+        metrics.install()
@@ -0,0 +1,115 @@
+"""
+View DRF chạy async (coroutine) cho các endpoint chỉ đọc, nặng về truy vấn (thống kê, báo cáo).
+
+DRF 3.15 chưa hỗ trợ view async: APIView.dispatch() đồng bộ. AsyncAPIView giữ nguyên luồng xử lý của
+DRF (xác thực, phân quyền, throttle, xử lý exception, renderer) nhưng dispatch() là coroutine, nên
+khi chạy dưới ASGI (app/asgi.py) request đang chờ DB không chiếm một worker/thread.
+
+    @async_api_view(['GET'])
+    @permission_classes([HasCapability('finance.read')])
+    @cached_view('finance')
+    async def thanhtoan_stats(request):
+        by_method, top = await gather_queries(lambda: breakdown_stats(...), lambda: list(...))
+        return Response(...)
+
+Dưới WSGI (gunicorn sync) view async vẫn chạy được: Django tự chạy event loop cho từng request.
+"""
+import asyncio
+import types
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView có handler async (async def get(...)). Django nhận ra view async qua view_is_async.
+    """
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # xác thực / phân quyền có thể đọc cache hoặc DB: chạy ở thread đồng bộ
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def async_api_view(http_method_names=None):
+    """
+    Như @api_view của DRF cho function view `async def`; dùng chung với @permission_classes,
+    @throttle_classes... (đặt bên dưới decorator này).
+    """
+    http_method_names = ['GET'] if http_method_names is None else http_method_names
+
+    def decorator(func):
+        assert not isinstance(http_method_names, types.FunctionType), \
+            '@async_api_view missing list of allowed HTTP methods'
+
+        async def handler(self, *args, **kwargs):
+            return await func(*args, **kwargs)
+
+        attrs = {'__doc__': func.__doc__}
+        attrs['http_method_names'] = [method.lower() for method in set(http_method_names) | {'options'}]
+        for method in http_method_names:
+            attrs[method.lower()] = handler
+        for name in (
+            'renderer_classes', 'parser_classes', 'authentication_classes', 'throttle_classes',
+            'permission_classes', 'schema',
+        ):
+            attrs[name] = getattr(func, name, getattr(APIView, name))
+
+        WrappedAPIView = type(func.__name__, (AsyncAPIView,), attrs)
+        WrappedAPIView.__module__ = func.__module__
+        return WrappedAPIView.as_view()
+
+    return decorator
+
+
+def _in_own_connection(query, using):
+    def run():
+        try:
+            return query()
+        finally:
+            # trả kết nối của thread này về pool (thread trong executor không có vòng đời request)
+            connections[using].close()
+    return run
+
+
+def _can_run_concurrently(using):
+    connection = connections[using]
+    return bool(connection.settings_dict['OPTIONS'].get('pool')) and not connection.in_atomic_block
+
+
+async def gather_queries(*queries, using=DEFAULT_DB_ALIAS):
+    """
+    Chạy đồng thời các hàm truy vấn đồng bộ, độc lập với nhau (không tham số), trả về list kết quả
+    theo đúng thứ tự. Mỗi hàm chạy ở một thread với kết nối lấy từ pool, nên thời gian chờ bằng
+    truy vấn chậm nhất thay vì tổng các truy vấn.
+
+    Chạy lần lượt trên kết nối hiện tại khi:
+    - alias không dùng pool (DB_POOL=0): mỗi thread sẽ phải mở kết nối mới;
+    - kết nối hiện tại đang trong giao dịch (atomic, TestCase): kết nối khác không thấy dữ liệu chưa commit.
+    """
+    if len(queries) < 2 or not await sync_to_async(_can_run_concurrently)(using):
+        return [await sync_to_async(query)() for query in queries]
+    return list(await asyncio.gather(*(
+        sync_to_async(_in_own_connection(query, using), thread_sensitive=False)() for query in queries
+    )))
@@ -0,0 +1,231 @@
+"""
+Xác thực JWT không truy vấn bảng erp_users ở mỗi request.
+
+JWTAuthentication mặc định SELECT user theo id trong token ở mọi request, trong khi các permission
+(app/core/permissions.py) chỉ cần `role`. Ở đây danh tính của user ("principal": id, role, cờ
+is_active/is_staff, HocVien liên kết...) được lấy theo thứ tự:
+
+1. bộ nhớ trong process, giữ PRINCIPAL_LOCAL_TTL giây;
+2. cache dùng chung (settings.CACHES, Redis khi có REDIS_URL) - được ghi lại ngay khi User được
+   lưu/xóa hoặc HocVien đổi tài khoản liên kết, nên đổi role / khóa tài khoản có hiệu lực sau tối đa
+   PRINCIPAL_LOCAL_TTL giây;
+3. cuối cùng đọc DB rồi ghi lại vào (2).
+
+Claim `role` / `hocvien_id` trong token chỉ để client hiển thị, không bao giờ dùng để xác thực: claim
+đúng tại thời điểm phát hành nên sẽ bỏ qua việc khóa tài khoản / đổi role xảy ra sau đó.
+
+request.user là instance User dựng bằng from_db() từ principal: các field khác (password,
+date_joined...) là deferred, chỉ truy vấn khi thực sự được đọc. `request.user.hocvien_id` là id
+HocVien liên kết (None nếu không có).
+
+Lưu ý: nếu cache dùng chung bị xóa (Redis restart) thì mỗi user chỉ tốn thêm một truy vấn DB ở
+request kế tiếp.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from app.core.tracking import previous_values, track_changes
+
+KEY_PREFIX = 'authprincipal'
+PRINCIPAL_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'role', 'is_active', 'is_staff', 'is_superuser',
+)
+PRINCIPAL_LOCAL_TTL = 5  # giây
+LOCAL_MAX_ENTRIES = 10000
+
+_local_lock = threading.Lock()
+_local = {}
+
+
+def get_cache():
+    return caches[getattr(settings, 'AUTH_PRINCIPAL_CACHE_ALIAS', 'default')]
+
+
+def principal_ttl():
+    """
+    Thời hạn của principal trong cache dùng chung: không ngắn hơn tuổi thọ access token để user
+    đang dùng token hợp lệ thường không phải đọc lại DB.
+    """
+    leeway = api_settings.LEEWAY
+    if isinstance(leeway, timedelta):
+        leeway = leeway.total_seconds()
+    token_lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds() + leeway
+    return max(getattr(settings, 'AUTH_PRINCIPAL_CACHE_TTL', 0), int(token_lifetime) + 60)
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def _local_get(key):
+    entry = _local.get(key)
+    if entry is None:
+        return None
+    expires, principal = entry
+    if expires < time.monotonic():
+        _local.pop(key, None)
+        return None
+    return principal
+
+
+def _local_set(key, principal):
+    with _local_lock:
+        if len(_local) >= LOCAL_MAX_ENTRIES:
+            _local.clear()
+        _local[key] = (time.monotonic() + PRINCIPAL_LOCAL_TTL, principal)
+
+
+def clear_local_principals():
+    with _local_lock:
+        _local.clear()
+
+
+def load_principal(user_id):
+    """
+    Đọc principal từ DB (một truy vấn, kèm id HocVien liên kết). None nếu user không tồn tại.
+    """
+    return (
+        get_user_model().objects.filter(pk=user_id)
+        .values(*PRINCIPAL_FIELDS, hocvien_id=F('hocvien__id'))
+        .first()
+    )
+
+
+def refresh_principal(user_id):
+    """
+    Ghi lại principal của `user_id` từ DB vào cache dùng chung và process hiện tại.
+    Gọi khi User hoặc liên kết User <-> HocVien thay đổi (xem UsersConfig / HocviensConfig.ready()).
+    """
+    if user_id is None:
+        return None
+    principal = load_principal(user_id) or {'id': user_id, 'is_active': False, 'deleted': True}
+    key = _key(user_id)
+    get_cache().set(key, principal, timeout=principal_ttl())
+    _local_set(key, principal)
+    return principal
+
+
+def refresh_principal_on_change(model, user_field=None):
+    """
+    Ghi lại principal mỗi khi `model` được lưu/xóa.
+    user_field=None: bản thân `model` là User. Ngược lại là tên FK tới User (vd. HocVien.user_id):
+    chỉ làm mới khi liên kết được tạo, đổi sang user khác hoặc bị xóa.
+    """
+    if user_field is not None:
+        track_changes(model, [user_field])
+
+    def receiver(sender, instance, raw=False, created=False, **kwargs):
+        if raw:
+            return
+        if user_field is None:
+            refresh_principal(instance.pk)
+            return
+        user_ids = {getattr(instance, user_field)}
+        previous = previous_values(instance) if kwargs['signal'] is post_save and not created else None
+        if previous is not None:
+            if previous[user_field] == getattr(instance, user_field):
+                return
+            user_ids.add(previous[user_field])
+        for user_id in user_ids - {None}:
+            refresh_principal(user_id)
+
+    uid = f'authprincipal:{model._meta.label}'
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
+
+
+def get_principal(user_id):
+    """
+    Principal của `user_id`: process -> cache dùng chung -> DB.
+    """
+    key = _key(user_id)
+    principal = _local_get(key)
+    if principal is not None:
+        return principal
+
+    principal = get_cache().get(key)
+    if principal is None:
+        principal = refresh_principal(user_id)
+    else:
+        _local_set(key, principal)
+    return principal
+
+
+def build_user(principal):
+    """
+    Instance User "nhẹ" từ principal: các field không có trong principal là deferred
+    """
+    User = get_user_model()
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in principal]
+    user = User.from_db(DEFAULT_DB_ALIAS, names, [principal[name] for name in names])
+    user.hocvien_id = principal.get('hocvien_id')
+    return user
+
+
+def _check_active(principal):
+    if principal.get('deleted'):
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+    if not principal['is_active']:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+
+class CachedPrincipalJWTAuthentication(JWTAuthentication):
+    """
+    Thay cho JWTAuthentication trong REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES']
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        principal = get_principal(user_id)
+        _check_active(principal)
+        return build_user(principal)
+
+
+def _set_principal_claims(token, principal):
+    token['role'] = principal['role']
+    token['hocvien_id'] = str(principal['hocvien_id']) if principal.get('hocvien_id') else None
+
+
+class PrincipalRefreshToken(RefreshToken):
+    """
+    RefreshToken kèm claim `role` và `hocvien_id`. Access token sinh lại khi refresh luôn lấy
+    role hiện tại thay vì chép claim cũ từ refresh token.
+    """
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        _set_principal_claims(token, refresh_principal(user.pk))
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        principal = get_principal(self[api_settings.USER_ID_CLAIM])
+        _check_active(principal)
+        _set_principal_claims(access, principal)
+        return access
+
+
+class PrincipalTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER']
+    """
+    token_class = PrincipalRefreshToken
@@ -0,0 +1,113 @@
+"""
+Endpoint được benchmark và ngân sách số truy vấn của từng endpoint.
+
+Ngân sách là số truy vấn tối đa của một request, không phụ thuộc lượng dữ liệu: vượt ngân sách
+thường là N+1 hoặc một truy vấn mới được thêm vào view. Được kiểm tra ở hai nơi:
+- EndpointQueryBudgetTest (app/core/tests.py) với dữ liệu nhỏ, chạy cùng test suite;
+- `python manage.py benchmark_endpoints` với dữ liệu theo quy mô thật (app/core/datagen.py),
+  đo thêm thời gian và ghi file JSON để so sánh giữa các commit.
+
+Stats / báo cáo được đo khi không có cache (STATS_CACHE_ALIAS trỏ tới DummyCache).
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+# (tên URL kèm namespace, query string, số truy vấn tối đa)
+# Danh sách phân trang theo trang: bảng nhỏ tốn thêm một COUNT(*) (bảng lớn chỉ dùng ước lượng,
+# xem app/core/pagination.py) nên ngân sách tính theo trường hợp bảng nhỏ.
+ENDPOINTS = [
+    # danh sách
+    ('users:user-list', '', 3),
+    ('teacher-list', '', 1),
+    ('hocviens:hocvien-list', '', 3),
+    ('hocviens:hocvien-list', 'search=nguyen', 2),
+    ('hocviens:hocvien-list', 'page=4', 3),
+    ('hocviens:hocvien-leads', '', 2),
+    ('khoahocs:khoahoc-list', '', 2),
+    ('khoahocs:khoahoc-public', '', 2),
+    ('dangky:dangky-list', '', 4),
+    ('thanhtoans:thanhtoan-list', '', 1),
+    ('chamsoc:chamsoc-list', '', 3),
+    ('thongbaos:thongbao-list', '', 3),
+    ('thongbaos:thongbao-public', '', 2),
+    ('thongbaos:thongbao-inbox', '', 3),
+    ('thongbaos:thongbao-unread-count', '', 1),
+    ('lophocs:lophoc-list', '', 2),
+    ('lophocs:lophoc-list', 'include=students,schedule', 4),
+    ('lichhocs:lichhoc-list', '', 3),
+    ('diemdanhs:diemdanh-list', '', 1),
+    # thống kê
+    ('hocviens:hocvien-stats', '', 2),
+    ('hocviens:hocvien-registrations', '', 1),
+    ('hocviens:hocvien-by-course', '', 2),
+    ('khoahocs:khoahoc-stats', '', 2),
+    ('dangky:dangky-stats', '', 1),
+    ('thanhtoans:thanhtoan-stats', '', 1),
+    ('chamsoc:chamsoc-stats', '', 1),
+    ('thongbaos:thongbao-stats', '', 1),
+    # báo cáo
+    ('reports:overview-report', '', 8),
+    ('reports:financial-report', '', 2),
+    ('reports:academic-report', '', 4),
+]
+
+NO_CACHE_ALIAS = 'benchmark-nocache'
+
+
+def without_stats_cache():
+    """
+    override_settings để view thống kê / báo cáo luôn tính lại (cache là DummyCache)
+    """
+    return override_settings(
+        CACHES={**settings.CACHES, NO_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        STATS_CACHE_ALIAS=NO_CACHE_ALIAS,
+    )
+
+
+def endpoint_key(name, query=''):
+    """
+    Khóa của endpoint trong file kết quả: tên URL không namespace (như route của /api/metrics/)
+    """
+    name = name.rpartition(':')[2]
+    return f'{name}?{query}' if query else name
+
+
+def endpoint_url(name, query=''):
+    url = reverse(name)
+    return f'{url}?{query}' if query else url
+
+
+def measure(client, name, query='', budget=None, repeat=0, using=DEFAULT_DB_ALIAS):
+    """
+    Gọi endpoint một lần để đếm truy vấn, rồi `repeat` lần để đo thời gian (không đếm truy vấn
+    để việc ghi lại SQL không làm sai thời gian). Trả về dict kết quả của endpoint.
+    """
+    url = endpoint_url(name, query)
+    with CaptureQueriesContext(connections[using]) as captured:
+        response = client.get(url)
+    result = {
+        'url': url,
+        'status': response.status_code,
+        'queries': len(captured),
+        'budget': budget,
+        'over_budget': budget is not None and len(captured) > budget,
+    }
+    if repeat:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        result.update({
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[max(int(len(timings) * 0.95 + 0.5) - 1, 0)], 3),
+            'min_ms': round(timings[0], 3),
+        })
+    return result
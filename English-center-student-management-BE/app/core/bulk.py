@@ -0,0 +1,57 @@
+"""
+Ghi hàng loạt bằng COPY của PostgreSQL.
+
+bulk_create() dựng một câu INSERT với (số dòng x số cột) tham số; với vài chục nghìn dòng
+thời gian biên dịch SQL và tách tham số phía Python chiếm phần lớn. COPY ... FROM STDIN
+gửi dữ liệu theo luồng, không qua SQL, nhanh hơn nhiều lần.
+Giống bulk_create(): không gọi save() và không bắn signal.
+"""
+from django.db import connections, router
+from django.db.models import Field
+
+
+def copy_insert(model, objs, using=None, keep_dates=False):
+    """
+    Chèn `objs` (instance chưa lưu của `model`) bằng COPY. Giá trị mặc định, auto_now_add...
+    được tính như khi save() (field.pre_save). Lỗi ràng buộc (trùng unique...) được
+    chuyển thành IntegrityError của Django như các truy vấn thông thường.
+
+    keep_dates=True: field auto_now / auto_now_add đã được gán giá trị thì giữ nguyên
+    (dữ liệu lịch sử, dữ liệu sinh cho kiểm thử tải).
+    """
+    if not objs:
+        return objs
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    fields = [field for field in model._meta.concrete_fields if not field.generated]
+    # chỉ gọi pre_save() với field có xử lý riêng (auto_now_add...), còn lại đọc thẳng thuộc tính
+    custom_pre_save = [type(field).pre_save is not Field.pre_save for field in fields]
+    preset = [
+        keep_dates and (getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False))
+        for field in fields
+    ]
+    quote = connection.ops.quote_name
+    sql = 'COPY {} ({}) FROM STDIN'.format(
+        quote(model._meta.db_table), ', '.join(quote(field.column) for field in fields),
+    )
+
+    with connection.cursor() as cursor, connection.wrap_database_errors:
+        # con trỏ psycopg gốc: CursorWrapper của Django không có copy()
+        with cursor.cursor.copy(sql) as copy:
+            for obj in objs:
+                copy.write_row([
+                    field.get_db_prep_save(_value(obj, field, custom, keep), connection=connection)
+                    for field, custom, keep in zip(fields, custom_pre_save, preset)
+                ])
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+    return objs
+
+
+def _value(obj, field, custom, keep):
+    if keep:
+        value = getattr(obj, field.attname)
+        if value is not None:
+            return value
+    return field.pre_save(obj, add=True) if custom else getattr(obj, field.attname)
@@ -0,0 +1,185 @@
+"""
+Cache cho các endpoint thống kê / báo cáo.
+
+- Khóa cache = tên view + role người gọi + query params + phiên bản của các namespace dữ liệu
+  mà view phụ thuộc (vd. 'finance', 'enrollments').
+- Khi model thay đổi (post_save/post_delete), phiên bản namespace tương ứng được tăng lên nên mọi
+  khóa cũ tự động hết hiệu lực, không cần liệt kê/xóa từng khóa. Đăng ký bằng `invalidate_on_change`
+  trong `AppConfig.ready()` của từng app.
+- Backend lấy theo alias `STATS_CACHE_ALIAS` trong settings.CACHES (locmem khi test, Redis khi có REDIS_URL).
+- Chỉ cache response 200; số lần hit/miss được đếm theo từng view (`cache_counters()`).
+- Dùng được cho cả view async (app/core/async_views.py): cache được đọc/ghi qua API async của Django.
+"""
+import functools
+import hashlib
+import threading
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+KEY_PREFIX = 'statcache'
+
+_counter_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def get_cache():
+    return caches[getattr(settings, 'STATS_CACHE_ALIAS', 'default')]
+
+
+def default_ttl():
+    return getattr(settings, 'STATS_CACHE_TTL', 300)
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:ns:{namespace}'
+
+
+def namespace_versions(namespaces):
+    """
+    Phiên bản hiện tại của các namespace (một round-trip get_many)
+    """
+    keys = [_version_key(ns) for ns in namespaces]
+    found = get_cache().get_many(keys)
+    return [found.get(key, 0) for key in keys]
+
+
+async def anamespace_versions(namespaces):
+    keys = [_version_key(ns) for ns in namespaces]
+    found = await get_cache().aget_many(keys)
+    return [found.get(key, 0) for key in keys]
+
+
+def invalidate(*namespaces):
+    """
+    Làm mọi khóa cache phụ thuộc `namespaces` hết hiệu lực
+    """
+    cache = get_cache()
+    for ns in namespaces:
+        key = _version_key(ns)
+        # add() không ghi đè nếu đã có; incr() nguyên tử trên Redis/locmem
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # khóa vừa bị evict giữa add() và incr()
+            cache.set(key, 1, timeout=None)
+
+
+def invalidate_on_change(model, *namespaces):
+    """
+    Tăng phiên bản `namespaces` mỗi khi `model` được lưu hoặc xóa
+    """
+    def receiver(sender, raw=False, **kwargs):
+        if not raw:
+            invalidate(*namespaces)
+
+    uid = f'statcache:{model._meta.label}:{",".join(namespaces)}'
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
+
+
+def build_key(name, request, namespaces, versions=None):
+    if versions is None:
+        versions = namespace_versions(namespaces)
+    role = getattr(request.user, 'role', None) or 'anon'
+    params = sorted((k, sorted(v)) for k, v in request.query_params.lists())
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()[:16]
+    versions = '.'.join(str(v) for v in versions)
+    return f'{KEY_PREFIX}:{name}:{role}:{versions}:{digest}'
+
+
+def _count(counter, name):
+    with _counter_lock:
+        counter[name] += 1
+
+
+def cache_counters():
+    """
+    Số lần hit/miss theo view kể từ khi process khởi động: {view: {'hits': .., 'misses': ..}}
+    """
+    with _counter_lock:
+        names = set(_hits) | set(_misses)
+        return {name: {'hits': _hits[name], 'misses': _misses[name]} for name in sorted(names)}
+
+
+def reset_counters():
+    with _counter_lock:
+        _hits.clear()
+        _misses.clear()
+
+
+def cached_response(request, name, namespaces, compute, ttl=None):
+    """
+    Trả Response từ cache nếu có, ngược lại gọi `compute()` và lưu `response.data` khi status 200
+    """
+    cache = get_cache()
+    key = build_key(name, request, namespaces)
+    data = cache.get(key)
+    if data is not None:
+        _count(_hits, name)
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _count(_misses, name)
+    response = compute()
+    if response.status_code == 200:
+        cache.set(key, response.data, timeout=ttl if ttl is not None else default_ttl())
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+async def acached_response(request, name, namespaces, compute, ttl=None):
+    """
+    Như cached_response() cho view async: `compute` là coroutine function
+    """
+    cache = get_cache()
+    key = build_key(name, request, namespaces, versions=await anamespace_versions(namespaces))
+    data = await cache.aget(key)
+    if data is not None:
+        _count(_hits, name)
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _count(_misses, name)
+    response = await compute()
+    if response.status_code == 200:
+        await cache.aset(key, response.data, timeout=ttl if ttl is not None else default_ttl())
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_view(*namespaces, ttl=None):
+    """
+    Decorator cache response GET cho function view DRF (đặt dưới @api_view / @permission_classes
+    để quyền truy cập vẫn được kiểm tra trước) hoặc cho method get() của APIView:
+
+        @api_view(['GET'])
+        @permission_classes([IsAuthenticated])
+        @cached_view('finance')
+        def thanhtoan_stats(request): ...
+    """
+    def decorator(view):
+        name = f'{view.__module__}.{view.__qualname__}'
+
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                request = args[0] if isinstance(args[0], Request) else args[1]
+                return await acached_response(request, name, namespaces, lambda: view(*args, **kwargs), ttl=ttl)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[0] if isinstance(args[0], Request) else args[1]
+            return cached_response(request, name, namespaces, lambda: view(*args, **kwargs), ttl=ttl)
+        return wrapper
+    return decorator
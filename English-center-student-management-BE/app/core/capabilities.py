@@ -0,0 +1,215 @@
+"""
+Ma trận quyền: role x tài nguyên x hành động.
+
+Toàn bộ chính sách phân quyền nằm trong MATRIX. Khi import module, ma trận được biên dịch thành
+một bit cho mỗi cặp "tài nguyên.hành động" (BITS) và một bitmask cho mỗi role (ROLE_MASKS),
+nên mỗi lần kiểm tra quyền chỉ là một phép AND.
+
+Hành động:
+- read: xem toàn bộ dữ liệu của tài nguyên
+- read_own: chỉ xem dữ liệu của HocVien liên kết với tài khoản (xem scope_queryset)
+- create: tạo mới (POST)
+- write: sửa / xóa (PUT, PATCH, DELETE)
+
+Dùng trong view:
+
+    permission_classes = [HasCapability('finance.write')]   # một quyền cụ thể
+    permission_classes = [HasCapability('finance')]         # hành động suy ra từ HTTP method
+"""
+from rest_framework import permissions
+
+ROLES = ('admin', 'giangvien', 'academic_staff', 'sales_staff', 'finance_staff', 'hocvien')
+ACTIONS = ('read', 'read_own', 'create', 'write')
+
+ALL = 'read create write'
+
+MATRIX = {
+    'students': {
+        'admin': ALL, 'academic_staff': ALL, 'sales_staff': ALL,
+        'finance_staff': 'read', 'hocvien': 'read_own',
+    },
+    'courses': {
+        'admin': ALL, 'academic_staff': ALL, 'giangvien': ALL,
+        'finance_staff': 'read', 'sales_staff': 'read', 'hocvien': 'read_own',
+    },
+    'attendance': {
+        'admin': ALL, 'academic_staff': ALL, 'giangvien': ALL,
+        'finance_staff': 'read', 'sales_staff': 'read', 'hocvien': 'read_own',
+    },
+    'finance': {
+        'admin': ALL, 'finance_staff': ALL,
+        'academic_staff': 'read create', 'sales_staff': 'read', 'hocvien': 'read_own',
+    },
+    'crm': {
+        'admin': ALL, 'sales_staff': ALL,
+    },
+    'enrollments': {
+        'admin': ALL, 'academic_staff': ALL, 'sales_staff': ALL, 'finance_staff': ALL, 'hocvien': 'read_own',
+    },
+    'care': {
+        'admin': ALL, 'academic_staff': ALL, 'sales_staff': ALL, 'finance_staff': ALL, 'hocvien': 'read_own',
+    },
+    'notifications': {
+        'admin': ALL, 'academic_staff': ALL, 'sales_staff': ALL, 'finance_staff': ALL,
+    },
+    'reports': {
+        'admin': 'read',
+    },
+    'users': {
+        'admin': ALL,
+    },
+}
+
+# Hành động tương ứng với HTTP method khi HasCapability chỉ nêu tên tài nguyên
+METHOD_ACTIONS = {
+    'GET': 'read', 'HEAD': 'read', 'OPTIONS': 'read',
+    'POST': 'create',
+    'PUT': 'write', 'PATCH': 'write', 'DELETE': 'write',
+}
+
+
+def _compile(matrix):
+    bits = {}
+    for resource in matrix:
+        for action in ACTIONS:
+            bits[f'{resource}.{action}'] = 1 << len(bits)
+
+    role_masks = dict.fromkeys(ROLES, 0)
+    for resource, grants in matrix.items():
+        for role, actions in grants.items():
+            if role not in role_masks:
+                raise ValueError(f'Role không tồn tại trong ma trận quyền: {role}')
+            for action in actions.split():
+                role_masks[role] |= bits[f'{resource}.{action}']
+    return bits, role_masks
+
+
+BITS, ROLE_MASKS = _compile(MATRIX)
+
+
+def capability_mask(*capabilities):
+    """
+    Bitmask của các quyền "tài nguyên.hành động"; tên sai báo lỗi ngay khi khai báo
+    """
+    mask = 0
+    for capability in capabilities:
+        try:
+            mask |= BITS[capability]
+        except KeyError:
+            raise ValueError(f'Quyền không tồn tại: {capability}') from None
+    return mask
+
+
+def role_mask(user):
+    if not (user and user.is_authenticated):
+        return 0
+    return ROLE_MASKS.get(user.role, 0)
+
+
+def has_capability(user, *capabilities):
+    """
+    True nếu `user` có ít nhất một trong các quyền `capabilities`
+    """
+    return bool(role_mask(user) & capability_mask(*capabilities))
+
+
+def capabilities_for(role):
+    """
+    Danh sách quyền của `role` (dùng cho API / kiểm thử)
+    """
+    mask = ROLE_MASKS.get(role, 0)
+    return sorted(capability for capability, bit in BITS.items() if mask & bit)
+
+
+class CapabilityPermission(permissions.BasePermission):
+    """
+    Lớp cơ sở của các permission sinh bởi HasCapability()
+    """
+    # mask chung cho mọi method, hoặc {method: mask} khi hành động suy ra từ method
+    required = 0
+    method_required = None
+
+    def has_permission(self, request, view):
+        mask = role_mask(request.user)
+        if not mask:
+            return False
+        if self.method_required is not None:
+            return bool(mask & self.method_required.get(request.method, 0))
+        return bool(mask & self.required)
+
+
+_permission_classes = {}
+
+
+def HasCapability(*capabilities):
+    """
+    Permission class cho phép user có ít nhất một trong `capabilities`.
+
+    - 'finance.write': quyền cụ thể, không phụ thuộc HTTP method.
+    - 'finance': hành động lấy theo method (GET -> read, POST -> create, PUT/PATCH/DELETE -> write).
+
+    Trả về class (dùng được trong permission_classes và với toán tử | & ~ của DRF);
+    cùng tham số luôn trả về cùng một class.
+    """
+    if not capabilities:
+        raise ValueError('HasCapability cần ít nhất một quyền')
+    key = tuple(capabilities)
+    if key in _permission_classes:
+        return _permission_classes[key]
+
+    attrs = {'__doc__': f"Yêu cầu quyền: {', '.join(capabilities)}"}
+    if all('.' in capability for capability in capabilities):
+        attrs['required'] = capability_mask(*capabilities)
+    else:
+        attrs['method_required'] = {
+            method: capability_mask(*(
+                capability if '.' in capability else f'{capability}.{action}'
+                for capability in capabilities
+            ))
+            for method, action in METHOD_ACTIONS.items()
+        }
+    name = f"HasCapability({', '.join(repr(capability) for capability in capabilities)})"
+    permission_class = type(name, (CapabilityPermission,), attrs)
+    _permission_classes[key] = permission_class
+    return permission_class
+
+
+def linked_hocvien_id(user):
+    """
+    Id HocVien liên kết với `user` (None nếu không có). CachedPrincipalJWTAuthentication đã gắn sẵn
+    `user.hocvien_id`; các cách xác thực khác (session, force_authenticate) thì đọc DB một lần.
+    """
+    if not (user and user.is_authenticated):
+        return None
+    try:
+        return user.hocvien_id
+    except AttributeError:
+        pass
+    user.hocvien_id = (
+        type(user).objects.filter(pk=user.pk).values_list('hocvien__id', flat=True).first()
+    )
+    return user.hocvien_id
+
+
+def own_queryset(queryset, user, owner='hocvien'):
+    """
+    Các dòng của `queryset` thuộc HocVien liên kết với `user`: `owner` là FK tới HocVien
+    ('pk' khi chính queryset là HocVien)
+    """
+    hocvien_id = linked_hocvien_id(user)
+    if hocvien_id is None:
+        return queryset.none()
+    return queryset.filter(**{owner: hocvien_id})
+
+
+def scope_queryset(queryset, user, resource, owner='hocvien'):
+    """
+    Giới hạn `queryset` theo quyền đọc của `user` trên `resource`:
+    `resource.read` -> toàn bộ, `resource.read_own` -> chỉ dữ liệu của mình, còn lại -> rỗng.
+    """
+    mask = role_mask(user)
+    if mask & BITS[f'{resource}.read']:
+        return queryset
+    if mask & BITS[f'{resource}.read_own']:
+        return own_queryset(queryset, user, owner)
+    return queryset.none()
@@ -0,0 +1,448 @@
+"""
+Sinh dữ liệu giả lập theo quy mô cho benchmark / kiểm thử tải.
+
+Tất định: cùng `seed` và cùng ngày mốc `today` luôn sinh ra đúng cùng dữ liệu (kể cả UUID), nên
+kết quả benchmark giữa các commit so sánh được với nhau. Thời điểm tạo được rải đều trong
+HISTORY_DAYS ngày trước ngày mốc.
+
+Dữ liệu được ghi bằng COPY theo lô `chunk_size` dòng (app/core/bulk.py), không gọi save() và không
+bắn signal. Sau khi sinh xong mới chạy một lượt: dựng lại bảng fact báo cáo, đối soát sổ công nợ
+(kéo theo trang_thai_hoc_phi), đưa thông báo đã gửi vào hộp thư người nhận, ANALYZE (planner và
+count ước lượng của phân trang cần thống kê mới) và làm mới cache thống kê.
+
+Email, số biên lai... có gắn `seed`: chạy lại cùng seed trên cùng DB sẽ báo trùng (IntegrityError),
+kiểm tra trước bằng `seed_used()`. Dùng qua `manage.py generate_data` (DB đang cấu hình) hoặc
+`manage.py benchmark_endpoints` (DB benchmark riêng).
+"""
+import random
+import uuid
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from app.core.bulk import copy_insert
+from app.core.cache import invalidate
+
+DEFAULT_SEED = 20240101
+CHUNK_SIZE = 10000
+HISTORY_DAYS = 730
+DEFAULT_PASSWORD = 'datagen123'
+
+# Quy mô chuẩn (scale=1)
+VOLUMES = {
+    'teachers': 200,
+    'staff': 40,
+    'courses': 150,
+    'students': 70000,
+    'leads': 30000,
+    'enrollments': 120000,
+    'classes': 2000,
+    'attendance': 1000000,
+    'payments': 300000,
+    'care_logs': 50000,
+    'notifications': 5000,
+}
+
+HO = ['Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Huỳnh', 'Phan', 'Vũ', 'Võ', 'Đặng', 'Bùi', 'Đỗ', 'Hồ', 'Ngô', 'Dương', 'Lý']
+TEN_DEM = ['Văn', 'Thị', 'Minh', 'Ngọc', 'Thanh', 'Quốc', 'Gia', 'Hoàng', 'Anh', 'Thu', 'Đức', 'Bảo', 'Hữu', 'Kim']
+TEN = [
+    'An', 'Bình', 'Châu', 'Dũng', 'Giang', 'Hà', 'Hải', 'Hạnh', 'Hiếu', 'Hòa', 'Hùng', 'Hương', 'Khánh', 'Lan',
+    'Linh', 'Long', 'Mai', 'Nam', 'Nga', 'Nhung', 'Phong', 'Phúc', 'Quân', 'Quỳnh', 'Sơn', 'Tâm', 'Thảo',
+    'Trang', 'Trung', 'Tuấn', 'Vy', 'Yến',
+]
+CHUONG_TRINH = [
+    ('IELTS', ['4.5-5.5', '5.5-6.5', '6.5-7.5']),
+    ('TOEIC', ['350-500', '500-650', '650-800']),
+    ('Giao tiếp', ['Cơ bản', 'Trung cấp', 'Nâng cao']),
+    ('Tiếng Anh thiếu nhi', ['Starters', 'Movers', 'Flyers']),
+    ('Ngữ pháp', ['Nền tảng', 'Chuyên sâu']),
+]
+THANH_PHO = ['Hà Nội', 'TP. Hồ Chí Minh', 'Đà Nẵng', 'Hải Phòng', 'Cần Thơ', 'Huế', 'Nha Trang']
+NHU_CAU = [
+    'Cần chứng chỉ để xét tốt nghiệp', 'Muốn học buổi tối sau giờ làm', 'Phụ huynh đăng ký cho con',
+    'Chuẩn bị du học', 'Cần giao tiếp cho công việc', 'Hỏi lịch khai giảng tháng tới',
+]
+NGUON = ['facebook', 'google', 'tiktok', 'gioi_thieu', 'website', 'su_kien']
+THU = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+CA_HOC = [time(8, 0), time(9, 45), time(14, 0), time(17, 30), time(19, 0)]
+STAFF_ROLES = ['academic_staff', 'sales_staff', 'finance_staff']
+
+# namespace cache thống kê của các bảng được sinh (xem invalidate_on_change trong apps.py)
+CACHE_NAMESPACES = ('students', 'courses', 'enrollments', 'finance', 'care', 'notifications')
+
+
+def scaled_volumes(scale=1.0, **overrides):
+    """
+    VOLUMES nhân với `scale` (tối thiểu 1 dòng mỗi loại); `overrides` ghi đè từng loại
+    """
+    volumes = {name: max(1, round(count * scale)) for name, count in VOLUMES.items()}
+    volumes.update({name: count for name, count in overrides.items() if count is not None})
+    return volumes
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+class DataGenerator:
+    """
+    DataGenerator(scaled_volumes(0.1), seed=1).run() -> số dòng đã sinh theo loại
+    """
+
+    def __init__(self, volumes, seed=DEFAULT_SEED, today=None, chunk_size=CHUNK_SIZE, log=None):
+        self.volumes = volumes
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.today = today or timezone.localdate()
+        self.chunk_size = chunk_size
+        self.log = log or (lambda message: None)
+        self.counts = {}
+        self.models = []
+        self._end = timezone.make_aware(datetime.combine(self.today, time.min)) + timedelta(days=1)
+
+    # ---------- giá trị ngẫu nhiên tất định ----------
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def moment(self, after=None):
+        """
+        Thời điểm ngẫu nhiên trong HISTORY_DAYS ngày trước ngày mốc (và sau `after` nếu có)
+        """
+        start = self._end - timedelta(days=HISTORY_DAYS)
+        if after is not None and after > start:
+            start = after
+        span = max(int((self._end - start).total_seconds()), 1)
+        return start + timedelta(seconds=self.rng.randrange(span))
+
+    def full_name(self):
+        rng = self.rng
+        return f'{rng.choice(HO)} {rng.choice(TEN_DEM)} {rng.choice(TEN)}'
+
+    def phone(self, index):
+        # duy nhất theo index, hợp lệ với RegexValidator của HocVien.sdt
+        return f'09{(index * 7919 + self.seed) % 10 ** 8:08d}'
+
+    def seed_used(self):
+        """
+        DB đã có dữ liệu sinh với seed này chưa (username / email gắn seed sẽ bị trùng)
+        """
+        from app.apps.users.models import User
+
+        return User.objects.filter(username__endswith=f'.{self.seed}').exists()
+
+    # ---------- ghi theo lô ----------
+
+    def _write(self, name, model, rows):
+        """
+        Ghi các instance sinh từ iterable `rows` theo lô chunk_size bằng COPY
+        """
+        total = 0
+        chunk = []
+        for obj in rows:
+            chunk.append(obj)
+            if len(chunk) >= self.chunk_size:
+                copy_insert(model, chunk, keep_dates=True)
+                total += len(chunk)
+                chunk = []
+                self.log(f'  {name}: {total}')
+        if chunk:
+            copy_insert(model, chunk, keep_dates=True)
+            total += len(chunk)
+        self.counts[name] = total
+        self.models.append(model)
+        return total
+
+    def _stamp(self, created):
+        return {'created_at': created, 'updated_at': created}
+
+    # ---------- từng loại dữ liệu ----------
+
+    def users(self):
+        from app.apps.users.models import User
+
+        password = make_password(DEFAULT_PASSWORD, salt=f'datagen{self.seed}')
+        self.teachers = []
+        self.staff = []
+
+        def rows():
+            for index in range(self.volumes['teachers'] + self.volumes['staff']):
+                is_teacher = index < self.volumes['teachers']
+                role = 'giangvien' if is_teacher else STAFF_ROLES[index % len(STAFF_ROLES)]
+                ho, ten = self.full_name().rsplit(' ', 1)
+                user = User(
+                    id=self.uuid(), username=f'{role}{index:05d}.{self.seed}', password=password,
+                    first_name=ten, last_name=ho, email=f'{role}{index:05d}.{self.seed}@example.com',
+                    role=role, is_active=True, date_joined=self.moment(),
+                )
+                user.is_staff, user.is_superuser = User.staff_flags_for_role(role)
+                (self.teachers if is_teacher else self.staff).append((user.id, f'{ho} {ten}'))
+                yield user
+
+        return self._write('users', User, rows())
+
+    def courses(self):
+        from app.apps.khoahocs.models import KhoaHoc
+
+        self.courses_list = []
+
+        def rows():
+            for index in range(self.volumes['courses']):
+                program, levels = CHUONG_TRINH[index % len(CHUONG_TRINH)]
+                level = levels[(index // len(CHUONG_TRINH)) % len(levels)]
+                created = self.moment()
+                hoc_phi = Decimal(self.rng.randrange(15, 80) * 100000)
+                course = KhoaHoc(
+                    id=self.uuid(), ten=f'{program} {level} - K{index + 1:03d}',
+                    lich_hoc=f'{self.rng.choice(["Thứ 2,4,6", "Thứ 3,5,7", "Cuối tuần"])} - 19:00-21:00',
+                    giang_vien=self.rng.choice(self.teachers)[1] if self.teachers else '',
+                    so_buoi=self.rng.choice([24, 30, 36, 40, 48]), hoc_phi=hoc_phi,
+                    mo_ta=f'Khóa {program} trình độ {level}',
+                    trang_thai=_weighted(self.rng, [('mo', 6), ('dong', 2), ('hoan_thanh', 2)]),
+                    **self._stamp(created),
+                )
+                self.courses_list.append((course.id, hoc_phi))
+                yield course
+
+        return self._write('courses', KhoaHoc, rows())
+
+    def students(self):
+        from app.apps.hocviens.models import HocVien
+
+        self.student_ids = []
+        self.lead_ids = []
+        # (id, created_at) của học viên chính thức: thanh toán / đăng ký xảy ra sau ngày tạo
+        self.student_created = []
+        students, leads = self.volumes['students'], self.volumes['leads']
+
+        def rows():
+            rng = self.rng
+            for index in range(students + leads):
+                is_lead = rng.random() < leads / (students + leads)
+                if is_lead and len(self.lead_ids) >= leads:
+                    is_lead = False
+                elif not is_lead and len(self.student_ids) >= students:
+                    is_lead = True
+                created = self.moment()
+                birth_year = rng.randrange(self.today.year - 40, self.today.year - 6)
+                hocvien = HocVien(
+                    id=self.uuid(), ten=self.full_name(), email=f'hocvien{index:07d}.{self.seed}@example.com',
+                    sdt=self.phone(index), address=rng.choice(THANH_PHO),
+                    ngay_sinh=datetime(birth_year, rng.randrange(1, 13), rng.randrange(1, 29)).date(),
+                    khoa_hoc_quan_tam_id=rng.choice(self.courses_list)[0] if is_lead or rng.random() < 0.3 else None,
+                    created_as_lead=is_lead or rng.random() < 0.3, is_converted=False,
+                    sourced=rng.choice(NGUON) if is_lead else None,
+                    concern_level=_weighted(rng, [('moi', 4), ('quan_tam', 3), ('nong', 2), ('mat', 1)])
+                    if is_lead else None,
+                    nhu_cau_hoc=rng.choice(NHU_CAU) if is_lead else None,
+                    **self._stamp(created),
+                )
+                if is_lead:
+                    self.lead_ids.append(hocvien.id)
+                else:
+                    hocvien.is_converted = hocvien.created_as_lead
+                    self.student_ids.append(hocvien.id)
+                    self.student_created.append((hocvien.id, created))
+                # COPY không gọi save(): tự tính search_text / sdt_chuan
+                hocvien.refresh_search_fields()
+                yield hocvien
+
+        return self._write('students', HocVien, rows())
+
+    def enrollments(self):
+        from app.apps.dangky.models import DangKyKhoaHoc
+
+        target = min(self.volumes['enrollments'], len(self.student_ids) * len(self.courses_list))
+        seen = set()
+
+        def rows():
+            rng = self.rng
+            while len(seen) < target:
+                student = rng.randrange(len(self.student_ids))
+                course = rng.randrange(len(self.courses_list))
+                if (student, course) in seen:
+                    continue
+                seen.add((student, course))
+                hocvien_id, created = self.student_created[student]
+                trang_thai = _weighted(rng, [('dang_ky', 2), ('dang_hoc', 4), ('hoan_thanh', 3), ('huy', 1)])
+                phan_tram = {'dang_ky': 0, 'hoan_thanh': 100}.get(trang_thai, rng.randrange(5, 100))
+                ngay = self.moment(after=created)
+                yield DangKyKhoaHoc(
+                    id=self.uuid(), hocvien_id=hocvien_id, khoahoc_id=self.courses_list[course][0],
+                    ngay_dang_ky=ngay, phan_tram_hoan_thanh=phan_tram, trang_thai=trang_thai,
+                    **self._stamp(ngay),
+                )
+
+        return self._write('enrollments', DangKyKhoaHoc, rows())
+
+    def classes(self):
+        from app.apps.lichhocs.models import LichHoc
+        from app.apps.lophocs.models import LopHoc
+
+        self.schedules = []  # (lich_hoc_id, lop_index)
+        class_ids = []
+
+        def class_rows():
+            rng = self.rng
+            for index in range(self.volumes['classes']):
+                created = self.moment()
+                start = created.date() + timedelta(days=rng.randrange(3, 30))
+                lop = LopHoc(
+                    id=self.uuid(), ten=f'Lớp {index + 1:05d}', khoa_hoc_id=rng.choice(self.courses_list)[0],
+                    giang_vien_id=rng.choice(self.teachers)[0] if self.teachers else None,
+                    phong_hoc=f'P{rng.randrange(1, 6)}{rng.randrange(1, 20):02d}',
+                    ngay_bat_dau=start, ngay_ket_thuc=start + timedelta(weeks=rng.choice([8, 12, 16])),
+                    so_hoc_vien_toi_da=rng.choice([15, 20, 25, 30]),
+                    trang_thai=_weighted(rng, [
+                        ('Chờ mở lớp', 1), ('Đang học', 5), ('Tạm dừng', 1), ('Đã kết thúc', 3), ('Đã hủy', 1),
+                    ]),
+                    **self._stamp(created),
+                )
+                class_ids.append((lop.id, created))
+                yield lop
+
+        def schedule_rows():
+            rng = self.rng
+            for index, (lop_id, created) in enumerate(class_ids):
+                ca = rng.choice(CA_HOC)
+                for thu in sorted(rng.sample(THU, rng.randrange(2, 5)), key=THU.index):
+                    lich = LichHoc(
+                        id=self.uuid(), lop_hoc_id=lop_id, lophocid=lop_id, ngay_hoc=thu, gio_bat_dau=ca,
+                        gio_ket_thuc=(datetime.combine(self.today, ca) + timedelta(minutes=90)).time(),
+                        phong_hoc=None, **self._stamp(created),
+                    )
+                    self.schedules.append((lich.id, index))
+                    yield lich
+
+        self._write('classes', LopHoc, class_rows())
+        return self._write('schedules', LichHoc, schedule_rows())
+
+    def attendance(self):
+        from app.apps.diemdanhs.models import DiemDanh
+
+        # mỗi lớp một danh sách học viên cố định; mỗi lịch học điểm danh `quota` học viên đầu danh sách
+        n_schedules = max(len(self.schedules), 1)
+        base, extra = divmod(self.volumes['attendance'], n_schedules)
+        quota = min(base + (1 if extra else 0), len(self.student_ids))
+
+        def rows():
+            rng = self.rng
+            rosters = {}
+            for number, (lich_id, lop_index) in enumerate(self.schedules):
+                size = min(base + (1 if number < extra else 0), len(self.student_ids))
+                roster = rosters.get(lop_index)
+                if roster is None:
+                    roster = rosters[lop_index] = rng.sample(range(len(self.student_ids)), quota)
+                for student in roster[:size]:
+                    hocvien_id, created = self.student_created[student]
+                    thoi_gian = self.moment(after=created)
+                    yield DiemDanh(
+                        id=self.uuid(), lich_hoc_id=lich_id, hoc_vien_id=hocvien_id, thoi_gian=thoi_gian,
+                        trang_thai=_weighted(rng, [('co_mat', 17), ('vang_co_phep', 2), ('vang_khong_phep', 1)]),
+                        **self._stamp(thoi_gian),
+                    )
+
+        return self._write('attendance', DiemDanh, rows())
+
+    def payments(self):
+        from app.apps.thanhtoans.models import ThanhToan
+
+        def rows():
+            rng = self.rng
+            for index in range(self.volumes['payments']):
+                hocvien_id, created = rng.choice(self.student_created)
+                trang_thai = _weighted(rng, [('paid', 6), ('partial', 2), ('pending', 2)])
+                issued = self.moment(after=created)
+                paid = trang_thai != 'pending'
+                yield ThanhToan(
+                    id=self.uuid(), hocvien_id=hocvien_id, so_tien=Decimal(rng.randrange(5, 60) * 100000),
+                    ngay_dong=issued if paid else None,
+                    hinh_thuc=_weighted(rng, [('chuyenkhoan', 5), ('tienmat', 3), ('the', 2)]) if paid else None,
+                    so_bien_lai=f'BL{self.seed}-{index:08d}' if paid else None,
+                    trang_thai=trang_thai, **self._stamp(issued),
+                )
+
+        return self._write('payments', ThanhToan, rows())
+
+    def care_logs(self):
+        from app.apps.chamsoc.models import ChamSocHocVien
+
+        everyone = self.student_ids + self.lead_ids
+        loai_noi_dung = {
+            'tuvan': 'Tư vấn lộ trình học',
+            'theodoi': 'Theo dõi tiến độ học tập',
+            'hoidap': 'Giải đáp thắc mắc về lịch học / học phí',
+            'khac': 'Liên hệ khác',
+        }
+
+        def rows():
+            rng = self.rng
+            for _ in range(self.volumes['care_logs']):
+                loai = _weighted(rng, [('tuvan', 4), ('theodoi', 3), ('hoidap', 2), ('khac', 1)])
+                ngay = self.moment()
+                yield ChamSocHocVien(
+                    id=self.uuid(), hocvien_id=rng.choice(everyone),
+                    nhanvien_id=rng.choice(self.staff)[0] if self.staff else None,
+                    loai_cham_soc=loai, noi_dung=loai_noi_dung[loai], ngay=ngay,
+                    trang_thai=_weighted(rng, [('moi', 2), ('dang_xu_ly', 2), ('hoan_thanh', 5), ('dong', 1)]),
+                    **self._stamp(ngay),
+                )
+
+        return self._write('care_logs', ChamSocHocVien, rows())
+
+    def notifications(self):
+        from app.apps.thongbaos.models import ThongBao
+
+        users = self.teachers + self.staff
+
+        def rows():
+            rng = self.rng
+            for index in range(self.volumes['notifications']):
+                nguoi_nhan = _weighted(rng, [('tatca', 4), ('hocvien', 3), ('nhanvien', 2), ('user', 1)])
+                ngay = self.moment()
+                yield ThongBao(
+                    id=self.uuid(), tieu_de=f'Thông báo số {index + 1}',
+                    noi_dung='Trung tâm thông báo lịch học / lịch nghỉ / chương trình ưu đãi.', ngay_gui=ngay,
+                    nguoi_nhan=nguoi_nhan,
+                    user_id=rng.choice(users)[0] if nguoi_nhan == 'user' and users else None,
+                    trang_thai=_weighted(rng, [('moi', 1), ('dang_gui', 1), ('da_gui', 7), ('huy_bo', 1)]),
+                    loai_thong_bao=_weighted(rng, [('thong_bao', 5), ('canh_bao', 1), ('thong_tin', 3), ('khac', 1)]),
+                    **self._stamp(ngay),
+                )
+
+        return self._write('notifications', ThongBao, rows())
+
+    def analyze(self):
+        tables = ', '.join(connection.ops.quote_name(model._meta.db_table) for model in self.models)
+        if tables:
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {tables}')
+
+    # ---------- chạy toàn bộ ----------
+
+    STEPS = ('users', 'courses', 'students', 'enrollments', 'classes', 'attendance', 'payments',
+             'care_logs', 'notifications')
+
+    def run(self):
+        from app.apps.reports import facts
+        from app.apps.thanhtoans import ledger
+        from app.apps.thongbaos import inbox
+
+        with transaction.atomic():
+            for step in self.STEPS:
+                self.log(f'Sinh {step}...')
+                getattr(self, step)()
+            # thống kê cho planner trước khi tính lại (bảng vừa COPY chưa có thống kê: plan lồng nhau rất chậm)
+            self.analyze()
+            # một lượt tính lại thay cho signal của từng dòng
+            self.log('Dựng lại bảng fact báo cáo, sổ công nợ và hộp thư thông báo...')
+            facts.rebuild_all()
+            ledger.reconcile()
+            inbox.rebuild()
+            self.analyze()
+        invalidate(*CACHE_NAMESPACES)
+        return self.counts
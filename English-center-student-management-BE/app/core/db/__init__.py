@@ -0,0 +1,3 @@
+"""
+Backend PostgreSQL có pool kết nối: ENGINE = 'app.core.db' (xem app/core/db/base.py).
+"""
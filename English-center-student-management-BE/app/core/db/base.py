@@ -0,0 +1,151 @@
+"""
+Backend PostgreSQL (psycopg 3) kèm pool kết nối và số liệu về kết nối.
+
+Django 5.0 chưa có OPTIONS['pool'] (có từ 5.1); backend này nhận đúng cú pháp đó để khi nâng cấp
+Django chỉ cần đổi ENGINE về 'django.db.backends.postgresql':
+
+    'ENGINE': 'app.core.db',
+    'CONN_MAX_AGE': 0,                     # pool tự giữ kết nối, bắt buộc 0
+    'CONN_HEALTH_CHECKS': True,            # kiểm tra kết nối khi lấy ra khỏi pool
+    'OPTIONS': {'pool': {'min_size': 2, 'max_size': 10, 'timeout': 10}},
+
+Mỗi process (worker gunicorn) có một pool riêng cho mỗi alias. Không khai báo 'pool' thì backend
+hoạt động như bản gốc (kết nối bền theo CONN_MAX_AGE), chỉ thêm bộ đếm.
+
+connection_stats() trả về số liệu của process hiện tại: số kết nối mở mới và thời gian mở,
+số lần lấy kết nối từ pool và thời gian chờ, kích thước pool (psycopg_pool.get_stats()).
+"""
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.backends.postgresql import base
+
+NO_DB_ALIAS = '__no_db__'
+
+COUNTERS = ('connections_opened', 'connect_ms', 'checkouts', 'checkout_wait_ms', 'health_check_failures')
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _record(alias, **values):
+    with _stats_lock:
+        counters = _stats.setdefault(alias, dict.fromkeys(COUNTERS, 0))
+        for name, value in values.items():
+            counters[name] += value
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # (alias, tên DB) -> ConnectionPool; dùng chung cho mọi thread của process
+    _connection_pools = {}
+    _pools_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        pool_options = self.settings_dict['OPTIONS'].get('pool')
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+        pool = self._connection_pools.get(self._pool_key)
+        if pool is None:
+            pool = self._create_pool({} if pool_options is True else pool_options)
+            with self._pools_lock:
+                pool = self._connection_pools.setdefault(self._pool_key, pool)
+        return pool
+
+    @property
+    def _pool_key(self):
+        # theo cả tên DB: khi chạy test, NAME được đổi sang DB test sau khi process đã khởi động
+        return (self.alias, self.settings_dict['NAME'])
+
+    def _create_pool(self, pool_options):
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured("Pool kết nối không dùng cùng CONN_MAX_AGE khác 0.")
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                "OPTIONS['pool'] cần gói psycopg_pool (pip install 'psycopg[pool]')."
+            ) from exc
+
+        connect_kwargs = self.get_connection_params()
+        # kết nối nằm trong pool ở chế độ autocommit, Django đặt lại khi lấy ra
+        connect_kwargs['autocommit'] = True
+        return ConnectionPool(
+            kwargs=connect_kwargs,
+            open=False,
+            check=ConnectionPool.check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+            name=self.alias,
+            **pool_options,
+        )
+
+    def close_pool(self):
+        with self._pools_lock:
+            pool = self._connection_pools.pop(self._pool_key, None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        started = time.perf_counter()
+        if pool is None:
+            connection = super().get_new_connection(conn_params)
+            _record(self.alias, connections_opened=1, connect_ms=(time.perf_counter() - started) * 1000)
+            return connection
+
+        # pool chưa mở thì mở lúc lấy kết nối đầu tiên (không mở khi import settings / fork worker)
+        pool.open()
+        connection = pool.getconn()
+        _record(self.alias, checkouts=1, checkout_wait_ms=(time.perf_counter() - started) * 1000)
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = (
+            base.IsolationLevel(isolation_level) if isolation_level is not None
+            else base.IsolationLevel.READ_COMMITTED
+        )
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None and self.pool is not None:
+            with self.wrap_database_errors:
+                # trả kết nối về pool thay vì đóng; pool tự rollback nếu còn giao dịch dở
+                self.connection._pool.putconn(self.connection)
+                self.connection = None
+            return
+        return super()._close()
+
+    def close_if_health_check_failed(self):
+        was_open = self.connection is not None
+        super().close_if_health_check_failed()
+        if was_open and self.connection is None:
+            _record(self.alias, health_check_failures=1)
+
+
+def connection_stats():
+    """
+    Số liệu kết nối của process hiện tại theo alias:
+    connections_opened / connect_ms (kết nối mới tới PostgreSQL), checkouts / checkout_wait_ms
+    (lấy từ pool), health_check_failures, CONN_MAX_AGE đang dùng và `pool` = psycopg_pool.get_stats()
+    (pool_size, pool_available, requests_waiting, requests_wait_ms...; None nếu không dùng pool).
+    """
+    with _stats_lock:
+        snapshot = {alias: dict(counters) for alias, counters in _stats.items()}
+
+    result = {}
+    for alias in connections:
+        wrapper = connections[alias]
+        stats = snapshot.get(alias) or dict.fromkeys(COUNTERS, 0)
+        stats['connect_ms'] = round(stats['connect_ms'], 3)
+        stats['checkout_wait_ms'] = round(stats['checkout_wait_ms'], 3)
+        stats['conn_max_age'] = wrapper.settings_dict['CONN_MAX_AGE']
+        pool = DatabaseWrapper._connection_pools.get((alias, wrapper.settings_dict['NAME']))
+        stats['pool'] = pool.get_stats() if pool is not None else None
+        result[alias] = stats
+    return result
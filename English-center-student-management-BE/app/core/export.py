@@ -0,0 +1,252 @@
+"""
+Xuất danh sách ra CSV / XLSX dạng streaming.
+
+Dùng `ExportMixin` cho list view và khai báo `export_fields`, rồi đăng ký thêm một URL:
+
+    path('hocviens/export/', views.HocVienListView.as_view(export=True), name='hocvien-export')
+
+- Tái sử dụng get_queryset() + filter/search/ordering của view (không phân trang).
+- Đọc dữ liệu bằng server-side cursor (`values_list().iterator(chunk_size=...)`) và ghi ra
+  StreamingHttpResponse theo từng khối, nên bộ nhớ không phụ thuộc số dòng xuất.
+- ?file_format=csv (mặc định) | xlsx. Không dùng ?format= vì DRF dành tham số đó cho renderer.
+- ?gzip=1: nén gzip trên đường truyền (Content-Encoding) khi client chấp nhận gzip.
+- Ô chuỗi bắt đầu bằng = + - @ (hoặc tab / CR) được thêm dấu ' ở đầu để Excel / Sheets không chạy
+  như công thức (CSV / formula injection).
+"""
+import csv
+import zipfile
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
+
+EXPORT_CHUNK_SIZE = 2000
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _resolve_field(model, lookup):
+    field = None
+    for part in lookup.split('__'):
+        field = model._meta.get_field(part)
+        model = field.related_model
+    return field
+
+
+def _cell_value(value):
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+def _safe_text(value):
+    """
+    Chuỗi do người dùng nhập không được mở ra thành công thức trong bảng tính
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_rows(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Sinh từng dòng (list giá trị đã chuyển choices -> nhãn) của `fields` = [(tiêu đề, lookup), ...]
+    """
+    lookups = [lookup for _, lookup in fields]
+    converters = []
+    for lookup in lookups:
+        choices = dict(_resolve_field(queryset.model, lookup).flatchoices or [])
+        converters.append((lambda value, c=choices: c.get(value, value)) if choices else None)
+
+    for row in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+        yield [
+            _cell_value(convert(value) if convert else value)
+            for value, convert in zip(row, converters)
+        ]
+
+
+class _Echo:
+    """File giả chỉ trả lại chuỗi được ghi (csv.writer cần một đối tượng có write())"""
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows, batch=500):
+    writer = csv.writer(_Echo())
+    # BOM để Excel nhận đúng UTF-8 (tiếng Việt)
+    yield '\ufeff' + writer.writerow(header)
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow(['' if value is None else _safe_text(value) for value in row]))
+        if len(buffer) >= batch:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+class _ZipSink:
+    """Đích ghi không seek được cho zipfile; dữ liệu được lấy ra sau mỗi lần ghi"""
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+_XLSX_STATIC = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+        'officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+        'worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_safe_text(str(value)))}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def xlsx_stream(header, rows, batch=500):
+    """
+    Ghi file XLSX tối giản (một sheet, chuỗi inline) trực tiếp vào luồng zip, không cần openpyxl
+    và không giữ cả file trong bộ nhớ.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row(header)
+            ).encode())
+            buffer = []
+            for row in rows:
+                buffer.append(_xlsx_row(row))
+                if len(buffer) >= batch:
+                    sheet.write(''.join(buffer).encode())
+                    buffer = []
+                    yield sink.drain()
+            sheet.write((''.join(buffer) + '</sheetData></worksheet>').encode())
+    yield sink.drain()
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: định dạng gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def streaming_export(queryset, fields, filename, file_format='csv', gzip=False):
+    header = [title for title, _ in fields]
+    rows = export_rows(queryset, fields)
+    if file_format == 'xlsx':
+        chunks = xlsx_stream(header, rows)
+    else:
+        chunks = (chunk.encode('utf-8') for chunk in csv_stream(header, rows))
+    if gzip:
+        chunks = gzip_stream(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    response['Vary'] = 'Accept-Encoding'
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    return response
+
+
+class ExportMixin:
+    """
+    Thêm chế độ xuất file cho list view (GenericAPIView). View khai báo:
+
+        export_fields = [('Họ tên', 'ten'), ('Email', 'email'), ...]
+        export_filename = 'hocvien'
+    """
+    export = False
+    export_fields = ()
+    export_filename = 'export'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.export and request.method != 'GET':
+            raise MethodNotAllowed(request.method)
+
+    def get(self, request, *args, **kwargs):
+        if not self.export:
+            return super().get(request, *args, **kwargs)
+
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in CONTENT_TYPES:
+            raise ValidationError({'file_format': f"Chỉ hỗ trợ: {', '.join(CONTENT_TYPES)}"})
+        gzip = (
+            request.query_params.get('gzip') in ('1', 'true')
+            and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        queryset = self.filter_queryset(self.get_queryset())
+        filename = f'{self.export_filename}-{timezone.localdate():%Y%m%d}'
+        return streaming_export(queryset, self.export_fields, filename, file_format, gzip)
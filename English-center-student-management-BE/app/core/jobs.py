@@ -0,0 +1,160 @@
+"""
+Hàng đợi công việc nền trên PostgreSQL (bảng erp_jobs), không cần broker ngoài.
+
+Khai báo tác vụ bằng @task, đưa vào hàng đợi bằng .enqueue(**kwargs) (tham số phải ghi được ra JSON):
+
+    @task(max_attempts=3)
+    def reconcile_khoahoc(khoahoc_id):
+        ...
+
+    reconcile_khoahoc.enqueue(khoahoc_id=khoahoc.pk)
+
+- Job được ghi cùng giao dịch với dữ liệu đã tạo ra nó: giao dịch rollback thì job cũng biến mất,
+  worker chỉ thấy job sau khi commit.
+- Worker (`manage.py run_worker`) lấy job bằng SELECT ... FOR UPDATE SKIP LOCKED: nhiều worker / thread
+  chạy song song không lấy trùng job và không chờ khóa của nhau.
+- Tác vụ lỗi được chạy lại sau JOBS_RETRY_BACKOFF * 2^(lần chạy - 1) giây (tối đa JOBS_RETRY_BACKOFF_MAX),
+  hết max_attempts thì chuyển 'failed'. Job 'running' quá JOBS_LOCK_TIMEOUT giây (worker chết giữa chừng)
+  được đưa lại hàng đợi bằng `requeue_stale()`.
+- Tác vụ có thể chạy nhiều lần (chạy lại sau lỗi, worker chết): cần viết idempotent.
+"""
+import functools
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from app.core.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def task(func=None, *, max_attempts=None, priority=0):
+    """
+    Đánh dấu hàm là tác vụ nền. Tên tác vụ là đường dẫn import của hàm (module.tên_hàm).
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            return func(**kwargs)
+
+        def enqueue(*, run_at=None, created_by=None, **kwargs):
+            return Job.objects.create(
+                task=name, kwargs=kwargs, priority=priority,
+                max_attempts=max_attempts or _setting('JOBS_MAX_ATTEMPTS', 5),
+                run_at=run_at or timezone.now(), created_by=created_by,
+            )
+
+        wrapper.task_name = name
+        wrapper.enqueue = enqueue
+        wrapper.is_job_task = True
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+def resolve(name):
+    """
+    Hàm tác vụ theo tên; chỉ chấp nhận hàm được đánh dấu @task
+    """
+    func = import_string(name)
+    if not getattr(func, 'is_job_task', False):
+        raise ImportError(f'{name} không phải tác vụ nền (@task)')
+    return func
+
+
+def backoff(attempts):
+    """
+    Số giây chờ trước lần chạy tiếp theo sau `attempts` lần lỗi
+    """
+    base = _setting('JOBS_RETRY_BACKOFF', 10)
+    return min(base * 2 ** (attempts - 1), _setting('JOBS_RETRY_BACKOFF_MAX', 3600))
+
+
+def claim(worker, limit=1):
+    """
+    Lấy tối đa `limit` job đến hạn (ưu tiên cao trước, cũ trước) và đánh dấu 'running' cho `worker`.
+    Job đang bị worker khác khóa được bỏ qua (SKIP LOCKED) thay vì chờ.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', run_at__lte=now)
+            .order_by('-priority', 'run_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids).update(
+            status='running', locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+        return list(Job.objects.filter(id__in=ids).order_by('-priority', 'run_at'))
+
+
+def execute(job):
+    """
+    Chạy một job đã claim và ghi kết quả: 'succeeded', chờ chạy lại, hoặc 'failed' khi hết lượt
+    """
+    try:
+        with transaction.atomic():
+            result = resolve(job.task)(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) lỗi lần %s/%s', job.pk, job.task, job.attempts, job.max_attempts)
+        if job.attempts < job.max_attempts:
+            changes = {'status': 'queued', 'run_at': timezone.now() + timedelta(seconds=backoff(job.attempts))}
+        else:
+            changes = {'status': 'failed', 'finished_at': timezone.now()}
+        changes.update(last_error=error, locked_by='', locked_at=None)
+    else:
+        changes = {'status': 'succeeded', 'result': result, 'finished_at': timezone.now(), 'locked_by': '',
+                   'locked_at': None}
+    # chỉ ghi nếu job vẫn thuộc worker này (chưa bị requeue_stale() lấy lại)
+    Job.objects.filter(pk=job.pk, status='running', locked_at=job.locked_at).update(**changes)
+    for field, value in changes.items():
+        setattr(job, field, value)
+    return job
+
+
+def requeue_stale(timeout=None):
+    """
+    Đưa lại hàng đợi các job 'running' quá `timeout` giây (worker bị dừng giữa chừng).
+    Job đã hết lượt chạy thì chuyển 'failed'. Trả về số job được xử lý.
+    """
+    timeout = _setting('JOBS_LOCK_TIMEOUT', 600) if timeout is None else timeout
+    now = timezone.now()
+    stale = Job.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=timeout))
+    message = f'Quá {timeout}s không hoàn thành (worker dừng giữa chừng?)'
+    with transaction.atomic():
+        failed = stale.filter(attempts__gte=F('max_attempts')).update(
+            status='failed', finished_at=now, last_error=message, locked_by='', locked_at=None,
+        )
+        requeued = stale.update(status='queued', run_at=now, last_error=message, locked_by='', locked_at=None)
+    return failed + requeued
+
+
+def run_pending(worker='inline', limit=None):
+    """
+    Chạy lần lượt các job đến hạn trong thread hiện tại cho tới khi hết (hoặc đủ `limit` job).
+    Trả về số job đã chạy. Dùng cho `run_worker --burst` và trong test.
+    """
+    done = 0
+    while limit is None or done < limit:
+        jobs = claim(worker)
+        if not jobs:
+            break
+        execute(jobs[0])
+        done += 1
+    return done
@@ -0,0 +1,114 @@
+import statistics
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from app.core.authentication import PrincipalRefreshToken
+from app.core.db.base import COUNTERS, connection_stats
+
+# Cấu hình kết nối được so sánh: (CONN_MAX_AGE, OPTIONS['pool'])
+MODES = {
+    'fresh': (0, None),
+    'persistent': (600, None),
+    'pool': (0, {'min_size': 1, 'max_size': 4, 'timeout': 10}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Đo độ trễ mỗi request khi mở kết nối DB mới mỗi request, dùng kết nối bền (CONN_MAX_AGE) '
+        'và dùng pool kết nối. Request đi thẳng vào WSGI handler (middleware, signal request_started / '
+        'request_finished đóng kết nối như khi chạy thật; test Client của Django bỏ qua bước này).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/khoahocs/', help='Endpoint GET cần đo')
+        parser.add_argument('--requests', type=int, default=200, help='Số request mỗi chế độ')
+        parser.add_argument('--username', help='Gọi API bằng tài khoản này (mặc định: admin đầu tiên)')
+        parser.add_argument(
+            '--modes', default=','.join(MODES),
+            help=f"Các chế độ cần đo, cách nhau dấu phẩy ({', '.join(MODES)})"
+        )
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Chế độ không hợp lệ: {', '.join(sorted(unknown))}")
+
+        client = _WSGIClient(self._auth_headers(options['username']))
+        connection = connections[DEFAULT_DB_ALIAS]
+        original = (connection.settings_dict['CONN_MAX_AGE'], connection.settings_dict['OPTIONS'].get('pool'))
+
+        self.stdout.write(f"{options['requests']} request GET {options['url']} mỗi chế độ")
+        self.stdout.write(f"{'chế độ':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'kết nối mới':>14}{'lấy từ pool':>14}")
+        try:
+            for mode in modes:
+                self._configure(connection, *MODES[mode])
+                timings, opened, checkouts = self._run(client, options['url'], options['requests'])
+                timings.sort()
+                self.stdout.write(
+                    f'{mode:<12}{statistics.fmean(timings):>10.2f}{timings[len(timings) // 2]:>10.2f}'
+                    f'{timings[int(len(timings) * 0.95) - 1]:>10.2f}{opened:>14}{checkouts:>14}'
+                )
+        finally:
+            self._configure(connection, *original)
+
+    def _auth_headers(self, username):
+        User = get_user_model()
+        users = User.objects.filter(is_active=True)
+        user = users.filter(username=username).first() if username else users.filter(role='admin').first()
+        if user is None:
+            if username:
+                raise CommandError(f'Không tìm thấy tài khoản {username}')
+            self.stdout.write(self.style.WARNING('Không có tài khoản admin: gọi API không kèm token'))
+            return {}
+        return {'HTTP_AUTHORIZATION': f'Bearer {PrincipalRefreshToken.for_user(user).access_token}'}
+
+    def _configure(self, connection, conn_max_age, pool):
+        connection.close()
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        if pool:
+            connection.settings_dict['OPTIONS']['pool'] = pool
+        else:
+            connection.settings_dict['OPTIONS'].pop('pool', None)
+
+    def _run(self, client, url, count):
+        status = client.get(url)  # làm nóng: cache, pool, import lười
+        if status >= 400:
+            raise CommandError(f'{url} trả về {status}')
+
+        before = connection_stats()[DEFAULT_DB_ALIAS]
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        after = connection_stats()[DEFAULT_DB_ALIAS]
+        delta = {name: after[name] - before[name] for name in COUNTERS}
+        return timings, delta['connections_opened'], delta['checkouts']
+
+
+class _WSGIClient:
+    def __init__(self, headers):
+        self.handler = WSGIHandler()
+        self.headers = headers
+
+    def get(self, url):
+        path, _, query = url.partition('?')
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, **self.headers}
+        setup_testing_defaults(environ)
+        status = []
+        response = self.handler(environ, lambda code, headers, exc_info=None: status.append(code))
+        try:
+            for _ in response:
+                pass
+        finally:
+            response.close()  # request_finished -> close_old_connections()
+        return int(status[0].split()[0])
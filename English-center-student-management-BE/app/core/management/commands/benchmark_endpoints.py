@@ -0,0 +1,176 @@
+import json
+import subprocess
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.core.benchmark import ENDPOINTS, endpoint_key, measure, without_stats_cache
+from app.core.datagen import DEFAULT_SEED, DataGenerator, scaled_volumes
+
+# Bảng được đếm và ghi vào file kết quả (để biết hai lần chạy có cùng dữ liệu)
+ROW_COUNTS = {
+    'students': ('hocviens', 'HocVien'),
+    'classes': ('lophocs', 'LopHoc'),
+    'attendance': ('diemdanhs', 'DiemDanh'),
+    'payments': ('thanhtoans', 'ThanhToan'),
+    'enrollments': ('dangky', 'DangKyKhoaHoc'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Sinh dữ liệu theo quy mô (app/core/datagen.py) vào một DB riêng (<tên DB>_benchmark), gọi mọi '
+        'endpoint danh sách / thống kê / báo cáo qua DRF test client, kiểm tra ngân sách số truy vấn '
+        '(app/core/benchmark.py) và ghi kết quả ra file JSON để so sánh giữa các commit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Hệ số quy mô dữ liệu (1 = 100k học viên/lead, 2k lớp, 1M điểm danh, 300k thanh toán)')
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Seed sinh dữ liệu')
+        parser.add_argument('--today', type=date.fromisoformat,
+                            help='Ngày mốc của dữ liệu (YYYY-MM-DD, mặc định hôm nay)')
+        parser.add_argument('--repeat', type=int, default=5, help='Số lần đo mỗi endpoint')
+        parser.add_argument('--only', help='Chỉ đo các endpoint có khóa chứa một trong các chuỗi (cách nhau dấu phẩy)')
+        parser.add_argument('--output', default='benchmark-results.json', help='File JSON kết quả')
+        parser.add_argument('--compare', help='File JSON của lần chạy trước để so sánh')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='p50 chậm hơn lần trước quá tỉ lệ này thì coi là chậm đi (mặc định 0.25)')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Báo lỗi (exit code khác 0) khi có endpoint chậm đi so với --compare')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Giữ DB benchmark sau khi chạy và dùng lại dữ liệu đã sinh ở lần sau')
+
+    def handle(self, *args, **options):
+        previous = self._load(options['compare']) if options['compare'] else None
+        connection = connections[DEFAULT_DB_ALIAS]
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if not test_settings.get('NAME'):
+            test_settings['NAME'] = f"{connection.settings_dict['NAME']}_benchmark"
+
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb'], serialize=False,
+        )
+        try:
+            self._seed(options)
+            results = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, ensure_ascii=False, indent=2)
+        self.stdout.write(f"Đã ghi kết quả vào {options['output']}")
+
+        over_budget = [key for key, result in results['endpoints'].items() if result['over_budget']]
+        failed = [key for key, result in results['endpoints'].items() if result['status'] >= 400]
+        regressions = self._compare(previous, results, options['tolerance']) if previous else []
+
+        errors = []
+        if over_budget:
+            errors.append(f"vượt ngân sách truy vấn: {', '.join(over_budget)}")
+        if failed:
+            errors.append(f"lỗi HTTP: {', '.join(failed)}")
+        if regressions and options['fail_on_regression']:
+            errors.append(f"chậm đi so với {options['compare']}: {', '.join(regressions)}")
+        if errors:
+            raise CommandError('; '.join(errors))
+
+    def _load(self, path):
+        try:
+            with open(path, encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Không đọc được {path}: {exc}')
+
+    def _seed(self, options):
+        from app.apps.hocviens.models import HocVien
+
+        if HocVien.objects.exists():
+            self.stdout.write('Dùng lại dữ liệu đã sinh trong DB benchmark (--keepdb)')
+            return
+        volumes = scaled_volumes(options['scale'])
+        self.stdout.write(f'Sinh dữ liệu (scale={options["scale"]}, seed={options["seed"]})...')
+        started = timezone.now()
+        counts = DataGenerator(
+            volumes, seed=options['seed'], today=options['today'], log=self.stdout.write,
+        ).run()
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(f"Đã sinh {sum(counts.values())} dòng trong {elapsed:.1f}s")
+
+    def _run(self, options):
+        from django.apps import apps
+        from app.apps.users.models import User
+
+        admin = User.objects.filter(role='admin').first() or User.objects.create_user(
+            username='benchmark_admin', password=None, role='admin',
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        only = [part.strip() for part in (options['only'] or '').split(',') if part.strip()]
+        endpoints = {}
+        self.stdout.write(f"{'endpoint':<42}{'status':>7}{'queries':>9}{'budget':>8}{'p50 ms':>10}{'p95 ms':>10}")
+        with without_stats_cache():
+            for name, query, budget in ENDPOINTS:
+                key = endpoint_key(name, query)
+                if only and not any(part in key for part in only):
+                    continue
+                result = measure(client, name, query, budget, repeat=options['repeat'])
+                endpoints[key] = result
+                line = (f"{key:<42}{result['status']:>7}{result['queries']:>9}{budget:>8}"
+                        f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}")
+                self.stdout.write(self.style.ERROR(line) if result['over_budget'] else line)
+
+        return {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'commit': _git_commit(),
+                'scale': options['scale'],
+                'seed': options['seed'],
+                'repeat': options['repeat'],
+                'rows': {
+                    label: apps.get_model(app_label, model).objects.count()
+                    for label, (app_label, model) in ROW_COUNTS.items()
+                },
+            },
+            'endpoints': endpoints,
+        }
+
+    def _compare(self, previous, results, tolerance):
+        if previous['meta'].get('rows') != results['meta']['rows']:
+            self.stdout.write(self.style.WARNING(
+                'Hai lần chạy có lượng dữ liệu khác nhau (meta.rows): so sánh chỉ mang tính tham khảo'
+            ))
+        regressions = []
+        self.stdout.write(f"So sánh với commit {previous['meta'].get('commit') or '?'}:")
+        for key, result in results['endpoints'].items():
+            before = previous['endpoints'].get(key)
+            if not before or not before.get('p50_ms'):
+                continue
+            ratio = result['p50_ms'] / before['p50_ms']
+            queries = result['queries'] - before['queries']
+            # bỏ qua chênh lệch dưới 1 ms (nhiễu đo)
+            slower = ratio > 1 + tolerance and result['p50_ms'] - before['p50_ms'] > 1
+            if slower:
+                regressions.append(key)
+            if slower or queries:
+                line = (f"  {key:<40}{before['p50_ms']:>9.1f} -> {result['p50_ms']:.1f} ms "
+                        f"(x{ratio:.2f}), truy vấn {before['queries']} -> {result['queries']}")
+                self.stdout.write(self.style.WARNING(line) if slower or queries > 0 else line)
+        if not regressions:
+            self.stdout.write('  không có endpoint chậm đi')
+        return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True,
+            text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,48 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from app.core.datagen import CHUNK_SIZE, DEFAULT_PASSWORD, DEFAULT_SEED, VOLUMES, DataGenerator, scaled_volumes
+
+
+class Command(BaseCommand):
+    help = (
+        'Sinh dữ liệu giả lập tất định cho mọi app (người dùng, lead, học viên, khóa học, lớp, lịch học, '
+        'đăng ký, điểm danh, thanh toán, chăm sóc, thông báo) vào DB đang cấu hình. Ghi bằng COPY theo lô, '
+        'không bắn signal; cuối cùng dựng lại bảng fact báo cáo và sổ công nợ một lần.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=0.01,
+                            help='Hệ số quy mô (1 = 70k học viên, 30k lead, 1M điểm danh, 300k thanh toán...; '
+                                 'mặc định 0.01)')
+        for name, count in VOLUMES.items():
+            parser.add_argument(f'--{name.replace("_", "-")}', type=int, dest=name,
+                                help=f'Số {name} (ghi đè --scale; scale=1: {count})')
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Seed sinh dữ liệu')
+        parser.add_argument('--today', type=date.fromisoformat,
+                            help='Ngày mốc của dữ liệu (YYYY-MM-DD, mặc định hôm nay)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Số dòng mỗi lô COPY')
+
+    def handle(self, *args, **options):
+        volumes = scaled_volumes(options['scale'], **{name: options[name] for name in VOLUMES})
+        generator = DataGenerator(
+            volumes, seed=options['seed'], today=options['today'], chunk_size=options['chunk_size'],
+            log=self.stdout.write,
+        )
+        if generator.seed_used():
+            raise CommandError(f"DB đã có dữ liệu sinh với seed {options['seed']}: chọn --seed khác")
+
+        self.stdout.write(f"Sinh dữ liệu (seed={options['seed']}): "
+                          + ', '.join(f'{name}={count}' for name, count in volumes.items()))
+        started = timezone.now()
+        counts = generator.run()
+        elapsed = (timezone.now() - started).total_seconds()
+
+        for name, count in counts.items():
+            self.stdout.write(f'  {name:<15}{count:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Đã sinh {sum(counts.values())} dòng trong {elapsed:.1f}s. '
+            f'Tài khoản giảng viên / nhân viên dùng mật khẩu "{DEFAULT_PASSWORD}".'
+        ))
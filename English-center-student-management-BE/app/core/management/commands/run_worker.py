@@ -0,0 +1,86 @@
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from app.core import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Chạy worker xử lý công việc nền (bảng erp_jobs, app/core/jobs.py). Mỗi thread lấy job bằng '
+        'SELECT ... FOR UPDATE SKIP LOCKED nên chạy nhiều worker / nhiều thread song song được. '
+        'Dừng bằng Ctrl+C / SIGTERM: job đang chạy được làm xong trước khi thoát.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=getattr(settings, 'JOBS_CONCURRENCY', 2),
+                            help='Số thread chạy job song song (mặc định JOBS_CONCURRENCY)')
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'JOBS_POLL_INTERVAL', 1.0),
+                            help='Số giây chờ trước khi hỏi lại khi hàng đợi rỗng')
+        parser.add_argument('--burst', action='store_true',
+                            help='Chạy hết các job đến hạn rồi thoát (dùng cho cron / kiểm thử)')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        previous = {
+            signum: signal.signal(signum, lambda *_: self.stop.set()) for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            self.work(options)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def work(self, options):
+        name = f'{socket.gethostname()}:{os.getpid()}'
+        recovered = jobs.requeue_stale()
+        if recovered:
+            self.stdout.write(self.style.WARNING(f'Đưa lại hàng đợi {recovered} job bị bỏ dở'))
+        connections.close_all()
+
+        threads = [
+            threading.Thread(
+                target=self.loop, args=(f'{name}#{index}', options['poll_interval'], options['burst']),
+                name=f'job-worker-{index}', daemon=True,
+            )
+            for index in range(max(options['concurrency'], 1))
+        ]
+        self.stdout.write(f'Worker {name}: {len(threads)} thread')
+        for thread in threads:
+            thread.start()
+
+        # thread chính: định kỳ thu hồi job bị bỏ dở cho tới khi được yêu cầu dừng / các thread xong (--burst)
+        stale_every = max(getattr(settings, 'JOBS_LOCK_TIMEOUT', 600) / 2, options['poll_interval'])
+        last_check = time.monotonic()
+        while any(thread.is_alive() for thread in threads) and not self.stop.wait(options['poll_interval']):
+            if time.monotonic() - last_check >= stale_every:
+                close_old_connections()
+                jobs.requeue_stale()
+                last_check = time.monotonic()
+        for thread in threads:
+            thread.join()
+        connections.close_all()
+        self.stdout.write('Worker đã dừng')
+
+    def loop(self, worker, poll_interval, burst):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                claimed = jobs.claim(worker)
+                if not claimed:
+                    if burst:
+                        return
+                    self.stop.wait(poll_interval)
+                    continue
+                job = jobs.execute(claimed[0])
+                style = self.style.SUCCESS if job.status == 'succeeded' else self.style.WARNING
+                self.stdout.write(style(f'[{worker}] {job.task} {job.pk}: {job.status} (lần {job.attempts})'))
+        finally:
+            # kết nối DB thuộc thread này: đóng (trả về pool) trước khi thread kết thúc
+            connections.close_all()
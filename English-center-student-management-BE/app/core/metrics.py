@@ -0,0 +1,309 @@
+"""
+Số liệu hiệu năng theo endpoint, xuất ở định dạng text của Prometheus (GET /api/metrics/).
+
+RequestMetricsMiddleware đo mỗi request (lấy mẫu theo METRICS_SAMPLE_RATE):
+- tổng thời gian xử lý (từ middleware ngoài cùng tới khi có response; response streaming như
+  export CSV chỉ tính tới lúc bắt đầu gửi),
+- số truy vấn và thời gian DB: execute wrapper gắn vào mọi kết nối (connection_created); kể cả
+  truy vấn chạy ở thread khác qua gather_queries vì contextvar được sao chép sang thread đó,
+- thời gian serialize (serializer.data của DRF, gồm cả truy vấn phát sinh khi serialize),
+- thời gian render response (JSON / browsable API).
+
+Số liệu được gộp thành histogram theo route = tên URL (hocvien-list, overview-report...) và
+HTTP method. http_requests_total đếm mọi request (kể cả request không được lấy mẫu), các
+histogram chỉ tính request được lấy mẫu.
+
+Mỗi process (worker gunicorn / uvicorn) giữ số liệu riêng trong bộ nhớ, giống connection_stats():
+mỗi lần Prometheus scrape nhận số liệu của worker xử lý request đó.
+"""
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# tên metric -> (mô tả, buckets)
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Thời gian xử lý request', DURATION_BUCKETS),
+    'http_request_db_queries': ('Số truy vấn DB mỗi request', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': ('Tổng thời gian truy vấn DB mỗi request', DURATION_BUCKETS),
+    'http_request_serialize_duration_seconds': ('Thời gian serialize (serializer.data)', DURATION_BUCKETS),
+    'http_request_render_duration_seconds': ('Thời gian render response', DURATION_BUCKETS),
+}
+
+UNMATCHED_ROUTE = 'unmatched'
+
+_current = ContextVar('request_metrics', default=None)
+
+_lock = threading.Lock()
+_histograms = {}  # (tên metric, labels) -> [đếm theo bucket..., sum, count]
+_requests = {}  # (route, method, status) -> số request
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'serialize_time', 'render_time', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.serializing = False
+
+
+def _observe(name, labels, value):
+    buckets = HISTOGRAMS[name][1]
+    key = (name, labels)
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(buckets) + 2)
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                series[index] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+
+def record_request(route, method, status_code, duration=None, stats=None):
+    labels = (('route', route), ('method', method))
+    with _lock:
+        key = (route, method, f'{status_code // 100}xx')
+        _requests[key] = _requests.get(key, 0) + 1
+    if stats is None:
+        return
+    _observe('http_request_duration_seconds', labels, duration)
+    _observe('http_request_db_queries', labels, stats.queries)
+    _observe('http_request_db_duration_seconds', labels, stats.db_time)
+    _observe('http_request_serialize_duration_seconds', labels, stats.serialize_time)
+    _observe('http_request_render_duration_seconds', labels, stats.render_time)
+
+
+def reset_metrics():
+    with _lock:
+        _histograms.clear()
+        _requests.clear()
+
+
+# ---------- đo DB và serializer ----------
+
+def _execute_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def _install_execute_wrapper(sender, connection, **kwargs):
+    # execute_wrappers thuộc wrapper của alias (giữ qua các lần kết nối lại): chỉ thêm một lần
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _execute_wrapper)
+
+
+def _instrument_serializers():
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data.fget
+    if getattr(original, 'metrics_instrumented', False):
+        return
+
+    def data(self):
+        stats = _current.get()
+        # serializer lồng nhau / .data gọi lồng: chỉ tính lần ngoài cùng
+        if stats is None or stats.serializing:
+            return original(self)
+        stats.serializing = True
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            stats.serializing = False
+            stats.serialize_time += time.perf_counter() - started
+
+    data.metrics_instrumented = True
+    BaseSerializer.data = property(data)
+
+
+def install():
+    """
+    Gọi trong CoreConfig.ready(): gắn execute wrapper cho mọi kết nối DB và đo serializer.data
+    """
+    connection_created.connect(_install_execute_wrapper, dispatch_uid='metrics:execute-wrapper')
+    for alias in connections:
+        connection = connections[alias]
+        if connection.connection is not None:
+            _install_execute_wrapper(None, connection)
+    _instrument_serializers()
+
+
+# ---------- middleware ----------
+
+def _route(request):
+    # tên URL là duy nhất trong project (hocvien-list...); route không đặt tên thì dùng pattern
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return match.url_name or match.route
+
+
+class RequestMetricsMiddleware:
+    """
+    Đặt đầu MIDDLEWARE. Tắt bằng METRICS_ENABLED=0; METRICS_SAMPLE_RATE (0..1) là tỉ lệ request
+    được đo chi tiết. Chạy được cả dưới WSGI và ASGI (không chuyển đổi sync/async).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _start(self):
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            stats = RequestStats()
+            return stats, _current.set(stats)
+        return None, None
+
+    def _finish(self, request, response, stats, token, started):
+        duration = time.perf_counter() - started
+        if token is not None:
+            _current.reset(token)
+        record_request(_route(request), request.method, response.status_code, duration, stats)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = self._start()
+        response = self.get_response(request)
+        self._finish(request, response, stats, token, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = self._start()
+        response = await self.get_response(request)
+        self._finish(request, response, stats, token, started)
+        return response
+
+    def process_template_response(self, request, response):
+        # gọi ngay trước khi render: đo tới khi render xong (post render callback)
+        stats = _current.get()
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+# ---------- định dạng Prometheus ----------
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _family(lines, name, kind, help_text, samples):
+    if not samples:
+        return
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for suffix, labels, value in samples:
+        lines.append(f'{name}{suffix}{_labels(labels)} {_number(value)}')
+
+
+def render_prometheus():
+    """
+    Số liệu của process hiện tại ở định dạng text của Prometheus (version 0.0.4): histogram theo
+    route, số request theo status, hit/miss của cache thống kê và số liệu kết nối DB.
+    """
+    from app.core.cache import cache_counters
+    from app.core.db.base import connection_stats
+
+    with _lock:
+        histograms = {key: list(series) for key, series in _histograms.items()}
+        requests = dict(_requests)
+
+    lines = []
+    _family(lines, 'http_requests_total', 'counter', 'Số request theo route, method và nhóm status', [
+        ('', (('route', route), ('method', method), ('status', status)), count)
+        for (route, method, status), count in sorted(requests.items())
+    ])
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        samples = []
+        for (metric, labels), series in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, series):
+                cumulative += count
+                samples.append(('_bucket', labels + (('le', _number(float(bound))),), cumulative))
+            samples.append(('_bucket', labels + (('le', '+Inf'),), series[-1]))
+            samples.append(('_sum', labels, series[-2]))
+            samples.append(('_count', labels, series[-1]))
+        _family(lines, name, 'histogram', help_text, samples)
+
+    counters = cache_counters()
+    for field in ('hits', 'misses'):
+        _family(lines, f'stats_cache_{field}_total', 'counter', f'Số lần cache {field} của view thống kê', [
+            ('', (('view', view),), values[field]) for view, values in counters.items()
+        ])
+
+    db = connection_stats()
+    db_counters = (
+        ('db_connections_opened_total', 'connections_opened', 1, 'Số kết nối mới tới PostgreSQL'),
+        ('db_connect_seconds_total', 'connect_ms', 1000, 'Tổng thời gian mở kết nối mới'),
+        ('db_pool_checkouts_total', 'checkouts', 1, 'Số lần lấy kết nối từ pool'),
+        ('db_pool_checkout_wait_seconds_total', 'checkout_wait_ms', 1000, 'Tổng thời gian chờ lấy kết nối'),
+        ('db_health_check_failures_total', 'health_check_failures', 1, 'Số kết nối hỏng bị bỏ khi kiểm tra'),
+    )
+    for name, field, scale, help_text in db_counters:
+        _family(lines, name, 'counter', help_text, [
+            ('', (('alias', alias),), stats[field] / scale if scale != 1 else stats[field])
+            for alias, stats in db.items()
+        ])
+    for name, field, help_text in (
+        ('db_pool_size', 'pool_size', 'Số kết nối đang có trong pool'),
+        ('db_pool_available', 'pool_available', 'Số kết nối rảnh trong pool'),
+        ('db_pool_requests_waiting', 'requests_waiting', 'Số request đang chờ kết nối'),
+    ):
+        _family(lines, name, 'gauge', help_text, [
+            ('', (('alias', alias),), stats['pool'].get(field, 0))
+            for alias, stats in db.items() if stats['pool'] is not None
+        ])
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.2 on 2026-10-18 21:40
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('task', models.CharField(max_length=200, verbose_name='Tác vụ')),
+                ('kwargs', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Tham số')),
+                ('status', models.CharField(choices=[('queued', 'Đang chờ'), ('running', 'Đang chạy'), ('succeeded', 'Thành công'), ('failed', 'Thất bại')], default='queued', max_length=20, verbose_name='Trạng thái')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='Độ ưu tiên')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Chạy từ lúc')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Số lần đã chạy')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='Số lần chạy tối đa')),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Bắt đầu chạy lúc')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Kết thúc lúc')),
+                ('result', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='Kết quả')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Lỗi gần nhất')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Người tạo')),
+            ],
+            options={
+                'verbose_name': 'Công việc nền',
+                'verbose_name_plural': 'Công việc nền',
+                'db_table': 'erp_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['-priority', 'run_at'], name='erp_jobs_queued_idx'), models.Index(condition=models.Q(('status', 'running')), fields=['locked_at'], name='erp_jobs_running_idx'), models.Index(fields=['task', '-created_at'], name='erp_jobs_task_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,6 @@
 import uuid
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
@@ -14,3 +16,57 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
         ordering = ['-created_at']
+
+
+class Job(BaseModel):
+    """
+    Công việc nền (app/core/jobs.py): worker (`manage.py run_worker`) lấy job bằng
+    SELECT ... FOR UPDATE SKIP LOCKED, chạy hàm `task` với `kwargs` và ghi lại kết quả.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Đang chờ'),
+        ('running', 'Đang chạy'),
+        ('succeeded', 'Thành công'),
+        ('failed', 'Thất bại'),
+    ]
+
+    task = models.CharField(max_length=200, verbose_name='Tác vụ')
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name='Tham số')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', verbose_name='Trạng thái')
+    # số lớn chạy trước
+    priority = models.SmallIntegerField(default=0, verbose_name='Độ ưu tiên')
+    run_at = models.DateTimeField(default=timezone.now, verbose_name='Chạy từ lúc')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Số lần đã chạy')
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name='Số lần chạy tối đa')
+    locked_by = models.CharField(max_length=100, blank=True, default='', verbose_name='Worker')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Bắt đầu chạy lúc')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Kết thúc lúc')
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name='Kết quả')
+    last_error = models.TextField(blank=True, default='', verbose_name='Lỗi gần nhất')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Người tạo'
+    )
+
+    class Meta:
+        verbose_name = 'Công việc nền'
+        verbose_name_plural = 'Công việc nền'
+        ordering = ['-created_at']
+        db_table = 'erp_jobs'
+        indexes = [
+            # worker chỉ quét job đang chờ: index nhỏ dù bảng giữ nhiều job đã xong
+            models.Index(
+                fields=['-priority', 'run_at'], name='erp_jobs_queued_idx', condition=models.Q(status='queued'),
+            ),
+            models.Index(
+                fields=['locked_at'], name='erp_jobs_running_idx', condition=models.Q(status='running'),
+            ),
+            models.Index(fields=['task', '-created_at'], name='erp_jobs_task_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.get_status_display()})"
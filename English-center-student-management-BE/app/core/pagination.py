@@ -1,18 +1,222 @@
-from rest_framework.pagination import PageNumberPagination
+"""
+Phân trang mặc định cho toàn bộ REST API (REST_FRAMEWORK['DEFAULT_PAGINATION_CLASS']).
+
+- Chế độ trang (?page=N): `count` của queryset không lọc lấy ước lượng `reltuples` của
+  PostgreSQL thay vì COUNT(*) toàn bảng; queryset có điều kiện lọc vẫn đếm chính xác.
+- Chế độ con trỏ (?cursor=...): keyset theo (created_at, id) khớp thứ tự mặc định của BaseModel,
+  trang sâu tốn đúng bằng trang đầu (không OFFSET, không COUNT). Gửi `?cursor=` rỗng để bắt đầu.
+- View chọn chế độ mặc định khi client không chỉ định bằng thuộc tính `pagination_mode`
+  ('page' hoặc 'cursor').
+"""
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
+# Bảng nhỏ hơn ngưỡng này thì COUNT(*) đủ rẻ, đếm chính xác
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_count(queryset, threshold=ESTIMATE_THRESHOLD):
+    """
+    Số dòng của queryset: ước lượng từ pg_class.reltuples nếu queryset là toàn bộ bảng
+    (không WHERE / DISTINCT / GROUP BY) và bảng đủ lớn, ngược lại COUNT(*) như thường.
+    Trả về (count, is_estimate).
+    """
+    query = queryset.query
+    connection = connections[queryset.db]
+    if (
+        connection.vendor != 'postgresql'
+        or query.where
+        or query.distinct
+        or query.combinator
+        or query.group_by is not None
+        or query.is_sliced
+    ):
+        return queryset.count(), False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    estimate = row[0] if row else -1
+    # reltuples = -1: bảng chưa từng được ANALYZE
+    if estimate < threshold:
+        return queryset.count(), False
+    return estimate, True
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            count, self.count_is_estimate = estimated_count(self.object_list)
+            return count
+        return super().count
+
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+    django_paginator_class = EstimatedCountPaginator
 
     def get_paginated_response(self, data):
         return Response({
             'count': self.page.paginator.count,
+            'count_is_estimate': self.page.paginator.count_is_estimate,
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'results': data,
             'total_pages': self.page.paginator.num_pages,
             'current_page': self.page.number,
         })
+
+
+def supports_keyset(queryset):
+    try:
+        queryset.model._meta.get_field('created_at')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class StandardCursorPagination(CursorPagination):
+    """
+    Phân trang theo con trỏ (?cursor=...): không cần COUNT(*) và không dùng OFFSET lớn,
+    chi phí mỗi trang không đổi dù đang ở trang thứ bao nhiêu.
+
+    Với thứ tự mặc định, vị trí con trỏ là cặp (created_at, id) nên luôn duy nhất và điều kiện
+    lọc dùng được index trên created_at. Nếu client yêu cầu ?ordering= khác thì quay về cách của
+    DRF (một cột + offset). Hỗ trợ cả queryset trả về dict (.values()).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(request, queryset, view)
+        self._keyset = tuple(ordering) == tuple(self.ordering)
+        if not self._keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = ordering
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        if reverse:
+            queryset = queryset.order_by('created_at', 'id')
+        else:
+            queryset = queryset.order_by('-created_at', '-id')
+        if position is not None:
+            queryset = queryset.filter(self._keyset_condition(position, after=not reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = (
+            self._get_position_from_instance(results[-1], ordering) if len(results) > self.page_size else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = position is not None, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next, self.next_position = following is not None, following
+            self.has_previous, self.previous_position = position is not None, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _keyset_condition(self, position, after):
+        """
+        after=True: các dòng đứng sau (created_at, id) theo thứ tự giảm dần.
+        Điều kiện created_at <= c được tách riêng để planner dùng index range scan.
+        """
+        try:
+            created_at, pk = position.split('|')
+            created_at, pk = parse_datetime(created_at), UUID(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        if after:
+            return Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(id__lt=pk))
+        return Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(id__gt=pk))
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [field.lstrip('-') for field in ordering]
+        if not getattr(self, '_keyset', False):
+            fields = fields[:1]
+        if isinstance(instance, dict):
+            values = [instance[field] for field in fields]
+        else:
+            values = [instance.serializable_value(field) for field in fields]
+        if len(values) == 1:
+            return str(values[0])
+        return f'{values[0].isoformat()}|{values[1]}'
+
+
+class DefaultPagination(BasePagination):
+    """
+    Chọn chế độ theo request: ?cursor= -> StandardCursorPagination, ?page= -> StandardResultsSetPagination,
+    không có thì theo `view.pagination_mode` (mặc định 'page').
+    Model không có created_at luôn dùng chế độ trang.
+    """
+    page_class = StandardResultsSetPagination
+    cursor_class = StandardCursorPagination
+
+    def get_mode(self, queryset, request, view):
+        if not supports_keyset(queryset):
+            return 'page'
+        params = request.query_params
+        if self.cursor_class.cursor_query_param in params:
+            return 'cursor'
+        if self.page_class.page_query_param in params:
+            return 'page'
+        return getattr(view, 'pagination_mode', 'page')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = self.get_mode(queryset, request, view)
+        self.delegate = self.cursor_class() if mode == 'cursor' else self.page_class()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_class().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = self.page_class().get_schema_operation_parameters(view)
+        names = {parameter['name'] for parameter in parameters}
+        return parameters + [
+            parameter for parameter in self.cursor_class().get_schema_operation_parameters(view)
+            if parameter['name'] not in names
+        ]
+
+    @property
+    def display_page_controls(self):
+        return getattr(getattr(self, 'delegate', None), 'display_page_controls', False)
+
+    def to_html(self):
+        return self.delegate.to_html()
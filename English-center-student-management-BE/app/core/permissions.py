@@ -1,5 +1,10 @@
+import hmac
+
+from django.conf import settings
 from rest_framework import permissions
 
+from app.core.capabilities import HasCapability
+
 
 class IsAdminUser(permissions.BasePermission):
     """
@@ -110,137 +115,53 @@ class IsOwnerOrStaff(permissions.BasePermission):
         return False
 
 
-# Permissions kết hợp cho các tình huống cụ thể
-class CanManageStudents(permissions.BasePermission):
-    """
-    Admin, Academic Staff, Sales Staff có thể quản lý học viên
-    """
-    def has_permission(self, request, view):
-        return (request.user and request.user.is_authenticated and 
-                (request.user.is_admin or request.user.is_academic_staff or request.user.is_sales_staff))
+# Permissions theo tài nguyên: chính sách nằm trong ma trận quyền (app/core/capabilities.py),
+# các tên dưới đây giữ lại cho view hiện có.
 
+# Admin, Academic Staff, Sales Staff quản lý học viên
+CanManageStudents = HasCapability('students.write')
 
-class CanManageCourses(permissions.BasePermission):
-    """
-    Admin, Academic Staff, Giảng viên có thể quản lý khóa học
-    """
-    def has_permission(self, request, view):
-        return (request.user and request.user.is_authenticated and 
-                (request.user.is_admin or request.user.is_academic_staff or request.user.is_giangvien))
+# Admin, Academic Staff, Giảng viên quản lý khóa học
+CanManageCourses = HasCapability('courses.write')
 
+# Admin, Finance Staff quản lý tài chính đầy đủ
+CanManageFinance = HasCapability('finance.write')
 
-class CanManageFinance(permissions.BasePermission):
-    """
-    Admin, Finance Staff có thể quản lý tài chính
-    """
-    def has_permission(self, request, view):
-        return (request.user and request.user.is_authenticated and 
-                (request.user.is_admin or request.user.is_finance_staff))
+# Admin, Sales Staff quản lý CRM
+CanManageCRM = HasCapability('crm.write')
 
+# Admin, Finance Staff, Academic Staff, Sales Staff xem thống kê tài chính
+CanViewFinance = HasCapability('finance.read')
 
-class CanManageCRM(permissions.BasePermission):
-    """
-    Admin, Sales Staff có thể quản lý CRM
-    """
-    def has_permission(self, request, view):
-        return (request.user and request.user.is_authenticated and 
-                (request.user.is_admin or request.user.is_sales_staff))
+# Admin, Finance Staff, Academic Staff tạo thanh toán
+CanCreatePayment = HasCapability('finance.create')
 
+# Finance module theo method:
+# - Admin, Finance Staff: Full CRUD
+# - Academic Staff: Read + Create
+# - Sales Staff: Read only
+FinancePermission = HasCapability('finance')
 
-# === FINANCE PERMISSIONS ===
+# Quản lý học viên (admin/academic/sales) với mọi method, Finance Staff chỉ xem
+CanManageStudentsOrFinanceRead = HasCapability('students')
 
-class CanManageFinance(permissions.BasePermission):
-    """
-    Admin và Finance Staff có thể quản lý tài chính đầy đủ
-    """
-    def has_permission(self, request, view):
-        return (request.user and request.user.is_authenticated and 
-                (request.user.is_admin or request.user.is_finance_staff))
+# Quản lý khóa học (admin/academic/giangvien) với mọi method, Finance Staff chỉ xem (GET).
+# Sales Staff có courses.read (thống kê khóa học) nhưng không xem danh sách quản lý khóa học.
+CanManageCoursesOrFinanceRead = CanManageCourses | (HasCapability('courses') & CanManageFinance)
 
 
-class CanViewFinance(permissions.BasePermission):
+class HasMetricsToken(permissions.BasePermission):
     """
-    Admin, Finance Staff, Academic Staff, Sales Staff có thể xem thống kê tài chính
+    Header `Authorization: Metrics <METRICS_TOKEN>` (cho Prometheus scrape, không cần JWT).
+    Không đặt METRICS_TOKEN thì luôn từ chối.
     """
-    def has_permission(self, request, view):
-        return (request.user and request.user.is_authenticated and 
-                request.user.role in ['admin', 'finance_staff', 'academic_staff', 'sales_staff'])
+    keyword = 'Metrics'
 
-
-class CanCreatePayment(permissions.BasePermission):
-    """
-    Admin, Finance Staff, Academic Staff có thể tạo thanh toán
-    """
     def has_permission(self, request, view):
-        return (request.user and request.user.is_authenticated and 
-                request.user.role in ['admin', 'finance_staff', 'academic_staff'])
-
-
-class FinancePermission(permissions.BasePermission):
-    """
-    Custom permission cho Finance module
-    - Admin: Full CRUD
-    - Finance Staff: Full CRUD  
-    - Academic Staff: Read + Create
-    - Sales Staff: Read only
-    """
-    def has_permission(self, request, view):
-        if not (request.user and request.user.is_authenticated):
-            return False
-        
-        # Admin và Finance Staff có full quyền
-        if request.user.role in ['admin', 'finance_staff']:
-            return True
-            
-        # Academic Staff có thể xem và tạo
-        if request.user.role == 'academic_staff':
-            return request.method in ['GET', 'POST']
-            
-        # Sales Staff chỉ được xem
-        if request.user.role == 'sales_staff':
-            return request.method == 'GET'
-            
-        return False
-
-
-# New composite permissions: allow manage-role OR finance read-only for GET
-class CanManageStudentsOrFinanceRead(permissions.BasePermission):
-    """
-    Allow users who Pass CanManageStudents (admin/academic/sales) for any method,
-    OR allow finance staff (CanManageFinance) for GET requests only.
-    """
-    def has_permission(self, request, view):
-        # full manage roles
-        try:
-            if CanManageStudents().has_permission(request, view):
-                return True
-        except Exception:
-            pass
-        # finance can view (GET) only
-        if request.method == 'GET':
-            try:
-                if CanManageFinance().has_permission(request, view):
-                    return True
-            except Exception:
-                pass
-        return False
-
-
-class CanManageCoursesOrFinanceRead(permissions.BasePermission):
-    """
-    Allow users who Pass CanManageCourses (admin/academic/giangvien) for any method,
-    OR allow finance staff (CanManageFinance) for GET requests only.
-    """
-    def has_permission(self, request, view):
-        try:
-            if CanManageCourses().has_permission(request, view):
-                return True
-        except Exception:
-            pass
-        if request.method == 'GET':
-            try:
-                if CanManageFinance().has_permission(request, view):
-                    return True
-            except Exception:
-                pass
-        return False
+        expected = getattr(settings, 'METRICS_TOKEN', '')
+        scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        # so sánh bytes: compare_digest không nhận chuỗi có ký tự ngoài ASCII (header do client gửi)
+        return (
+            bool(expected) and scheme == self.keyword
+            and hmac.compare_digest(token.strip().encode(), expected.encode())
+        )
@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Trạng thái công việc nền (dùng để polling)
+    """
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'task', 'kwargs', 'status', 'status_display', 'priority', 'attempts', 'max_attempts',
+            'run_at', 'locked_at', 'finished_at', 'result', 'last_error', 'created_by', 'created_at'
+        ]
+        read_only_fields = fields
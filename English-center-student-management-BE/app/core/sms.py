@@ -0,0 +1,170 @@
+"""
+Gửi SMS qua backend cấu hình ở SMS_BACKEND, cùng giao diện với backend email của Django:
+
+    with get_connection() as connection:
+        connection.send_messages([SMSMessage('0912345678', 'Nội dung')])
+
+- ConsoleBackend: in ra stdout (mặc định, dùng khi phát triển).
+- FileBackend: ghi vào SMS_FILE_PATH, mỗi lần mở kết nối một file.
+- LocMemBackend: giữ tin trong `outbox` của module (dùng trong test).
+- HttpBackend: POST JSON {"to", "text"} tới SMS_GATEWAY_URL (Authorization: Bearer SMS_GATEWAY_TOKEN),
+  giữ một kết nối HTTP keep-alive cho cả lô tin.
+"""
+import http.client
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# tin đã gửi qua LocMemBackend (như django.core.mail.outbox)
+outbox = []
+
+
+class SMSMessage:
+    def __init__(self, to, body):
+        self.to = to
+        self.body = body
+
+    def __repr__(self):
+        return f'<SMSMessage to={self.to!r}>'
+
+
+class BaseBackend:
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def open(self):
+        """
+        Mở kết nối tới gateway; trả về True nếu vừa mở kết nối mới
+        """
+        return False
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send_messages(self, messages):
+        """
+        Gửi các SMSMessage, trả về số tin đã gửi
+        """
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseBackend):
+    def __init__(self, *args, stream=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream = stream or sys.stdout
+        self._lock = threading.RLock()
+
+    def write_message(self, message):
+        self.stream.write(f'SMS tới {message.to}\n{message.body}\n{"-" * 79}\n')
+
+    def send_messages(self, messages):
+        with self._lock:
+            for message in messages:
+                self.write_message(message)
+            self.stream.flush()
+        return len(messages)
+
+
+class FileBackend(ConsoleBackend):
+    def __init__(self, *args, file_path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.file_path = os.path.abspath(file_path or getattr(settings, 'SMS_FILE_PATH', 'tmp/sms'))
+        os.makedirs(self.file_path, exist_ok=True)
+        # file được mở khi mở kết nối
+        self.stream = None
+
+    def open(self):
+        if self.stream is None:
+            name = f'{datetime.now():%Y%m%d-%H%M%S}-{id(self)}.log'
+            self.stream = open(os.path.join(self.file_path, name), 'a', encoding='utf-8')
+            return True
+        return False
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def send_messages(self, messages):
+        new_connection = self.open()
+        try:
+            return super().send_messages(messages)
+        finally:
+            if new_connection:
+                self.close()
+
+
+class LocMemBackend(BaseBackend):
+    def send_messages(self, messages):
+        outbox.extend(messages)
+        return len(messages)
+
+
+class HttpBackend(BaseBackend):
+    def __init__(self, *args, url=None, token=None, timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url = urlsplit(url or settings.SMS_GATEWAY_URL)
+        self.token = token if token is not None else getattr(settings, 'SMS_GATEWAY_TOKEN', '')
+        self.timeout = timeout or getattr(settings, 'SMS_GATEWAY_TIMEOUT', 10)
+        self.connection = None
+
+    def open(self):
+        if self.connection is not None:
+            return False
+        connection_class = http.client.HTTPSConnection if self.url.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(self.url.netloc, timeout=self.timeout)
+        return True
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _post(self, message):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        body = json.dumps({'to': message.to, 'text': message.body})
+        self.connection.request('POST', self.url.path or '/', body=body.encode(), headers=headers)
+        response = self.connection.getresponse()
+        content = response.read()
+        if response.status >= 300:
+            raise RuntimeError(f'SMS gateway trả về {response.status}: {content[:200]!r}')
+
+    def send_messages(self, messages):
+        new_connection = self.open()
+        sent = 0
+        try:
+            for message in messages:
+                try:
+                    self._post(message)
+                except (OSError, http.client.HTTPException, RuntimeError):
+                    # kết nối hỏng thì lần gửi sau mở lại
+                    self.close()
+                    self.open()
+                    if not self.fail_silently:
+                        raise
+                else:
+                    sent += 1
+        finally:
+            if new_connection:
+                self.close()
+        return sent
+
+
+def get_connection(backend=None, fail_silently=False, **kwargs):
+    backend = backend or getattr(settings, 'SMS_BACKEND', 'app.core.sms.ConsoleBackend')
+    return import_string(backend)(fail_silently=fail_silently, **kwargs)
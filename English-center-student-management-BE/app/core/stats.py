@@ -0,0 +1,58 @@
+from django.db import models
+
+
+def _queryset(source):
+    return source._default_manager.all() if isinstance(source, type) else source
+
+
+def _measure(measure, condition=None):
+    if measure is None:
+        return models.Count('pk', filter=condition)
+    return models.Sum(measure, filter=condition)
+
+
+def breakdown_stats(source, breakdowns=(), total='total', measure=None, **conditions):
+    """
+    Đếm theo nhiều tiêu chí bằng MỘT câu aggregate() với COUNT/SUM ... FILTER (WHERE ...).
+
+    source      - model hoặc queryset
+    breakdowns  - các cặp (field, values); values là list (alias = giá trị)
+                  hoặc dict {alias: giá trị}
+    total       - alias cho tổng không lọc (None để bỏ qua)
+    measure     - None: đếm số dòng; tên field: cộng field đó (vd. 'so_luong' của bảng fact)
+    conditions  - alias=Q(...) cho điều kiện tùy ý, hoặc alias=<aggregate> để tính riêng
+
+        breakdown_stats(ChamSocHocVien, [('trang_thai', ['moi', 'dong'])], total='total_chamsoc')
+        -> {'total_chamsoc': 10, 'moi': 3, 'dong': 7}
+
+    Giá trị None (không có dòng nào) được trả về là 0.
+    """
+    result = _queryset(source).aggregate(**_breakdown_aggregates(breakdowns, total, measure, conditions))
+    return {alias: value or 0 for alias, value in result.items()}
+
+
+async def abreakdown_stats(source, breakdowns=(), total='total', measure=None, **conditions):
+    """
+    Như breakdown_stats() nhưng dùng async ORM (aaggregate) cho view async
+    """
+    aggregates = _breakdown_aggregates(breakdowns, total, measure, conditions)
+    result = await _queryset(source).aaggregate(**aggregates)
+    return {alias: value or 0 for alias, value in result.items()}
+
+
+def _breakdown_aggregates(breakdowns, total, measure, conditions):
+    aggregates = {}
+    if total:
+        aggregates[total] = _measure(measure)
+    for field, values in breakdowns:
+        if not isinstance(values, dict):
+            values = {value: value for value in values}
+        for alias, value in values.items():
+            if alias in aggregates:
+                raise ValueError(f"Trùng alias thống kê: '{alias}'")
+            aggregates[alias] = _measure(measure, models.Q(**{field: value}))
+    for alias, condition in conditions.items():
+        if alias in aggregates:
+            raise ValueError(f"Trùng alias thống kê: '{alias}'")
+        aggregates[alias] = _measure(measure, condition) if isinstance(condition, models.Q) else condition
+    return aggregates
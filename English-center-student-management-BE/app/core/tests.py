@@ -0,0 +1,188 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from app.apps.hocviens.models import HocVien
+from app.apps.thanhtoans import ledger
+from app.apps.users.models import User
+from app.core import jobs
+from app.core.benchmark import ENDPOINTS, endpoint_key, measure, without_stats_cache
+from app.core.datagen import DataGenerator, scaled_volumes
+from app.core.db.base import connection_stats
+from app.core.metrics import reset_metrics
+from app.core.models import Job
+
+
+@jobs.task(max_attempts=2)
+def divide(a, b):
+    return a / b
+
+
+class ConnectionPoolTest(APITestCase):
+    def test_pooled_connection_is_returned_to_pool(self):
+        # kết nối riêng (ngoài giao dịch của test) dùng pool trên cùng DB test
+        settings_dict = {**connections[DEFAULT_DB_ALIAS].settings_dict, 'CONN_MAX_AGE': 0}
+        settings_dict['OPTIONS'] = {**settings_dict['OPTIONS'], 'pool': {'min_size': 1, 'max_size': 2}}
+        wrapper = connections.create_connection(DEFAULT_DB_ALIAS)
+        wrapper.settings_dict = settings_dict
+        try:
+            for _ in range(3):
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                wrapper.close()
+            pool_stats = wrapper.pool.get_stats()
+            self.assertEqual(pool_stats['requests_num'], 3)
+            self.assertLess(pool_stats['connections_num'], 3)  # kết nối được dùng lại
+            self.assertEqual(connection_stats()[DEFAULT_DB_ALIAS]['pool']['requests_num'], 3)
+        finally:
+            wrapper.close_pool()
+
+    def test_stats_endpoint_admin_only(self):
+        url = '/api/system/db-connections/'
+        self.client.force_authenticate(User.objects.create_user(username='ketoan', password='x', role='finance_staff'))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(User.objects.create_user(username='quantri', password='x', role='admin'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('connections_opened', response.data[DEFAULT_DB_ALIAS])
+
+
+class RequestMetricsTest(APITestCase):
+    def setUp(self):
+        reset_metrics()
+        self.admin = User.objects.create_user(username='quantri', password='x', role='admin')
+
+    def test_metrics_per_route(self):
+        self.client.force_authenticate(self.admin)
+        self.client.get('/api/khoahocs/')
+        self.client.get('/api/khoahocs/')
+
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{route="khoahoc-list",method="GET"} 2', body)
+        self.assertIn('http_requests_total{route="khoahoc-list",method="GET",status="2xx"} 2', body)
+        # trang danh sách có truy vấn DB và serialize
+        queries = [line for line in body.splitlines()
+                   if line.startswith('http_request_db_queries_sum{route="khoahoc-list"')]
+        self.assertGreater(float(queries[0].rsplit(' ', 1)[1]), 0)
+        self.assertIn('http_request_serialize_duration_seconds_count{route="khoahoc-list",method="GET"} 2', body)
+
+    @override_settings(METRICS_TOKEN='bi-mat')
+    def test_metrics_admin_or_token_only(self):
+        self.client.force_authenticate(User.objects.create_user(username='ketoan', password='x', role='finance_staff'))
+        self.assertEqual(self.client.get('/api/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Metrics sai').status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        # token ngoài ASCII (WSGI giải mã header theo latin-1) bị từ chối như token sai, không lỗi 500
+        self.assertEqual(
+            self.client.get(
+                '/api/metrics/', HTTP_AUTHORIZATION='Metrics bí-mật'.encode().decode('latin-1'),
+            ).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.assertEqual(
+            self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Metrics bi-mat').status_code,
+            status.HTTP_200_OK,
+        )
+
+
+class EndpointQueryBudgetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        volumes = scaled_volumes(0.001, teachers=3, staff=3, courses=5, classes=5)
+        DataGenerator(volumes, seed=7).run()
+        cls.admin = User.objects.create_user(username='quantri', password='x', role='admin')
+
+    maxDiff = None
+
+    def test_endpoints_within_query_budget(self):
+        self.client.force_authenticate(self.admin)
+        failures = []
+        with without_stats_cache():
+            for name, query, budget in ENDPOINTS:
+                result = measure(self.client, name, query, budget)
+                if result['status'] != 200 or result['over_budget']:
+                    failures.append(f"{endpoint_key(name, query)}: HTTP {result['status']}, "
+                                    f"{result['queries']} truy vấn (ngân sách {budget})")
+        self.assertEqual(failures, [])
+
+
+class GenerateDataCommandTest(APITestCase):
+    def test_generate_data(self):
+        out = StringIO()
+        call_command('generate_data', '--today=2024-06-01', scale=0.0005, teachers=2, staff=3, seed=11, stdout=out)
+        self.assertEqual(HocVien.objects.filter(created_as_lead=True, is_converted=False).count(), 15)
+        self.assertEqual(User.objects.filter(role='giangvien').count(), 2)
+        # lượt tính lại cuối cùng thay cho signal: sổ công nợ khớp dữ liệu gốc
+        self.assertEqual(ledger.reconcile(dry_run=True), [])
+
+        with self.assertRaisesMessage(CommandError, 'seed 11'):
+            call_command('generate_data', scale=0.0005, seed=11, stdout=out)
+
+
+@override_settings(JOBS_RETRY_BACKOFF=30)
+class JobQueueTest(APITestCase):
+    def test_run_and_retry(self):
+        ok = divide.enqueue(a=6, b=3)
+        bad = divide.enqueue(a=1, b=0)
+        self.assertEqual(jobs.run_pending(), 2)
+        ok.refresh_from_db()
+        self.assertEqual((ok.status, ok.result, ok.attempts), ('succeeded', 2.0, 1))
+
+        # lỗi lần đầu: chờ chạy lại sau JOBS_RETRY_BACKOFF giây
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), ('queued', 1))
+        self.assertGreater(bad.run_at, timezone.now() + timedelta(seconds=25))
+        self.assertIn('ZeroDivisionError', bad.last_error)
+        self.assertEqual(jobs.run_pending(), 0)
+
+        Job.objects.filter(pk=bad.pk).update(run_at=timezone.now())
+        self.assertEqual(jobs.run_pending(), 1)
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), ('failed', 2))
+
+    def test_requeue_stale(self):
+        job = divide.enqueue(a=1, b=1)
+        [claimed] = jobs.claim('worker-chet')
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(timeout=60), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ('queued', ''))
+        # worker cũ ghi kết quả muộn: bị bỏ qua
+        jobs.execute(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+
+    def test_status_endpoint(self):
+        owner = User.objects.create_user(username='taojob', password='x', role='sales_staff')
+        other = User.objects.create_user(username='khac', password='x', role='sales_staff')
+        job = divide.enqueue(a=1, b=2, created_by=owner)
+        url = reverse('core:job-detail', args=[job.pk])
+
+        self.client.force_authenticate(owner)
+        self.assertEqual(self.client.get(url).data['status'], 'queued')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('core:job-list')).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class RunWorkerCommandTest(TransactionTestCase):
+    def test_threads_share_queue(self):
+        created = [divide.enqueue(a=index, b=1) for index in range(6)]
+        call_command('run_worker', burst=True, concurrency=3, poll_interval=0.05, stdout=StringIO())
+        finished = Job.objects.filter(pk__in=[job.pk for job in created])
+        self.assertEqual(set(finished.values_list('status', flat=True)), {'succeeded'})
+        # SKIP LOCKED: mỗi job chỉ được một thread chạy đúng một lần
+        self.assertEqual(set(finished.values_list('attempts', flat=True)), {1})
@@ -0,0 +1,63 @@
+"""
+Chuẩn hóa chuỗi tiếng Việt và số điện thoại cho tìm kiếm.
+"""
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_PHONE_NOISE = re.compile(r'[\s.\-()]')
+_PHONE_QUERY = re.compile(r'^\+?\d{3,}$')
+
+
+def fold_diacritics(value):
+    """
+    Bỏ dấu tiếng Việt và chuyển về chữ thường: 'Nguyễn Đức' -> 'nguyen duc'
+    """
+    if not value:
+        return ''
+    value = str(value).replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', value)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def search_tokens(value):
+    """
+    Tách chuỗi đã bỏ dấu thành các từ chỉ gồm [a-z0-9] (an toàn để ghép vào tsquery)
+    """
+    return [token for token in _NON_ALNUM.split(fold_diacritics(value)) if token]
+
+
+def normalize_phone(value):
+    """
+    Đưa số điện thoại Việt Nam về dạng 0xxxxxxxxx, bất kể tiền tố +84 / 84 / 0 / không có.
+    Trả về '' nếu không phải số điện thoại.
+    """
+    digits = _PHONE_NOISE.sub('', str(value or ''))
+    if digits.startswith('+84'):
+        digits = digits[3:]
+    elif digits.startswith('84') and len(digits) == 11:
+        digits = digits[2:]
+    digits = digits.lstrip('+')
+    if not digits.isdigit():
+        return ''
+    return digits if digits.startswith('0') else '0' + digits
+
+
+def phone_query_prefixes(value):
+    """
+    Các tiền tố 0xxxx có thể ứng với một đoạn số điện thoại người dùng gõ (chưa đủ số).
+    '84912' có thể là '0912' (đã gõ mã quốc gia) hoặc '084912' -> trả về cả hai.
+    Trả về [] nếu chuỗi không giống số điện thoại.
+    """
+    digits = _PHONE_NOISE.sub('', str(value or ''))
+    if not _PHONE_QUERY.match(digits):
+        return []
+    if digits.startswith('+84'):
+        return ['0' + digits[3:]]
+    digits = digits.lstrip('+')
+    if digits.startswith('0'):
+        return [digits]
+    prefixes = ['0' + digits]
+    if digits.startswith('84') and len(digits) > 2:
+        prefixes.append('0' + digits[2:])
+    return prefixes
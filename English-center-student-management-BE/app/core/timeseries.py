@@ -0,0 +1,89 @@
+from datetime import date, datetime, time
+
+from django.db import models
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def first_of_month(value):
+    """
+    Ngày đầu tháng của một date/datetime
+    """
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value.replace(day=1)
+
+
+def add_months(value, months):
+    """
+    Cộng/trừ số tháng cho một ngày đầu tháng
+    """
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(start, end):
+    """
+    Danh sách ngày đầu tháng từ tháng của `start` đến tháng của `end` (bao gồm cả hai đầu)
+    """
+    current, last = first_of_month(start), first_of_month(end)
+    months = []
+    while current <= last:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def month_window(from_date=None, to_date=None, default_months=12):
+    """
+    Xác định khoảng tháng cần thống kê.
+    Thiếu `to_date` -> tháng hiện tại; thiếu `from_date` -> lùi `default_months` tháng tính cả tháng cuối.
+    """
+    end = first_of_month(to_date or timezone.localdate())
+    start = first_of_month(from_date) if from_date else add_months(end, -(default_months - 1))
+    if start > end:
+        start, end = end, start
+    return start, end
+
+
+def _range_filter(model, date_field, start, end):
+    """
+    Điều kiện lọc [đầu tháng start, đầu tháng sau end) trực tiếp trên cột để tận dụng index
+    """
+    lower = first_of_month(start)
+    upper = add_months(first_of_month(end), 1)
+    if isinstance(model._meta.get_field(date_field), models.DateTimeField):
+        tz = timezone.get_current_timezone()
+        lower = timezone.make_aware(datetime.combine(lower, time.min), tz)
+        upper = timezone.make_aware(datetime.combine(upper, time.min), tz)
+    return {f'{date_field}__gte': lower, f'{date_field}__lt': upper}
+
+
+def monthly_buckets(queryset, date_field, start, end, **aggregates):
+    """
+    Gom nhóm `queryset` theo tháng của `date_field` bằng MỘT truy vấn GROUP BY.
+
+    Trả về list theo thứ tự tháng tăng dần:
+      [{'thang': date(2025, 1, 1), '<alias>': <giá trị>, ...}, ...]
+    Các tháng không có dữ liệu được điền 0 ở phía Python.
+    """
+    rows = (
+        queryset
+        .filter(**_range_filter(queryset.model, date_field, start, end))
+        .annotate(thang=TruncMonth(date_field))
+        .values('thang')
+        .annotate(**aggregates)
+        .order_by()
+    )
+    by_month = {}
+    for row in rows:
+        by_month[first_of_month(row.pop('thang'))] = row
+
+    buckets = []
+    for month in month_range(start, end):
+        row = by_month.get(month, {})
+        bucket = {'thang': month}
+        for alias in aggregates:
+            bucket[alias] = row.get(alias) or 0
+        buckets.append(bucket)
+    return buckets
@@ -0,0 +1,67 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import pre_save
+
+# model -> tập các field cần ghi nhớ giá trị trước khi save
+_tracked_fields = {}
+
+
+def track_changes(model, fields):
+    """
+    Đăng ký ghi nhớ giá trị cũ (trong DB) của `fields` trước mỗi lần save `model`.
+    Nhiều nơi cùng theo dõi một model chỉ tốn MỘT truy vấn cho mỗi lần update.
+    """
+    _tracked_fields.setdefault(model, set()).update(fields)
+    pre_save.connect(_remember_previous, sender=model, dispatch_uid=f'track_changes:{model._meta.label}')
+
+
+def previous_values(instance):
+    """
+    Giá trị cũ của các field được theo dõi, hoặc None nếu instance vừa được tạo
+    """
+    return getattr(instance, '_previous_values', None)
+
+
+def _remember_previous(sender, instance, raw=False, **kwargs):
+    instance._previous_values = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_values = (
+        sender._default_manager.filter(pk=instance.pk).values(*_tracked_fields[sender]).first()
+    )
+
+
+def apply_delta(model, key, measures, sign=1, create_missing=True):
+    """
+    Cộng (sign=1) hoặc trừ (sign=-1) `measures` vào dòng `key` của bảng tích lũy bằng F().
+    Chưa có dòng thì tạo mới, trừ khi `create_missing=False`.
+    """
+    deltas = {name: sign * value for name, value in measures.items()}
+    if model.objects.filter(**key).update(**{name: F(name) + d for name, d in deltas.items()}):
+        return
+    if not create_missing:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **deltas)
+    except IntegrityError:
+        # Dòng vừa được request khác tạo: cộng dồn vào dòng đó
+        model.objects.filter(**key).update(**{name: F(name) + d for name, d in deltas.items()})
+
+
+def apply_change(contribution, old_values, new_values):
+    """
+    Chuyển đóng góp của một bản ghi nguồn từ `old_values` sang `new_values` (None = không tồn tại).
+    `contribution(values)` trả về (model, key, measures).
+    """
+    old = contribution(old_values) if old_values else None
+    new = contribution(new_values) if new_values else None
+    if old and new and old[1] == new[1]:
+        diff = {name: new[2][name] - old[2][name] for name in new[2]}
+        if any(diff.values()):
+            apply_delta(new[0], new[1], diff)
+        return
+    if old:
+        apply_delta(*old, sign=-1)
+    if new:
+        apply_delta(*new)
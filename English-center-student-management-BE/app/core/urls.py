@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('metrics/', views.metrics, name='metrics'),
+    path('jobs/', views.JobListView.as_view(), name='job-list'),
+    path('jobs/<uuid:pk>/', views.JobDetailView.as_view(), name='job-detail'),
+    path('system/db-connections/', views.db_connection_stats, name='db-connection-stats'),
+]
@@ -0,0 +1,55 @@
+from django.http import HttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from app.core.db.base import connection_stats
+from app.core.metrics import render_prometheus
+from app.core.models import Job
+from app.core.permissions import HasMetricsToken, IsAdminUser
+from app.core.serializers import JobSerializer
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_connection_stats(request):
+    """
+    Số liệu kết nối DB của worker đang xử lý request (mỗi worker gunicorn có số liệu riêng)
+    """
+    return Response(connection_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser | HasMetricsToken])
+def metrics(request):
+    """
+    Số liệu hiệu năng theo endpoint của worker hiện tại, định dạng text của Prometheus
+    """
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class JobListView(generics.ListAPIView):
+    """
+    Danh sách công việc nền (Admin), lọc theo status / task
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'task']
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    """
+    Trạng thái một công việc nền: Admin xem mọi job, user khác chỉ xem job do mình tạo
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == 'admin':
+            return Job.objects.all()
+        return Job.objects.filter(created_by=user)
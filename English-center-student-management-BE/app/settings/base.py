@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from decouple import config
+
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -26,6 +28,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Third-party apps
     "rest_framework",
@@ -35,6 +38,7 @@ INSTALLED_APPS = [
     "drf_spectacular",
 
     # Local apps
+    'app.core',
     'app.apps.chamsoc',
     'app.apps.dangky',
     'app.apps.hocviens',
@@ -52,6 +56,8 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # ==============================
 MIDDLEWARE = [
+    # đo thời gian / số truy vấn theo endpoint, xem /api/metrics/ (app/core/metrics.py)
+    "app.core.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS phải đứng trước CommonMiddleware
@@ -84,12 +90,43 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "app.wsgi.application"
+ASGI_APPLICATION = "app.asgi.application"
 
 # ==============================
 # DATABASE (sẽ override ở dev.py/prod.py)
 # ==============================
 DATABASES = {}
 
+
+def postgres_database(name, user, password, host, port):
+    """
+    Cấu hình DB PostgreSQL kèm quản lý kết nối theo biến môi trường (backend app/core/db):
+    - DB_POOL=1: mỗi process giữ một pool kết nối psycopg (DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE,
+      DB_POOL_TIMEOUT = số giây chờ lấy kết nối, DB_POOL_MAX_IDLE = số giây giữ kết nối rảnh)
+    - DB_POOL=0 (mặc định): kết nối bền, giữ DB_CONN_MAX_AGE giây (0 = mở kết nối mới mỗi request)
+    - DB_CONN_HEALTH_CHECKS=1 (mặc định): kiểm tra kết nối còn sống trước khi dùng lại
+    """
+    database = {
+        'ENGINE': 'app.core.db',
+        'NAME': name,
+        'USER': user,
+        'PASSWORD': password,
+        'HOST': host,
+        'PORT': port,
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': {},
+    }
+    if config('DB_POOL', default=False, cast=bool):
+        database['CONN_MAX_AGE'] = 0  # pool tự giữ kết nối
+        database['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        }
+    return database
+
 # ==============================
 # PASSWORD VALIDATORS
 # ==============================
@@ -123,13 +160,83 @@ MEDIA_ROOT = BASE_DIR / "media"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWT + principal (role, HocVien liên kết) lấy từ cache/claim, không SELECT user mỗi request
+        "app.core.authentication.CachedPrincipalJWTAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.OrderingFilter",
         "rest_framework.filters.SearchFilter",
     ],
+    # ?page= (count ước lượng) hoặc ?cursor= (keyset), xem app/core/pagination.py
+    "DEFAULT_PAGINATION_CLASS": "app.core.pagination.DefaultPagination",
+    "PAGE_SIZE": 20,
+}
+
+# ==============================
+# CACHE (Redis khi có REDIS_URL, ngược lại locmem trong process)
+# ==============================
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "erp",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "erp-default",
+        }
+    }
+
+# Cache cho các endpoint thống kê / báo cáo (app/core/cache.py)
+STATS_CACHE_ALIAS = "default"
+STATS_CACHE_TTL = config('STATS_CACHE_TTL', default=300, cast=int)  # giây
+
+# Số liệu hiệu năng theo endpoint (app/core/metrics.py, GET /api/metrics/)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_SAMPLE_RATE = config('METRICS_SAMPLE_RATE', default=1.0, cast=float)  # tỉ lệ request được đo chi tiết
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # Authorization: Metrics <token> cho Prometheus
+
+# Công việc nền (app/core/jobs.py, manage.py run_worker)
+JOBS_CONCURRENCY = config('JOBS_CONCURRENCY', default=2, cast=int)  # số thread mỗi worker
+JOBS_POLL_INTERVAL = config('JOBS_POLL_INTERVAL', default=1.0, cast=float)  # giây, khi hàng đợi rỗng
+JOBS_MAX_ATTEMPTS = config('JOBS_MAX_ATTEMPTS', default=5, cast=int)
+JOBS_RETRY_BACKOFF = config('JOBS_RETRY_BACKOFF', default=10, cast=int)  # giây, nhân đôi sau mỗi lần lỗi
+JOBS_RETRY_BACKOFF_MAX = config('JOBS_RETRY_BACKOFF_MAX', default=3600, cast=int)
+JOBS_LOCK_TIMEOUT = config('JOBS_LOCK_TIMEOUT', default=600, cast=int)  # job chạy quá lâu coi như worker đã chết
+
+# Email / SMS gửi ra ngoài (app/apps/thongbaos/delivery.py, app/core/sms.py)
+# Backend email: console (mặc định) | django.core.mail.backends.filebased.EmailBackend (EMAIL_FILE_PATH) | smtp
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'tmp' / 'mail'))
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='no-reply@localhost')
+# Backend SMS: app.core.sms.ConsoleBackend | FileBackend (SMS_FILE_PATH) | LocMemBackend | HttpBackend (gateway)
+SMS_BACKEND = config('SMS_BACKEND', default='app.core.sms.ConsoleBackend')
+SMS_FILE_PATH = config('SMS_FILE_PATH', default=str(BASE_DIR / 'tmp' / 'sms'))
+SMS_GATEWAY_URL = config('SMS_GATEWAY_URL', default='')
+SMS_GATEWAY_TOKEN = config('SMS_GATEWAY_TOKEN', default='')
+SMS_GATEWAY_TIMEOUT = config('SMS_GATEWAY_TIMEOUT', default=10, cast=int)
+OUTBOUND_BATCH_SIZE = config('OUTBOUND_BATCH_SIZE', default=200, cast=int)  # số tin mỗi lô / mỗi kết nối
+OUTBOUND_EMAIL_RATE = config('OUTBOUND_EMAIL_RATE', default=20.0, cast=float)  # tin/giây, 0 = không giới hạn
+OUTBOUND_SMS_RATE = config('OUTBOUND_SMS_RATE', default=5.0, cast=float)
+OUTBOUND_MAX_ATTEMPTS = config('OUTBOUND_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOUND_LEASE = config('OUTBOUND_LEASE', default=600, cast=int)  # giây giữ một lô tin đang gửi
+
+SIMPLE_JWT = {
+    # access token mới khi refresh mang role hiện tại thay vì claim cũ
+    "TOKEN_REFRESH_SERIALIZER": "app.core.authentication.PrincipalTokenRefreshSerializer",
 }
 
 SPECTACULAR_SETTINGS = {
@@ -8,14 +8,13 @@ DEBUG = True
 
 # Database
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('POSTGRES_DB', default='crm'),
-        'USER': config('POSTGRES_USER', default='postgres'),
-        'PASSWORD': config('POSTGRES_PASSWORD', default='postgres'),
-        'HOST': config('POSTGRES_HOST', default='db'),
-        'PORT': config('POSTGRES_PORT', default='5432'),
-    }
+    'default': postgres_database(
+        config('POSTGRES_DB', default='crm'),
+        config('POSTGRES_USER', default='postgres'),
+        config('POSTGRES_PASSWORD', default='postgres'),
+        config('POSTGRES_HOST', default='db'),
+        config('POSTGRES_PORT', default='5432'),
+    )
 }
 
 # CORS cho môi trường dev (mở hết)
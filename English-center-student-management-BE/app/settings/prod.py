@@ -5,16 +5,24 @@ DEBUG = False
 
 # Database (override bằng biến môi trường)
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('POSTGRES_DB'),
-        'USER': config('POSTGRES_USER'),
-        'PASSWORD': config('POSTGRES_PASSWORD'),
-        'HOST': config('POSTGRES_HOST', default='db'),
-        'PORT': config('POSTGRES_PORT', default='5432'),
-    }
+    'default': postgres_database(
+        config('POSTGRES_DB'),
+        config('POSTGRES_USER'),
+        config('POSTGRES_PASSWORD'),
+        config('POSTGRES_HOST', default='db'),
+        config('POSTGRES_PORT', default='5432'),
+    )
 }
 
+# Cache: không có Redis thì dùng file cache để các worker gunicorn dùng chung
+if not REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('FILE_CACHE_DIR', default='/tmp/erp-cache'),
+        }
+    }
+
 # Security settings cho production
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -18,6 +18,7 @@ urlpatterns = [
     path('api/', include('app.apps.diemdanhs.urls')),
     path('api/', include('app.apps.lophocs.urls')),
     path('api/', include('app.apps.teachers.urls')),
+    path('api/', include('app.core.urls')),
     
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
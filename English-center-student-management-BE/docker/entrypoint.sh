@@ -43,7 +43,15 @@ fi
 if [ "$DJANGO_SETTINGS_MODULE" = "app.settings.dev" ]; then
   echo "Chạy Django development server..."
   exec python manage.py runserver 0.0.0.0:8000
+elif [ "$APP_SERVER" = "asgi" ]; then
+  # ASGI: mỗi worker là một event loop, số request đồng thời không bị giới hạn bởi số worker.
+  # View async (thống kê, báo cáo) không giữ thread khi chờ DB; view đồng bộ chạy trong thread pool
+  # (ASGI_THREADS). Kết nối DB không gắn cố định với thread nên dùng pool thay cho CONN_MAX_AGE.
+  echo "Chạy Gunicorn + Uvicorn (ASGI)..."
+  export DB_CONN_MAX_AGE=0
+  export DB_POOL="${DB_POOL:-1}"
+  exec gunicorn app.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000 --workers "${WEB_WORKERS:-4}"
 else
   echo "Chạy Gunicorn production server..."
-  exec gunicorn app.wsgi:application --bind 0.0.0.0:8000 --workers 4
+  exec gunicorn app.wsgi:application --bind 0.0.0.0:8000 --workers "${WEB_WORKERS:-4}"
 fi
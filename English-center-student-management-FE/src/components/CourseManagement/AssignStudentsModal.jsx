@@ -46,8 +46,8 @@ export default function AssignStudentsModal({ classData, onClose, onSuccess }) {
       try {
         setLoading(true);
         setError(null);
-        const response = await courseService.getStudents();
-        setStudents(response || []);
+        const response = await courseService.getAllStudents();
+        setStudents(response.results);
 
         // Initialize with current class students
         if (classData && classData.students) {
@@ -30,7 +30,7 @@ export default function ClassList({
       try {
         setLoading(true);
         setError(null);
-        const response = await courseService.fetchClass();
+        const response = await courseService.fetchClass({ include: 'schedule', page_size: 100 });
         console.log('Classes response:', response);
         
         // Transform API response to match frontend format
@@ -10,17 +10,22 @@ export default function CourseDetail({ course, onClose }) {
     const loadCourseClasses = async () => {
       try {
         setLoading(true);
-        const response = await courseService.getClasses();
+        // Compare with course.id (remove "class_" prefix if present)
+        const courseIdToMatch = typeof course.id === 'string' && course.id.startsWith('class_') 
+          ? course.id.replace('class_', '') 
+          : course.id;
+
+        // Chỉ lấy lớp của khóa học này, kèm học viên và lịch học
+        const response = await courseService.getClasses({
+          khoa_hoc: courseIdToMatch,
+          include: 'students,schedule',
+        });
         const allClasses = response.results || [];
         
         console.log('All classes:', allClasses);
         console.log('Current course ID:', course.id);
         
         // Filter classes for this course
-        // Compare with course.id (remove "class_" prefix if present)
-        const courseIdToMatch = typeof course.id === 'string' && course.id.startsWith('class_') 
-          ? course.id.replace('class_', '') 
-          : course.id;
         
         const filteredClasses = allClasses.filter(cls => {
           console.log('Comparing:', cls.courseId, 'with', courseIdToMatch);
@@ -17,8 +17,8 @@ export default function CourseList() {
       try {
         setLoading(true);
         setError(null);
-        const response = await courseService.getCourses();
-        setCourses(response.results || response || []);
+        const response = await courseService.getAllCourses();
+        setCourses(response.results);
       } catch (err) {
         console.error('Error loading courses:', err);
         setError('Không thể tải danh sách khóa học. Vui lòng thử lại.');
@@ -72,9 +72,9 @@ export default function CreateClassForm({ onClose, onSuccess }) {
     const fetchCourses = async () => {
       setLoadingCourses(true);
       try {
-        const response = await courseService.getCourses();
+        const response = await courseService.getAllCourses();
         console.log('response ', response);
-        setCourses(response || []);
+        setCourses(response.results);
       } catch (error) {
         setCourses([]);
       } finally {
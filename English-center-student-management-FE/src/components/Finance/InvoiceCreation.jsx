@@ -143,7 +143,7 @@ export default function InvoiceCreation({ student, onClose, onSubmit }) {
       setCoursesLoading(true);
       setCoursesError(null);
       try {
-        const response = await courseService.getCourses();
+        const response = await courseService.getAllCourses();
         console.log('API Response:', response); // Debug log
 
         // Handle different response structures
@@ -56,8 +56,8 @@ export default function EditStudentForm({ student, onClose, onSuccess }) {
     const loadCourses = async () => {
       try {
         setLoadingCourses(true);
-        const response = await courseService.getCourses();
-        setCourses(response.results || response || []);
+        const response = await courseService.getAllCourses();
+        setCourses(response.results);
       } catch (err) {
         console.error("Error loading courses:", err);
       } finally {
@@ -31,8 +31,8 @@ export default function StudentList({ onEdit, onViewProfile, refreshTrigger }) {
     try {
       setLoading(true);
       setError(null);
-      const response = await crmService.getStudents();
-      setStudents(response.results || response || []);
+      const response = await crmService.getAllStudents();
+      setStudents(response.results);
     } catch (err) {
       console.error('Error loading students:', err);
       setError('Không thể tải danh sách học viên. Vui lòng thử lại.');
@@ -161,17 +161,24 @@ const FinancePage = () => {
       setReportLoading(true);
       setReportError(null);
 
-      // Fetch payment statistics
-      // const stats = await financeService.getPaymentStats();
-      
-      // Fetch all payments for processing
-      const payments = await financeService.getPayments({ page_size: 1000 });
-      
-      // Process monthly revenue data from actual payments
-      const monthlyRevenue = [];
-      const totalRevenue = payments.results?.reduce((sum, payment) => sum + (payment.so_tien || 0), 0) || 0;
-      const totalPayments = payments.results?.length || 0;
-      const averageMonthlyRevenue = totalPayments > 0 ? totalRevenue / 6 : 0; // Assume 6 months
+      // Tổng doanh thu / số thanh toán và doanh thu theo tháng lấy từ các endpoint tổng hợp
+      // (danh sách /thanhtoans/ chỉ trả một trang nên không dùng để cộng dồn)
+      const [paymentStats, financialReport] = await Promise.all([
+        financeService.getPaymentStats(),
+        // báo cáo tài chính chỉ dành cho admin: vai trò khác dùng dữ liệu ước lượng bên dưới
+        financeService.getFinancialReport().catch(() => null),
+      ]);
+
+      const monthlyRevenue = (financialReport?.monthly_stats || []).slice(0, 6).map(row => ({
+        month: `T${row.thang.replace(/^0/, '')}`,
+        revenue: Number(row.doanh_thu) || 0,
+        payments: row.so_luong || 0,
+      }));
+      const totalRevenue = Number(paymentStats.total_tien) || 0;
+      const totalPayments = paymentStats.total_thanhtoan || 0;
+      const averageMonthlyRevenue = monthlyRevenue.length > 0
+        ? monthlyRevenue.reduce((sum, row) => sum + row.revenue, 0) / monthlyRevenue.length
+        : (totalPayments > 0 ? totalRevenue / 6 : 0); // Assume 6 months
 
       // Get overdue customers (students with debt)
       const debtInfo = await financeService.getStudentDebtInfo({ 
@@ -248,7 +255,11 @@ const FinancePage = () => {
       setPaymentLoading(true);
       setPaymentError(null);
       
-      const response = await financeService.getPayments();
+      // Bảng chỉ hiển thị trang đầu; số liệu tổng lấy từ /thanhtoans/stats/
+      const [response, stats] = await Promise.all([
+        financeService.getPayments(),
+        financeService.getPaymentStats(),
+      ]);
       console.log('🔍 API Response:', response);
       
       // Handle direct array response or paginated response
@@ -257,16 +268,13 @@ const FinancePage = () => {
       
       setPayments(paymentsData);
       
-      // Calculate payment stats
-      const totalAmount = paymentsData.reduce((sum, p) => sum + (parseFloat(p.so_tien) || 0), 0);
-      const completedPayments = paymentsData.length; // All payments are considered completed
-      const pendingPayments = 0; // No pending status in current API
-      
+      // Payment stats over all payments, not just the loaded page
+      const totalPayments = stats.total_thanhtoan || 0;
       const calculatedStats = {
-        totalAmount,
-        totalPayments: paymentsData.length,
-        completedPayments,
-        pendingPayments
+        totalAmount: Number(stats.total_tien) || 0,
+        totalPayments,
+        completedPayments: totalPayments, // All payments are considered completed
+        pendingPayments: 0 // No pending status in current API
       };
       
       setPaymentStats(calculatedStats);
@@ -45,7 +45,8 @@ export default function NotificationsSupport() {
         const data = await notificationsService.getNotificationsByRecipients(recipients);
         if (mounted) {
           // Transform API data to UI format
-          const formattedData = data.map(notif => ({
+          const items = Array.isArray(data) ? data : (data.results || []);
+          const formattedData = items.map(notif => ({
             id: notif.id,
             title: notif.tieu_de,
             content: notif.noi_dung,
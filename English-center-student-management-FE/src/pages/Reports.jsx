@@ -36,9 +36,9 @@ export default function Reports() {
     let mounted = true;
     const loadAllStudents = async () => {
       try {
-        const data = await crmService.getStudents();
+        const data = await crmService.getAllStudents();
         if (mounted) {
-          setAllStudents(data.results || data || []);
+          setAllStudents(data.results);
         }
       } catch (error) {
         console.error('Error loading all students:', error);
@@ -1,5 +1,6 @@
 // Course Management API Service
 import authService from "./authService";
+import { fetchAllPages } from "../utils/pagination";
 
 // Sử dụng axios client từ authService để có auto refresh token
 const http = authService.client;
@@ -23,6 +24,20 @@ class CourseService {
     }
   }
 
+  /**
+   * Lấy toàn bộ khóa học (đi hết các trang), dùng cho dropdown / lọc phía client
+   * @param {Object} params - Query parameters { search, trang_thai, giang_vien, ordering }
+   */
+  async getAllCourses(params = {}) {
+    try {
+      const results = await fetchAllPages(http, '/khoahocs/', params);
+      return { results, count: results.length };
+    } catch (error) {
+      console.error("Error fetching courses:", error);
+      throw error;
+    }
+  }
+
   /**
    * Lấy chi tiết khóa học
    * @param {string} courseId - ID của khóa học
@@ -114,25 +129,28 @@ class CourseService {
    */
   async getClasses(params = {}) {
     try {
-      const lophocsResponse = await this.fetchClass(params);
+      // Danh sách lớp phân trang theo con trỏ: lấy hết các trang.
+      // Truyền include: 'students,schedule' khi màn hình cần danh sách học viên / lịch học.
+      const lophocs = await this.fetchAllClasses(params);
 
-      const classes = lophocsResponse.results?.map(lophoc => ({
+      const classes = lophocs.map(lophoc => ({
         id: `class_${lophoc.id}`,
         courseId: lophoc.khoa_hoc, // ID của khóa học (foreign key)
-        courseName: lophoc.ten,
+        courseName: lophoc.courseName || lophoc.ten,
         name: lophoc.ten,
         giang_vien: lophoc.giang_vien,
         teacherName: lophoc.giang_vien?.name || lophoc.giang_vien?.username || 'Chưa có giáo viên',
         room: lophoc.phong_hoc || `P${Math.floor(Math.random() * 20) + 1}`,
         schedule: lophoc.schedule || [],
-        maxStudents: lophoc.si_so_toi_da || 20,
-        currentStudents: lophoc.students?.length || 0,
+        maxStudents: lophoc.so_hoc_vien_toi_da || 20,
+        // backend trả sẵn số học viên; `students` chỉ có khi include=students
+        currentStudents: lophoc.currentStudents ?? lophoc.students?.length ?? 0,
         status: lophoc.trang_thai === 'dang_hoc' ? 'Đang học' : 'Đã kết thúc',
         startDate: lophoc.ngay_bat_dau || lophoc.created_at,
         students: lophoc.students || [],
         price: lophoc.hoc_phi,
         description: lophoc.mo_ta
-      })) || [];
+      }));
 
       return { results: classes };
     } catch (fallbackError) {
@@ -144,7 +162,7 @@ class CourseService {
 
   /**
      * Fetch classes (LopHoc) from backend.
-     * This returns the raw LopHoc list (used by getClasses).
+     * This returns the raw LopHoc list (one page).
      */
   async fetchClass(params = {}) {
     try {
@@ -156,6 +174,19 @@ class CourseService {
     }
   }
 
+  /**
+   * Lấy toàn bộ lớp học: đi theo link `next` của phân trang con trỏ (mỗi trang tối đa 100 lớp)
+   * @param {Object} params - Query parameters (include, khoa_hoc, trang_thai...)
+   */
+  async fetchAllClasses(params = {}) {
+    try {
+      return await fetchAllPages(http, '/lophocs/', params);
+    } catch (error) {
+      console.error("Error fetching classes (lophocs):", error);
+      throw error;
+    }
+  }
+
   /**
    * Tạo lớp học mới
    * @param {Object} classData - Dữ liệu lớp học
@@ -420,6 +451,20 @@ class CourseService {
     }
   }
 
+  /**
+   * Lấy toàn bộ học viên (đi hết các trang)
+   * @param {Object} params - Query parameters
+   */
+  async getAllStudents(params = {}) {
+    try {
+      const results = await fetchAllPages(http, '/hocviens/', params);
+      return { results, count: results.length };
+    } catch (error) {
+      console.error("Error fetching students:", error);
+      return { results: [] };
+    }
+  }
+
   /**
    * Lấy danh sách giáo viên
    */
@@ -1,5 +1,6 @@
 // CRM API Service
 import authService from './authService';
+import { fetchAllPages } from '../utils/pagination';
 
 // Sử dụng axios client từ authService để có auto refresh token
 const http = authService.client;
@@ -15,6 +16,17 @@ class CRMService {
     }
   }
 
+  // Toàn bộ học viên (đi hết các trang), dùng khi màn hình lọc / tìm phía client
+  async getAllStudents(params = {}) {
+    try {
+      const results = await fetchAllPages(http, '/hocviens/', params);
+      return { results, count: results.length };
+    } catch (error) {
+      console.error('Error fetching students:', error);
+      throw error;
+    }
+  }
+
   async getStudent(id) {
     try {
       const { data } = await http.get(`/hocviens/${id}/`);
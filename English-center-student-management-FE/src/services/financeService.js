@@ -126,44 +126,34 @@ class FinanceService {
    */
   async getMonthlyRevenue(months = 12) {
     try {
-      const payments = await this.getPayments({
-        page_size: 1000,
-        ordering: '-ngay_dong'
-      });
-
-      // Process payments into monthly data
-      const monthlyData = {};
-      const now = new Date();
-
-      // Initialize last N months
-      for (let i = 0; i < months; i++) {
-        const date = new Date(now.getFullYear(), now.getMonth() - i, 1);
-        const key = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
-        monthlyData[key] = {
-          month: date.toLocaleDateString('vi-VN', { month: 'long', year: 'numeric' }),
-          total: 0,
-          count: 0
-        };
-      }
-
-      // Aggregate payment data
-      payments.results?.forEach(payment => {
-        const paymentDate = new Date(payment.ngay_dong);
-        const key = `${paymentDate.getFullYear()}-${String(paymentDate.getMonth() + 1).padStart(2, '0')}`;
-
-        if (monthlyData[key]) {
-          monthlyData[key].total += parseFloat(payment.so_tien);
-          monthlyData[key].count += 1;
-        }
-      });
-
-      return Object.values(monthlyData).reverse();
+      // Tổng hợp theo tháng ở backend (bảng fact doanh thu), không cộng dồn từ danh sách thanh toán
+      const report = await this.getFinancialReport();
+
+      return (report.monthly_stats || []).slice(0, months).reverse().map(row => ({
+        month: row.thang,
+        total: Number(row.doanh_thu) || 0,
+        count: row.so_luong || 0
+      }));
     } catch (error) {
       console.error('Error fetching monthly revenue:', error);
       throw error;
     }
   }
 
+  /**
+   * Get financial report (payment method totals + monthly revenue), admin only
+   * @param {Object} params - Query parameters (from, to: YYYY-MM-DD)
+   */
+  async getFinancialReport(params = {}) {
+    try {
+      const { data } = await http.get('/reports/financial/', { params });
+      return data;
+    } catch (error) {
+      console.error('Error fetching financial report:', error);
+      throw error;
+    }
+  }
+
   /**
    * Get payment method statistics
    */
@@ -0,0 +1,25 @@
+// Helpers for paginated list endpoints (backend DefaultPagination: ?page= / ?cursor=)
+
+export const MAX_PAGE_SIZE = 100;
+
+/**
+ * Lấy toàn bộ danh sách của một endpoint phân trang: đi theo link `next` tới trang cuối.
+ * Dùng cho màn hình cần cả danh sách (dropdown, lọc phía client); màn hình lớn nên phân trang ở server.
+ * @param {import('axios').AxiosInstance} http - axios client (authService.client)
+ * @param {string} url - Endpoint, ví dụ '/khoahocs/'
+ * @param {Object} params - Query parameters (search, filter...)
+ * @returns {Promise<Array>} Tất cả các dòng
+ */
+export async function fetchAllPages(http, url, params = {}) {
+  let { data } = await http.get(url, { params: { page_size: MAX_PAGE_SIZE, ...params } });
+  // endpoint không phân trang trả thẳng mảng
+  if (Array.isArray(data)) return data;
+
+  const results = [...(data.results || [])];
+  while (data.next) {
+    // `next` là URL tuyệt đối: axios bỏ qua baseURL
+    ({ data } = await http.get(data.next));
+    results.push(...(data.results || []));
+  }
+  return results;
+}